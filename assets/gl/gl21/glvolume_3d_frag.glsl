@@ -41,6 +41,13 @@ uniform mat4 img2CmapXform;
  */
 uniform vec3 imageShape;
 
+/*
+ * Shape of the data stored in the imageTexture - this
+ * will differ from the imageShape if the image data
+ * has been sub-sampled.
+ */
+uniform vec3 texShape;
+
 /*
  * Shape of the clipping image.
  */
@@ -132,6 +139,34 @@ uniform vec3 rayStep;
 uniform float stepLength;
 
 
+/*
+ * Texture which identifies regions of the image that
+ * may contain visible voxels. The image is divided into
+ * cells - each texel of the occupancyTexture corresponds
+ * to one cell, and contains 0 if all voxels in the cell
+ * (and in the cells around it) are clipped.
+ */
+uniform sampler3D occupancyTexture;
+
+/*
+ * Skip over empty cells? If false, the occupancyTexture
+ * is not used.
+ */
+uniform bool useOccupancy;
+
+/*
+ * Number of cells along each dimension of the image -
+ * the image shape divided by the cell size. This may
+ * be fractional.
+ */
+uniform vec3 occupancyCells;
+
+/*
+ * Shape of the occupancyTexture.
+ */
+uniform vec3 occupancyShape;
+
+
 
 /*
  * A constant value between 0 and 1 which controls how
@@ -179,6 +214,18 @@ void main(void) {
     int   activeClipPlanes = 0;
     float voxValue;
     int   clipIdx;
+    vec3  cell;
+    vec3  cellEdge;
+    vec3  cellDist;
+    vec3  safeStep;
+    float nskip;
+
+    /*
+     * Used when skipping over empty cells - zero
+     * components are replaced with a tiny value,
+     * to avoid dividing by zero.
+     */
+    safeStep = rayStep + vec3(equal(rayStep, vec3(0))) * 1e-9;
 
     /*
      * Dither by applying a random offset
@@ -208,6 +255,26 @@ void main(void) {
         break;
       }
 
+      /*
+       * If the current cell is empty, move
+       * the ray (by a whole number of steps)
+       * to the point where it leaves the cell.
+       */
+      if (useOccupancy) {
+
+        cell = floor(texCoord * occupancyCells);
+
+        if (texture3D(occupancyTexture, (cell + 0.5) / occupancyShape).a < 0.5) {
+
+          cellEdge      = (cell + step(0.0, rayStep)) / occupancyCells;
+          cellDist      = (cellEdge - texCoord) / safeStep;
+          nskip         = floor(min(cellDist.x, min(cellDist.y, cellDist.z)));
+          texCoord     += rayStep * nskip;
+          clipTexCoord += rayStep * nskip;
+          continue;
+        }
+      }
+
       /*
        * Count the number of active clipping
        * planes (planes for which the current
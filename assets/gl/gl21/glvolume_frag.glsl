@@ -40,6 +40,32 @@ uniform mat4 img2CmapXform;
  */
 uniform vec3 imageShape;
 
+/*
+ * Shape of the data stored in the imageTexture - this
+ * will differ from the imageShape if the image data
+ * has been sub-sampled, or if the imageTexture only
+ * contains one brick of the image data.
+ */
+uniform vec3 texShape;
+
+/*
+ * If the image data has been split into bricks, only
+ * one brick is bound to the imageTexture at a time.
+ * Fragments with image texture coordinates outside of
+ * [brickLo, brickHi) are drawn by another brick, and
+ * so are discarded.
+ */
+uniform vec3 brickLo;
+uniform vec3 brickHi;
+
+/*
+ * Scales and offsets which transform image texture
+ * coordinates into the texture coordinate system
+ * of the current brick.
+ */
+uniform vec3 brickScale;
+uniform vec3 brickOffset;
+
 /*
  * Shape of the clipping image.
  */
@@ -118,7 +144,8 @@ varying vec4 fragColourFactor;
 
 void main(void) {
 
-    vec4 colour;
+    vec4  colour;
+    vec3  texCoord;
     float voxValue;
 
     /*
@@ -128,7 +155,18 @@ void main(void) {
         discard;
     }
 
-    if (!sample_volume(fragTexCoord, fragClipTexCoord, voxValue, colour)) {
+    /*
+     * Skip fragments which are drawn by
+     * another brick of the image texture
+     */
+    if (any(lessThan(        fragTexCoord, brickLo)) ||
+        any(greaterThanEqual(fragTexCoord, brickHi))) {
+        discard;
+    }
+
+    texCoord = fragTexCoord * brickScale + brickOffset;
+
+    if (!sample_volume(texCoord, fragClipTexCoord, voxValue, colour)) {
         discard;
     }
 
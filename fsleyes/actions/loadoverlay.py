@@ -140,7 +140,8 @@ def loadOverlays(paths,
                  saveDir=True,
                  onLoad=None,
                  inmem=False,
-                 blocking=False):
+                 blocking=False,
+                 cache=None):
     """Loads all of the overlays specified in the sequence of files
     contained in ``paths``.
 
@@ -182,6 +183,13 @@ def loadOverlays(paths,
                     directly. Otherwise, overlays and the ``onLoad`` are loaded
                     loaded/called on the :func:`.idle.idle` loop.
 
+    :arg cache:     Optional ``dict`` which is used to cache loaded
+                    overlays, so that an overlay file which is loaded
+                    more than once (e.g. by the :mod:`fsleyes.render`
+                    batch mode) is only read once. Overlays are stored
+                    in the cache, and retrieved from it, by their path and
+                    modification time.
+
     :returns:       If ``blocking is False`` (the default), returns ``None``.
                     Otherwise returns a list containing the loaded overlay
                     objects.
@@ -216,6 +224,23 @@ def loadOverlays(paths,
             errorFunc(path, strings.messages['loadOverlays.unknownType'])
             return
 
+        if cache is not None:
+            cacheKey = (op.abspath(path), _modTime(path))
+            cached   = cache.get(cacheKey, None)
+
+            # The same file may be specified more
+            # than once, in which case we have to
+            # load a separate copy of it.
+            if cached is not None and \
+               any(c is o for c in cached for o in overlays):
+                cached = None
+
+            if cached is not None:
+                log.debug('Using cached overlay(s) for {}'.format(path))
+                overlays.extend(cached)
+                pathIdxs.extend([idx] * len(cached))
+                return
+
         log.debug('Loading overlay {} (guessed data type: {})'.format(
             path, dtype.__name__))
 
@@ -230,6 +255,9 @@ def loadOverlays(paths,
             overlays.extend(loaded)
             pathIdxs.extend([idx] * len(loaded))
 
+            if cache is not None:
+                cache[cacheKey] = loaded
+
         except Exception as e:
             errorFunc(path, e)
 
@@ -274,6 +302,16 @@ def loadOverlays(paths,
     else:        return None
 
 
+def _modTime(path):
+    """Used by :func:`loadOverlays`. Returns the modification time of the
+    given file, or ``None`` if it cannot be determined.
+    """
+    try:
+        return op.getmtime(path)
+    except OSError:
+        return None
+
+
 def loadImage(dtype, path, inmem=False):
     """Called by the :func:`loadOverlays` function. Loads an overlay which
     is represented by an ``Image`` instance, or a sub-class of ``Image``.
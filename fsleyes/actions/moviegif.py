@@ -7,16 +7,30 @@
 """This module provides the :class:`MovieGifAction`, which allows the user
 to save animated gifs. The :func:`makeGif` function can also be used to
 programmatically generate animated gifs.
+
+
+Movie frames are encoded and written to file as they are captured, by one of
+the following classes, so memory use does not depend on the length of the
+movie:
+
+.. autosummary::
+   :nosignatures:
+
+   GifWriter
+   ApngWriter
+   movieWriter
 """
 
 
 import os.path as op
 import            os
-import            shutil
-import            tempfile
+import            io
+import            struct
+import            zlib
 
-import          PIL
-import          wx
+import numpy             as np
+import PIL.Image         as Image
+import                      wx
 
 import fsl.utils.idle                 as idle
 import fsl.utils.transform            as transform
@@ -151,6 +165,11 @@ def makeGif(overlayList,
     """Save an animated gif of the currently selected overlay, according to the
     current movie mode settings.
 
+    Each frame is passed to a :class:`GifWriter` as soon as it has been
+    captured. If the ``filename`` has a ``.png`` or ``.apng`` suffix, an
+    animated PNG is saved instead, via an :class:`ApngWriter` (see the
+    :func:`movieWriter` function).
+
     .. note:: This function will return immediately, as the animated GIF is
               generated on the ``wx`` :mod:`.idle` loop
 
@@ -171,17 +190,22 @@ def makeGif(overlayList,
 
     overlay = displayCtx.getSelectedOverlay()
     opts    = displayCtx.getOpts(overlay)
-    tempdir = tempfile.mkdtemp()
     is3d    = isinstance(panel, scene3dpanel.Scene3DPanel) and \
               panel.movieAxis != 3
 
     class Context(object):
         pass
 
-    ctx           = Context()
-    ctx.cancelled = False
-    ctx.images    = []
-    ctx.frames    = []
+    # We only need to keep track of the
+    # first and most recent frame values
+    # (see realCaptureFrame), so nothing
+    # grows with the number of frames.
+    ctx            = Context()
+    ctx.cancelled  = False
+    ctx.writer     = movieWriter(filename)
+    ctx.nframes    = 0
+    ctx.firstFrame = None
+    ctx.lastFrame  = None
 
     class Finished(Exception):
         pass
@@ -190,14 +214,11 @@ def makeGif(overlayList,
         pass
 
     def finalise(ctx):
-        if not ctx.cancelled and len(ctx.images) > 0:
-            ctx.images[0].save(filename,
-                               format='gif',
-                               save_all=True,
-                               append_images=ctx.images[1:],
-                               duration=50,
-                               loop=0)
-        shutil.rmtree(tempdir)
+        ctx.writer.close()
+
+        if ctx.cancelled or ctx.nframes == 0:
+            if op.exists(filename):
+                os.remove(filename)
 
         if onfinish is not None:
             onfinish()
@@ -224,11 +245,7 @@ def makeGif(overlayList,
 
     def realCaptureFrame(ctx):
 
-        # individual frames don't
-        # need to be saved as gif
-        idx   = len(ctx.frames)
-        fname = op.join(tempdir, '{}.png'.format(idx))
-
+        idx   = ctx.nframes
         frame = panel.getMovieFrame(overlay, opts)
 
         if not progfunc(idx):
@@ -258,7 +275,7 @@ def makeGif(overlayList,
         #     point)
         if is3d:
 
-            if len(ctx.frames) == 0:
+            if ctx.nframes == 0:
                 ctx.startFrame = frame
 
             # normalise the rotmat for this
@@ -270,8 +287,8 @@ def makeGif(overlayList,
             # have performed a full 360 degree
             # rotation (rmsdev of current
             # frame is decreasing towards 0)
-            if len(ctx.frames) > 1    and \
-               frame < ctx.frames[-1] and \
+            if ctx.nframes > 1         and \
+               frame < ctx.lastFrame   and \
                abs(frame) < 0.1:
                 raise Finished()
 
@@ -284,20 +301,416 @@ def makeGif(overlayList,
 
             # Have we looped back to fmin?
             ctx.looped = getattr(ctx, 'looped', False)
-            if not ctx.looped          and \
-               len(ctx.frames) > 1 and \
-               frame < ctx.frames[-1]:
+            if not ctx.looped      and \
+               ctx.nframes > 1     and \
+               frame < ctx.lastFrame:
                 ctx.looped = True
 
             # We have done one full loop, and
             # have reached the starting frame.
             if ctx.looped          and \
-               len(ctx.frames) > 1 and \
-               frame >= ctx.frames[0]:
+               ctx.nframes > 1     and \
+               frame >= ctx.firstFrame:
                 raise Finished()
 
-        screenshot.screenshot(panel, fname)
-        ctx.images.append(PIL.Image.open(fname))
-        ctx.frames.append(frame)
+        ctx.writer.write(screenshot.canvasPanelBitmap(panel))
+
+        if ctx.nframes == 0:
+            ctx.firstFrame = frame
+
+        ctx.lastFrame  = frame
+        ctx.nframes   += 1
 
     idle.idleWhen(captureFrame, ready, ctx, after=0.1)
+
+
+def movieWriter(filename, delay=50, loop=0):
+    """Creates and returns a writer object which can be used to save an
+    animated image to the given ``filename``. An :class:`ApngWriter` is
+    returned if the file has a ``.png`` or ``.apng`` suffix, otherwise a
+    :class:`GifWriter` is returned.
+
+    :arg filename: File to save the movie to
+    :arg delay:    Delay between frames, in milliseconds
+    :arg loop:     Number of times the movie should loop - 0 means forever.
+    """
+
+    suffix = op.splitext(filename)[1].lower()
+
+    if suffix in ('.png', '.apng'): return ApngWriter(filename, delay, loop)
+    else:                           return GifWriter( filename, delay, loop)
+
+
+def _fitFrame(frame, shape):
+    """Used by the :class:`GifWriter` and :class:`ApngWriter`. All frames
+    of an animated image must have the same size - if the given ``frame``
+    (a ``numpy`` array of shape ``(height, width, channels)``) does not have
+    the given ``(height, width)`` ``shape``, it is cropped/padded so that it
+    does.
+    """
+
+    if frame.shape[:2] == tuple(shape):
+        return frame
+
+    h, w    = shape
+    fitted  = np.zeros((h, w, frame.shape[2]), dtype=frame.dtype)
+    fh, fw  = min(h, frame.shape[0]), min(w, frame.shape[1])
+
+    fitted[:fh, :fw] = frame[:fh, :fw]
+
+    return fitted
+
+
+class GifWriter(object):
+    """The ``GifWriter`` class saves an animated GIF, one frame at a time.
+    Each frame is encoded and written to the file as soon as it is passed to
+    the :meth:`write` method, so the frames do not need to be kept in memory.
+
+    GIF images are limited to 256 colours. Each frame is quantised, by
+    ``PIL``, to its own palette when it is written, and the palette is stored
+    as a *local colour table* for the frame. The image data for each frame is
+    encoded by ``PIL``, and then copied into the animated GIF.
+
+    A ``GifWriter`` can be used as a context manager, in which case the
+    :meth:`close` method is called automatically.
+    """
+
+
+    def __init__(self, filename, delay=50, loop=0):
+        """Create a ``GifWriter``.
+
+        :arg filename: File to save the animated GIF to
+        :arg delay:    Delay between frames, in milliseconds. GIF frame
+                       delays have a resolution of 10 milliseconds.
+        :arg loop:     Number of times the movie should loop - 0 means
+                       forever.
+        """
+        self.__fobj    = open(filename, 'wb')
+        self.__delay   = int(round(delay / 10.0))
+        self.__loop    = loop
+        self.__shape   = None
+        self.__nframes = 0
+
+
+    def __enter__(self):
+        """Returns this ``GifWriter``. """
+        return self
+
+
+    def __exit__(self, *a):
+        """Calls :meth:`close`. """
+        self.close()
+
+
+    @property
+    def nframes(self):
+        """Returns the number of frames that have been written. """
+        return self.__nframes
+
+
+    def write(self, frame):
+        """Encode the given frame and append it to the file.
+
+        :arg frame: ``numpy`` ``uint8`` array of shape
+                    ``(height, width, 3)`` or ``(height, width, 4)``,
+                    containing RGB(A) values. Alpha is ignored.
+        """
+
+        frame = np.ascontiguousarray(frame[:, :, :3], dtype=np.uint8)
+
+        if self.__shape is None:
+            self.__shape = frame.shape[:2]
+            self.__writeHeader()
+        else:
+            frame = _fitFrame(frame, self.__shape)
+
+        h, w = self.__shape
+
+        # Quantise the frame, and let PIL
+        # encode it as a single-frame GIF.
+        # We then pull out the palette and
+        # the LZW-encoded image data, and
+        # add them to our file.
+        img = Image.fromarray(frame, 'RGB').quantize(colors=256)
+        buf = io.BytesIO()
+        img.save(buf, format='gif')
+
+        palette, interlace, data = GifWriter.__parseFrame(buf.getvalue())
+
+        # The local colour table size is
+        # stored as n, where the number of
+        # colours is 2 ** (n + 1)
+        tablen = (len(palette) // 3).bit_length() - 2
+        flags  = 0x80 | tablen
+        fobj   = self.__fobj
+
+        if interlace:
+            flags |= 0x40
+
+        # Graphic control extension (frame delay)
+        fobj.write(b'\x21\xf9\x04')
+        fobj.write(struct.pack('<BHBB', 0, self.__delay, 0, 0))
+
+        # Image descriptor, local
+        # colour table, image data
+        fobj.write(b'\x2c')
+        fobj.write(struct.pack('<HHHHB', 0, 0, w, h, flags))
+        fobj.write(palette)
+        fobj.write(data)
+
+        self.__nframes += 1
+
+
+    def close(self):
+        """Finishes the animated GIF, and closes the file. """
+
+        if self.__fobj is None:
+            return
+
+        if self.__shape is not None:
+            self.__fobj.write(b'\x3b')
+
+        self.__fobj.close()
+        self.__fobj = None
+
+
+    def __writeHeader(self):
+        """Called on the first call to :meth:`write`. Writes the GIF header,
+        logical screen descriptor, and looping extension.
+        """
+
+        h, w = self.__shape
+        fobj = self.__fobj
+
+        # There is no global colour table -
+        # every frame has its own palette.
+        fobj.write(b'GIF89a')
+        fobj.write(struct.pack('<HHBBB', w, h, 0x70, 0, 0))
+
+        # Netscape looping extension
+        fobj.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01')
+        fobj.write(struct.pack('<HB', self.__loop, 0))
+
+
+    @staticmethod
+    def __parseFrame(gif):
+        """Parses a single-frame GIF image (as written by ``PIL``), and
+        returns a tuple containing:
+
+          - The colour table
+          - ``True`` if the frame is interlaced, ``False`` otherwise
+          - The LZW-encoded data for the frame, including the LZW minimum
+            code size and the block terminator.
+        """
+
+        gif = bytearray(gif)
+
+        def skipBlocks(pos):
+            while gif[pos] != 0:
+                pos += gif[pos] + 1
+            return pos + 1
+
+        def colourTable(flags, pos):
+            if not (flags & 0x80):
+                return None, pos
+            nbytes = 3 * 2 ** ((flags & 0x07) + 1)
+            return bytes(gif[pos:pos + nbytes]), pos + nbytes
+
+        # Header and logical screen descriptor
+        palette, pos = colourTable(gif[10], 13)
+
+        while pos < len(gif):
+
+            block = gif[pos]
+
+            # Extension - skip it
+            if block == 0x21:
+                pos = skipBlocks(pos + 2)
+
+            # Image descriptor - the frame may
+            # have a local colour table, which
+            # takes precedence over the global one
+            elif block == 0x2c:
+                flags      = gif[pos + 9]
+                interlace  = bool(flags & 0x40)
+                local, pos = colourTable(flags, pos + 10)
+                start      = pos
+                pos        = skipBlocks(pos + 1)
+
+                if local is not None:
+                    palette = local
+
+                return palette, interlace, bytes(gif[start:pos])
+
+            else:
+                break
+
+        raise ValueError('Could not parse GIF frame')
+
+
+class ApngWriter(object):
+    """The ``ApngWriter`` class saves an animated PNG (APNG), one frame at a
+    time. It does not depend on any external encoder - each frame is
+    compressed with ``zlib``, and written to the file as soon as it is passed
+    to the :meth:`write` method, so the frames do not need to be kept in
+    memory.
+
+    Unlike animated GIFs, APNG frames are stored losslessly, with full RGBA
+    colour. APNG files can be viewed in most web browsers, and are displayed
+    as a static image (the first frame) by software which does not support
+    APNG.
+
+    The total number of frames must be stored at the beginning of an APNG
+    file, so it is written as 0 at first, and is updated by the :meth:`close`
+    method.
+
+    An ``ApngWriter`` can be used as a context manager, in which case the
+    :meth:`close` method is called automatically.
+    """
+
+
+    def __init__(self, filename, delay=50, loop=0):
+        """Create an ``ApngWriter``.
+
+        :arg filename: File to save the animated PNG to
+        :arg delay:    Delay between frames, in milliseconds.
+        :arg loop:     Number of times the movie should loop - 0 means
+                       forever.
+        """
+        self.__fobj    = open(filename, 'wb')
+        self.__delay   = int(delay)
+        self.__loop    = loop
+        self.__shape   = None
+        self.__nframes = 0
+        self.__seqno   = 0
+        self.__actlpos = None
+
+
+    def __enter__(self):
+        """Returns this ``ApngWriter``. """
+        return self
+
+
+    def __exit__(self, *a):
+        """Calls :meth:`close`. """
+        self.close()
+
+
+    @property
+    def nframes(self):
+        """Returns the number of frames that have been written. """
+        return self.__nframes
+
+
+    def write(self, frame):
+        """Encode the given frame and append it to the file.
+
+        :arg frame: ``numpy`` ``uint8`` array of shape
+                    ``(height, width, 3)`` or ``(height, width, 4)``,
+                    containing RGB(A) values.
+        """
+
+        frame = np.asarray(frame, dtype=np.uint8)
+
+        if frame.shape[2] == 3:
+            alpha = np.full(frame.shape[:2] + (1,), 255, dtype=np.uint8)
+            frame = np.concatenate((frame, alpha), axis=2)
+
+        if self.__shape is None:
+            self.__shape = frame.shape[:2]
+            self.__writeHeader()
+        else:
+            frame = _fitFrame(frame, self.__shape)
+
+        h, w = self.__shape
+
+        # Every scanline uses the PNG "up"
+        # filter (type 2) - each byte is
+        # stored as the difference from the
+        # byte above it, which compresses
+        # well for typical rendered scenes.
+        frame         = frame.reshape(h, w * 4)
+        lines         = np.empty((h, w * 4 + 1), dtype=np.uint8)
+        lines[:,  0]  = 2
+        lines[0,  1:] = frame[0]
+        lines[1:, 1:] = frame[1:] - frame[:-1]
+        data          = zlib.compress(lines.tobytes(), 6)
+
+        # Frame control chunk
+        self.__writeChunk(b'fcTL', struct.pack('>IIIIIHHBB',
+                                               self.__nextSeqno(),
+                                               w, h, 0, 0,
+                                               self.__delay, 1000,
+                                               0, 0))
+
+        # The first frame is stored as IDAT,
+        # so it is displayed by non-APNG
+        # aware software, and subsequent
+        # frames as fdAT.
+        if self.__nframes == 0:
+            self.__writeChunk(b'IDAT', data)
+        else:
+            self.__writeChunk(
+                b'fdAT', struct.pack('>I', self.__nextSeqno()) + data)
+
+        self.__nframes += 1
+
+
+    def close(self):
+        """Finishes the animated PNG, updates the frame count, and closes the
+        file.
+        """
+
+        if self.__fobj is None:
+            return
+
+        if self.__shape is not None:
+            self.__writeChunk(b'IEND', b'')
+            self.__fobj.seek(self.__actlpos)
+            self.__writeAnimationControl()
+
+        self.__fobj.close()
+        self.__fobj = None
+
+
+    def __nextSeqno(self):
+        """Returns the next APNG sequence number. """
+        seqno         = self.__seqno
+        self.__seqno += 1
+        return seqno
+
+
+    def __writeChunk(self, ctype, data):
+        """Writes a PNG chunk of the given type. """
+        crc = zlib.crc32(ctype + data) & 0xffffffff
+        self.__fobj.write(struct.pack('>I', len(data)))
+        self.__fobj.write(ctype)
+        self.__fobj.write(data)
+        self.__fobj.write(struct.pack('>I', crc))
+
+
+    def __writeAnimationControl(self):
+        """Writes the APNG animation control chunk, containing the number of
+        frames and number of loops.
+        """
+        self.__writeChunk(b'acTL', struct.pack('>II',
+                                               self.__nframes,
+                                               self.__loop))
+
+
+    def __writeHeader(self):
+        """Called on the first call to :meth:`write`. Writes the PNG
+        signature, the header chunk, and the animation control chunk.
+        """
+
+        h, w = self.__shape
+
+        self.__fobj.write(b'\x89PNG\r\n\x1a\n')
+
+        # 8 bit RGBA, default compression/
+        # filter method, no interlacing
+        ihdr = struct.pack('>IIBBBBB', w, h, 8, 6, 0, 0, 0)
+        self.__writeChunk(b'IHDR', ihdr)
+
+        self.__actlpos = self.__fobj.tell()
+        self.__writeAnimationControl()
@@ -17,6 +17,7 @@ A few stand-alone functions are defined in this module:
    screenshot
    plotPanelScreenshot
    canvasPanelScreenshot
+   canvasPanelBitmap
 """
 
 
@@ -147,6 +148,20 @@ def canvasPanelScreenshot(panel, filename):
     or :class:`.PlotPanel`, saving it to the given ``filename``.
     """
 
+    data = canvasPanelBitmap(panel)
+
+    try:              fmt = op.splitext(filename)[1][1:]
+    except Exception: fmt = None
+
+    mplimg.imsave(filename, data, format=fmt)
+
+
+def canvasPanelBitmap(panel):
+    """Capture the contents of the given :class:`.CanvasPanel`, and return it
+    as a ``numpy`` ``uint8`` array of shape ``(height, width, 4)``,
+    containing RGBA values.
+    """
+
     # The canvas panel container is the
     # direct parent of the colour bar
     # canvas, and an ancestor of the
@@ -210,10 +225,7 @@ def canvasPanelScreenshot(panel, filename):
 
     data[:, :,  3] = 255
 
-    try:              fmt = op.splitext(filename)[1][1:]
-    except Exception: fmt = None
-
-    mplimg.imsave(filename, data, format=fmt)
+    return data
 
 
 def _patchInCanvases(canvasPanel, containerPanel, data, bgColour):
@@ -102,6 +102,10 @@ class CanvasSettingsPanel(ctrlpanel.SettingsPanel):
             ('syncOverlayVolume',  props.Widget('syncOverlayVolume')),
             ('movieMode',          props.Widget('movieMode')),
             ('movieSyncRefresh',   props.Widget('movieSyncRefresh')),
+            ('movieCache',         props.Widget('movieCache')),
+            ('movieCacheSize',
+             props.Widget('movieCacheSize',
+                          enabledWhen=lambda p: p.movieCache)),
             ('movieAxis',
              props.Widget('movieAxis',
                           labels=strings.choices[canvasPanel, 'movieAxis'])),
@@ -161,7 +161,8 @@ def _initPropertyList_VolumeOpts(threedee):
              'displayRange',
              'clippingRange',
              'clipImage',
-             'custom_overrideDataRange']
+             'custom_overrideDataRange',
+             'textureStorage']
 
     if threedee:
         plist.remove('clipImage')
@@ -399,6 +400,9 @@ def _initWidgetSpec_VolumeOpts(threedee):
             slider=False,
             dependencies=['enableOverrideDataRange'],
             enabledWhen=lambda vo, en: en),
+        'textureStorage' : props.Widget(
+            'textureStorage',
+            labels=strings.choices['VolumeOpts.textureStorage']),
     }
 
 
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+#
+# renderprofilepanel.py - The RenderProfilePanel class.
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+"""This module provides the :class:`RenderProfilePanel` class, a *FSLeyes
+control* panel which displays the render timings recorded by the
+:mod:`fsleyes.gl.profiler` module.
+"""
+
+
+import logging
+
+import wx
+
+import fsl.utils.idle                as idle
+import fsleyes_widgets               as fwidgets
+
+import fsleyes.controls.controlpanel as ctrlpanel
+import fsleyes.gl.profiler           as glprofiler
+import fsleyes.strings               as strings
+
+
+log = logging.getLogger(__name__)
+
+
+class RenderProfilePanel(ctrlpanel.ControlPanel):
+    """The ``RenderProfilePanel`` displays a table containing the time taken
+    by each :class:`.GLObject`, in each draw phase, to draw itself. It can be
+    used to find out which overlay is making a view slow to draw.
+
+    Profiling (see the :mod:`.gl.profiler` module) is enabled when a
+    ``RenderProfilePanel`` is created, and disabled when it is destroyed.
+    The table is refreshed every :attr:`REFRESH_INTERVAL` seconds. All times
+    are shown in milliseconds, and are averaged over the most recent
+    :data:`.profiler.WINDOW` draws.
+    """
+
+
+    REFRESH_INTERVAL = 1.0
+    """Interval, in seconds, at which the table is refreshed. """
+
+
+    def __init__(self, parent, overlayList, displayCtx, frame):
+        """Create a ``RenderProfilePanel``.
+
+        :arg parent:      The :mod:`wx` parent object.
+        :arg overlayList: The :class:`.OverlayList` instance.
+        :arg displayCtx:  The :class:`.DisplayContext` instance.
+        :arg frame:       The :class:`.FSLeyesFrame` instance.
+        """
+
+        ctrlpanel.ControlPanel.__init__(
+            self, parent, overlayList, displayCtx, frame)
+
+        self.__table = wx.ListCtrl(self, style=(wx.LC_REPORT |
+                                                wx.LC_HRULES |
+                                                wx.LC_VRULES))
+        self.__reset = wx.Button(self, label=strings.labels[self, 'reset'])
+
+        self.__columns = ['overlay', 'phase', 'calls', 'cpuMean',
+                          'cpuMax', 'gpuMean', 'gpuMax']
+
+        for i, col in enumerate(self.__columns):
+            self.__table.InsertColumn(i, strings.labels[self, col])
+
+        self.__sizer = wx.BoxSizer(wx.VERTICAL)
+        self.__sizer.Add(self.__table, flag=wx.EXPAND, proportion=1)
+        self.__sizer.Add(self.__reset, flag=wx.EXPAND)
+        self.SetSizer(self.__sizer)
+
+        self.__reset.Bind(wx.EVT_BUTTON, self.__onReset)
+
+        glprofiler.enable()
+
+        self.__destroyed = False
+        self.__refresh()
+
+        self.SetMinSize((500, 200))
+        self.Layout()
+
+
+    def destroy(self):
+        """Must be called when this ``RenderProfilePanel`` is no longer
+        needed. Releases the reference to the profiler which was acquired
+        in :meth:`__init__`, clears all recorded timings if no other code
+        is using the profiler, and calls the :meth:`.ControlPanel.destroy`
+        method.
+        """
+        self.__destroyed = True
+        glprofiler.disable()
+        if not glprofiler.enabled():
+            glprofiler.reset()
+        ctrlpanel.ControlPanel.destroy(self)
+
+
+    def __onReset(self, ev):
+        """Called when the *Reset* button is pushed. Clears all recorded
+        timings.
+        """
+        glprofiler.reset()
+        self.__refresh(schedule=False)
+
+
+    def __refresh(self, schedule=True):
+        """Refreshes the table. If ``schedule`` is ``True``, schedules the
+        next refresh to happen after :attr:`REFRESH_INTERVAL` seconds.
+        """
+
+        if self.__destroyed or not fwidgets.isalive(self):
+            return
+
+        def fmt(val):
+            if val is None: return '-'
+            else:           return '{:0.3f}'.format(val * 1000)
+
+        table = self.__table
+        stats = glprofiler.stats()
+
+        table.Freeze()
+        table.DeleteAllItems()
+
+        for i, st in enumerate(stats):
+            row = [st.label,
+                   st.phase,
+                   str(st.count),
+                   fmt(st.cpuMean),
+                   fmt(st.cpuMax),
+                   fmt(st.gpuMean),
+                   fmt(st.gpuMax)]
+
+            table.InsertItem(i, row[0])
+            for col, val in enumerate(row[1:], 1):
+                table.SetItem(i, col, val)
+
+        for col in range(len(self.__columns)):
+            table.SetColumnWidth(col, wx.LIST_AUTOSIZE_USEHEADER)
+
+        table.Thaw()
+
+        if schedule:
+            idle.idle(self.__refresh, after=self.REFRESH_INTERVAL)
@@ -13,7 +13,8 @@ import logging
 
 import deprecation
 
-import numpy as np
+import numpy         as np
+import scipy.spatial as spatial
 
 import fsl.data.image       as fslimage
 import fsl.utils.transform  as transform
@@ -215,6 +216,14 @@ class MeshOpts(cmapopts.ColourMapOpts, fsldisplay.DisplayOpts):
         self.__vertexData      = None
         self.__vertexDataRange = None
 
+        # A KD-tree of the mesh vertices is
+        # created on demand, and used to find
+        # vertices near to a location. It is
+        # discarded whenever the vertex set
+        # changes. See the __getVertexTree
+        # method.
+        self.__vertexTree = None
+
         nounbind = kwargs.get('nounbind', [])
         nounbind.extend(['refImage', 'coordSpace', 'vertexData', 'vertexSet'])
         kwargs['nounbind'] = nounbind
@@ -315,6 +324,7 @@ class MeshOpts(cmapopts.ColourMapOpts, fsldisplay.DisplayOpts):
 
         self.__oldRefImage = None
         self.__vertexData  = None
+        self.__vertexTree  = None
 
         cmapopts  .ColourMapOpts.destroy(self)
         fsldisplay.DisplayOpts  .destroy(self)
@@ -444,32 +454,125 @@ class MeshOpts(cmapopts.ColourMapOpts, fsldisplay.DisplayOpts):
         return opts.getTransform(self.coordSpace, opts.transform)
 
 
-    def getVertex(self, xyz=None):
+    def getVertex(self, xyz=None, tolerance=None):
         """Returns an integer identifying the index of the mesh vertex that
-        coresponds to the given ``xyz`` location,
+        coresponds to the given ``xyz`` location, or ``None`` if there is no
+        vertex at the location.
+
+        :arg xyz:       Location to convert to a vertex index. If not
+                        provided, the current
+                        :class:`.DisplayContext.location` is used.
 
-        :arg xyz: Location to convert to a vertex index. If not provided, the
-                  current :class:`.DisplayContext.location` is used.
+        :arg tolerance: If provided, the nearest vertex is returned if it is
+                        within this distance of ``xyz``. Otherwise, a vertex
+                        is only returned if it is at the location.
         """
 
-        # TODO return vertex closest to the point,
-        #      within some configurabe tolerance?
+        if xyz is None:
+            xyz = self.displayCtx.location.xyz
+            xyz = self.transformCoords(xyz, 'display', 'mesh')
+
+        vertices = self.overlay.vertices
+        vidx     = self.displayCtx.vertexIndex
+
+        # The DisplayContext.vertexIndex is
+        # checked first, so that it takes
+        # precedence over any vertices which
+        # share the same location.
+        if vidx >= 0 and vidx < vertices.shape[0]:
+            if np.all(np.isclose(vertices[vidx, :], xyz)):
+                return vidx
+
+        vidx, dist = self.getNearestVertex(xyz)
+
+        if vidx is None:
+            return None
+
+        if tolerance is None: match = np.all(np.isclose(vertices[vidx], xyz))
+        else:                 match = dist <= tolerance
+
+        if match: return vidx
+        else:     return None
+
+
+    def getNearestVertex(self, xyz=None):
+        """Returns the index of the mesh vertex which is nearest to the
+        given ``xyz`` location, and its distance from the location.
+
+        :arg xyz: Location in the mesh coordinate system. If not provided,
+                  the current :class:`.DisplayContext.location` is used.
+
+        :returns: A tuple containing the vertex index and the distance, or
+                  ``(None, None)`` if the mesh does not have any vertices.
+        """
 
         if xyz is None:
             xyz = self.displayCtx.location.xyz
             xyz = self.transformCoords(xyz, 'display', 'mesh')
 
-        vert = None
-        vidx = self.displayCtx.vertexIndex
+        tree = self.__getVertexTree()
 
-        if vidx >= 0 and vidx <= self.overlay.nvertices:
-            vert = self.overlay.vertices[vidx, :]
+        if tree is None:
+            return None, None
 
-        if vert is not None and np.all(np.isclose(vert, xyz)):
-            return vidx
-        else:
+        dist, vidx = tree.query(xyz)
+
+        return int(vidx), float(dist)
+
+
+    def getVerticesWithin(self, radius, xyz=None):
+        """Returns the indices of all mesh vertices which are within the
+        given distance of the given ``xyz`` location.
+
+        :arg radius: Distance, in the mesh coordinate system.
+
+        :arg xyz:    Location in the mesh coordinate system. If not provided,
+                     the current :class:`.DisplayContext.location` is used.
+
+        :returns:    A ``numpy`` array containing the vertex indices, in
+                     ascending order.
+        """
+
+        if xyz is None:
+            xyz = self.displayCtx.location.xyz
+            xyz = self.transformCoords(xyz, 'display', 'mesh')
+
+        tree = self.__getVertexTree()
+
+        if tree is None:
+            return np.zeros(0, dtype=int)
+
+        return np.sort(np.array(tree.query_ball_point(xyz, radius),
+                                dtype=int))
+
+
+    def __getVertexTree(self):
+        """Returns a :class:`scipy.spatial.cKDTree` containing the
+        current mesh vertices, creating one if necessary. Returns ``None``
+        if the mesh does not have any vertices.
+        """
+
+        vertices = self.overlay.vertices
+        tree     = self.__vertexTree
+
+        # The tree is also re-created if the
+        # vertices have been changed without
+        # the vertexSet being changed (e.g.
+        # by a MeshOpts in another view).
+        if tree is not None and tree[0] is vertices:
+            return tree[1]
+
+        if vertices is None or len(vertices) == 0:
             return None
 
+        log.debug('Creating vertex KD-tree for {} ({} vertices)'.format(
+            self.overlay.name, len(vertices)))
+
+        tree              = spatial.cKDTree(vertices)
+        self.__vertexTree = (vertices, tree)
+
+        return tree
+
     def normaliseSpace(self, space):
         """Used by :meth:`transformCoords` and :meth:`getTransform` to
         normalise their ``from_`` and ``to`` parameters.
@@ -645,12 +748,15 @@ class MeshOpts(cmapopts.ColourMapOpts, fsldisplay.DisplayOpts):
 
     def __overlayVerticesChanged(self, *a):
         """Called when the :attr:`.Mesh.vertices` change. Makes sure that the
-        :attr:`vertexSet` attribute is synchronised.
+        :attr:`vertexSet` attribute is synchronised, and discards the vertex
+        KD-tree.
         """
 
         vset   = self.overlay.selectedVertices()
         vsprop = self.getProp('vertexSet')
 
+        self.__vertexTree = None
+
         if vset not in vsprop.getChoices(instance=self):
             self.addVertexSetOptions([vset])
             self.vertexSet = vset
@@ -659,9 +765,11 @@ class MeshOpts(cmapopts.ColourMapOpts, fsldisplay.DisplayOpts):
     def __vertexSetChanged(self, *a):
         """Called when the :attr:`.MeshOpts.vertexSet` property changes.
         Updates the current vertex set on the :class:`.Mesh` overlay, and
-        the overlay bounds.
+        the overlay bounds, and discards the vertex KD-tree.
         """
 
+        self.__vertexTree = None
+
         if self.vertexSet not in self.overlay.vertexSets():
             self.overlay.loadVertices(self.vertexSet)
         else:
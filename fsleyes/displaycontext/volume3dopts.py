@@ -195,6 +195,18 @@ class Volume3DOpts(object):
         return int(outer)
 
 
+    def getBlendFactor(self, lod=1.0):
+        """Returns the blending factor to be used by the ray-casting shader,
+        calculated from the :attr:`blendFactor` property.
+
+        :arg lod: Level of detail (see :attr:`.Scene3DCanvas.lod`). At a
+                  reduced level of detail, larger steps are taken along
+                  each ray, so the blending factor is scaled to preserve
+                  the accumulated opacity.
+        """
+        return (1 - self.blendFactor) ** 2 / lod
+
+
     def calculateRayCastSettings(self, view=None, proj=None):
         """Calculates various parameters required for 3D ray-cast rendering
         (see the :class:`.GLVolume` class).
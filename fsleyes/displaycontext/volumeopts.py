@@ -880,6 +880,15 @@ class VolumeOpts(cmapopts.ColourMapOpts, vol3dopts.Volume3DOpts, NiftiOpts):
     """
 
 
+    textureStorage = props.Choice(('default', 'half', 'byte'))
+    """How the image data is stored on the GPU. ``default`` stores the data at
+    full precision (or as normalised 16 bit integers, if necessary). ``half``
+    (16 bit floating point) and ``byte`` (8 bit integer) store the data at a
+    reduced precision, normalised to the image data range, which reduces GPU
+    memory usage. See :meth:`.Texture3D.setStorage`.
+    """
+
+
     @classmethod
     def getInitialDisplayRange(cls):
         """This class method returns a tuple containing ``(low, high)``
@@ -940,15 +949,17 @@ class VolumeOpts(cmapopts.ColourMapOpts, vol3dopts.Volume3DOpts, NiftiOpts):
             interp.removeChoice('spline', instance=self)
             interp.updateChoice('linear', instance=self, newAlt=['spline'])
 
-        # Interpolation cannot be unbound
-        # between VolumeOpts instances. This is
+        # Interpolation and texture storage
+        # cannot be unbound between
+        # VolumeOpts instances. This is
         # primarily to reduce memory requirement
-        # - if interpolation were different
+        # - if these were different
         # across different views, we would have
         # to create multiple 3D image textures
         # for the same image.
         nounbind = kwargs.get('nounbind', [])
         nounbind.append('interpolation')
+        nounbind.append('textureStorage')
         nounbind.append('clipImage')
         kwargs['nounbind'] = nounbind
 
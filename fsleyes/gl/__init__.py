@@ -83,6 +83,11 @@ Instead, two base classes are provided for each of the use-cases:
    OffScreenCanvasTarget
 
 
+Both of these classes derive from the :class:`SceneHashTarget` class, which
+allows a canvas to skip re-drawing its scene when nothing has changed since
+it was last drawn.
+
+
 And the following sub-classes are defined, providing use-case specific
 implementations for each of the available canvases:
 
@@ -775,7 +780,100 @@ class GLContext(object):
         self.__context = context
 
 
-class OffScreenCanvasTarget(object):
+SKIP_UNCHANGED_DRAWS = True
+"""If ``True``, canvases do not re-draw their scene if it has not changed
+since it was last drawn. See :class:`SceneHashTarget`.
+"""
+
+
+class SceneHashTarget(object):
+    """Base class for the :class:`WXGLCanvasTarget` and
+    :class:`OffScreenCanvasTarget` classes.
+
+    A canvas is often refreshed several times in response to a single
+    change, and refreshed in response to changes which do not affect the
+    scene at all. Sub-classes may override the :meth:`_sceneHash` method to
+    return a value which describes the current state of their scene (e.g.
+    the canvas size and settings, and the :attr:`.GLObject.version` of every
+    ``GLObject``). If this value has not changed since the scene was last
+    drawn, the draw is skipped, and the previously drawn frame remains on
+    display.
+
+    The :attr:`drawCount` and :attr:`skippedDrawCount` properties may be
+    used to find out how many draws have been performed and skipped.
+    Skipping can be disabled via the :data:`SKIP_UNCHANGED_DRAWS` flag.
+    """
+
+
+    def __init__(self):
+        """Create a ``SceneHashTarget``. """
+        self.__lastSceneHash    = None
+        self.__drawCount        = 0
+        self.__skippedDrawCount = 0
+
+
+    @property
+    def drawCount(self):
+        """Returns the number of times that the scene has been drawn. """
+        return self.__drawCount
+
+
+    @property
+    def skippedDrawCount(self):
+        """Returns the number of times that a draw has been skipped because
+        the scene had not changed.
+        """
+        return self.__skippedDrawCount
+
+
+    def _sceneHash(self):
+        """Returns a value describing the current state of the scene, which
+        must change whenever the scene needs to be re-drawn. May return
+        ``None`` if the scene state cannot be determined, in which case the
+        scene is always drawn. The default implementation returns ``None``.
+        """
+        return None
+
+
+    @staticmethod
+    def _propertyState(*objs):
+        """Convenience method for use by :meth:`_sceneHash` implementations.
+        Returns a tuple containing the (string representations of the)
+        values of all properties of the given ``HasProperties`` objects.
+        """
+        state = []
+        for obj in objs:
+            for name in obj.getAllProperties()[0]:
+                state.append(str(getattr(obj, name)))
+        return tuple(state)
+
+
+    def _invalidateSceneHash(self):
+        """Forces the scene to be re-drawn on the next draw. """
+        self.__lastSceneHash = None
+
+
+    def _sceneUnchanged(self):
+        """Called by sub-classes before drawing the scene. Returns ``True``
+        if the scene has not changed since it was last drawn, and so does
+        not need to be re-drawn, ``False`` otherwise.
+        """
+
+        sceneHash = None
+
+        if SKIP_UNCHANGED_DRAWS:
+            sceneHash = self._sceneHash()
+
+        if sceneHash is not None and sceneHash == self.__lastSceneHash:
+            self.__skippedDrawCount += 1
+            return True
+
+        self.__lastSceneHash  = sceneHash
+        self.__drawCount     += 1
+        return False
+
+
+class OffScreenCanvasTarget(SceneHashTarget):
     """Base class for canvas objects which support off-screen rendering. """
 
     def __init__(self, width, height):
@@ -788,6 +886,8 @@ class OffScreenCanvasTarget(object):
 
         from fsleyes.gl.textures import RenderTexture
 
+        SceneHashTarget.__init__(self)
+
         self.__width  = width
         self.__height = height
         self.__target = RenderTexture(
@@ -859,11 +959,16 @@ class OffScreenCanvasTarget(object):
 
     def draw(self):
         """Calls the :meth:`_draw` method, which must be provided by
-        subclasses.
+        subclasses. Does nothing if the scene has not changed since it was
+        last drawn (see :class:`SceneHashTarget`).
         """
 
         self._setGLContext()
         self._initGL()
+
+        if self._sceneUnchanged():
+            return
+
         self.__target.setSize(self.__width, self.__height)
 
         self.__target.bindAsRenderTarget()
@@ -905,7 +1010,7 @@ else:
     WXGLMetaClass = type
 
 
-class WXGLCanvasTarget(object):
+class WXGLCanvasTarget(SceneHashTarget):
     """Base class for :class:`wx.glcanvas.GLCanvas` objects.
 
     It is assumed that subclasses of this base class are also subclasses of
@@ -925,6 +1030,8 @@ class WXGLCanvasTarget(object):
 
         import wx
 
+        SceneHashTarget.__init__(self)
+
         context = getGLContext()
 
         # If we are on OSX, and using the Apple Software
@@ -960,8 +1067,12 @@ class WXGLCanvasTarget(object):
         to be called on the idle loop.
         """
 
+        # The canvas contents may have been
+        # damaged, so must be re-drawn, even
+        # if the scene has not changed.
         def doRefresh():
             if fwidgets.isalive(self):
+                self._invalidateSceneHash()
                 self.Refresh()
 
         # GL canvases do need to be refreshed
@@ -1017,6 +1128,18 @@ class WXGLCanvasTarget(object):
 
         def drawWrapper(*a, **kwa):
 
+            # If the scene has not changed, the
+            # front buffer already contains it,
+            # so we don't need to draw or swap.
+            # We can only do this if draws and
+            # swaps are not frozen, as frozen
+            # swaps may be performed later on,
+            # separately from this draw.
+            if self.__freezeDraw or self.__freezeSwapBuffers:
+                self._invalidateSceneHash()
+            elif self._sceneUnchanged():
+                return
+
             if not self.__freezeDraw:
                 subClassDraw(*a, **kwa)
 
@@ -1212,3 +1335,84 @@ class WXGLCanvasTarget(object):
         bmp = np.flipud(bmp)
 
         return bmp
+
+
+    def captureFrame(self, front=False):
+        """Returns the contents of this canvas as a ``(height, width, 4)``
+        ``numpy`` array, in the row order used by OpenGL (i.e. bottom row
+        first), so that it can be passed to :meth:`drawFrame`. Returns
+        ``None`` if this canvas cannot be drawn on.
+
+        :arg front: If ``True``, the front buffer is read. Otherwise (the
+                    default) the back buffer is read - this must be called
+                    after the scene has been drawn, but before the buffers
+                    are swapped.
+        """
+        import OpenGL.GL as gl
+        import numpy     as np
+
+        if not self._setGLContext():
+            return None
+
+        width, height = self.GetScaledSize()
+
+        if width == 0 or height == 0:
+            return None
+
+        if front: gl.glReadBuffer(gl.GL_FRONT_LEFT)
+        else:     gl.glReadBuffer(gl.GL_BACK_LEFT)
+
+        bmp = gl.glReadPixels(
+            0, 0,
+            width, height,
+            gl.GL_RGBA,
+            gl.GL_UNSIGNED_BYTE)
+
+        bmp = np.frombuffer(bmp, dtype=np.uint8)
+        return bmp.reshape((height, width, 4))
+
+
+    def drawFrame(self, frame):
+        """Draws a frame, previously returned by :meth:`captureFrame`,
+        straight on to this canvas, and swaps the front and back buffers.
+        This is performed regardless of whether draws or buffer swaps have
+        been frozen.
+
+        :returns: ``True`` if the frame was drawn, ``False`` if it could not
+                  be drawn (e.g. because the canvas size has changed).
+        """
+        import OpenGL.GL as gl
+        from . import       routines as glroutines
+
+        if not self._setGLContext():
+            return False
+
+        height, width = frame.shape[:2]
+
+        if (width, height) != self.GetScaledSize():
+            return False
+
+        gl.glViewport(0, 0, width, height)
+        gl.glMatrixMode(gl.GL_PROJECTION)
+        gl.glLoadIdentity()
+        gl.glMatrixMode(gl.GL_MODELVIEW)
+        gl.glLoadIdentity()
+
+        with glroutines.disabled((gl.GL_DEPTH_TEST,
+                                  gl.GL_BLEND,
+                                  gl.GL_TEXTURE_2D,
+                                  gl.GL_TEXTURE_3D)):
+            gl.glRasterPos2f(-1, -1)
+            gl.glDrawPixels(width,
+                            height,
+                            gl.GL_RGBA,
+                            gl.GL_UNSIGNED_BYTE,
+                            frame)
+
+        super(WXGLCanvasTarget, self).SwapBuffers()
+
+        # The canvas no longer contains
+        # the most recently drawn scene
+        self._invalidateSceneHash()
+
+        return True
@@ -199,6 +199,24 @@ class Annotations(object):
         self.__holdq = []
 
 
+    def sceneState(self):
+        """Returns a value which describes the state of all enqueued
+        annotations, or ``None`` if the state of any annotation cannot be
+        described (see :meth:`AnnotationObject.sceneState`). Used by the
+        canvas to determine whether it needs to be re-drawn.
+        """
+
+        state = []
+
+        for obj in self.__holdq + self.__q:
+            objState = obj.sceneState()
+            if objState is None:
+                return None
+            state.append(objState)
+
+        return tuple(state)
+
+
     def draw(self, zpos, xform=None, skipHold=False):
         """Draws all enqueued annotations.
 
@@ -343,6 +361,23 @@ class AnnotationObject(globject.GLSimpleObject):
         self.creation = time.time()
 
 
+    def sceneState(self):
+        """Returns a string which describes the current state of this
+        ``AnnotationObject``, or ``None`` if its state cannot be described.
+        The default implementation returns a string containing all of its
+        attributes, or ``None`` if this ``AnnotationObject`` has an expiry
+        time. Sub-classes which are modified in ways that are not reflected
+        by their attributes (e.g. in-place changes to an array) must
+        override this method to return ``None``.
+        """
+
+        if self.expiry is not None:
+            return None
+
+        return '{}{}'.format(type(self).__name__,
+                             sorted(vars(self).items()))
+
+
     def expired(self, now):
         """Returns ``True`` if this ``Annotation`` has expired, ``False``
         otherwise.
@@ -577,6 +612,13 @@ class VoxelGrid(AnnotationObject):
         self.offsets         = offsets
 
 
+    def sceneState(self):
+        """Overrides :meth:`AnnotationObject.sceneState`. Returns ``None``,
+        as the ``selectMask`` may be modified in place.
+        """
+        return None
+
+
     def draw2D(self, zpos, axes):
         """Draws this ``VoxelGrid`` annotation. """
 
@@ -661,6 +703,13 @@ class VoxelSelection(AnnotationObject):
             selection)
 
 
+    def sceneState(self):
+        """Overrides :meth:`AnnotationObject.sceneState`. Returns ``None``,
+        as the selection may be modified in place.
+        """
+        return None
+
+
     def destroy(self):
         """Must be called when this ``VoxelSelection`` is no longer needed.
         Destroys the :class:`.SelectionTexture`.
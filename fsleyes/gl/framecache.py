@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+#
+# framecache.py - The FrameCache class.
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+"""This module provides the :class:`FrameCache` class, which is used by the
+:class:`.CanvasPanel` to store the rendered frames of a movie.
+"""
+
+
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+class FrameCache(object):
+    """The ``FrameCache`` stores rendered movie frames, so that they can be
+    re-displayed without the scene having to be prepared and drawn again.
+    It is used by the :class:`.CanvasPanel` in movie mode (see
+    :attr:`.CanvasPanel.movieCache`).
+
+    Each frame is identified by a frame index (e.g. a volume index), and
+    comprises one bitmap for each canvas being displayed, as returned by the
+    :meth:`.WXGLCanvasTarget.captureFrame` method. The cached frames are only
+    valid for one particular scene - the cache is given a *key* which
+    describes the scene via the :meth:`validate` method, and all cached
+    frames are discarded whenever the key changes.
+
+    The total size of all cached frames is limited to a memory budget - once
+    the budget has been reached, further frames are not cached.
+    """
+
+
+    def __init__(self, budget):
+        """Create a ``FrameCache``.
+
+        :arg budget: Maximum number of bytes to use for cached frames.
+        """
+
+        self.__budget  = budget
+        self.__key     = None
+        self.__frames  = {}
+        self.__size    = 0
+
+        self.current = None
+        """Index of the frame which is currently displayed from the cache,
+        or ``None`` if the currently displayed frame was drawn normally. This
+        attribute is managed by the user of the ``FrameCache``.
+        """
+
+
+    def __len__(self):
+        """Returns the number of cached frames. """
+        return len(self.__frames)
+
+
+    def __contains__(self, frame):
+        """Returns ``True`` if the given frame is cached, ``False``
+        otherwise.
+        """
+        return frame in self.__frames
+
+
+    @property
+    def size(self):
+        """Returns the total size, in bytes, of all cached frames. """
+        return self.__size
+
+
+    @property
+    def budget(self):
+        """Returns the memory budget, in bytes. """
+        return self.__budget
+
+
+    @budget.setter
+    def budget(self, budget):
+        """Sets the memory budget. Discards all cached frames if they exceed
+        the new budget.
+        """
+        self.__budget = budget
+        if self.__size > budget:
+            self.__discard()
+
+
+    def clear(self):
+        """Discards all cached frames, and clears the :attr:`current` frame.
+        """
+        self.__discard()
+        self.current = None
+
+
+    def __discard(self):
+        """Discards all cached frames. """
+        self.__frames = {}
+        self.__size   = 0
+
+
+    def validate(self, key):
+        """Discards all cached frames if the given ``key`` is not equal to
+        the key that was passed to the previous call to ``validate``. The
+        :attr:`current` frame is left unchanged.
+
+        :returns: ``True`` if the cached frames are still valid, ``False``
+                  if they were discarded.
+        """
+
+        if key == self.__key:
+            return True
+
+        if len(self.__frames) > 0:
+            log.debug('Scene changed - discarding {} cached '
+                      'frames'.format(len(self.__frames)))
+
+        self.__key = key
+        self.__discard()
+        return False
+
+
+    def get(self, frame):
+        """Returns the bitmaps for the given frame, or ``None`` if it is not
+        cached.
+        """
+        return self.__frames.get(frame, None)
+
+
+    def put(self, frame, bitmaps):
+        """Stores the bitmaps for the given frame, if there is room within the
+        memory budget.
+
+        :arg frame:   Frame index
+        :arg bitmaps: Sequence of ``numpy`` arrays, one for each canvas. May
+                      contain ``None`` for canvases that are not shown.
+
+        :returns:     ``True`` if the frame was cached, ``False`` otherwise.
+        """
+
+        if frame in self.__frames:
+            return True
+
+        size = sum([b.nbytes for b in bitmaps if b is not None])
+
+        if self.__size + size > self.__budget:
+            return False
+
+        self.__frames[frame] = tuple(bitmaps)
+        self.__size         += size
+
+        return True
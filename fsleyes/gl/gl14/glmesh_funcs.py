@@ -100,6 +100,18 @@ def updateShaderState(self, **kwargs):
         fshader.unload()
 
 
+def updateVertices(self):
+    """Does nothing - the mesh vertices and indices are drawn from the
+    vertex buffers managed by the :class:`.GLMesh`.
+    """
+
+
+def updateVertexData(self):
+    """Does nothing - vertex data is passed to the :func:`draw` function
+    on every draw.
+    """
+
+
 def preDraw(self):
     """Must be called before :func:`draw`. Loads the appropriate shader
     program.
@@ -155,16 +167,28 @@ def draw(self,
     nvertices = vertices.shape[0]
     vertices  = vertices.ravel('C')
 
+    # In 3D, the full mesh is always drawn,
+    # so we can use the GLMesh vertex buffers
     with glroutines.enabled((gl.GL_VERTEX_ARRAY)):
-        gl.glVertexPointer(3, gl.GL_FLOAT, 0, vertices)
 
-        if indices is None:
-            gl.glDrawArrays(glType, 0, nvertices)
-        else:
+        if self.threedee:
+            self.bindBuffers()
             gl.glDrawElements(glType,
                               indices.shape[0],
                               gl.GL_UNSIGNED_INT,
-                              indices.ravel('C'))
+                              None)
+            self.unbindBuffers()
+
+        else:
+            gl.glVertexPointer(3, gl.GL_FLOAT, 0, vertices)
+
+            if indices is None:
+                gl.glDrawArrays(glType, 0, nvertices)
+            else:
+                gl.glDrawElements(glType,
+                                  indices.shape[0],
+                                  gl.GL_UNSIGNED_INT,
+                                  indices.ravel('C'))
 
 
 def postDraw(self):
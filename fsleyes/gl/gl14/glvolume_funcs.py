@@ -209,7 +209,7 @@ def draw3D(self, xform=None, bbox=None):
     rayStep    = list(rayStep)   + [0]
     texform    = texform[2, :]
     settings   = [
-        (1 - opts.blendFactor) ** 2,
+        opts.getBlendFactor(),
         0,
         0,
         display.alpha / 100.0]
@@ -263,19 +263,14 @@ def drawAll(self, axes, zposes, xforms):
     applying the corresponding transformation to each of the slices.
     """
 
-    nslices   = len(zposes)
-    vertices  = np.zeros((nslices * 6, 3), dtype=np.float32)
-    texCoords = np.zeros((nslices * 6, 3), dtype=np.float32)
-    indices   = np.arange(nslices * 6,     dtype=np.uint32)
+    nslices = len(zposes)
 
-    for i, (zpos, xform) in enumerate(zip(zposes, xforms)):
-
-        v, vc, tc = self.generateVertices2D(zpos, axes)
-
-        vertices[ i * 6: i * 6 + 6, :] = transform.transform(v, xform)
-        texCoords[i * 6: i * 6 + 6, :] = tc
+    if nslices == 0:
+        return
 
-    vertices = vertices.ravel('C')
+    vertices, _, texCoords = self.generateAllVertices2D(zposes, axes, xforms)
+    indices                = np.arange(nslices * 6, dtype=np.uint32)
+    vertices               = vertices.ravel('C')
 
     self.shader.setAtt('texCoord', texCoords)
 
@@ -52,7 +52,6 @@ def updateShaderState(self, **kwargs):
 
     dopts    = self.opts
     copts    = self.canvas.opts
-    vdata    = dopts.getVertexData()
     dshader  = self.dataShader
     fshader  = self.flatShader
 
@@ -71,16 +70,6 @@ def updateShaderState(self, **kwargs):
         dshader.set('lighting', copts.light)
         dshader.set('lightPos', kwargs['lightPos'])
 
-        dshader.setAtt('vertex',     self.vertices)
-        dshader.setAtt('normal',     self.normals)
-
-        if vdata is not None:
-
-            vdata = vdata[:, dopts.vertexDataIndex]
-
-            dshader.setAtt('vertexData', vdata.ravel('C'))
-        dshader.setIndices(self.indices)
-
     dshader.unload()
 
     if self.threedee:
@@ -88,13 +77,41 @@ def updateShaderState(self, **kwargs):
         fshader.set('lighting', copts.light)
         fshader.set('lightPos', kwargs['lightPos'])
         fshader.set('colour',   kwargs['flatColour'])
-
-        fshader.setAtt('vertex', self.vertices)
-        fshader.setAtt('normal', self.normals)
-        fshader.setIndices(self.indices)
         fshader.unload()
 
 
+def updateVertices(self):
+    """Called when the mesh vertices change. In 3D, copies the vertices,
+    normals and indices into the vertex buffers of the shader programs,
+    where they are kept until they next change. In 2D, vertex data is
+    passed to the :func:`draw` function on each draw.
+    """
+
+    if not self.threedee:
+        return
+
+    for shader in [self.flatShader, self.dataShader]:
+        shader.setAtt('vertex', self.vertices)
+        shader.setAtt('normal', self.normals)
+        shader.setIndices(self.indices)
+
+
+def updateVertexData(self):
+    """Called when the :attr:`.MeshOpts.vertexData` or
+    :attr:`.MeshOpts.vertexDataIndex` change. In 3D, copies the vertex data
+    into a vertex buffer of the data shader program.
+    """
+
+    dopts = self.opts
+    vdata = dopts.getVertexData()
+
+    if not self.threedee or vdata is None:
+        return
+
+    vdata = vdata[:, dopts.vertexDataIndex]
+    self.dataShader.setAtt('vertexData', vdata.ravel('C'))
+
+
 def preDraw(self):
     """Must be called before :func:`draw`. Loads the appropriate shader
     program.
@@ -85,6 +85,7 @@ def updateShaderState(self):
     clipHigh   = opts.clippingRange[1] * clipXform[0, 0] + clipXform[0, 3]
     texZero    = 0.0                   * imgXform[ 0, 0] + imgXform[ 0, 3]
     imageShape = self.image.shape[:3]
+    texShape   = self.imageTexture.textureShape[:3]
 
     if imageIsClip: clipImageShape = imageShape
     else:           clipImageShape = opts.clipImage.shape[:3]
@@ -103,6 +104,7 @@ def updateShaderState(self):
 
     changed |= shader.set('useSpline',        opts.interpolation == 'spline')
     changed |= shader.set('imageShape',       imageShape)
+    changed |= shader.set('texShape',         texShape)
     changed |= shader.set('clipLow',          clipLow)
     changed |= shader.set('clipHigh',         clipHigh)
     changed |= shader.set('texZero',          texZero)
@@ -117,9 +119,12 @@ def updateShaderState(self):
     changed |= shader.set('negColourTexture', 2)
     changed |= shader.set('clipTexture',      3)
 
+    if not self.threedee:
+        changed |= setBrick(self, None)
+
     if self.threedee:
 
-        blendFactor = (1 - opts.blendFactor) ** 2
+        blendFactor = opts.getBlendFactor()
         clipPlanes  = np.zeros((opts.numClipPlanes, 4), dtype=np.float32)
         d2tmat      = opts.getTransform('display', 'texture')
 
@@ -134,6 +139,31 @@ def updateShaderState(self):
             normal           = transform.transformNormal(normal, d2tmat)
             clipPlanes[i, :] = glroutines.planeEquation2(origin, normal)
 
+        # Empty regions of the image are skipped
+        # over, unless a separate clipping image
+        # is being used (see OccupancyTexture)
+        occTex       = self.occupancyTexture
+        useOccupancy = False
+        occCells     = [1, 1, 1]
+        occShape     = [1, 1, 1]
+
+        if occTex is not None:
+            occTex.setClipping(opts.clippingRange[0],
+                               opts.clippingRange[1],
+                               opts.invertClipping,
+                               opts.useNegativeCmap)
+
+            useOccupancy = imageIsClip and occTex.ready()
+
+        if useOccupancy:
+            occCells = np.array(imageShape, dtype=np.float32) / occTex.cellSize
+            occShape = occTex.shape
+
+        changed |= shader.set('occupancyTexture', 6)
+        changed |= shader.set('useOccupancy',     useOccupancy)
+        changed |= shader.set('occupancyCells',   occCells)
+        changed |= shader.set('occupancyShape',   occShape)
+
         changed |= shader.set('numClipPlanes', opts.numClipPlanes)
         changed |= shader.set('clipMode',      clipMode)
         changed |= shader.set('clipPlanes',    clipPlanes, opts.numClipPlanes)
@@ -185,7 +215,74 @@ def draw2D(self, zpos, axes, xform=None, bbox=None):
 
     self.shader.loadAtts()
 
-    gl.glDrawArrays(gl.GL_TRIANGLES, 0, 6)
+    drawBricks(self, texCoords, 6)
+
+
+def setBrick(self, brick):
+    """Configures the shader program so that the given :class:`.TextureBrick`
+    of the :class:`.ImageTexture` is drawn. If ``brick`` is ``None``, the
+    shader is configured to draw an un-bricked image texture.
+
+    :returns: ``True`` if any shader variables were changed, ``False``
+              otherwise.
+    """
+
+    shader = self.shader
+
+    if brick is None:
+        lo       = [-1, -1, -1]
+        hi       = [ 2,  2,  2]
+        scale    = [ 1,  1,  1]
+        offset   = [ 0,  0,  0]
+        texShape = self.imageTexture.textureShape[:3]
+    else:
+        lo,    hi     = brick.texCoordBounds
+        scale, offset = brick.texCoordScaleOffset
+        texShape      = brick.shape
+
+    changed  = False
+    changed |= shader.set('brickLo',     lo)
+    changed |= shader.set('brickHi',     hi)
+    changed |= shader.set('brickScale',  scale)
+    changed |= shader.set('brickOffset', offset)
+    changed |= shader.set('texShape',    texShape)
+
+    return changed
+
+
+def drawBricks(self, texCoords, nvertices):
+    """Used by :func:`draw2D` and :func:`drawAll`. Issues the draw call(s)
+    for ``nvertices`` vertices, which are assumed to have already been
+    loaded.
+
+    If the :class:`.ImageTexture` has been split into bricks (see the
+    :meth:`.Texture3D.bricks` property), the vertices are drawn once for
+    every brick which intersects with the bounding box of the given texture
+    coordinates.  Otherwise the vertices are drawn once.
+    """
+
+    bricks = self.imageTexture.bricks
+
+    if len(bricks) == 0:
+        gl.glDrawArrays(gl.GL_TRIANGLES, 0, nvertices)
+        return
+
+    texLo = texCoords.min(axis=0)
+    texHi = texCoords.max(axis=0)
+
+    for brick in bricks:
+
+        lo, hi = brick.texCoordBounds
+
+        if np.any(texHi < lo) or np.any(texLo > hi):
+            continue
+
+        setBrick(self, brick)
+        brick.bindTexture(gl.GL_TEXTURE0)
+        gl.glDrawArrays(gl.GL_TRIANGLES, 0, nvertices)
+        brick.unbindTexture()
+
+    setBrick(self, None)
 
 
 def draw3D(self, xform=None, bbox=None):
@@ -201,6 +298,7 @@ def draw3D(self, xform=None, bbox=None):
     """
 
     opts                           = self.opts
+    lod                            = self.canvas.lod
     tex                            = self.renderTexture1
     proj                           = self.canvas.projectionMatrix
     vertices, voxCoords, texCoords = self.generateVertices3D(bbox)
@@ -209,8 +307,17 @@ def draw3D(self, xform=None, bbox=None):
     if xform is not None:
         vertices = transform.transform(vertices, xform)
 
+    # At a reduced level of detail (see
+    # Scene3DCanvas.lod), we take larger
+    # steps along each ray, and scale the
+    # blending factor so that the
+    # accumulated opacity is preserved.
+    rayStep     = rayStep / lod
+    blendFactor = opts.getBlendFactor(lod)
+
     self.shader.set(   'tex2ScreenXform', texform)
     self.shader.set(   'rayStep',         rayStep)
+    self.shader.set(   'blendFactor',     blendFactor)
     self.shader.setAtt('vertex',          vertices)
     self.shader.setAtt('texCoord',        texCoords)
 
@@ -227,17 +334,13 @@ def draw3D(self, xform=None, bbox=None):
 def drawAll(self, axes, zposes, xforms):
     """Draws all of the specified slices. """
 
-    nslices   = len(zposes)
-    vertices  = np.zeros((nslices * 6, 3), dtype=np.float32)
-    voxCoords = np.zeros((nslices * 6, 3), dtype=np.float32)
-    texCoords = np.zeros((nslices * 6, 3), dtype=np.float32)
+    nslices = len(zposes)
 
-    for i, (zpos, xform) in enumerate(zip(zposes, xforms)):
+    if nslices == 0:
+        return
 
-        v, vc, tc = self.generateVertices2D(zpos, axes)
-        vertices[ i * 6: i * 6 + 6, :] = transform.transform(v, xform)
-        voxCoords[i * 6: i * 6 + 6, :] = vc
-        texCoords[i * 6: i * 6 + 6, :] = tc
+    vertices, voxCoords, texCoords = self.generateAllVertices2D(
+        zposes, axes, xforms)
 
     self.shader.setAtt('vertex',   vertices)
     self.shader.setAtt('voxCoord', voxCoords)
@@ -245,7 +348,7 @@ def drawAll(self, axes, zposes, xforms):
 
     self.shader.loadAtts()
 
-    gl.glDrawArrays(gl.GL_TRIANGLES, 0, 6 * nslices)
+    drawBricks(self, texCoords, 6 * nslices)
 
 
 def postDraw(self, xform=None, bbox=None):
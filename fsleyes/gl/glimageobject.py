@@ -34,6 +34,7 @@ class GLImageObject(globject.GLObject):
 
          frontFace
          generateVertices2D
+         generateAllVertices2D
          generateVoxelCoordinates2D
 
     Some useful methods for 3D rendering::
@@ -134,6 +135,17 @@ class GLImageObject(globject.GLObject):
         return self.image is None
 
 
+    def getResources(self):
+        """Overrides :meth:`.GLObject.getResources`. Returns any of the
+        ``imageTexture``, ``clipTexture``, ``modulateTexture`` and
+        ``colourTexture`` attributes which have been set by the sub-class.
+        """
+        attrs = ['imageTexture', 'clipTexture',
+                 'modulateTexture', 'colourTexture']
+        res   = [getattr(self, a, None) for a in attrs]
+        return [r for r in res if r is not None]
+
+
     def getDisplayBounds(self):
         """Returns the bounds of the :class:`.Image` (see the
         :meth:`.DisplayOpts.bounds` property).
@@ -262,6 +274,56 @@ class GLImageObject(globject.GLObject):
         return vertices, voxCoords, texCoords
 
 
+    def generateAllVertices2D(self, zposes, axes, xforms):
+        """Generates vertex coordinates for a number of 2D slices of the
+        :class:`.Image`, one through each of the given ``zposes``, applying
+        the corresponding transformation matrix in ``xforms`` to the vertices
+        of each slice (but not to the voxel/texture coordinates).
+
+        This is equivalent to calling :meth:`generateVertices2D` once for
+        each slice, but the slice geometry is only calculated once, and
+        then replicated across all of the slices with ``numpy`` array
+        operations. It is used by the ``drawAll`` function in the
+        :mod:`.gl14.glvolume_funcs` and :mod:`.gl21.glvolume_funcs` modules
+        (for drawing :class:`.LightBoxCanvas` slices).
+
+        :returns: A tuple containing ``N*3 numpy.float32`` arrays of vertex,
+                  voxel, and texture coordinates, where ``N`` is six times
+                  the number of slices.
+        """
+
+        opts          = self.opts
+        d2vMat        = opts.getTransform('display', 'voxel')
+        v2tMat        = opts.getTransform('voxel',   'texture')
+        xax, yax, zax = axes
+        zposes        = np.asarray(zposes, dtype=np.float32)
+        nslices       = len(zposes)
+
+        if nslices == 0:
+            empty = np.zeros((0, 3), dtype=np.float32)
+            return empty, empty, empty
+
+        vertices = self.generateVertices2D(0, axes)[0]
+
+        # Vertices for every slice, in
+        # the display coordinate system
+        vertices             = np.tile(vertices, (nslices, 1, 1))
+        vertices[:, :, zax]  = zposes[:, np.newaxis]
+        voxCoords            = transform.transform(vertices.reshape(-1, 3),
+                                                   d2vMat)
+
+        # See generateVertices2D
+        if not hasattr(opts, 'interpolation') or opts.interpolation == 'none':
+            voxCoords = opts.roundVoxels(voxCoords, daxes=[zax])
+
+        texCoords = transform.transform(voxCoords, v2tMat)
+        vertices  = glroutines.transformAll(vertices, xforms)
+
+        return (vertices.reshape(-1, 3),
+                np.asarray(voxCoords, dtype=np.float32),
+                np.asarray(texCoords, dtype=np.float32))
+
+
     @memoize.Instanceify(memoize.memoize)
     def generateVertices3D(self, bbox=None):
         """Generates vertex coordinates defining the 3D bounding box of the
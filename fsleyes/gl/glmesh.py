@@ -9,15 +9,18 @@ to render :class:`.Mesh` overlays.
 """
 
 
-import numpy        as np
-import numpy.linalg as npla
-import OpenGL.GL    as gl
+import numpy                  as np
+import numpy.linalg           as npla
+import OpenGL.GL              as gl
+import OpenGL.raw.GL._types   as gltypes
 
-from . import                 globject
-import fsl.utils.transform as transform
-import fsleyes.gl          as fslgl
-import fsleyes.gl.routines as glroutines
-import fsleyes.gl.textures as textures
+from . import                   globject
+from . import                   planeindex
+import fsl.utils.transform   as transform
+from   fsl.utils.platform import platform as fslplatform
+import fsleyes.gl            as fslgl
+import fsleyes.gl.routines   as glroutines
+import fsleyes.gl.textures   as textures
 
 
 class GLMesh(globject.GLObject):
@@ -37,6 +40,17 @@ class GLMesh(globject.GLObject):
     properties.
 
 
+    *Vertex buffers*
+
+
+    The mesh vertices and indices (transformed into the display coordinate
+    system) are stored in a pair of OpenGL vertex buffer objects, which are
+    only re-populated when the mesh vertices, or the mesh-to-display
+    transformation, change (see :meth:`updateVertices`). Every draw of the
+    complete mesh uses these buffers, so the mesh geometry does not need to
+    be copied to the GPU every time the mesh is drawn.
+
+
     *Cross-sections*
 
     If ``outline is False and vertexData is None``, a filled cross-section of
@@ -61,7 +75,10 @@ class GLMesh(globject.GLObject):
 
     If ``outline is True or vertexData is not None``, the intersection of the
     mesh triangles with the viewing plane is calculated. These lines are then
-    rendered as ``GL_LINES`` primitives.
+    rendered as ``GL_LINES`` primitives. The intersection is calculated with
+    a :class:`.PlaneIndex`, which is created once for each vertex set and
+    plane orientation, so that intersections can be quickly calculated at
+    any slice position (see :meth:`getPlaneIndex`).
 
 
     When a mesh outline is drawn on a canvas, the calculated line vertices,
@@ -98,6 +115,13 @@ class GLMesh(globject.GLObject):
 
      - ``compileShaders(GLMesh)``: Compiles vertex/fragment shaders.
 
+     - ``updateVertices(GLMesh)``: Called when the mesh vertices, normals,
+       or indices have changed.
+
+     - ``updateVertexData(GLMesh)``: Called when the
+       :attr:`.MeshOpts.vertexData` or :attr:`.MeshOpts.vertexDataIndex`
+       have changed.
+
      - ``updateShaderState(GLMesh, **kwargs)``: Updates vertex/fragment
        shaders. Should expect the following keyword arguments:
 
@@ -167,21 +191,50 @@ class GLMesh(globject.GLObject):
         self.negCmapTexture = textures.ColourMapTexture(  self.name)
         self.lutTexture     = textures.LookupTableTexture(self.name)
 
+        # Vertex buffer objects containing the
+        # mesh vertices and indices - these are
+        # populated in updateVertices. They are
+        # used for 2D rendering, and for 3D
+        # rendering under GL14. Under GL21, 3D
+        # meshes are drawn from buffers which
+        # are managed by the shader programs
+        # (see gl21.glmesh_funcs.updateVertices),
+        # so these buffers are not created.
+        if (not threedee) or float(fslplatform.glVersion) < 2.1:
+            self.vertexBuffer = gl.glGenBuffers(1)
+            self.indexBuffer  = gl.glGenBuffers(1)
+        else:
+            self.vertexBuffer = None
+            self.indexBuffer  = None
+
+        # PlaneIndex instances used to calculate
+        # mesh cross-sections, one for each plane
+        # orientation, created on demand in
+        # getPlaneIndex, and cleared in
+        # updateVertices.
+        self.__planeIndices = {}
+
         self.lut = None
 
         self.registerLut()
         self.addListeners()
-        self.updateVertices()
         self.refreshCmapTextures(notify=False)
 
+        # The shaders must be compiled before
+        # the vertices are generated, as the
+        # version-specific updateVertices and
+        # updateVertexData functions may copy
+        # data into shader-owned buffers.
         self.compileShaders()
+        self.updateVertices()
+        self.updateVertexData()
         self.updateShaderState()
 
 
     def destroy(self):
         """Must be called when this ``GLMesh`` is no longer needed. Removes
-        some property listeners and destroys the colour map textures and
-        off-screen :class:`.RenderTexture`.
+        some property listeners, destroys the colour map textures and
+        off-screen :class:`.RenderTexture`, and deletes the vertex buffers.
         """
 
         self.renderTexture .destroy()
@@ -189,6 +242,10 @@ class GLMesh(globject.GLObject):
         self.negCmapTexture.destroy()
         self.lutTexture    .destroy()
 
+        if self.vertexBuffer is not None:
+            gl.glDeleteBuffers(1, gltypes.GLuint(self.vertexBuffer))
+            gl.glDeleteBuffers(1, gltypes.GLuint(self.indexBuffer))
+
         self.removeListeners()
         self.deregisterLut()
 
@@ -202,6 +259,9 @@ class GLMesh(globject.GLObject):
         self.activeShader = None
 
         self.lut            = None
+        self.__planeIndices = None
+        self.vertexBuffer   = None
+        self.indexBuffer    = None
         self.renderTexture  = None
         self.cmapTexture    = None
         self.negCmapTexture = None
@@ -233,6 +293,11 @@ class GLMesh(globject.GLObject):
             self.updateShaderState()
             self.notify()
 
+        def vertexData(*a):
+            self.updateVertexData()
+            self.updateShaderState()
+            self.notify()
+
         def refreshCmap(*a):
             self.refreshCmapTextures(notify=False)
             self.updateShaderState()
@@ -252,8 +317,8 @@ class GLMesh(globject.GLObject):
         opts   .addListener('outline',          name, refresh,     weak=False)
         opts   .addListener('outlineWidth',     name, refresh,     weak=False)
         opts   .addListener('wireframe',        name, refresh,     weak=False)
-        opts   .addListener('vertexData',       name, shader,      weak=False)
-        opts   .addListener('vertexDataIndex',  name, shader,      weak=False)
+        opts   .addListener('vertexData',       name, vertexData,  weak=False)
+        opts   .addListener('vertexDataIndex',  name, vertexData,  weak=False)
         opts   .addListener('clippingRange',    name, shader,      weak=False)
         opts   .addListener('invertClipping',   name, shader,      weak=False)
         opts   .addListener('discardClipped',   name, shader,      weak=False)
@@ -339,6 +404,11 @@ class GLMesh(globject.GLObject):
         change. (Re-)generates the mesh vertices, indices and normals (if
         being displayed in 3D). They are stored as attributes called
         ``vertices``, ``indices``, and ``normals`` respectively.
+
+        The vertices and indices are also copied into the vertex buffers
+        (see :meth:`bindBuffers`), if they are in use, the version-specific
+        ``updateVertices`` function is called, and any :class:`.PlaneIndex`
+        instances (see :meth:`getPlaneIndex`) are discarded.
         """
 
         overlay  = self.overlay
@@ -360,6 +430,59 @@ class GLMesh(globject.GLObject):
         if self.threedee:
             self.normals = np.array(normals, dtype=np.float32)
 
+        self.__planeIndices = {}
+
+        if self.vertexBuffer is not None:
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.vertexBuffer)
+            gl.glBufferData(gl.GL_ARRAY_BUFFER,
+                            self.vertices.nbytes,
+                            self.vertices.ravel('C'),
+                            gl.GL_STATIC_DRAW)
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+
+            gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self.indexBuffer)
+            gl.glBufferData(gl.GL_ELEMENT_ARRAY_BUFFER,
+                            self.indices.nbytes,
+                            self.indices,
+                            gl.GL_STATIC_DRAW)
+            gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, 0)
+
+        fslgl.glmesh_funcs.updateVertices(self)
+
+
+    def updateVertexData(self, *a):
+        """Called by :meth:`__init__`, and when the
+        :attr:`.MeshOpts.vertexData` or :attr:`.MeshOpts.vertexDataIndex`
+        properties change. Calls the version-specific ``updateVertexData``
+        function.
+        """
+        fslgl.glmesh_funcs.updateVertexData(self)
+
+
+    def bindBuffers(self):
+        """Binds the vertex and index buffers, and sets the
+        ``GL_VERTEX_ARRAY`` pointer to the vertex buffer. After calling this
+        method, the complete mesh can be drawn with::
+
+            gl.glDrawElements(gl.GL_TRIANGLES,
+                              len(self.indices),
+                              gl.GL_UNSIGNED_INT,
+                              None)
+
+        The :meth:`unbindBuffers` method must be called afterwards.
+        """
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER,         self.vertexBuffer)
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self.indexBuffer)
+        gl.glVertexPointer(3, gl.GL_FLOAT, 0, None)
+
+
+    def unbindBuffers(self):
+        """Unbinds the vertex and index buffers that were bound by
+        :meth:`bindBuffers`.
+        """
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER,         0)
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, 0)
+
 
     def frontFace(self):
         """Returns the face of the mesh triangles which which will be facing
@@ -506,6 +629,9 @@ class GLMesh(globject.GLObject):
         blo, bhi  = self.getDisplayBounds()
         vdata     = opts.getVertexData()
 
+        if vdata is not None:
+            vdata = vdata[:, opts.vertexDataIndex]
+
         is2D = np.isclose(bhi[2], blo[2])
 
         if opts.wireframe:
@@ -635,11 +761,12 @@ class GLMesh(globject.GLObject):
             gl.glColor(*opts.getConstantColour())
             gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
 
-            gl.glVertexPointer(3, gl.GL_FLOAT, 0, vertices.ravel('C'))
+            self.bindBuffers()
             gl.glDrawElements(gl.GL_TRIANGLES,
                               faces.shape[0],
                               gl.GL_UNSIGNED_INT,
-                              faces.ravel('C'))
+                              None)
+            self.unbindBuffers()
 
             gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
 
@@ -675,8 +802,7 @@ class GLMesh(globject.GLObject):
         ymin     = lo[yax]
         xmax     = hi[xax]
         ymax     = hi[yax]
-        vertices = self.vertices.ravel('C')
-        indices  = self.indices
+        nindices = len(self.indices)
 
         dest.bindAsRenderTarget()
         dest.setRenderViewport(xax, yax, lo, hi)
@@ -713,6 +839,8 @@ class GLMesh(globject.GLObject):
         gl.glClipPlane(gl.GL_CLIP_PLANE0, planeEq)
         gl.glColorMask(gl.GL_FALSE, gl.GL_FALSE, gl.GL_FALSE, gl.GL_FALSE)
 
+        self.bindBuffers()
+
         # First and second passes - render front and
         # back faces separately. In the stencil buffer,
         # subtract the mask created by the second
@@ -737,11 +865,12 @@ class GLMesh(globject.GLObject):
             gl.glStencilOp(gl.GL_KEEP, gl.GL_KEEP, direction)
             gl.glCullFace(face)
 
-            gl.glVertexPointer(3, gl.GL_FLOAT, 0, vertices)
             gl.glDrawElements(gl.GL_TRIANGLES,
-                              len(indices),
+                              nindices,
                               gl.GL_UNSIGNED_INT,
-                              indices)
+                              None)
+
+        self.unbindBuffers()
 
         # Third pass - render the intersection
         # of the front and back faces from the
@@ -818,8 +947,30 @@ class GLMesh(globject.GLObject):
         return lo, hi
 
 
+    def getPlaneIndex(self, normal):
+        """Returns a :class:`.PlaneIndex` which can be used to calculate
+        the intersection of the mesh with planes orthogonal to the given
+        ``normal`` vector (in the mesh coordinate system). The index is
+        created on the first call for each normal vector, and is re-used
+        until the mesh vertices change.
+        """
+
+        normal = np.asarray(normal, dtype=np.float64)
+        normal = normal / np.sqrt(np.sum(normal ** 2))
+        key    = tuple(np.round(normal, 6))
+        index  = self.__planeIndices.get(key, None)
+
+        if index is None:
+            index = planeindex.PlaneIndex(self.overlay.vertices,
+                                          self.overlay.indices,
+                                          normal)
+            self.__planeIndices[key] = index
+
+        return index
+
+
     def calculateIntersection(self, zpos, axes, bbox=None):
-        """Uses the :func:`.Mesh.planeIntersection` method to
+        """Uses a :class:`.PlaneIndex` (see :meth:`getPlaneIndex`) to
         calculate the intersection of the mesh with the viewing plane at
         the given ``zpos``.
 
@@ -867,11 +1018,8 @@ class GLMesh(globject.GLObject):
         normal    = opts.transformCoords(normal, 'display', 'mesh',
                                          vector=True)
 
-        # TODO use bbox to constrain? This
-        #      would be nice, but is not
-        #      supported by trimesh.
-        lines, faces, dists = overlay.planeIntersection(
-            normal, origin, distances=True)
+        index               = self.getPlaneIndex(normal)
+        lines, faces, dists = index.intersect(origin)
 
         lines = np.asarray(lines, dtype=np.float32)
         faces = np.asarray(faces, dtype=np.uint32)
@@ -33,6 +33,8 @@ import logging
 
 import fsl.utils.notifier as notifier
 
+from . import resources   as glresources
+
 
 log = logging.getLogger(__name__)
 
@@ -159,6 +161,23 @@ class GLObject(notifier.Notifier):
     facilitate this notification process.
 
 
+    Every notification increments the :attr:`version` of the ``GLObject``,
+    which canvases use to detect whether their scene has changed since it
+    was last drawn.
+
+
+    **Shared resources**
+
+
+    A ``GLObject`` tells the :mod:`.resources` module about the shared
+    resources (returned by :meth:`getResources`) that it is using, and
+    whether they are visible (according to the :attr:`.Display.enabled`
+    property), via :func:`.resources.registerVisibility`. This is used by
+    the ``resources`` module to decide which resources may be evicted when
+    its memory budget is exceeded. When a ``GLObject`` becomes visible, any
+    of its resources which have been evicted are restored.
+
+
     **Sub-class resposibilities***
 
 
@@ -227,6 +246,7 @@ class GLObject(notifier.Notifier):
         self.__canvas      = canvas
         self.__display     = None
         self.__opts        = None
+        self.__version     = 0
 
         # GLSimpleObject passes in None for
         # both the overlay and the displayCtx.
@@ -234,6 +254,12 @@ class GLObject(notifier.Notifier):
             self.__display = displayCtx.getDisplay(overlay)
             self.__opts    = self.__display.opts
 
+            glresources.registerVisibility(self.__name,
+                                           self.__resourceVisibility)
+            self.__display.addListener('enabled',
+                                       self.__resourceName,
+                                       self.__enabledChanged)
+
         log.debug('{}.init ({})'.format(type(self).__name__, id(self)))
 
 
@@ -249,6 +275,23 @@ class GLObject(notifier.Notifier):
         return self.__name
 
 
+    @property
+    def version(self):
+        """Returns the number of times that this ``GLObject`` has notified
+        its listeners that it has changed (see :meth:`notify`). Canvases use
+        this to determine whether a ``GLObject`` needs to be re-drawn.
+        """
+        return self.__version
+
+
+    def notify(self, *args, **kwargs):
+        """Overrides :meth:`.Notifier.notify`. Increments the
+        :attr:`version`, then notifies all registered listeners.
+        """
+        self.__version += 1
+        notifier.Notifier.notify(self, *args, **kwargs)
+
+
     @property
     def overlay(self):
         """The overlay being drawn by this ``GLObject``."""
@@ -300,6 +343,52 @@ class GLObject(notifier.Notifier):
         return self.__threedee
 
 
+    @property
+    def __resourceName(self):
+        """Name used for the :attr:`.Display.enabled` listener registered
+        in :meth:`__init__`, so that it does not clash with listeners
+        registered by sub-classes.
+        """
+        return '{}_resources'.format(self.__name)
+
+
+    def getResources(self):
+        """Returns a list containing the shared resources (e.g.
+        :class:`.ImageTexture` instances managed by the :mod:`.resources`
+        module) which are currently being used by this ``GLObject``. May be
+        overridden by sub-classes - the default implementation returns an
+        empty list.
+        """
+        return []
+
+
+    def __resourceVisibility(self):
+        """Registered with :func:`.resources.registerVisibility`. Returns
+        the resources used by this ``GLObject``, and whether it is visible.
+        """
+        display = self.__display
+        if display is None:
+            return [], False
+        return self.getResources(), display.enabled
+
+
+    def __enabledChanged(self, *a):
+        """Called when the :attr:`.Display.enabled` property changes. When
+        this ``GLObject`` becomes visible, restores any resources which have
+        been evicted. When it is hidden, its resources may be evicted, if the
+        memory budget has been exceeded.
+        """
+
+        if not self.__display.enabled:
+            glresources.enforceBudget()
+            return
+
+        for res in self.getResources():
+            restore = getattr(res, 'restore', None)
+            if callable(restore):
+                restore()
+
+
     def ready(self):
         """This method must return ``True`` or ``False`` to indicate
         whether this ``GLObject`` is ready to be drawn. The method should,
@@ -364,6 +453,11 @@ class GLObject(notifier.Notifier):
         .. note:: Sub-classes which override this method must call this
                   implementation.
         """
+
+        glresources.deregisterVisibility(self.__name)
+        if self.__display is not None:
+            self.__display.removeListener('enabled', self.__resourceName)
+
         self.__overlay    = None
         self.__display    = None
         self.__opts       = None
@@ -125,6 +125,14 @@ class GLVolume(glimageobject.GLImageObject):
     **Textures**
 
 
+    Images which are too large to be stored in a single 3D texture (see
+    :meth:`.Texture3D.maxTextureSize`) are split into bricks when rendered in
+    2D with OpenGL 2.1 - each brick is bound to texture unit 0 in turn, and
+    only bricks which intersect the slice being drawn are drawn (see the
+    :attr:`.Texture3D.bricks` property). In all other situations, such
+    images are sub-sampled so that they fit into a single texture.
+
+
     The ``GLVolume`` class uses the following textures:
 
      - An :class:`.ImageTexture`, a 3D texture which contains image data.
@@ -149,6 +157,10 @@ class GLVolume(glimageobject.GLImageObject):
        is being drawn it is bound to texture units 4 (for RGBA) and 5 (for
        depth).
 
+     - An :class:`.OccupancyTexture`, which is used (under OpenGL 2.1) to
+       skip over empty regions of the image when it is rendered in 3D. This
+       is bound to texture unit 6.
+
 
     **Attributes**
 
@@ -169,6 +181,8 @@ class GLVolume(glimageobject.GLImageObject):
                          rendering.
     ``renderTexture2``   The first :class:`.RenderTexture` used for 3D
                          rendering.
+    ``occupancyTexture`` The :class:`.OccupancyTexture` used for 3D
+                         rendering, or ``None`` if it is not being used.
     ``texName``          A name used for the ``imageTexture``,
                          ``colourTexture``, and ``negColourTexture`. The
                          name for the latter is suffixed with ``'_neg'``.
@@ -226,11 +240,33 @@ class GLVolume(glimageobject.GLImageObject):
         self.imageTexture     = None
         self.clipTexture      = None
         self.colourTexture    = textures.ColourMapTexture(self.texName)
+
+        # The resource key under which the
+        # image texture is currently shared
+        # (see refreshImageTexture), and whether
+        # it is the synced texture, which is
+        # borrowed by this unsynced GLVolume.
+        self.__texKey         = None
+        self.__borrowed       = False
         self.negColourTexture = textures.ColourMapTexture(
             '{}_neg'.format(self.texName))
 
+        # Under GL21, 3D renders skip over
+        # regions of the image which are
+        # known to be empty - see the
+        # OccupancyTexture class.
+        self.occupancyTexture = None
+
         if self.threedee:
 
+            if float(fslplatform.glVersion) >= 2.1:
+                self.occupancyTexture = textures.OccupancyTexture(
+                    '{}_occupancy'.format(self.name),
+                    self.image,
+                    volume=self.opts.index()[3:])
+                self.occupancyTexture.register(self.name,
+                                               self.__occupancyChanged)
+
             self.smoothFilter = glfilter.Filter('smooth', texture=0)
             self.smoothFilter.set(kernSize=self.opts.smoothing * 2)
 
@@ -276,7 +312,7 @@ class GLVolume(glimageobject.GLImageObject):
         self.removeDisplayListeners()
 
         self.imageTexture.deregister(self.name)
-        glresources.delete(self.imageTexture.getTextureName())
+        glresources.delete(self.__texKey)
 
         if self.clipTexture is not None:
             self.clipTexture.deregister(self.name)
@@ -287,9 +323,16 @@ class GLVolume(glimageobject.GLImageObject):
 
         self.imageTexture     = None
         self.clipTexture      = None
+        self.__texKey         = None
+        self.__borrowed       = False
         self.colourTexture    = None
         self.negColourTexture = None
 
+        if self.occupancyTexture is not None:
+            self.occupancyTexture.deregister(self.name)
+            self.occupancyTexture.destroy()
+            self.occupancyTexture = None
+
         if self.threedee:
             self.renderTexture1.destroy()
             self.renderTexture2.destroy()
@@ -336,11 +379,12 @@ class GLVolume(glimageobject.GLImageObject):
         display properties are changed.
         """
 
-        display = self.display
-        opts    = self.opts
-        name    = self.name
+        display    = self.display
+        displayCtx = self.displayCtx
+        opts       = self.opts
+        name       = self.name
 
-        crPVs   = opts.getPropVal('clippingRange').getPropertyValueList()
+        crPVs      = opts.getPropVal('clippingRange').getPropertyValueList()
 
         display .addListener('alpha',            name, self._alphaChanged)
         opts    .addListener('displayRange',     name,
@@ -370,6 +414,12 @@ class GLVolume(glimageobject.GLImageObject):
                              self._enableOverrideDataRangeChanged)
         opts    .addListener('overrideDataRange', name,
                              self._overrideDataRangeChanged)
+        opts    .addListener('textureStorage',   name,
+                             self._textureStorageChanged)
+        display .addListener('enabled',          name,
+                             self._texturePriorityChanged)
+        displayCtx.addListener('selectedOverlay', name,
+                               self._texturePriorityChanged)
 
         # 3D-only options
         if self.threedee:
@@ -419,10 +469,11 @@ class GLVolume(glimageobject.GLImageObject):
         were added by :meth:`addDisplayListeners`.
         """
 
-        display = self.display
-        opts    = self.opts
-        name    = self.name
-        crPVs   = opts.getPropVal('clippingRange').getPropertyValueList()
+        display    = self.display
+        displayCtx = self.displayCtx
+        opts       = self.opts
+        name       = self.name
+        crPVs      = opts.getPropVal('clippingRange').getPropertyValueList()
 
         display .removeListener(          'alpha',                   name)
         opts    .removeListener(          'displayRange',            name)
@@ -443,6 +494,9 @@ class GLVolume(glimageobject.GLImageObject):
         opts    .removeListener(          'displayXform',            name)
         opts    .removeListener(          'enableOverrideDataRange', name)
         opts    .removeListener(          'overrideDataRange',       name)
+        opts    .removeListener(          'textureStorage',          name)
+        display .removeListener(          'enabled',                 name)
+        displayCtx.removeListener(        'selectedOverlay',         name)
 
         if self.threedee:
             opts.removeListener('numSteps',        name)
@@ -534,22 +588,35 @@ class GLVolume(glimageobject.GLImageObject):
         :class:`.Image` data. This is performed through the :mod:`.resources`
         module, so the image texture can be shared between multiple
         ``GLVolume`` instances.
+
+        ``GLVolume`` instances which are synchronised with their parent
+        :class:`.VolumeOpts` share a single texture. The texture for an
+        unsynchronised ``GLVolume`` is identified by its content - the volume,
+        normalisation range, interpolation and storage settings - so
+        unsynchronised ``GLVolume`` instances which are displaying the same
+        volume of the same image (e.g. in different views) will share one
+        texture, and will share the synchronised texture if it contains the
+        same content. An unsynchronised ``GLVolume`` never modifies a
+        synchronised texture that it is borrowing.
         """
 
         opts     = self.opts
         texName  = self.texName
         unsynced = self.testUnsynced()
 
-        if unsynced:
-            texName = '{}_unsync_{}'.format(texName, id(opts))
+        # Images which are too large to be stored
+        # in a single GL texture are split into
+        # bricks for 2D rendering under GL21. The
+        # GL14 shaders and the 3D ray caster need
+        # the image in a single texture, so the
+        # image data is sub-sampled for them, and
+        # stored in a different texture.
+        bricked = (not self.threedee) and \
+                  float(fslplatform.glVersion) >= 2.1
 
-        if self.imageTexture is not None:
-
-            if self.imageTexture.getTextureName() == texName:
-                return None
-
-            self.imageTexture.deregister(self.name)
-            glresources.delete(self.imageTexture.getTextureName())
+        if not bricked and \
+           textures.Texture3D.exceedsMaxSize(self.image.shape[:3]):
+            texName = '{}_subsampled'.format(texName)
 
         if opts.interpolation == 'none': interp = gl.GL_NEAREST
         else:                            interp = gl.GL_LINEAR
@@ -557,17 +624,124 @@ class GLVolume(glimageobject.GLImageObject):
         if opts.enableOverrideDataRange: normRange = opts.overrideDataRange
         else:                            normRange = None
 
+        volume  = list(opts.index()[3:])
+        storage = opts.textureStorage
+        content = (volume, normRange, interp, storage)
+        texKey  = texName
+
+        if unsynced:
+            texKey = self.__contentKey(texName, *content)
+            shared = glresources.find(texName)
+
+            if shared is not None and \
+               self.__textureMatches(shared, *content):
+                texKey = texName
+
+        if self.imageTexture is not None:
+
+            if self.__texKey == texKey:
+                return None
+
+            # If nobody else is using our texture,
+            # and the new content is not already
+            # available, we re-use the texture,
+            # rather than creating a new one. We
+            # don't touch a borrowed synced texture,
+            # as it belongs to the synced GLVolumes.
+            if unsynced                                and \
+               not self.__borrowed                     and \
+               glresources.refcount(self.__texKey) == 1 and \
+               not glresources.exists(texKey):
+                glresources.rename(self.__texKey, texKey)
+                self.__texKey = texKey
+                self.imageTexture.set(volume=volume,
+                                      interp=interp,
+                                      normaliseRange=normRange,
+                                      storage=storage)
+                return None
+
+            self.imageTexture.deregister(self.name)
+            glresources.delete(self.__texKey)
+
+        self.__texKey     = texKey
+        self.__borrowed   = unsynced and texKey == texName
+
+        # Large images are displayed progressively,
+        # starting with a coarse version of the data
+        # (see Texture3D). The image texture always
+        # contains the finest level that is ready,
+        # and we are notified (via the
+        # __texturesChanged method) when a finer
+        # level becomes available.
         self.imageTexture = glresources.get(
-            texName,
+            texKey,
             textures.ImageTexture,
-            texName,
+            texKey,
             self.image,
             interp=interp,
-            volume=opts.index()[3:],
+            volume=volume,
             normaliseRange=normRange,
+            storage=storage,
+            bricked=bricked,
+            pyramid=True,
             notify=False)
 
         self.imageTexture.register(self.name, self.__texturesChanged)
+        self.__updateTexturePriority()
+
+
+    def __updateTexturePriority(self):
+        """Called by :meth:`refreshImageTexture` and
+        :meth:`_texturePriorityChanged`. Sets the :attr:`.Texture3D.priority`
+        of the image texture, so that texture data for the selected overlay
+        is prepared first, followed by other visible overlays, and then by
+        hidden overlays. The priority of a borrowed synced texture is left
+        to the synced ``GLVolume`` instances which own it.
+        """
+
+        if self.imageTexture is None or self.__borrowed:
+            return
+
+        if   self.displayCtx.getSelectedOverlay() is self.image: priority = 2
+        elif self.display.enabled:                               priority = 1
+        else:                                                    priority = 0
+
+        self.imageTexture.priority = priority
+
+
+    @staticmethod
+    def __contentKey(texName, volume, normRange, interp, storage):
+        """Used by :meth:`refreshImageTexture`. Generates a resource key for
+        an image texture with the given content.
+        """
+        if normRange is not None:
+            normRange = tuple(float(r) for r in normRange)
+
+        volume = tuple(int(v) for v in volume)
+
+        return '{}_content_{}_{}_{}_{}'.format(
+            texName, volume, normRange, interp, storage)
+
+
+    def __textureMatches(self, texture, volume, normRange, interp, storage):
+        """Used by :meth:`refreshImageTexture`. Returns ``True`` if the given
+        :class:`.ImageTexture` currently contains (or is being refreshed to
+        contain) the given content, ``False`` otherwise.
+        """
+
+        if normRange is None:
+            normRange = self.image.dataRange
+
+        texVolume = texture.volume
+        texRange  = texture.normaliseRange
+
+        if texVolume is None: texVolume = []
+        if texRange  is None: return False
+
+        return (list(texVolume)  == list(volume) and
+                texture.interp   == interp       and
+                texture.storage  == storage      and
+                tuple(texRange)  == tuple(normRange))
 
 
     def registerClipImage(self):
@@ -694,6 +868,9 @@ class GLVolume(glimageobject.GLImageObject):
         if self.clipTexture is not None:
             self.clipTexture .bindTexture(gl.GL_TEXTURE3)
 
+        if self.occupancyTexture is not None:
+            self.occupancyTexture.bindTexture(gl.GL_TEXTURE6)
+
         fslgl.glvolume_funcs.preDraw(self, *args, **kwargs)
 
 
@@ -708,11 +885,14 @@ class GLVolume(glimageobject.GLImageObject):
 
 
     def draw3D(self, *args, **kwargs):
-        """Calls the version dependent ``draw3D`` function. """
+        """Calls the version dependent ``draw3D`` function. The render
+        resolution is reduced by the :attr:`.Volume3DOpts.resolution` and by
+        the :attr:`.Scene3DCanvas.lod`.
+        """
 
         opts = self.opts
         w, h = self.canvas.GetScaledSize()
-        res  = self.opts.resolution / 100.0
+        res  = self.opts.resolution / 100.0 * self.canvas.lod
         sw   = int(np.ceil(w * res))
         sh   = int(np.ceil(h * res))
 
@@ -726,7 +906,7 @@ class GLVolume(glimageobject.GLImageObject):
                 gl.glClearColor(0, 0, 0, 0)
                 gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
 
-        if opts.resolution != 100:
+        if res != 1:
             gl.glViewport(0, 0, sw, sh)
 
         # Do the render. Even though we're
@@ -764,7 +944,7 @@ class GLVolume(glimageobject.GLImageObject):
         invproj = transform.invert(self.canvas.projectionMatrix)
         verts   = transform.transform(verts, invproj)
 
-        if opts.resolution != 100:
+        if res != 1:
             gl.glViewport(0, 0, w, h)
 
         with glroutines.enabled(gl.GL_DEPTH_TEST):
@@ -807,6 +987,9 @@ class GLVolume(glimageobject.GLImageObject):
         if self.clipTexture is not None:
             self.clipTexture.unbindTexture()
 
+        if self.occupancyTexture is not None:
+            self.occupancyTexture.unbindTexture()
+
         fslgl.glvolume_funcs.postDraw(self, *args, **kwargs)
 
 
@@ -933,14 +1116,26 @@ class GLVolume(glimageobject.GLImageObject):
         if opts.enableOverrideDataRange: normRange = opts.overrideDataRange
         else:                            normRange = None
 
-        self.imageTexture.set(volume=opts.index()[3:],
-                              interp=interp,
-                              volRefresh=volRefresh,
-                              normaliseRange=normRange)
+        # Unsynced GLVolumes may be sharing their
+        # texture with other GLVolumes, so we
+        # don't modify it directly - instead
+        # refreshImageTexture will choose the
+        # texture which has the new content.
+        if self.testUnsynced():
+            self.refreshImageTexture()
+        else:
+            self.imageTexture.set(volume=opts.index()[3:],
+                                  interp=interp,
+                                  volRefresh=volRefresh,
+                                  normaliseRange=normRange,
+                                  storage=opts.textureStorage)
 
         if self.clipTexture is not None:
             self.clipTexture.set(interp=interp)
 
+        if self.occupancyTexture is not None:
+            self.occupancyTexture.set(volume=opts.index()[3:])
+
 
     def _interpolationChanged(self, *a):
         """Called when the :attr:`.NiftiOpts.interpolation` property changes.
@@ -948,6 +1143,21 @@ class GLVolume(glimageobject.GLImageObject):
         self._volumeChanged(volRefresh=True)
 
 
+    def _textureStorageChanged(self, *a):
+        """Called when the :attr:`.VolumeOpts.textureStorage` property
+        changes. Calls :meth:`_volumeChanged`.
+        """
+        self._volumeChanged(volRefresh=True)
+
+
+    def _texturePriorityChanged(self, *a):
+        """Called when the :attr:`.Display.enabled` or
+        :attr:`.DisplayContext.selectedOverlay` properties change. Updates the
+        priority of the image texture - see :meth:`__updateTexturePriority`.
+        """
+        self.__updateTexturePriority()
+
+
     def _transformChanged(self, *a):
         """Called when the :attr:`.NiftiOpts.transform` property changes.
         """
@@ -1040,8 +1250,28 @@ class GLVolume(glimageobject.GLImageObject):
         self.updateShaderState(alwaysNotify=True)
 
 
-    def __texturesChanged(self, *a):
+    def __texturesChanged(self, texture, *a):
         """Called when either the ``imageTexture`` or the ``clipTexture``
         changes. Calls :meth:`updateShaderState`.
+
+        :arg texture: The texture which has changed.
+        """
+
+        # If we are sharing an image texture that
+        # has been changed by another GLVolume, we
+        # may need to switch to a different one.
+        # Changes to the clip texture have no
+        # bearing on which image texture we use.
+        if texture is self.imageTexture and \
+           texture is not None          and \
+           self.testUnsynced():
+            self.refreshImageTexture()
+
+        self.updateShaderState(alwaysNotify=True)
+
+
+    def __occupancyChanged(self, *a):
+        """Called when the :class:`.OccupancyTexture` has been re-calculated.
+        Calls :meth:`updateShaderState`.
         """
         self.updateShaderState(alwaysNotify=True)
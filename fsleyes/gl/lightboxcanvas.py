@@ -16,13 +16,13 @@ import numpy     as np
 import OpenGL.GL as gl
 
 import fsl.data.image                    as fslimage
-import fsl.utils.transform               as transform
 
 import fsleyes.displaycontext.canvasopts as canvasopts
 import fsleyes.gl.slicecanvas            as slicecanvas
 import fsleyes.gl.resources              as glresources
 import fsleyes.gl.routines               as glroutines
 import fsleyes.gl.textures               as textures
+import fsleyes.gl.profiler               as glprofiler
 
 
 log = logging.getLogger(__name__)
@@ -586,11 +586,16 @@ class LightBoxCanvas(slicecanvas.SliceCanvas):
     def _genSliceLocations(self):
         """Called when any of the slice display properties change.
 
-        For every overlay in the overlay list, generates a list of
-        transformation matrices, and a list of slice indices. The latter
-        specifies the slice indices from the overlay to be displayed, and the
-        former specifies the transformation matrix to be used to position the
-        slice on the canvas.
+        For every overlay in the overlay list, generates an array of
+        transformation matrices, and an array of slice locations. The latter
+        specifies the Z positions of the slices to be displayed, and the
+        former specifies the transformation matrix to be used to position
+        each slice on the canvas.
+
+        The slice locations and transformations are stored as ``numpy``
+        arrays, so that they can be passed straight through to
+        :meth:`.GLObject.drawAll`, which can then generate the geometry
+        for all slices without looping over them in Python.
         """
 
         # calculate the locations, in display coordinates,
@@ -601,53 +606,49 @@ class LightBoxCanvas(slicecanvas.SliceCanvas):
             opts.zrange.xhi,
             opts.sliceSpacing)
 
+        # The slice locations and transformations
+        # are the same for every overlay, so we
+        # only need to calculate them once.
+        xforms = self._calculateSliceTransforms(np.arange(len(sliceLocs)))
+
         self._sliceLocs  = {}
         self._transforms = {}
 
-        # calculate the transformation for each
-        # slice in each overlay, and the index of
-        # each slice to be displayed
-        for i, overlay in enumerate(self.overlayList):
-
-            iSliceLocs  = []
-            iTransforms = []
-
-            for zi, zpos in enumerate(sliceLocs):
-
-                xform = self._calculateSliceTransform(overlay, zi)
-
-                iTransforms.append(xform)
-                iSliceLocs .append(zpos)
-
-            self._transforms[overlay] = iTransforms
-            self._sliceLocs[ overlay] = iSliceLocs
+        for overlay in self.overlayList:
+            self._transforms[overlay] = xforms
+            self._sliceLocs[ overlay] = sliceLocs
 
 
-    def _calculateSliceTransform(self, overlay, sliceno):
-        """Calculates a transformation matrix for the given slice number in
-        the given overlay.
+    def _calculateSliceTransforms(self, slicenos):
+        """Calculates a transformation matrix for each of the given slice
+        numbers.
 
         Each slice is displayed on the same canvas, but is translated to a
         specific row/column.  So translation matrix is created, to position
         the slice in the correct location on the canvas.
+
+        :returns: A ``(N, 4, 4)`` array containing the transformation matrix
+                  for each slice.
         """
 
-        opts  = self.opts
-        nrows = self._totalRows
-        ncols = opts.ncols
+        opts     = self.opts
+        nrows    = self._totalRows
+        ncols    = opts.ncols
+        slicenos = np.asarray(slicenos, dtype=np.int64)
 
-        row = int(np.floor(sliceno / ncols))
-        col = int(np.floor(sliceno % ncols))
+        rows = slicenos // ncols
+        cols = slicenos %  ncols
 
         xlen = self.displayCtx.bounds.getLen(opts.xax)
         ylen = self.displayCtx.bounds.getLen(opts.yax)
 
-        translate              = np.identity(4, dtype=np.float32)
-        translate[opts.xax, 3] = xlen * col
-        translate[opts.yax, 3] = ylen * (nrows - row - 1)
-        translate[opts.zax, 3] = 0
+        xforms                 = np.zeros((len(slicenos), 4, 4),
+                                          dtype=np.float32)
+        xforms[:]              = np.identity(4, dtype=np.float32)
+        xforms[:, opts.xax, 3] = xlen * cols
+        xforms[:, opts.yax, 3] = ylen * (nrows - rows - 1)
 
-        return translate
+        return xforms
 
 
     def __prepareSliceTransforms(self, globj, xforms):
@@ -661,7 +662,6 @@ class LightBoxCanvas(slicecanvas.SliceCanvas):
         if not opts.invertX or opts.invertY:
             return xforms
 
-        invXforms = []
         lo, hi    = globj.getDisplayBounds()
         xmin      = lo[opts.xax]
         xmax      = hi[opts.xax]
@@ -669,33 +669,23 @@ class LightBoxCanvas(slicecanvas.SliceCanvas):
         ymax      = hi[opts.yax]
         xlen      = xmax - xmin
         ylen      = ymax - ymin
+        invXforms = np.array(xforms, dtype=np.float32)
+
+        # Each slice transformation is a translation.
+        # Translating it to the origin, flipping it
+        # there, then translating it back to its
+        # original location, amounts to negating
+        # the scale of the flipped axis, and
+        # moving the translation to the other
+        # side of the slice centre.
+        for ax, invert, amin, alen in ((opts.xax, opts.invertX, xmin, xlen),
+                                       (opts.yax, opts.invertY, ymin, ylen)):
+            if not invert:
+                continue
 
-        # We have to translate each slice transformation
-        # to the origin, perform the flip there, then
-        # transform it back to its original location.
-        for xform in xforms:
-
-            invert     = np.eye(4)
-            toOrigin   = np.eye(4)
-            fromOrigin = np.eye(4)
-
-            xoff = xlen / 2.0 + xform[opts.xax, 3] + xmin
-            yoff = ylen / 2.0 + xform[opts.yax, 3] + ymin
-
-            if opts.invertX:
-                invert[    opts.xax, opts.xax] = -1
-                toOrigin[  opts.xax, 3]        = -xoff
-                fromOrigin[opts.xax, 3]        =  xoff
-            if opts.invertY:
-                invert[    opts.yax, opts.yax] = -1
-                toOrigin[  opts.yax, 3]        = -yoff
-                fromOrigin[opts.yax, 3]        =  yoff
-
-            xform = transform.concat(fromOrigin,
-                                     invert,
-                                     toOrigin,
-                                     xform)
-            invXforms.append(xform)
+            off                  = alen / 2.0 + xforms[:, ax, 3] + amin
+            invXforms[:, ax, :] *= -1
+            invXforms[:, ax, 3] += 2 * off
 
         return invXforms
 
@@ -911,13 +901,15 @@ class LightBoxCanvas(slicecanvas.SliceCanvas):
                               endSlice,
                               overlay))
 
-                for zpos, xform in zip(zposes, xforms):
-                    rt.draw(zpos, xform)
+                rt.drawAll(zposes, xforms)
             else:
 
-                globj.preDraw()
-                globj.drawAll(axes, zposes, xforms)
-                globj.postDraw()
+                with glprofiler.phase(globj, 'preDraw'):
+                    globj.preDraw()
+                with glprofiler.phase(globj, 'drawAll'):
+                    globj.drawAll(axes, zposes, xforms)
+                with glprofiler.phase(globj, 'postDraw'):
+                    globj.postDraw()
 
         if opts.renderMode == 'offscreen':
             rt.unbindAsRenderTarget()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+#
+# planeindex.py - The PlaneIndex class.
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+"""This module provides the :class:`PlaneIndex` class, which is used by the
+:class:`.GLMesh` class to calculate the intersection of a mesh with a
+plane.
+"""
+
+
+import logging
+
+import numpy as np
+
+
+log = logging.getLogger(__name__)
+
+
+LONG_PERCENTILE = 99
+"""Triangles with an extent (along the :class:`PlaneIndex` normal vector)
+greater than this percentile of all triangle extents are stored separately
+from all other triangles. See the :class:`PlaneIndex` class.
+"""
+
+
+class PlaneIndex(object):
+    """The ``PlaneIndex`` is a spatial index of the triangles in a mesh,
+    which can be used to quickly calculate the intersection of the mesh
+    with any plane orthogonal to a fixed normal vector.
+
+    Each triangle spans a range of offsets along the normal vector. The
+    triangles are sorted by their minimum offset, so that, for a plane
+    located at offset ``d``, the only triangles which can intersect the
+    plane are those with a minimum offset in the range ``[d - L, d]``,
+    where ``L`` is the largest triangle extent along the normal. These
+    candidates are found with a binary search, and are then tested
+    individually. Unusually long triangles, which would otherwise inflate
+    ``L``, are stored in a separate list (see :data:`LONG_PERCENTILE`),
+    and are always tested.
+
+    A ``PlaneIndex`` is only valid for the vertices it was created with -
+    a new one must be created whenever the mesh vertices change.
+    """
+
+
+    def __init__(self, vertices, indices, normal):
+        """Create a ``PlaneIndex``.
+
+        :arg vertices: ``(n, 3)`` array containing the mesh vertices.
+        :arg indices:  ``(m, 3)`` array containing the mesh triangles.
+        :arg normal:   Plane normal vector.
+        """
+
+        vertices = np.asarray(vertices, dtype=np.float64)
+        indices  = np.asarray(indices,  dtype=np.uint32).reshape(-1, 3)
+        normal   = np.array(normal, dtype=np.float64)
+        normal   = normal / np.sqrt(np.sum(normal ** 2))
+
+        # Offset of every vertex, and the
+        # min/max offset of every triangle,
+        # along the normal vector
+        offsets = np.dot(vertices, normal)
+        toffs   = offsets[indices.T]
+        tmins   = np.minimum(np.minimum(toffs[0], toffs[1]), toffs[2])
+        tmaxs   = np.maximum(np.maximum(toffs[0], toffs[1]), toffs[2])
+        extents = tmaxs - tmins
+
+        if len(extents) > 0:
+            thres = np.percentile(extents, LONG_PERCENTILE)
+        else:
+            thres = 0
+
+        islong    = extents > thres
+        short     = np.where(~islong)[0]
+        order     = short[np.argsort(tmins[short])]
+        maxExtent = extents[short].max() if len(short) > 0 else 0
+
+        self.__normal    = normal
+        self.__vertices  = vertices
+        self.__indices   = indices
+        self.__offsets   = offsets
+        self.__tmins     = tmins
+        self.__tmaxs     = tmaxs
+        self.__order     = order
+        self.__sortMins  = tmins[order]
+        self.__maxExtent = maxExtent
+        self.__long      = np.where(islong)[0]
+
+        log.debug('Created plane index for {} triangles ({} long) '
+                  'along {}'.format(len(indices), len(self.__long), normal))
+
+
+    @property
+    def normal(self):
+        """Returns the (unit) normal vector of this ``PlaneIndex``. """
+        return np.array(self.__normal)
+
+
+    def candidates(self, offset):
+        """Returns the indices of all triangles which may intersect a plane
+        at the given ``offset`` along the normal vector, in ascending order.
+        """
+
+        tmins = self.__tmins
+        tmaxs = self.__tmaxs
+        smins = self.__sortMins
+        lng   = self.__long
+
+        lo    = np.searchsorted(smins, offset - self.__maxExtent, 'left')
+        hi    = np.searchsorted(smins, offset,                    'right')
+        cands = self.__order[lo:hi]
+        cands = cands[tmaxs[cands] >= offset]
+        lng   = lng[(tmins[lng] <= offset) & (tmaxs[lng] >= offset)]
+
+        return np.sort(np.concatenate((cands, lng)))
+
+
+    def intersect(self, origin):
+        """Calculates the intersection of the mesh with the plane which
+        passes through ``origin``, and which is orthogonal to the normal
+        vector.
+
+        Triangles which lie within the plane are ignored.
+
+        :arg origin: Any point on the plane.
+
+        :returns: A tuple containing:
+
+                   - A ``(n, 2, 3)`` array which contains the two vertices
+                     of a line for every intersected triangle.
+
+                   - A ``(n, )`` array containing the indices of the
+                     intersected triangles.
+
+                   - A ``(n, 2, 3)`` array containing the barycentric
+                     coordinates of each line vertex, with respect to the
+                     vertices of its triangle.
+        """
+
+        offset = np.dot(np.asarray(origin, dtype=np.float64), self.__normal)
+        faces  = self.candidates(offset)
+        tris   = self.__indices[faces]
+        dists  = self.__offsets[tris] - offset
+
+        # Triangles which have vertices on
+        # both sides of the plane (vertices
+        # which lie on the plane are considered
+        # to be below it) are intersected.
+        above  = dists > 0
+        nabove = above.sum(axis=1)
+        hit    = (nabove == 1) | (nabove == 2)
+        faces  = faces[ hit]
+        tris   = tris[  hit]
+        dists  = dists[ hit]
+        above  = above[ hit]
+        nabove = nabove[hit]
+        ntris  = len(faces)
+        rows   = np.arange(ntris)
+
+        # The plane intersects the two triangle
+        # edges which are connected to the vertex
+        # that is alone on one side of the plane
+        lone = np.argmax(above == (nabove == 1)[:, None], axis=1)
+        vidx = np.vstack((lone, (lone + 1) % 3, (lone + 2) % 3)).T
+
+        verts  = self.__vertices[tris[rows[:, None], vidx]]
+        vdists = dists[rows[:, None], vidx]
+        lines  = np.zeros((ntris, 2, 3), dtype=np.float64)
+        bary   = np.zeros((ntris, 2, 3), dtype=np.float64)
+
+        for i in (1, 2):
+            t    = vdists[:, 0] / (vdists[:, 0] - vdists[:, i])
+            edge = verts[:, i] - verts[:, 0]
+
+            lines[:, i - 1]                = verts[:, 0] + t[:, None] * edge
+            bary[ rows, i - 1, vidx[:, 0]] = 1 - t
+            bary[ rows, i - 1, vidx[:, i]] = t
+
+        return lines, faces, bary
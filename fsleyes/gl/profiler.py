@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+#
+# profiler.py - Per-GLObject render timing.
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+"""This module provides an opt-in profiler which records the time taken by
+each :class:`.GLObject` in each phase of drawing (e.g. ``preDraw``,
+``draw2D`` and ``postDraw``). It can be used to find out which overlay is
+making a view slow to draw.
+
+Profiling is disabled by default, and is enabled via the :func:`enable`
+function. The canvases (e.g. the :class:`.SliceCanvas`) wrap every
+``GLObject`` draw phase with the :func:`phase` context manager::
+
+    import fsleyes.gl.profiler as glprofiler
+
+    with glprofiler.phase(globj, 'draw2D'):
+        globj.draw2D(zpos, axes)
+
+When profiling is enabled, the CPU time taken by each phase is recorded. If
+the ``GL_ARB_timer_query`` (or ``GL_EXT_timer_query``) extension is
+available, the GPU time taken by each phase is also recorded, via
+``GL_TIME_ELAPSED`` queries. Query results are collected when they become
+available, so that the profiler does not stall the GL pipeline.
+
+Rolling statistics over the most recent :data:`WINDOW` samples for each
+``GLObject`` and phase can be retrieved via the :func:`stats` function, or
+as a formatted table via the :func:`report` function. Profiling results
+are displayed by the :class:`.RenderProfilePanel`, and by ``fsleyes render``
+when the ``--profile-render`` option is used.
+"""
+
+
+import time
+import logging
+import contextlib
+import collections
+
+import numpy as np
+
+
+log = logging.getLogger(__name__)
+
+
+WINDOW = 100
+"""Number of samples over which statistics are calculated for each
+:class:`.GLObject` and draw phase.
+"""
+
+
+def enable():
+    """Enables profiling. Calls to ``enable`` are reference counted -
+    profiling remains enabled until :func:`disable` has been called once
+    for every call to ``enable``. This allows multiple independent users
+    (e.g. a :class:`.RenderProfilePanel` and ``fsleyes render``) to enable
+    and disable profiling without interfering with each other.
+    """
+    global _enabled
+    _enabled += 1
+
+
+def disable():
+    """Releases one reference acquired via :func:`enable`. Profiling is
+    disabled when all references have been released. Statistics which have
+    already been recorded are retained until :func:`reset` is called.
+    """
+    global _enabled
+    _enabled = max(0, _enabled - 1)
+
+
+def enabled():
+    """Returns ``True`` if profiling is enabled, ``False`` otherwise. """
+    return _enabled > 0
+
+
+def reset():
+    """Clears all recorded statistics, and discards all pending GPU timer
+    queries. Should be called while a GL context is current, so that the
+    pending queries can be deleted.
+    """
+
+    _stats.clear()
+
+    if len(_pending) == 0:
+        return
+
+    queries = [query for query, _ in _pending]
+    _pending.clear()
+
+    try:
+        import OpenGL.GL as gl
+        gl.glDeleteQueries(len(queries), queries)
+    except Exception as e:
+        log.debug('Could not delete pending GPU timer '
+                  'queries: {}'.format(e))
+
+
+@contextlib.contextmanager
+def phase(globj, name):
+    """Context manager which records the time taken by the given
+    :class:`.GLObject` in the given draw phase. Does nothing if profiling
+    is not enabled.
+
+    :arg globj: The ``GLObject`` being drawn.
+    :arg name:  Name of the draw phase, e.g. ``'draw2D'``.
+    """
+
+    if _enabled == 0:
+        yield
+        return
+
+    _collect()
+
+    key   = (globj.name, name)
+    st    = _stats.get(key, None)
+    query = _beginQuery()
+
+    if st is None:
+        st = PhaseStats(_label(globj), name)
+        _stats[key] = st
+
+    start = _clock()
+
+    try:
+        yield
+    finally:
+        st.addCPUTime(_clock() - start)
+        _endQuery(query, st)
+
+
+def stats():
+    """Returns a list of :class:`PhaseStats` objects, one for each
+    :class:`.GLObject` and draw phase for which timings have been recorded,
+    in the order that they were first recorded.
+
+    .. note:: GPU timings are collected during subsequent draws, so the GPU
+              statistics may lag slightly behind the CPU statistics.
+    """
+    return list(_stats.values())
+
+
+def report():
+    """Returns a string containing a table of the statistics for every
+    :class:`.GLObject` and draw phase. All times are in milliseconds. Must
+    be called while the GL context used for drawing is current, as it waits
+    for all pending GPU timer queries to finish.
+    """
+
+    _collect(wait=True)
+
+    header = ['Overlay', 'Phase', 'Calls', 'CPU mean', 'CPU max',
+              'GPU mean', 'GPU max']
+    rows   = []
+
+    def fmt(val):
+        if val is None: return '-'
+        else:           return '{:0.3f}'.format(val * 1000)
+
+    for st in _stats.values():
+        rows.append([st.label,
+                     st.phase,
+                     str(st.count),
+                     fmt(st.cpuMean),
+                     fmt(st.cpuMax),
+                     fmt(st.gpuMean),
+                     fmt(st.gpuMax)])
+
+    widths = [max([len(r[i]) for r in [header] + rows])
+              for i in range(len(header))]
+    lines  = []
+
+    for row in [header] + rows:
+        lines.append('  '.join([c.ljust(w) for c, w in zip(row, widths)]))
+
+    return '\n'.join(lines)
+
+
+class PhaseStats(object):
+    """The ``PhaseStats`` class stores timings for one draw phase of one
+    :class:`.GLObject`. Statistics are calculated over the most recent
+    :data:`WINDOW` samples. All times are in seconds. GPU statistics are
+    ``None`` if GPU timing is not available.
+    """
+
+
+    def __init__(self, label, phase):
+        """Create a ``PhaseStats`` object.
+
+        :arg label: Label describing the ``GLObject``.
+        :arg phase: Name of the draw phase.
+        """
+        self.label = label
+        self.phase = phase
+        self.count = 0
+        self.__cpu = collections.deque(maxlen=WINDOW)
+        self.__gpu = collections.deque(maxlen=WINDOW)
+
+
+    def addCPUTime(self, t):
+        """Adds a CPU time sample. """
+        self.count += 1
+        self.__cpu.append(t)
+
+
+    def addGPUTime(self, t):
+        """Adds a GPU time sample. """
+        self.__gpu.append(t)
+
+
+    @property
+    def cpuMean(self):
+        """Mean CPU time. """
+        return _mean(self.__cpu)
+
+
+    @property
+    def cpuMax(self):
+        """Maximum CPU time. """
+        return _max(self.__cpu)
+
+
+    @property
+    def gpuMean(self):
+        """Mean GPU time. """
+        return _mean(self.__gpu)
+
+
+    @property
+    def gpuMax(self):
+        """Maximum GPU time. """
+        return _max(self.__gpu)
+
+
+def _mean(samples):
+    """Used by :class:`PhaseStats`. """
+    if len(samples) == 0: return None
+    else:                 return sum(samples) / float(len(samples))
+
+
+def _max(samples):
+    """Used by :class:`PhaseStats`. """
+    if len(samples) == 0: return None
+    else:                 return max(samples)
+
+
+def _label(globj):
+    """Returns a label for the given :class:`.GLObject`, to be used in
+    profiling results.
+    """
+    overlay = globj.overlay
+    if overlay is None:
+        return type(globj).__name__
+    return '{} ({})'.format(getattr(overlay, 'name', overlay),
+                            type(globj).__name__)
+
+
+def _gpuTimingAvailable():
+    """Returns ``True`` if GPU timer queries are available, ``False``
+    otherwise. Must be called while a GL context is current.
+    """
+
+    global _gpuTiming
+
+    if _gpuTiming is None:
+        try:
+            import OpenGL.extensions as glexts
+            _gpuTiming = (glexts.hasExtension('GL_ARB_timer_query') or
+                          glexts.hasExtension('GL_EXT_timer_query'))
+        except Exception as e:
+            log.debug('Could not query GL timer extension: {}'.format(e))
+            _gpuTiming = False
+
+        log.debug('GPU render timing available: {}'.format(_gpuTiming))
+
+    return _gpuTiming
+
+
+def _beginQuery():
+    """Starts a ``GL_TIME_ELAPSED`` query, and returns its ID, or ``None``
+    if GPU timing is not available.
+    """
+
+    global _gpuTiming
+
+    if not _gpuTimingAvailable():
+        return None
+
+    import OpenGL.GL as gl
+
+    try:
+        query = int(np.asarray(gl.glGenQueries(1)).ravel()[0])
+        gl.glBeginQuery(gl.GL_TIME_ELAPSED, query)
+        return query
+
+    except Exception as e:
+        log.warning('GPU render timing failed - disabling: {}'.format(e))
+        _gpuTiming = False
+        return None
+
+
+def _endQuery(query, st):
+    """Ends the given ``GL_TIME_ELAPSED`` query, and queues it so that its
+    result is added to the given :class:`PhaseStats` when it becomes
+    available.
+    """
+
+    if query is None:
+        return
+
+    import OpenGL.GL as gl
+
+    gl.glEndQuery(gl.GL_TIME_ELAPSED)
+    _pending.append((query, st))
+
+
+def _collect(wait=False):
+    """Collects the results of all finished GPU timer queries.
+
+    :arg wait: If ``True``, waits for all pending queries to finish.
+    """
+
+    if len(_pending) == 0:
+        return
+
+    import OpenGL.GL as gl
+
+    avail  = np.zeros(1, dtype=np.uint32)
+    result = np.zeros(1, dtype=np.uint64)
+
+    while len(_pending) > 0:
+
+        query, st = _pending[0]
+
+        # Queries finish in the order that
+        # they were issued, so we can stop
+        # at the first unfinished one
+        if not wait:
+            gl.glGetQueryObjectuiv(query, gl.GL_QUERY_RESULT_AVAILABLE, avail)
+            if not avail[0]:
+                break
+
+        gl.glGetQueryObjectui64v(query, gl.GL_QUERY_RESULT, result)
+        gl.glDeleteQueries(1, [query])
+        _pending.popleft()
+
+        # Result is in nanoseconds
+        st.addGPUTime(int(result[0]) / 1e9)
+
+
+def _clock():
+    """Returns the current time, in seconds, from the most precise clock
+    available.
+    """
+    return _perfCounter()
+
+
+_perfCounter = getattr(time, 'perf_counter', time.time)
+"""Clock used by :func:`_clock` - ``time.perf_counter`` is not available
+in python 2.
+"""
+
+
+_enabled = 0
+"""Reference count, incremented by :func:`enable` and decremented by
+:func:`disable`. Profiling is enabled when this is greater than zero.
+"""
+
+
+_gpuTiming = None
+"""Set by :func:`_gpuTimingAvailable` - ``True`` if GPU timer queries are
+available, ``False`` otherwise.
+"""
+
+
+_stats = collections.OrderedDict()
+"""Dictionary of ``{(globj name, phase) : PhaseStats}`` mappings, containing
+all recorded statistics.
+"""
+
+
+_pending = collections.deque()
+"""Queue of ``(query, PhaseStats)`` tuples, containing GPU timer queries
+which have been issued, but whose results have not yet been collected.
+"""
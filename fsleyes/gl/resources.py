@@ -16,7 +16,10 @@ following functions:
 
    exists
    get
+   find
+   refcount
    set
+   rename
    delete
 
 
@@ -63,9 +66,73 @@ count; when this count reaches zero, the texture will be destroyed::
           objects, but can actually be used with any type - the only
           requirement is that the type defines a method called ``destroy``,
           which performs any required clean-up operations.
+
+
+**Memory budget**
+
+
+The total amount of memory used by all resources may be limited via the
+:func:`setBudget` function. Resources which define the following methods
+are included in the budget:
+
+ - ``memorySize()`` - returns the (estimated) number of bytes of GPU
+   memory that the resource currently uses.
+
+ - ``evict()`` - releases the GPU memory used by the resource. The
+   resource must re-create its GPU data when it is next needed.
+
+Resources may also define a ``restore()`` method, which is called by
+:func:`get`, to re-create the GPU data of a resource that has been evicted.
+
+Users of a resource should call the :func:`registerVisibility` function, to
+tell this module about the resources that they are using, and whether those
+resources are visible. When the budget is exceeded, resources are evicted
+until the total usage fits within the budget (see :func:`enforceBudget`).
+Only resources which are not referenced (see :func:`setRetain`), and
+resources which are only used by users that are hidden, are evicted -
+resources which are not used by any registered user are never evicted.
+Resources are evicted in least recently used order - users should call the
+:func:`used` function whenever a resource is used (e.g. when a texture is
+bound for drawing). Users must restore the resources that they use when
+they become visible again. Statistics about resource memory usage are
+available via the :func:`usage` function.
+
+
+.. autosummary::
+   :nosignatures:
+
+   setBudget
+   getBudget
+   registerVisibility
+   deregisterVisibility
+   visible
+   used
+   enforceBudget
+   usage
+
+
+**Retention**
+
+
+Normally a resource is destroyed as soon as its reference count reaches
+``0``. When many short-lived scenes are created one after another (e.g. by
+the :mod:`fsleyes.render` batch mode), it can be useful to keep resources
+around, so that they can be re-used by the next scene. When retention is
+enabled via :func:`setRetain`, resources whose reference count reaches
+``0`` are retained, and are returned by the next call to :func:`get` with
+the same key. Retained resources are destroyed by the :func:`purge`
+function.
+
+
+.. autosummary::
+   :nosignatures:
+
+   setRetain
+   purge
 """
 
 import logging
+import time
 
 
 log = logging.getLogger(__name__)
@@ -105,12 +172,55 @@ def get(key, createFunc=None, *args, **kwargs):
         log.debug('Resource {} reference count '
                   'increased to {}'.format(str(key), r.refcount))
 
+        # The resource may have been
+        # evicted while it was unused
+        restore = getattr(r.resource, 'restore', None)
+        if callable(restore):
+            restore()
+
         return r.resource
 
     if createFunc is not None:
         return set(key, createFunc(*args, **kwargs))
 
 
+def find(key):
+    """Returns the resource with the specified key, or ``None`` if there is
+    no such resource. Unlike :func:`get`, the reference count of the
+    resource is not changed.
+    """
+    r = _resources.get(key, None)
+    if r is None: return None
+    else:         return r.resource
+
+
+def refcount(key):
+    """Returns the reference count of the resource with the specified key,
+    or ``0`` if there is no such resource.
+    """
+    r = _resources.get(key, None)
+    if r is None: return 0
+    else:         return r.refcount
+
+
+def rename(oldKey, newKey):
+    """Changes the key of an existing resource.
+
+    :arg oldKey: Current resource key.
+    :arg newKey: New resource key. A :exc:`KeyError` is raised if a resource
+                 with this key already exists.
+    """
+
+    if newKey in _resources:
+        raise KeyError('Resource {} already exists'.format(str(newKey)))
+
+    log.debug('Renaming resource {} to {}'.format(str(oldKey), str(newKey)))
+
+    r                  = _resources.pop(oldKey)
+    r.key              = newKey
+    _resources[newKey] = r
+
+
 def set(key, resource, overwrite=False):
     """Create a new resource, or update an existing one.
 
@@ -131,9 +241,10 @@ def set(key, resource, overwrite=False):
     if not overwrite:
         log.debug('Adding resource {}'.format(str(key)))
 
-        r               = _Resource(key, resource)
-        r.refcount     += 1
-        _resources[key] = r
+        r                   = _Resource(key, resource)
+        r.refcount         += 1
+        _resources[key]     = r
+        _byId[id(resource)] = r
 
         log.debug('Resource {} reference count '
                   'increased to {}'.format(str(key), r.refcount))
@@ -141,7 +252,12 @@ def set(key, resource, overwrite=False):
     else:
         log.debug('Updating resource {}'.format(str(key)))
 
-        _resources[key].resource = resource
+        r = _resources[key]
+        _byId.pop(id(r.resource), None)
+        r.resource          = resource
+        _byId[id(resource)] = r
+
+    enforceBudget()
 
     return resource
 
@@ -149,7 +265,8 @@ def set(key, resource, overwrite=False):
 def delete(key):
     """Decrements the reference count of the resource with the specified key.
     When the resource reference count reaches ``0``, the ``destroy`` method
-    is called on the resource.
+    is called on the resource, unless retention is enabled (see
+    :func:`setRetain`).
 
     :arg key: Unique resource identifier.
     """
@@ -160,12 +277,234 @@ def delete(key):
     log.debug('Resource {} reference count '
               'decreased to {}'.format(str(key), r.refcount))
 
-    if r.refcount <= 0:
+    if r.refcount <= 0 and not _retain:
+        _destroy(r)
+
+
+def _destroy(r):
+    """Used by :func:`delete` and :func:`purge`. Destroys the given
+    ``_Resource``.
+    """
+
+    log.debug('Destroying resource {}'.format(str(r.key)))
+
+    _resources.pop(r.key)
+    _byId.pop(id(r.resource), None)
+    r.resource.destroy()
+
+
+def setRetain(retain):
+    """Enables or disables retention of unreferenced resources (see the
+    section on retention in the module documentation). Retained resources
+    are not destroyed when retention is disabled - use :func:`purge` to
+    destroy them.
+    """
+    global _retain
+    _retain = retain
+
+
+def purge(keep=None):
+    """Destroys all retained resources, i.e. those which have a reference
+    count of ``0`` (see :func:`setRetain`).
+
+    :arg keep: Optional function which is passed the key of each retained
+               resource, and which should return ``True`` if the resource
+               is to be kept, ``False`` if it is to be destroyed.
+    """
+
+    for r in list(_resources.values()):
+        if r.refcount > 0:
+            continue
+        if keep is not None and keep(r.key):
+            continue
+        _destroy(r)
+
+
+def setBudget(budget):
+    """Sets the memory budget, in bytes, to be shared by all resources.
+    If ``None``, memory usage is not limited.
+    """
+    global _budget
+    _budget = budget
+    enforceBudget()
+
+
+def getBudget():
+    """Returns the current memory budget, in bytes, or ``None`` if memory
+    usage is not limited.
+    """
+    return _budget
+
+
+def registerVisibility(name, func):
+    """Registers a user of some resources. The given ``func`` will be called
+    whenever this module needs to know which resources may be evicted. It
+    must return a tuple containing:
+
+      - A sequence of the resources (not their keys) that are being used.
+      - ``True`` if the resources are visible (and so must not be evicted),
+        ``False`` otherwise.
+
+    :arg name: Unique name identifying the user.
+    :arg func: Function which returns the resources used by the user.
+    """
+    _visibility[name] = func
+
+
+def deregisterVisibility(name):
+    """De-registers a user that was registered via
+    :func:`registerVisibility`.
+    """
+    _visibility.pop(name, None)
+
+
+def _visibleIds():
+    """Used by :func:`visible` and :func:`enforceBudget`. Returns a tuple
+    containing:
+
+      - A set containing the IDs of all resources which are used by
+        registered users.
+      - A set containing the IDs of all resources which are used by
+        registered users that are visible.
+    """
+    # The built-in set type is hidden
+    # by the set function in this module
+    claimed = []
+    shown   = []
+
+    for func in list(_visibility.values()):
+        resources, isVisible = func()
+        ids                  = [id(r) for r in resources if r is not None]
+        claimed.extend(ids)
+        if isVisible:
+            shown.extend(ids)
+
+    return frozenset(claimed), frozenset(shown)
+
+
+def visible(resource):
+    """Returns ``True`` if the given resource is being used by at least one
+    visible user (see :func:`registerVisibility`), ``False`` otherwise.
+    """
+    return id(resource) in _visibleIds()[1]
+
+
+def used(resource):
+    """Should be called whenever a resource is used. Records the time of use,
+    which is used to determine the order in which resources are evicted when
+    the memory budget is exceeded. Resources which are not managed by this
+    module are ignored.
+
+    :arg resource: The resource (not its key).
+    """
+    r = _byId.get(id(resource), None)
+    if r is not None:
+        r.lastUsed = time.time()
+
+
+def enforceBudget():
+    """Evicts resources until the total estimated memory usage is within the
+    budget. Resources which are not referenced are evicted first, followed by
+    resources which are only used by hidden users, in least recently used
+    order. Resources which are used by a visible user, and referenced
+    resources which are not used by any registered user, are never evicted
+    (see :func:`registerVisibility`).
+
+    :returns: The number of resources that were evicted.
+    """
+
+    global _evictions
+
+    if _budget is None:
+        return 0
+
+    sizes = {key : _memorySize(r) for key, r in _resources.items()}
+    total = sum(sizes.values())
 
-        log.debug('Destroying resource {}'.format(str(key)))
+    if total <= _budget:
+        return 0
 
-        _resources.pop(key)
-        r.resource.destroy()
+    claimed, shown = _visibleIds()
+
+    def evictable(r):
+        rid = id(r.resource)
+        if sizes[r.key] <= 0:                              return False
+        if not callable(getattr(r.resource, 'evict', None)): return False
+        if r.refcount <= 0:                                return True
+        return rid in claimed and rid not in shown
+
+    candidates = [r for r in _resources.values() if evictable(r)]
+    candidates = sorted(candidates,
+                        key=lambda r: (r.refcount > 0, r.lastUsed))
+    evicted    = 0
+
+    for r in candidates:
+
+        if total <= _budget:
+            break
+
+        log.debug('Memory usage ({} bytes) exceeds budget ({} bytes) - '
+                  'evicting resource {} ({} bytes)'.format(
+                      total, _budget, str(r.key), sizes[r.key]))
+
+        r.resource.evict()
+
+        total      -= sizes[r.key]
+        r.evictions += 1
+        _evictions  += 1
+        evicted     += 1
+
+    if total > _budget:
+        log.debug('Memory usage ({} bytes) exceeds budget ({} bytes), but '
+                  'no more resources can be evicted'.format(total, _budget))
+
+    return evicted
+
+
+def usage():
+    """Returns a dictionary containing statistics about the memory used by
+    all resources, which may be displayed to the user. The dictionary
+    contains the following items:
+
+    ============= ==========================================================
+    ``budget``    The memory budget in bytes (``None`` if unlimited).
+    ``total``     Total estimated memory usage in bytes.
+    ``count``     Number of resources.
+    ``resident``  Number of resources which are currently using memory.
+    ``evictions`` Total number of evictions which have been performed.
+    ``resources`` A list containing a ``(key, size, refcount, lastUsed,
+                  evictions)`` tuple for every resource, sorted from most
+                  to least recently used.
+    ============= ==========================================================
+    """
+
+    resources = []
+    for key, r in _resources.items():
+        resources.append((key,
+                          _memorySize(r),
+                          r.refcount,
+                          r.lastUsed,
+                          r.evictions))
+
+    resources = sorted(resources, key=lambda r: r[3], reverse=True)
+
+    return {
+        'budget'    : _budget,
+        'total'     : sum(r[1] for r in resources),
+        'count'     : len(resources),
+        'resident'  : len([r for r in resources if r[1] > 0]),
+        'evictions' : _evictions,
+        'resources' : resources,
+    }
+
+
+def _memorySize(r):
+    """Returns the estimated memory used by the given :class:`_Resource`,
+    or ``0`` if the resource does not report its memory usage.
+    """
+    memorySize = getattr(r.resource, 'memorySize', None)
+    if callable(memorySize): return memorySize()
+    else:                    return 0
 
 
 class _Resource(object):
@@ -173,11 +512,14 @@ class _Resource(object):
     number of active references to that resources. The following attributes
     are available on a ``_Resource``:
 
-    ============ ============================================================
-    ``key``      The unique resource key.
-    ``resource`` The resource itself.
-    ``refcount`` Number of references to the resource (initialised to ``0``).
-    ============ ============================================================
+    ============= ===========================================================
+    ``key``       The unique resource key.
+    ``resource``  The resource itself.
+    ``refcount``  Number of references to the resource (initialised to
+                  ``0``).
+    ``lastUsed``  Time that the resource was last used (see :func:`used`).
+    ``evictions`` Number of times that the resource has been evicted.
+    ============= ===========================================================
     """
 
     def __init__(self, key, resource):
@@ -186,12 +528,41 @@ class _Resource(object):
         :arg key:      The unique resource key.
         :arg resource: The resource itself.
         """
-        self.key      = key
-        self.resource = resource
-        self.refcount = 0
+        self.key       = key
+        self.resource  = resource
+        self.refcount  = 0
+        self.lastUsed  = time.time()
+        self.evictions = 0
 
 
 _resources = {}
 """A dictionary containing ``{key : _Resource}`` mappings for all resources
 that exist.
 """
+
+
+_byId = {}
+"""A dictionary containing ``{id(resource) : _Resource}`` mappings for all
+resources that exist, used by the :func:`used` function.
+"""
+
+
+_retain = False
+"""If ``True``, resources are not destroyed when their reference count
+reaches ``0``. See :func:`setRetain`.
+"""
+
+
+_visibility = {}
+"""A dictionary containing ``{name : func}`` mappings for all users that
+have been registered via :func:`registerVisibility`.
+"""
+
+
+_budget = None
+"""Memory budget in bytes, or ``None`` for no limit. See :func:`setBudget`.
+"""
+
+
+_evictions = 0
+"""Total number of evictions performed by :func:`enforceBudget`. """
@@ -1208,7 +1208,7 @@ def boundingBox(dataShape,
     return vertices, voxCoords
 
 
-def subsample(data, resolution, pixdim=None, volume=None):
+def subsample(data, resolution, pixdim=None, volume=None, smooth=False):
     """Samples the given 3D data according to the given resolution.
 
     Returns a tuple containing:
@@ -1230,6 +1230,15 @@ def subsample(data, resolution, pixdim=None, volume=None):
 
     :arg volume:     If the image is a 4D volume, the volume index of the 3D
                      image to be sampled.
+
+    :arg smooth:     If ``True``, each sample is the mean of the ``2*2*2``
+                     block of voxels starting at the sample location, rather
+                     than the value of a single voxel. This reduces aliasing
+                     in the sub-sampled data, while only accessing a small
+                     fraction of the input data. The mean is calculated
+                     at single precision (or double precision for double
+                     precision input data), and the sampled data has the
+                     same type as the input data.
     """
 
     if pixdim is None:
@@ -1254,15 +1263,44 @@ def subsample(data, resolution, pixdim=None, volume=None):
     if ystart >= data.shape[1]: ystart = data.shape[1] - 1
     if zstart >= data.shape[2]: zstart = data.shape[2] - 1
 
-    if len(data.shape) > 3: sample = data[xstart::xstep,
-                                          ystart::ystep,
-                                          zstart::zstep,
-                                          volume]
-    else:                   sample = data[xstart::xstep,
-                                          ystart::ystep,
-                                          zstart::zstep]
+    starts = (xstart, ystart, zstart)
+    steps  = (xstep,  ystep,  zstep)
+
+    if len(data.shape) > 3:
+        data = data[:, :, :, volume]
+
+    if not smooth:
+        sample = data[xstart::xstep, ystart::ystep, zstart::zstep]
+        return sample, starts, steps
+
+    # Average across neighbouring voxels
+    # (clamping at the data boundaries),
+    # along each axis which is being
+    # sub-sampled.
+    indices = [np.arange(st, sz, sp)
+               for st, sz, sp in zip(starts, data.shape[:3], steps)]
+    offsets = [range(min(2, sp)) for sp in steps]
+    sample  = None
+    count   = 0
+
+    if data.dtype == np.float64: dtype = np.float64
+    else:                        dtype = np.float32
+
+    for off in it.product(*offsets):
+        idxs = [np.minimum(i + o, sz - 1)
+                for i, o, sz in zip(indices, off, data.shape[:3])]
+        vals = np.asarray(data[np.ix_(*idxs)], dtype=dtype)
+
+        if sample is None: sample  = vals
+        else:              sample += vals
+        count += 1
 
-    return sample, (xstart, ystart, zstart), (xstep, ystep, zstep)
+    sample /= count
+
+    if issubclass(data.dtype.type, np.integer):
+        np.round(sample, out=sample)
+
+    return sample.astype(data.dtype), starts, steps
 
 
 def broadcast(vertices, indices, zposes, xforms, zax):
@@ -1293,31 +1331,49 @@ def broadcast(vertices, indices, zposes, xforms, zax):
       - A new numpy array containing all of the generated indices.
     """
 
-    vertices = np.array(vertices)
-    indices  = np.array(indices)
-
+    vertices = np.array(vertices, dtype=np.float32)
+    indices  = np.array(indices,  dtype=np.uint32)
+    zposes   = np.asarray(zposes, dtype=np.float32)
+    nslices  = len(zposes)
     nverts   = vertices.shape[0]
-    nidxs    = indices.shape[ 0]
 
-    allTexCoords  = np.zeros((nverts * len(zposes), 3), dtype=np.float32)
-    allVertCoords = np.zeros((nverts * len(zposes), 3), dtype=np.float32)
-    allIndices    = np.zeros( nidxs  * len(zposes),     dtype=np.uint32)
+    # One copy of the geometry for
+    # each slice, with the Z coordinate
+    # replaced by the slice position
+    allTexCoords             = np.tile(vertices, (nslices, 1, 1))
+    allTexCoords[:, :, zax]  = zposes[:, np.newaxis]
+    allVertCoords            = transformAll(allTexCoords, xforms)
+    allIndices               = indices[np.newaxis, :] + \
+                               nverts * np.arange(nslices, dtype=np.uint32)[
+                                   :, np.newaxis]
+
+    return (allVertCoords.reshape(-1, 3),
+            allTexCoords .reshape(-1, 3),
+            allIndices   .ravel())
 
-    for i, (zpos, xform) in enumerate(zip(zposes, xforms)):
 
-        vertices[:, zax] = zpos
+def transformAll(vertices, xforms):
+    """Applies a different affine transformation to each of a number of
+    sets of vertices, without looping over them in Python.
 
-        vStart = i * nverts
-        vEnd   = vStart + nverts
+    :arg vertices: A ``(N, M, 3)`` ``numpy`` array containing ``N`` sets of
+                   ``M`` vertices.
+
+    :arg xforms:   A sequence of ``N`` ``(4, 4)`` affine transformation
+                   matrices.
+
+    :returns:      A ``(N, M, 3)`` ``numpy.float32`` array containing the
+                   transformed vertices.
+    """
 
-        iStart = i * nidxs
-        iEnd   = iStart + nidxs
+    xforms   = np.asarray(xforms, dtype=np.float32).reshape(-1, 4, 4)
+    rotscale = xforms[:, :3, :3]
+    offset   = xforms[:, :3,  3]
 
-        allIndices[   iStart:iEnd]    = indices + i * nverts
-        allTexCoords[ vStart:vEnd, :] = vertices
-        allVertCoords[vStart:vEnd, :] = transform.transform(vertices, xform)
+    vertices = np.einsum('nij,nmj->nmi', rotscale, vertices)
+    vertices = vertices + offset[:, np.newaxis, :]
 
-    return allVertCoords, allTexCoords, allIndices
+    return np.asarray(vertices, dtype=np.float32)
 
 
 def planeEquation(xyz1, xyz2, xyz3):
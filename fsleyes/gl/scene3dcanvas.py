@@ -10,6 +10,7 @@ FSLeyes for its 3D view.
 
 
 import logging
+import time
 
 import numpy     as np
 import OpenGL.GL as gl
@@ -21,6 +22,7 @@ import fsl.utils.transform as transform
 
 import fsleyes.gl.routines               as glroutines
 import fsleyes.gl.globject               as globject
+import fsleyes.gl.profiler               as glprofiler
 import fsleyes.displaycontext            as fsldisplay
 import fsleyes.displaycontext.canvasopts as canvasopts
 
@@ -31,6 +33,26 @@ log = logging.getLogger(__name__)
 class Scene3DCanvas(object):
 
 
+    TARGET_FRAME_TIME = 0.05
+    """Target time, in seconds, for drawing one frame while the user is
+    interacting with the canvas (see :meth:`beginInteraction`). The
+    :attr:`lod` is adjusted so that frames are drawn in approximately this
+    amount of time.
+    """
+
+
+    MIN_LOD = 0.25
+    """Minimum value for the :attr:`lod`. """
+
+
+    LOD_STEP = 0.125
+    """The :attr:`lod` is rounded to a multiple of this value, so that it
+    only changes in discrete steps. Otherwise, as the :class:`.GLVolume`
+    render texture size is proportional to the level of detail, the render
+    textures would be re-allocated on almost every frame.
+    """
+
+
     def __init__(self, overlayList, displayCtx):
 
         self.__name           = '{}_{}'.format(type(self).__name__, id(self))
@@ -43,6 +65,8 @@ class Scene3DCanvas(object):
         self.__viewport       = None
         self.__resetLightPos  = True
         self.__glObjects      = {}
+        self.__interacting    = False
+        self.__lodLevel       = 1.0
 
         overlayList.addListener('overlays',
                                 self.__name,
@@ -108,6 +132,72 @@ class Scene3DCanvas(object):
         self.__resetLightPos = reset
 
 
+    @property
+    def lod(self):
+        """Returns the current level of detail, a value between
+        :attr:`MIN_LOD` and ``1``, which should be used by
+        :class:`.GLObject` instances to reduce the quality (and hence the
+        time taken) of their 3D renders. For example, the :class:`.GLVolume`
+        reduces the resolution of its render textures, and increases its
+        ray-casting step size.
+
+        The level of detail is always ``1`` (full quality), unless the user
+        is interacting with the canvas (see :meth:`beginInteraction`). It
+        is always a multiple of :attr:`LOD_STEP`.
+        """
+
+        if not self.__interacting:
+            return 1.0
+
+        step = self.LOD_STEP
+        lod  = np.round(self.__lodLevel / step) * step
+
+        return float(np.clip(lod, self.MIN_LOD, 1.0))
+
+
+    def beginInteraction(self):
+        """Should be called when the user starts interacting with the canvas
+        (e.g. rotating or zooming). Until :meth:`endInteraction` is called,
+        the scene is drawn at a reduced level of detail (see :attr:`lod`),
+        which is adjusted after every draw according to the
+        :attr:`TARGET_FRAME_TIME`.
+        """
+        self.__interacting = True
+
+
+    def endInteraction(self):
+        """Should be called when the user stops interacting with the canvas.
+        The scene is re-drawn at full quality. The most recent level of
+        detail is retained, and used as the starting point for the next
+        interaction.
+        """
+        if not self.__interacting:
+            return
+
+        self.__interacting = False
+        self.Refresh()
+
+
+    def __adjustLod(self, elapsed):
+        """Called by :meth:`_draw` while the user is interacting with the
+        canvas. Adjusts the level of detail according to the time taken to
+        draw the most recent frame.
+
+        The draw time is assumed to be roughly proportional to the cube of
+        the level of detail, as the 3D render resolution is reduced along
+        both screen axes, and the number of ray-casting steps is also
+        reduced.
+        """
+
+        ratio = self.TARGET_FRAME_TIME / max(elapsed, 1e-6)
+        lod   = self.__lodLevel * ratio ** (1 / 3.0)
+
+        self.__lodLevel = float(np.clip(lod, self.MIN_LOD, 1.0))
+
+        log.debug('Frame drawn in {:0.4f} seconds - level of detail '
+                  'now {:0.2f}'.format(elapsed, self.__lodLevel))
+
+
     def defaultLightPos(self):
         """Resets the :attr:`lightPos` property to a sensible value. """
         b      = self.__displayCtx.bounds
@@ -310,6 +400,36 @@ class Scene3DCanvas(object):
         return overlays, globjs
 
 
+    def _sceneHash(self):
+        """Overrides :meth:`.SceneHashTarget._sceneHash`. Returns a value
+        which describes the current scene, made up of the canvas size and
+        properties, and the display/opts properties and
+        :attr:`.GLObject.version` of every overlay. Returns ``None`` (forcing
+        a re-draw) if the scene cannot be described.
+        """
+
+        displayCtx = self.__displayCtx
+        state      = [self.GetScaledSize(),
+                      self.lod,
+                      self._propertyState(self.opts, displayCtx)]
+
+        for ovl in displayCtx.getOrderedOverlays():
+
+            # GLObject not yet created
+            globj = self.__glObjects.get(ovl, None)
+            if not globj:
+                return None
+
+            display = displayCtx.getDisplay(ovl)
+            state.append((id(ovl),
+                          id(globj),
+                          globj.version,
+                          globj.ready(),
+                          self._propertyState(display, display.opts)))
+
+        return tuple(state)
+
+
     def _initGL(self):
         """Called when the canvas is ready to be drawn on. """
         self.__overlayListChanged()
@@ -582,6 +702,8 @@ class Scene3DCanvas(object):
         depthOffset = transform.scaleOffsetXform(1, [0, 0, 0.1])
         depthOffset = np.array(depthOffset,    dtype=np.float32, copy=False)
         xform       = np.array(self.__viewMat, dtype=np.float32, copy=False)
+        interacting = self.__interacting
+        start       = time.time()
 
         for ovl, globj in zip(overlays, globjs):
 
@@ -599,9 +721,19 @@ class Scene3DCanvas(object):
 
             log.debug('Drawing {} [{}]'.format(ovl, globj))
 
-            globj.preDraw( xform=xform)
-            globj.draw3D(  xform=xform)
-            globj.postDraw(xform=xform)
+            with glprofiler.phase(globj, 'preDraw'):
+                globj.preDraw( xform=xform)
+            with glprofiler.phase(globj, 'draw3D'):
+                globj.draw3D(  xform=xform)
+            with glprofiler.phase(globj, 'postDraw'):
+                globj.postDraw(xform=xform)
+
+        # While the user is interacting, we
+        # wait for the GPU to finish, so we
+        # know how long the frame really took.
+        if interacting:
+            gl.glFinish()
+            self.__adjustLod(time.time() - start)
 
         if opts.showCursor:
             with glroutines.enabled((gl.GL_DEPTH_TEST)):
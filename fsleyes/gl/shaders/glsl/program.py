@@ -10,6 +10,7 @@ a GLSL shader program comprising a vertex shader and a fragment shader.
 
 
 import logging
+import collections
 
 import numpy                          as np
 import OpenGL.GL                      as gl
@@ -36,6 +37,33 @@ corresponding GL types and sizes.
 """
 
 
+RECYCLE_PROGRAMS = False
+"""If ``True``, compiled GLSL programs are not deleted when a
+:class:`GLSLShader` is destroyed. Instead, they are kept, and re-used by
+the next ``GLSLShader`` which is created with the same vertex and fragment
+shader source, so that the program does not need to be compiled again.
+This is used by the :mod:`fsleyes.render` batch mode, where the same
+scenes are repeatedly created and destroyed. See also
+:func:`clearRecycledPrograms`.
+"""
+
+
+_recycledPrograms = collections.defaultdict(list)
+"""Used to store programs for re-use when :data:`RECYCLE_PROGRAMS` is
+``True``. Contains ``{(vertSrc, fragSrc) : [program]}`` mappings.
+"""
+
+
+def clearRecycledPrograms():
+    """Deletes all compiled GLSL programs which have been stored for re-use
+    (see :data:`RECYCLE_PROGRAMS`).
+    """
+    for programs in _recycledPrograms.values():
+        for program in programs:
+            gl.glDeleteProgram(program)
+    _recycledPrograms.clear()
+
+
 class GLSLShader(object):
     """The ``GLSLShader`` class encapsulates information and logic about
     a GLSL 1.20 shader program, comprising a vertex shader and a fragment
@@ -111,7 +139,18 @@ class GLSLShader(object):
                       via the :meth:`setIndices` method.
         """
 
-        self.program     = self.__compile(vertSrc, fragSrc)
+        # Re-use a previously compiled
+        # program if one is available.
+        # The uniform values of a re-used
+        # program will be stale, but the
+        # set method has no record of
+        # them, so they will all be
+        # overwritten when first set.
+        self.__srcKey    = (vertSrc, fragSrc)
+        recycled         = _recycledPrograms.get(self.__srcKey, [])
+
+        if len(recycled) > 0: self.program = recycled.pop()
+        else:                 self.program = self.__compile(vertSrc, fragSrc)
 
         vertDecs         = parse.parseGLSL(vertSrc)
         fragDecs         = parse.parseGLSL(fragSrc)
@@ -232,8 +271,15 @@ class GLSLShader(object):
 
 
     def destroy(self):
-        """Deletes all GL resources managed by this ``GLSLShader``. """
-        gl.glDeleteProgram(self.program)
+        """Deletes all GL resources managed by this ``GLSLShader``. If
+        :data:`RECYCLE_PROGRAMS` is ``True``, the compiled program is kept
+        for re-use, rather than being deleted.
+        """
+
+        if RECYCLE_PROGRAMS:
+            _recycledPrograms[self.__srcKey].append(self.program)
+        else:
+            gl.glDeleteProgram(self.program)
 
         for buf in self.buffers.values():
             gl.glDeleteBuffers(1, gltypes.GLuint(buf))
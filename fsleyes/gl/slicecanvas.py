@@ -25,6 +25,7 @@ import fsleyes.displaycontext.canvasopts  as canvasopts
 import fsleyes.gl.routines                as glroutines
 import fsleyes.gl.resources               as glresources
 import fsleyes.gl.globject                as globject
+import fsleyes.gl.profiler                as glprofiler
 import fsleyes.gl.textures                as textures
 import fsleyes.gl.annotations             as annotations
 
@@ -940,6 +941,48 @@ class SliceCanvas(object):
         return overlays, globjs
 
 
+    def _sceneHash(self):
+        """Overrides :meth:`.SceneHashTarget._sceneHash`. Returns a value
+        which describes the current scene, made up of the canvas size and
+        properties, the display/opts properties and the
+        :attr:`.GLObject.version` of every overlay, and the state of all
+        annotations. Returns ``None`` (forcing a re-draw) if the scene
+        cannot be described.
+        """
+
+        copts = self.opts
+
+        # Pre-rendered textures are
+        # updated asynchronously, so
+        # we always need to re-draw
+        if copts.renderMode == 'prerender':
+            return None
+
+        annots = self._annotations.sceneState()
+        if annots is None:
+            return None
+
+        state = [self.GetScaledSize(),
+                 self._propertyState(copts, self.displayCtx),
+                 annots]
+
+        for ovl in self.displayCtx.getOrderedOverlays():
+
+            # GLObject not yet created
+            globj = self._glObjects.get(ovl, None)
+            if not globj:
+                return None
+
+            display = self.displayCtx.getDisplay(ovl)
+            state.append((id(ovl),
+                          id(globj),
+                          globj.version,
+                          globj.ready(),
+                          self._propertyState(display, display.opts)))
+
+        return tuple(state)
+
+
     def _overlayBoundsChanged(self, *args, **kwargs):
         """Called when the :attr:`.DisplayContext.bounds` are changed.
         Initialises/resets the display bounds, and/or preserves the zoom
@@ -1463,9 +1506,12 @@ class SliceCanvas(object):
                           'directly to canvas'.format(
                               copts.zax, display.name))
 
-                globj.preDraw(bbox=bbox)
-                globj.draw2D(zpos, axes, bbox=bbox)
-                globj.postDraw(bbox=bbox)
+                with glprofiler.phase(globj, 'preDraw'):
+                    globj.preDraw(bbox=bbox)
+                with glprofiler.phase(globj, 'draw2D'):
+                    globj.draw2D(zpos, axes, bbox=bbox)
+                with glprofiler.phase(globj, 'postDraw'):
+                    globj.postDraw(bbox=bbox)
 
             # Off-screen rendering - each overlay is
             # rendered to an off-screen texture -
@@ -1493,9 +1539,12 @@ class SliceCanvas(object):
                      glroutines.disabled(gl.GL_BLEND):
 
                     glroutines.clear((0, 0, 0, 0))
-                    globj.preDraw()
-                    globj.draw2D(zpos, axes)
-                    globj.postDraw()
+                    with glprofiler.phase(globj, 'preDraw'):
+                        globj.preDraw()
+                    with glprofiler.phase(globj, 'draw2D'):
+                        globj.draw2D(zpos, axes)
+                    with glprofiler.phase(globj, 'postDraw'):
+                        globj.postDraw()
 
             # Pre-rendering - a pre-generated 2D
             # texture of the current z position
@@ -23,6 +23,7 @@ from .imagetexture       import ImageTexture
 from .colourmaptexture   import ColourMapTexture
 from .lookuptabletexture import LookupTableTexture
 from .selectiontexture   import SelectionTexture
+from .occupancytexture   import OccupancyTexture
 from .rendertexture      import RenderTexture
 from .rendertexture      import GLObjectRenderTexture
 from .rendertexturestack import RenderTextureStack
@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+#
+# datacache.py - On-disk cache of prepared texture data.
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+"""This module provides the :class:`DataCache` class, an on-disk cache which
+may be used to store data that has been prepared for use as texture data
+(see :meth:`.Texture3D.__realPrepareTextureData`).
+
+Preparing the data for a large image (e.g. normalising it to ``uint16``) can
+take a long time, and use a lot of memory. When a ``DataCache`` is active,
+the prepared data is saved to the cache directory, and subsequently loaded
+from there as a memory-mapped ``numpy`` array, the next time that the same
+data is needed.
+
+Cache entries are content-addressed - each entry is identified by a hash of
+all of the parameters which affect the prepared data (e.g. the source file
+path and modification time, volume index, normalisation range, etc). The
+total size of the cache is limited - when this limit is exceeded, the least
+recently used entries are deleted.
+
+The cache is disabled by default. It can be enabled via the :func:`enable`
+function, and accessed via the :func:`getCache` function::
+
+    import fsleyes.gl.textures.datacache as datacache
+
+    datacache.enable('/path/to/cache/dir', maxSize=2 * 1024 ** 3)
+
+    cache = datacache.getCache()
+    key   = cache.key('data.nii', 1543823731, 0)
+    data  = cache.get(key)
+
+    if data is None:
+        data, voxValXform, invVoxValXform = prepareData()
+        cache.put(key, data, voxValXform, invVoxValXform)
+"""
+
+
+import os.path as op
+import            os
+import            json
+import            time
+import            hashlib
+import            logging
+import            tempfile
+import            threading
+
+import numpy as np
+
+import fsl.utils.settings as fslsettings
+
+
+log = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_SIZE = 4 * 1024 ** 3
+"""Default maximum cache size, in bytes. """
+
+
+def enable(cachedir=None, maxSize=None):
+    """Enable the texture data cache.
+
+    :arg cachedir: Directory in which to store cached data. Defaults to a
+                   directory called ``texturecache`` in the FSLeyes settings
+                   directory.
+
+    :arg maxSize:  Maximum cache size in bytes. Defaults to
+                   :data:`DEFAULT_MAX_SIZE`.
+
+    :returns:      The :class:`DataCache` instance.
+    """
+
+    global _cache
+
+    if cachedir is None: cachedir = fslsettings.filePath('texturecache')
+    if maxSize  is None: maxSize  = DEFAULT_MAX_SIZE
+
+    _cache = DataCache(cachedir, maxSize)
+
+    return _cache
+
+
+def disable():
+    """Disable the texture data cache. Existing cache files are left on disk.
+    """
+    global _cache
+    _cache = None
+
+
+def getCache():
+    """Returns the active :class:`DataCache`, or ``None`` if the cache has not
+    been enabled.
+    """
+    return _cache
+
+
+class DataCache(object):
+    """The ``DataCache`` class manages a directory of cached texture data.
+    Each cache entry comprises two files:
+
+      - ``<key>.npy``:  The prepared data, stored in ``numpy`` format, so that
+                        it can be memory-mapped.
+
+      - ``<key>.json``: The ``voxValXform`` and ``invVoxValXform`` associated
+                        with the data (see :attr:`.Texture3D.voxValXform`).
+
+    The modification time of the ``.npy`` file is updated whenever an entry
+    is accessed, and is used to determine which entries are to be deleted
+    when the cache size exceeds its limit.
+
+    A ``DataCache`` may be safely used from multiple threads.
+    """
+
+
+    def __init__(self, cachedir, maxSize=DEFAULT_MAX_SIZE):
+        """Create a ``DataCache``.
+
+        :arg cachedir: Cache directory. Created if it does not exist.
+        :arg maxSize:  Maximum total size, in bytes, of all cached data.
+        """
+
+        if not op.exists(cachedir):
+            os.makedirs(cachedir)
+
+        self.__cachedir = cachedir
+        self.__maxSize  = maxSize
+        self.__lock     = threading.Lock()
+
+        log.debug('Texture data cache: {} (max size: {} bytes)'.format(
+            cachedir, maxSize))
+
+
+    @property
+    def cachedir(self):
+        """Returns the cache directory. """
+        return self.__cachedir
+
+
+    @property
+    def maxSize(self):
+        """Returns the maximum cache size, in bytes. """
+        return self.__maxSize
+
+
+    @staticmethod
+    def key(*params):
+        """Generates a key from the given parameters. All parameters must have
+        a stable string representation (e.g. numbers, strings, tuples).
+        """
+        params = repr(tuple(params)).encode('utf-8')
+        return hashlib.sha1(params).hexdigest()
+
+
+    def __paths(self, key):
+        """Returns paths to the data and metadata files for the given key. """
+        base = op.join(self.__cachedir, key)
+        return '{}.npy'.format(base), '{}.json'.format(base)
+
+
+    def __contains__(self, key):
+        """Returns ``True`` if an entry with the given key exists, ``False``
+        otherwise.
+        """
+        return all(op.exists(p) for p in self.__paths(key))
+
+
+    def get(self, key):
+        """Returns the entry for the given key, or ``None`` if there is no
+        such entry.
+
+        :returns: A tuple containing:
+
+                   - The prepared data as a read-only memory-mapped ``numpy``
+                     array
+                   - The ``voxValXform``
+                   - The ``invVoxValXform``
+        """
+
+        datafile, metafile = self.__paths(key)
+
+        with self.__lock:
+
+            if not (op.exists(datafile) and op.exists(metafile)):
+                return None
+
+            try:
+                with open(metafile, 'rt') as f:
+                    meta = json.load(f)
+
+                data           = np.load(datafile, mmap_mode='r')
+                voxValXform    = np.array(meta['voxValXform'])
+                invVoxValXform = np.array(meta['invVoxValXform'])
+
+                # Update the modification
+                # time for LRU cleanup
+                os.utime(datafile, None)
+
+            except Exception as e:
+                log.warning('Could not load cached texture data {} ({}) - '
+                            'removing from cache'.format(key, e))
+                self.__remove(key)
+                return None
+
+        log.debug('Loaded cached texture data {} (shape {})'.format(
+            key, data.shape))
+
+        return data, voxValXform, invVoxValXform
+
+
+    def put(self, key, data, voxValXform, invVoxValXform):
+        """Adds an entry to the cache, and removes old entries if the cache
+        is now too large.
+
+        :returns: A read-only memory-mapped copy of ``data``, or ``data``
+                  itself if it could not be stored.
+        """
+
+        datafile, metafile = self.__paths(key)
+
+        # Data which is too big
+        # for the cache is not
+        # stored at all
+        if data.nbytes > self.__maxSize:
+            return data
+
+        meta = {'voxValXform'    : np.asarray(voxValXform)   .tolist(),
+                'invVoxValXform' : np.asarray(invVoxValXform).tolist()}
+
+        with self.__lock:
+
+            # Write to temporary files, then move them into
+            # place, so that other processes sharing the
+            # cache never see a partially written entry.
+            dtmp = None
+            mtmp = None
+
+            try:
+                dfd, dtmp = tempfile.mkstemp(prefix='.', suffix='.npy',
+                                             dir=self.__cachedir)
+                mfd, mtmp = tempfile.mkstemp(prefix='.', suffix='.json',
+                                             dir=self.__cachedir)
+
+                with os.fdopen(dfd, 'wb') as f: np.save(f, data)
+                with os.fdopen(mfd, 'wt') as f: json.dump(meta, f)
+
+                # os.replace is not available in
+                # python 2 - os.rename will do
+                # the same thing on POSIX systems
+                replace = getattr(os, 'replace', os.rename)
+                replace(mtmp, metafile)
+                replace(dtmp, datafile)
+
+            except Exception as e:
+                log.warning('Could not cache texture data {}: {}'.format(
+                    key, e))
+                for tmp in (dtmp, mtmp):
+                    if tmp is not None and op.exists(tmp):
+                        os.remove(tmp)
+                return data
+
+            self.__clean()
+
+            if not op.exists(datafile):
+                return data
+
+            return np.load(datafile, mmap_mode='r')
+
+
+    def remove(self, key):
+        """Removes the entry with the given key, if it exists. """
+        with self.__lock:
+            self.__remove(key)
+
+
+    def __remove(self, key):
+        """Removes the entry with the given key. Must be called with the
+        lock held.
+        """
+        for path in self.__paths(key):
+            if op.exists(path):
+                os.remove(path)
+
+
+    def entries(self):
+        """Returns a list of ``(key, size, atime)`` tuples for every entry
+        in the cache, sorted from least to most recently used.
+        """
+
+        entries = []
+
+        for fname in os.listdir(self.__cachedir):
+
+            # Temporary files (entries which are
+            # in the process of being written)
+            # are prefixed with a period
+            if fname.startswith('.') or not fname.endswith('.npy'):
+                continue
+
+            key  = fname[:-4]
+            path = op.join(self.__cachedir, fname)
+
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            entries.append((key, stat.st_size, stat.st_mtime))
+
+        return sorted(entries, key=lambda e: e[2])
+
+
+    def size(self):
+        """Returns the total size, in bytes, of all cached data. """
+        return sum(e[1] for e in self.entries())
+
+
+    def clear(self):
+        """Removes all entries from the cache. """
+        with self.__lock:
+            for key, _, _ in self.entries():
+                self.__remove(key)
+
+
+    def clean(self):
+        """Removes the least recently used entries until the total cache
+        size is less than the limit.
+        """
+        with self.__lock:
+            self.__clean()
+
+
+    def __clean(self):
+        """Does the work for :meth:`clean`. Must be called with the lock
+        held.
+        """
+
+        entries = self.entries()
+        total   = sum(e[1] for e in entries)
+
+        for key, size, atime in entries:
+
+            if total <= self.__maxSize:
+                break
+
+            log.debug('Evicting cached texture data {} (last used {})'.format(
+                key, time.ctime(atime)))
+
+            self.__remove(key)
+            total -= size
+
+
+_cache = None
+"""The active :class:`DataCache`, or ``None`` if the cache is disabled. Use
+the :func:`enable`, :func:`disable`, and :func:`getCache` functions instead
+of accessing this directly.
+"""
@@ -9,18 +9,106 @@ for storing a :class:`.Image` instance.
 """
 
 
-import logging
-import collections
+import os.path as op
+import            os
+import            logging
+import            threading
+import            collections
 
+import six
 import numpy as np
 
 from . import texture3d
+from . import workerpool
 import fsl.data.imagewrapper as imagewrapper
+import fsl.utils.naninfrange as nir
 
 
 log = logging.getLogger(__name__)
 
 
+PREFETCH_VOLUMES = 0
+"""Default number of volumes to prefetch for 4D images - see the
+:class:`ImageTexture` class documentation. Prefetching is disabled by
+default.
+"""
+
+
+def stepDirection(old, new, nvols):
+    """Returns the direction (``1`` or ``-1``) of a change from volume
+    ``old`` to volume ``new`` of a 4D image with ``nvols`` volumes. Volume
+    indices wrap around (as movie playback loops), so the direction is that
+    of the shortest path between the two volumes - for example, a change
+    from volume ``nvols - 1`` to volume ``0`` is a forward step. Ties are
+    treated as forward steps.
+
+    :returns: ``1`` for a forward step, ``-1`` for a backward step, or
+              ``0`` if ``old == new``.
+    """
+
+    forward  = (new - old) % nvols
+    backward = (old - new) % nvols
+
+    if   forward == 0:        return 0
+    elif forward <= backward: return 1
+    else:                     return -1
+
+
+def ringVolumes(current, direction, size, nvols):
+    """Returns the indices of the volumes which should be prefetched for a
+    4D image with ``nvols`` volumes. Three quarters of the ring are ahead of
+    the ``current`` volume in the given ``direction``, and the remainder are
+    behind it. Indices wrap around at either end of the image.
+
+    :arg current:   Current volume index
+    :arg direction: ``1`` or ``-1`` - see :func:`stepDirection`.
+    :arg size:      Number of volumes to prefetch.
+    :arg nvols:     Number of volumes in the image.
+    :returns:       A list of volume indices, nearest first, with the
+                    volumes ahead of ``current`` before the volumes
+                    behind it. ``current`` is not included.
+    """
+
+    size   = min(size, nvols - 1)
+    behind = size // 4
+    ahead  = size - behind
+
+    vols  = [(current + direction * i) % nvols for i in range(1, ahead  + 1)]
+    vols += [(current - direction * i) % nvols for i in range(1, behind + 1)]
+
+    return vols
+
+
+def slabRange(data, slabSize=None):
+    """Calculates the minimum and maximum values in ``data``, ignoring
+    ``nan`` and ``inf`` values, one slab (along the last axis) at a time.
+    When ``data`` is a memory-map, this means that only one slab at a time
+    is read into memory.
+
+    :arg data:     ``numpy`` array
+    :arg slabSize: Approximate slab size in bytes. Defaults to
+                   :data:`.texture3d.SLAB_SIZE`.
+    :returns:      A tuple containing the ``(min, max)`` values, which will
+                   be ``nan`` if ``data`` contains no finite values.
+    """
+
+    if slabSize is None:
+        slabSize = texture3d.SLAB_SIZE
+
+    nslices    = data.shape[-1]
+    sliceBytes = data.dtype.itemsize * data.size // max(1, nslices)
+    slabLen    = max(1, slabSize // max(1, sliceBytes))
+    dmin       = np.nan
+    dmax       = np.nan
+
+    for z in range(0, nslices, slabLen):
+        smin, smax = nir.naninfrange(data[..., z:z + slabLen])
+        if np.isnan(dmin) or smin < dmin: dmin = smin
+        if np.isnan(dmax) or smax > dmax: dmax = smax
+
+    return dmin, dmax
+
+
 class ImageTexture(texture3d.Texture3D):
     """The ``ImageTexture`` class contains the logic required to create and
     manage a 3D texture which represents a :class:`.Image` instance.
@@ -29,6 +117,31 @@ class ImageTexture(texture3d.Texture3D):
     of an ``ImageTexture`` object, called ``image``. See the
     :class:`.Texture3D`
     documentation for more details.
+
+
+    **Prefetching**
+
+
+    For 4D images, an ``ImageTexture`` can maintain a *ring* of volumes
+    adjacent to the current volume, which are prepared ahead of time on the
+    shared :class:`.WorkerPool`, at a lower priority than texture refreshes
+    (see :attr:`.Texture3D.priority`). When the volume is changed to one
+    which is in the ring (e.g. during movie playback), the prepared data is
+    used as-is, without needing to be read or prepared - only the upload to
+    the GPU remains. Note that large volumes are still uploaded
+    asynchronously (into a separate staging texture, which is swapped in
+    when the upload is complete, if the previous volume is being
+    displayed - see :meth:`.Texture.swapTextureHandle`), so prefetching
+    reduces, but does not eliminate, the delay before a new volume is
+    displayed. The ring is centred on the current volume, but
+    is biased towards the direction in which the volume was last changed
+    (see :func:`stepDirection` and :func:`ringVolumes`).
+
+    The number of volumes in the ring is set via the ``prefetch`` parameter
+    to :meth:`__init__`, which defaults to :data:`PREFETCH_VOLUMES`.
+    Volumes are only prefetched when their data can be safely read from a
+    separate thread - i.e. if the data is memory-mapped, or if the image
+    data range has been fully calculated.
     """
 
 
@@ -41,18 +154,25 @@ class ImageTexture(texture3d.Texture3D):
         refreshed whenever the image data changes - see the
         :meth:`__imageDataChanged` method.
 
-        :arg name:   A name for this ``imageTexure``.
+        :arg name:     A name for this ``imageTexure``.
 
-        :arg image:  The :class:`.Image` instance.
+        :arg image:    The :class:`.Image` instance.
 
-        :arg volume: Initial volume index/indices, for >3D images.
+        :arg volume:   Initial volume index/indices, for >3D images.
+
+        :arg prefetch: Number of volumes to prefetch, for 4D images.
+                       Defaults to :data:`PREFETCH_VOLUMES`.
 
         All other arguments are passed through to the
         :meth:`.Texture3D.__init__` method, and thus used as initial texture
         settings.
         """
 
-        nvals = kwargs.get('nvals', 1)
+        nvals    = kwargs.get('nvals', 1)
+        prefetch = kwargs.pop('prefetch', None)
+
+        if prefetch is None:
+            prefetch = PREFETCH_VOLUMES
 
         # For 4D textures, the image must have a shape of the form:
         #   (x, y, z, [1, [1, [1, [1, ]]]] nvals)
@@ -70,6 +190,25 @@ class ImageTexture(texture3d.Texture3D):
         self.image        = image
         self.__nvals      = nvals
         self.__volume     = None
+        self.__normalise  = False
+
+        # Prefetched volumes are stored in the
+        # ring as {volume : (settings, prepared)}
+        # mappings - see the __prefetch method.
+        self.__prefetch   = prefetch
+        self.__ring       = {}
+        self.__ringVols   = []
+        self.__ringLock   = threading.Lock()
+        self.__direction  = 1
+
+        # Volumes are prefetched on the shared
+        # workerpool.WorkerPool, in the same
+        # task group as the texture refresh
+        # tasks (see Texture3D.taskGroup).
+        if prefetch > 0 and image.ndim == 4 and nvals == 1:
+            self.__prefetchPool = workerpool.getPool()
+        else:
+            self.__prefetchPool = None
 
         kwargs['scales'] = image.pixdim[:3]
 
@@ -89,6 +228,20 @@ class ImageTexture(texture3d.Texture3D):
         texture3d.Texture3D.destroy(self)
         self.image.deregister(self.__name, 'data')
 
+        # Texture3D.destroy cancels all queued
+        # tasks in our task group, including
+        # prefetch tasks.
+        self.__prefetchPool = None
+        self.__clearRing()
+
+
+    @property
+    def volume(self):
+        """Returns the current volume indices (see :meth:`setVolume`), or
+        ``None`` for 3D images.
+        """
+        return self.__volume
+
 
     def setVolume(self, volume):
         """For :class:`.Image` instances with more than three dimensions,
@@ -100,6 +253,28 @@ class ImageTexture(texture3d.Texture3D):
         self.set(volume=volume)
 
 
+    def dataCacheKey(self):
+        """Overrides :meth:`.Texture3D.dataCacheKey`. If the image was
+        loaded from a file, and has not been modified since, returns a tuple
+        containing the file path, its modification time and size, and the
+        current volume. Otherwise returns ``None``.
+        """
+
+        image = self.image
+        src   = image.dataSource
+
+        if src is None or not image.saveState or not op.isfile(src):
+            return None
+
+        src  = op.abspath(src)
+        stat = os.stat(src)
+
+        if self.__volume is None: volume = None
+        else:                     volume = tuple(int(v) for v in self.__volume)
+
+        return (src, stat.st_mtime, stat.st_size, volume)
+
+
     def __imageDataChanged(self, image, topic, sliceobj):
         """Called when the :class:`.Image` notifies about a data changes.
         Triggers an image texture refresh via a call to :meth:`set`.
@@ -114,8 +289,17 @@ class ImageTexture(texture3d.Texture3D):
 
         # If the data change was performed using
         # normal array indexing, we can just replace
-        # that part of the image texture.
-        if isinstance(sliceobj, tuple):
+        # that part of the image texture (unless the
+        # texture data has been sub-sampled, e.g.
+        # because it is too big to fit into a
+        # single texture).
+        subsampled = self.textureShape is not None and \
+                     tuple(self.textureShape) != tuple(image.shape[:3])
+
+        # Any prefetched volumes are now stale
+        self.__clearRing()
+
+        if isinstance(sliceobj, tuple) and not subsampled:
 
             # Get the new data, and calculate an
             # offset into the full image from the
@@ -186,13 +370,379 @@ class ImageTexture(texture3d.Texture3D):
         if (not volRefresh) and volume == self.__volume:
             return
 
-        self.__volume = volume
+        # Keep track of the direction in which
+        # the volume is changing, for prefetching.
+        # Playback which loops from the last
+        # volume back to the first is forwards.
+        if volume is not None and self.__volume is not None:
+            step = stepDirection(self.__volume[0],
+                                 volume[0],
+                                 image.shape[3])
+            if step != 0:
+                self.__direction = step
+
+        # Reduced precision storage
+        # modes require normalisation
+        storage   = kwargs.get('storage', self.storage)
+        normalise = kwargs.get('normalise', False) or storage != 'default'
+
+        self.__volume    = volume
+        self.__normalise = normalise
 
         slc = [slice(None), slice(None), slice(None)]
         if volume is not None:
             slc += volume
 
-        kwargs['data']           = self.image[tuple(slc)]
+        # If the data can be used without being
+        # normalised, we try to pass a view into
+        # a memory-map of the image file, so the
+        # data is only read from disk as it is
+        # copied to the GPU. Reading through the
+        # memory-map bypasses the Image, so if
+        # the image data range does not already
+        # encompass the requested data, we
+        # calculate it from the memory-map, and
+        # update the Image. If this is not
+        # possible, we read the data through the
+        # Image, so that its data range is updated.
+        data = None
+        if nvals == 1 and not self.__needsNormalisation(normalise):
+            data = self.__memoryMappedData()
+
+        if data is not None:
+            data = data[tuple(slc)]
+            if not (self.__dataRangeKnown(volume) or
+                    self.__calcDataRange(data, volume)):
+                data = None
+
+        if data is None:
+            data = self.image[tuple(slc)]
+
+        kwargs['data']           = data
         kwargs['normaliseRange'] = normRange
 
-        return texture3d.Texture3D.set(self, **kwargs)
+        changed = texture3d.Texture3D.set(self, **kwargs)
+
+        self.__updateRing()
+
+        return changed
+
+
+    def getPreparedData(self):
+        """Overrides :meth:`.Texture3D.getPreparedData`. If the current
+        volume has been prefetched, with the current texture settings,
+        returns the prepared data. Otherwise returns ``None``.
+        """
+
+        volume = self.__volume
+
+        if self.__prefetchPool is None or volume is None:
+            return None
+
+        with self.__ringLock:
+            entry = self.__ring.get(int(volume[0]))
+
+        if entry is None:
+            return None
+
+        settings, prepared = entry
+
+        if settings != self.preparationSettings():
+            return None
+
+        log.debug('Using prefetched data for volume {} of {}'.format(
+            volume[0], self.image.name))
+
+        return prepared
+
+
+    def __clearRing(self):
+        """Clears all prefetched volumes from the ring. """
+        with self.__ringLock:
+            self.__ring     = {}
+            self.__ringVols = []
+
+
+    def __updateRing(self):
+        """Called by :meth:`set`. Updates the set of volumes which should be
+        in the prefetch ring, discards volumes which are no longer needed,
+        and queues the remaining volumes to be prefetched by the
+        :meth:`__prefetch` method.
+        """
+
+        if self.__prefetchPool is None or self.__volume is None:
+            return
+
+        nvols    = self.image.shape[3]
+        current  = int(self.__volume[0])
+        vols     = ringVolumes(current,
+                               self.__direction,
+                               self.__prefetch,
+                               nvols)
+        settings = self.preparationSettings()
+
+        with self.__ringLock:
+
+            # Keep the current volume in the
+            # ring, so we can go back to it
+            oldVols         = self.__ringVols
+            self.__ringVols = vols + [current]
+
+            for vol, (volSettings, _) in list(self.__ring.items()):
+                if vol not in self.__ringVols or volSettings != settings:
+                    self.__ring.pop(vol)
+
+            missing = [v for v in vols if v not in self.__ring]
+
+        # Cancel queued prefetches for
+        # volumes which have dropped
+        # out of the ring
+        for vol in oldVols:
+            if vol not in vols:
+                self.__prefetchPool.dequeue(self.__prefetchTaskName(vol))
+
+        # Prefetches are given a lower priority
+        # than refreshes, so that textures
+        # which need to be displayed now are
+        # not held up by speculative work.
+        for vol in missing:
+            taskName = self.__prefetchTaskName(vol)
+            if not self.__prefetchPool.isQueued(taskName):
+                self.__prefetchPool.enqueue(
+                    self.__prefetch,
+                    vol,
+                    taskName=taskName,
+                    group=self.taskGroup,
+                    priority=lambda: self.priority - 1)
+
+
+    def __prefetchTaskName(self, vol):
+        """Returns the :class:`.WorkerPool` task name used to prefetch the
+        specified volume.
+        """
+        return '{}_prefetch_{}'.format(self.__name, vol)
+
+
+    def __prefetch(self, vol):
+        """Called on the :class:`.WorkerPool`. Reads and prepares the data for
+        the specified volume, and adds it to the ring.
+        """
+
+        with self.__ringLock:
+            if vol not in self.__ringVols or vol in self.__ring:
+                return
+
+        data = self.__prefetchData(vol)
+
+        if data is None:
+            return
+
+        settings = self.preparationSettings()
+        prepared = self.prepareData(data)
+
+        # If the data is memory-mapped, and did
+        # not need to be prepared, make sure
+        # that it is read into memory now.
+        if prepared[0] is data and isinstance(data, np.memmap):
+            prepared = (np.array(data),) + tuple(prepared[1:])
+
+        with self.__ringLock:
+            if vol in self.__ringVols:
+                self.__ring[vol] = (settings, prepared)
+
+        log.debug('Prefetched volume {} of {}'.format(vol, self.image.name))
+
+
+    def __prefetchData(self, vol):
+        """Called by :meth:`__prefetch`. Returns the data for the specified
+        volume, or ``None`` if it cannot be safely read from the prefetch
+        thread.
+
+        Reading through the :class:`.Image` may cause the image data range
+        to be updated (and listeners to be notified), which must only happen
+        on the main thread, and reading through a memory-map would leave
+        the data range out of date. So the data is only read if the data
+        range already encompasses the volume.
+        """
+
+        if not self.__dataRangeKnown([vol]):
+            return None
+
+        data = self.__memoryMappedData()
+
+        if data is not None: return data[:, :, :, vol]
+        else:                return self.image[:, :, :, vol]
+
+
+    def __dataRangeKnown(self, volume):
+        """Returns ``True`` if the :class:`.Image` data range has already
+        been calculated for the given ``volume`` (a list of indices into the
+        fourth and higher dimensions, or ``None`` for 3D images), ``False``
+        otherwise. Data for which this method returns ``True`` may be read
+        without going through the ``Image`` (see :meth:`__memoryMappedData`).
+        """
+
+        image   = self.image
+        wrapper = image.getImageWrapper()
+
+        if wrapper.covered:
+            return True
+
+        # Coverage for individual volumes
+        # is only available for 4D images
+        if volume is None or len(volume) != 1 or image.ndim != 4:
+            return False
+
+        # (low, high) indices along each
+        # dimension, of shape (2, 3)
+        coverage = wrapper.coverage(volume[0])
+
+        if np.any(np.isnan(coverage)):
+            return False
+
+        return bool(np.all(coverage[0] <= 0) and
+                    np.all(coverage[1] >= image.shape[:3]))
+
+
+    def __calcDataRange(self, data, volume):
+        """Called by :meth:`set`. Calculates the data range of ``data``, a
+        view into a memory-map of the image file (see
+        :meth:`__memoryMappedData`), and updates the data range of the
+        :class:`.Image` accordingly, without the data having to be read
+        through the ``Image``. The range is calculated slab-by-slab (see
+        :func:`slabRange`), so the data is never fully loaded into memory.
+
+        :arg data:   Memory-mapped data for the given ``volume``.
+        :arg volume: List of indices into the fourth and higher dimensions,
+                     or ``None`` for 3D images.
+        :returns:    ``True`` if the data range was updated, ``False``
+                     otherwise.
+
+        .. note:: The :class:`.ImageWrapper` does not provide a means of
+                  updating its data range from data which has been read
+                  elsewhere, so its internal state is updated directly.
+                  If this is not possible (e.g. because the ``ImageWrapper``
+                  is calculating its data range on a separate thread),
+                  ``False`` is returned, and the data must be read through
+                  the ``Image`` instead.
+        """
+
+        image   = self.image
+        wrapper = image.getImageWrapper()
+
+        if wrapper.getTaskThread() is not None:
+            return False
+
+        try:
+            coverage  = wrapper._ImageWrapper__coverage
+            volRanges = wrapper._ImageWrapper__volRanges
+            oldRange  = wrapper._ImageWrapper__range
+            isCovered = wrapper._ImageWrapper__imageIsCovered
+        except AttributeError:
+            return False
+
+        # The ImageWrapper stores the coverage
+        # and range of each index along the last
+        # non-singleton dimension - this is each
+        # volume of a 4D image, or each slice of
+        # a 3D image.
+        ndims, nvols = coverage.shape[1:]
+
+        if volume is None:
+            if ndims >= data.ndim:
+                return False
+            data = data.reshape(data.shape[:ndims + 1])
+            vols = list(range(nvols))
+        elif ndims == 3 and len(volume) == 1:
+            data = data[..., np.newaxis]
+            vols = [volume[0]]
+        else:
+            return False
+
+        if data.shape[-1] != len(vols):
+            return False
+
+        log.debug('Calculating data range of {} from memory-map'.format(
+            image.name))
+
+        for i, vol in enumerate(vols):
+            volRanges[vol, :]   = slabRange(data[..., i])
+            coverage[0, :, vol] = 0
+            coverage[1, :, vol] = data.shape[:ndims]
+
+        newRange = nir.naninfrange(volRanges)
+
+        wrapper._ImageWrapper__range   = newRange
+        wrapper._ImageWrapper__covered = isCovered()
+
+        if None in oldRange or not np.all(np.isclose(oldRange, newRange)):
+            wrapper.notify()
+
+        return True
+
+
+    def __needsNormalisation(self, normalise):
+        """Returns ``True`` if the image data will need to be normalised
+        when it is prepared for use as texture data (see
+        :meth:`.Texture3D.set`), ``False`` otherwise.
+        """
+        dtype = self.image.dtype
+        return normalise or not (self.canUseFloatTextures()[0] or
+                                 dtype in (np.uint8,
+                                           np.int8,
+                                           np.uint16,
+                                           np.int16))
+
+
+    def __memoryMappedData(self):
+        """If the image data is stored uncompressed, in native byte order,
+        in a file which has not been modified, and has not been loaded into
+        memory, returns a read-only memory-mapped ``numpy`` array which
+        refers to the image file, with the same shape as the image.
+        Otherwise returns ``None``.
+
+        Accessing the data through a memory-map means that for data which
+        needs no conversion before being copied to the GPU, the texture data
+        never needs to be fully loaded into memory (although the data range
+        may need to be calculated from it first - see
+        :meth:`__calcDataRange`).
+        """
+
+        image    = self.image
+        nibImage = image.nibImage
+
+        if nibImage is None or nibImage.in_memory or (not image.saveState):
+            return None
+
+        # The data must be accessed through a
+        # nibabel ArrayProxy, without scaling
+        proxy    = nibImage.dataobj
+        filename = getattr(proxy, 'file_like', None)
+        slope    = getattr(proxy, 'slope',     1)
+        inter    = getattr(proxy, 'inter',     0)
+        order    = getattr(proxy, 'order',     'F')
+
+        if not isinstance(filename, six.string_types) or \
+           not op.isfile(filename)                    or \
+           filename.endswith('.gz')                   or \
+           slope != 1                                 or \
+           inter != 0:
+            return None
+
+        dtype = np.dtype(proxy.dtype)
+
+        if not dtype.isnative:
+            return None
+
+        try:
+            data = np.memmap(filename,
+                             dtype=dtype,
+                             mode='r',
+                             offset=proxy.offset,
+                             shape=tuple(proxy.shape),
+                             order=order)
+            return data.reshape(image.shape, order=order)
+
+        except Exception as e:
+            log.debug('Could not memory-map {}: {}'.format(filename, e))
+            return None
@@ -0,0 +1,386 @@
+#!/usr/bin/env python
+#
+# occupancytexture.py - The OccupancyTexture class.
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+"""This module provides the :class:`OccupancyTexture` class, a 3D
+:class:`.Texture` which is used by the :class:`.GLVolume` class to skip over
+empty regions of an image when it is rendered in 3D.
+
+The :func:`minMaxGrid` and :func:`occupancy` functions, which are used by the
+``OccupancyTexture``, are also defined in this module.
+"""
+
+
+import logging
+
+import numpy     as np
+import OpenGL.GL as gl
+
+from   fsl.utils.platform import platform as fslplatform
+import fsl.utils.notifier                 as notifier
+
+from . import                                texture
+from . import                                workerpool
+
+
+log = logging.getLogger(__name__)
+
+
+CELL_SIZE = 8
+"""Default size, in voxels, of each cell in an :class:`OccupancyTexture`
+along each dimension.
+"""
+
+
+def minMaxGrid(data, cellSize=CELL_SIZE):
+    """Divides the given 3D ``data`` into cells of size ``cellSize ** 3``,
+    and calculates the minimum and maximum value within each cell, and within
+    the neighbouring cells.
+
+    The neighbouring cells are included because the value sampled at any
+    point within a cell, using linear or spline interpolation, may be
+    affected by the voxels around the cell boundary. ``nan`` values are
+    ignored - cells which contain only ``nan`` values are given a minimum
+    and maximum of ``nan``.
+
+    The data is processed one slab of cells at a time, so it may be a
+    memory-mapped array.
+
+    :arg data:     3D ``numpy`` array
+    :arg cellSize: Cell size, in voxels
+    :returns:      A tuple containing the ``(mins, maxs)`` as ``float32``
+                   ``numpy`` arrays of shape ``ceil(data.shape / cellSize)``.
+    """
+
+    shape  = np.array(data.shape[:3])
+    cshape = tuple(int(s) for s in np.ceil(shape / float(cellSize)))
+    pshape = [s * cellSize for s in cshape]
+    mins   = np.zeros(cshape, dtype=np.float32)
+    maxs   = np.zeros(cshape, dtype=np.float32)
+
+    for zi in range(cshape[2]):
+
+        zlo  = zi * cellSize
+        zhi  = min(zlo + cellSize, shape[2])
+        slab = np.asarray(data[:, :, zlo:zhi], dtype=np.float32)
+
+        # Pad the slab to a multiple of the
+        # cell size by repeating the edge
+        # values, which does not affect the
+        # cell minimums/maximums
+        pad  = [(0, pshape[0] - shape[0]),
+                (0, pshape[1] - shape[1]),
+                (0, cellSize  - (zhi - zlo))]
+        slab = np.pad(slab, pad, mode='edge')
+        slab = slab.reshape(cshape[0], cellSize,
+                            cshape[1], cellSize,
+                            cellSize)
+
+        mins[:, :, zi] = np.fmin.reduce(slab, axis=(1, 3, 4))
+        maxs[:, :, zi] = np.fmax.reduce(slab, axis=(1, 3, 4))
+
+    # Include the neighbours of each cell
+    pmins      = np.pad(mins, 1, mode='constant', constant_values=np.nan)
+    pmaxs      = np.pad(maxs, 1, mode='constant', constant_values=np.nan)
+    nx, ny, nz = cshape
+
+    for xoff in range(3):
+        for yoff in range(3):
+            for zoff in range(3):
+                slc  = (slice(xoff, xoff + nx),
+                        slice(yoff, yoff + ny),
+                        slice(zoff, zoff + nz))
+                mins = np.fmin(mins, pmins[slc])
+                maxs = np.fmax(maxs, pmaxs[slc])
+
+    return mins, maxs
+
+
+def occupancy(mins,
+              maxs,
+              low,
+              high,
+              invert=False,
+              mirror=False,
+              margin=0):
+    """Given the cell minimums and maximums calculated by :func:`minMaxGrid`,
+    determines which cells may contain visible voxels, according to the
+    given clipping settings.
+
+    :arg mins:   Cell minimum values
+    :arg maxs:   Cell maximum values
+    :arg low:    Voxels with a value less than or equal to ``low`` are
+                 clipped
+    :arg high:   Voxels with a value greater than or equal to ``high`` are
+                 clipped
+    :arg invert: Invert the clipping - voxels with a value between ``low``
+                 and ``high`` are clipped.
+    :arg mirror: If ``True``, negative values are also tested after being
+                 inverted (see :attr:`.VolumeOpts.useNegativeCmap`).
+    :arg margin: Amount by which to expand each cell range, to allow for
+                 loss of precision in the texture data.
+    :returns:    A boolean ``numpy`` array, ``True`` for cells which may
+                 contain visible voxels.
+    """
+
+    def test(lo, hi):
+        with np.errstate(invalid='ignore'):
+            if invert: return (lo < low) | (hi > high)
+            else:      return (hi > low) & (lo < high)
+
+    mins = mins - margin
+    maxs = maxs + margin
+    occ  = test(mins, maxs)
+
+    if mirror:
+        occ |= test(-maxs, -mins)
+
+    return occ
+
+
+class OccupancyTexture(texture.Texture, notifier.Notifier):
+    """The ``OccupancyTexture`` is a small 3D texture which identifies the
+    regions of an :class:`.Image` which may contain visible voxels. It is
+    used by the :class:`.GLVolume` ray-casting shader to skip over empty
+    space.
+
+    The image is divided into cells (:data:`CELL_SIZE` voxels along each
+    dimension), and the minimum and maximum value within each cell is
+    calculated with the :func:`minMaxGrid` function, whenever the image
+    volume or data changes. The calculation is performed on the shared
+    :class:`.WorkerPool`, so the ``OccupancyTexture`` may not be ready to use
+    for some time after it has been created or refreshed - its listeners are
+    notified (via the :class:`.Notifier` interface) when it is ready.
+
+    Whenever the clipping settings are changed via the :meth:`setClipping`
+    method, the texture is updated to contain the value ``255`` for cells
+    which may contain voxels that are not clipped, and ``0`` for cells
+    which are empty (see the :func:`occupancy` function).
+    """
+
+
+    def __init__(self, name, image, volume=None, cellSize=CELL_SIZE,
+                 threaded=None):
+        """Create an ``OccupancyTexture``.
+
+        :arg name:     A unique name for this ``OccupancyTexture``.
+        :arg image:    The :class:`.Image`
+        :arg volume:   Initial volume indices, for images with more than three
+                       dimensions.
+        :arg cellSize: Cell size, in voxels.
+        :arg threaded: If ``True``, cell minimums/maximums are calculated on
+                       the shared :class:`.WorkerPool`. Otherwise they are
+                       calculated immediately. Defaults to
+                       ``fslplatform.haveGui``.
+        """
+
+        texture.Texture.__init__(self, name, 3)
+
+        if threaded is None:
+            threaded = fslplatform.haveGui
+
+        self.__image    = image
+        self.__cellSize = cellSize
+        self.__threaded = threaded
+        self.__volume   = None
+        self.__mins     = None
+        self.__maxs     = None
+        self.__margin   = 0
+        self.__clipping = None
+        self.__occ      = None
+        self.__taskName = '{}_{}'.format(type(self).__name__, id(self))
+
+        self.__init()
+
+        image.register(self.__taskName,
+                       self.__imageDataChanged,
+                       'data',
+                       runOnIdle=True)
+
+        self.set(volume=volume)
+
+
+    def __init(self):
+        """Called by :meth:`__init__`. Configures the texture parameters. """
+
+        self.bindTexture()
+
+        for param, value in [(gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST),
+                             (gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST),
+                             (gl.GL_TEXTURE_WRAP_S,     gl.GL_CLAMP_TO_EDGE),
+                             (gl.GL_TEXTURE_WRAP_T,     gl.GL_CLAMP_TO_EDGE),
+                             (gl.GL_TEXTURE_WRAP_R,     gl.GL_CLAMP_TO_EDGE)]:
+            gl.glTexParameteri(gl.GL_TEXTURE_3D, param, value)
+
+        self.unbindTexture()
+
+
+    def destroy(self):
+        """Must be called when this ``OccupancyTexture`` is no longer needed.
+        Cancels any queued calculation, removes the image data listener,
+        and calls :meth:`.Texture.destroy`.
+        """
+        if self.__threaded:
+            workerpool.getPool().dequeue(self.__taskName)
+
+        self.__image.deregister(self.__taskName, 'data')
+        texture.Texture.destroy(self)
+        self.__image = None
+        self.__mins  = None
+        self.__maxs  = None
+
+
+    def ready(self):
+        """Returns ``True`` if this ``OccupancyTexture`` is ready to be used,
+        ``False`` otherwise.
+        """
+        return self.__occ is not None
+
+
+    @property
+    def cellSize(self):
+        """Returns the cell size, in voxels. """
+        return self.__cellSize
+
+
+    @property
+    def shape(self):
+        """Returns the shape of the cell grid, or ``None`` if it has not yet
+        been calculated.
+        """
+        if self.__mins is None: return None
+        else:                   return self.__mins.shape
+
+
+    @property
+    def occupancy(self):
+        """Returns a boolean ``numpy`` array containing the current
+        occupancy of each cell, or ``None`` if it has not yet been
+        calculated.
+        """
+        return self.__occ
+
+
+    def set(self, volume=None):
+        """Sets the volume for images with more than three dimensions, and
+        re-calculates the cell minimums and maximums.
+        """
+
+        ndims = self.__image.ndim
+
+        if ndims > 3 and volume is None:
+            volume = [0] * (ndims - 3)
+
+        self.__volume = volume
+        self.__refresh()
+
+
+    def setClipping(self, low, high, invert=False, mirror=False):
+        """Sets the clipping range, and updates the texture. See the
+        :func:`occupancy` function.
+        """
+        clipping = (low, high, invert, mirror)
+
+        if clipping == self.__clipping:
+            return
+
+        self.__clipping = clipping
+        self.__upload()
+
+
+    def __imageDataChanged(self, *a):
+        """Called when the :class:`.Image` data changes. Re-calculates the
+        cell minimums and maximums.
+        """
+        self.__refresh()
+
+
+    def __refresh(self):
+        """Calculates the cell minimums/maximums for the current volume. """
+
+        slc = [slice(None), slice(None), slice(None)]
+        if self.__volume is not None:
+            slc += list(self.__volume)
+
+        image    = self.__image
+        cellSize = self.__cellSize
+
+        # The results are stored on the worker
+        # thread, and applied on the main thread
+        # (in finish), so the minimums/maximums
+        # used by __upload are always consistent.
+        result = {}
+
+        # The data is read on the worker thread,
+        # so that the main thread is not blocked
+        # while it is loaded from disk
+        def calc():
+            data       = image[tuple(slc)]
+            mins, maxs = minMaxGrid(data, cellSize)
+
+            # Allow for the image texture
+            # being stored at 8 bit precision
+            with np.errstate(invalid='ignore'):
+                drange = np.nanmax(maxs) - np.nanmin(mins)
+
+            if np.isfinite(drange): margin = drange / 255.0
+            else:                   margin = 0
+
+            result['grid'] = (mins, maxs, margin)
+
+        def finish():
+            if self.__image is None or 'grid' not in result:
+                return
+
+            self.__mins, self.__maxs, self.__margin = result['grid']
+
+            log.debug('{} cell grid calculated: {}'.format(
+                self.getTextureName(), self.__mins.shape))
+            self.__upload()
+            self.notify()
+
+        if self.__threaded:
+            workerpool.getPool().enqueue(calc,
+                                         taskName=self.__taskName,
+                                         onFinish=finish)
+        else:
+            calc()
+            finish()
+
+
+    def __upload(self):
+        """Calculates the occupancy of each cell from the current clipping
+        settings, and copies it to the texture.
+        """
+
+        if self.__mins is None or self.__clipping is None:
+            return
+
+        low, high, invert, mirror = self.__clipping
+
+        occ  = occupancy(self.__mins,
+                         self.__maxs,
+                         low,
+                         high,
+                         invert,
+                         mirror,
+                         self.__margin)
+        data = np.asarray(occ, dtype=np.uint8) * 255
+
+        self.__occ = occ
+
+        self.bindTexture()
+        gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
+        gl.glTexImage3D(gl.GL_TEXTURE_3D,
+                        0,
+                        gl.GL_ALPHA8,
+                        data.shape[0],
+                        data.shape[1],
+                        data.shape[2],
+                        0,
+                        gl.GL_ALPHA,
+                        gl.GL_UNSIGNED_BYTE,
+                        data.ravel('F'))
+        self.unbindTexture()
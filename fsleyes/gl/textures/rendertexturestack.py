@@ -14,6 +14,7 @@ by the :class:`.SliceCanvas` class to store a collection of off-screen
 from __future__ import division
 
 import logging
+import time
 
 import numpy     as np
 import OpenGL.GL as gl
@@ -26,6 +27,22 @@ from . import                 rendertexture
 log = logging.getLogger(__name__)
 
 
+MAX_MEMORY = 256 * 1024 * 1024
+"""Default maximum amount of memory, in bytes, which may be used by the
+:class:`.RenderTexture` instances in one :class:`RenderTextureStack`. If
+``None``, memory usage is not limited. This can be changed at any time, and
+is set by the ``--prerenderMemory`` command line option. Changes affect all
+``RenderTextureStack`` instances which were not created with their own
+limit.
+"""
+
+
+UPDATE_BUDGET = 0.02
+"""Default amount of time, in seconds, that a :class:`RenderTextureStack`
+may spend refreshing textures on each call from the idle loop.
+"""
+
+
 class RenderTextureStack(object):
     """The ``RenderTextureStack`` class creates and maintains a collection of
     :class:`.RenderTexture` instances, each of which is used to display a
@@ -38,7 +55,22 @@ class RenderTextureStack(object):
     in real time.
 
     The :class:`.RenderTexture` textures are updated in an idle loop, via the
-    :func:`.idle.idle` function.
+    :func:`.idle.idle` function. On each iteration of the idle loop, as many
+    textures are refreshed as can be within a time budget (see
+    :data:`UPDATE_BUDGET`). Textures are refreshed in order of their distance
+    from the most recently drawn slice - when a different slice is drawn
+    (e.g. as the user scrolls through the slices), any remaining dirty
+    textures are re-ordered around the new slice.
+
+
+    Textures are only created when they are needed, and the total amount of
+    memory used by the textures is limited (see :data:`MAX_MEMORY`). When
+    the limit is reached, the textures which are furthest from the most
+    recently drawn slice are destroyed to make room for closer ones, and are
+    re-created if they are subsequently drawn. Textures which were drawn by
+    the most recent call to :meth:`draw` or :meth:`drawAll` (i.e. which are
+    visible) are never destroyed - if they do not fit within the limit, the
+    limit is exceeded.
 
 
     .. note:: A ``RenderTextureStack`` instance must be manually updated
@@ -50,14 +82,24 @@ class RenderTextureStack(object):
     """
 
 
-    def __init__(self, globj):
+    def __init__(self, globj, maxMemory=None, updateBudget=None):
         """Create a ``RenderTextureStack``. An update listener is registered
         on the ``GLObject``, so that the textures can be refreshed whenever it
         changes.
 
-        :arg globj: The :class:`.GLObject` instance.
+        :arg globj:        The :class:`.GLObject` instance.
+
+        :arg maxMemory:    Maximum amount of memory, in bytes, to use for
+                           textures. If not provided, the current value of
+                           :data:`MAX_MEMORY` is used.
+
+        :arg updateBudget: Time, in seconds, to spend refreshing textures on
+                           each idle loop iteration. Defaults to
+                           :data:`UPDATE_BUDGET`.
         """
 
+        if updateBudget is None: updateBudget = UPDATE_BUDGET
+
         self.name = '{}_{}_{}'.format(
             type(self).__name__,
             type(globj).__name__, id(self))
@@ -70,8 +112,23 @@ class RenderTextureStack(object):
         self.__defaultWidth       = 256
         self.__defaultHeight      = 256
 
+        self.__maxMemory          = maxMemory
+        self.__updateBudget       = updateBudget
+
+        # The textures list contains one entry
+        # for every slice - entries for slices
+        # which have not been rendered, or which
+        # have been evicted, are None. The
+        # allocated dict contains {index : size}
+        # mappings for every texture which exists.
+        # The visible list contains the indices of
+        # the textures which were drawn by the most
+        # recent call to drawAll - these are never
+        # evicted.
         self.__textureDirty       = []
         self.__textures           = []
+        self.__allocated          = {}
+        self.__visible            = []
 
         self.__lastDrawnTexture   = None
         self.__updateQueue        = []
@@ -94,6 +151,24 @@ class RenderTextureStack(object):
         self.__destroyTextures()
 
 
+    @property
+    def maxMemory(self):
+        """Returns the maximum amount of memory, in bytes, that may be used
+        by the textures in this ``RenderTextureStack``, or ``None`` if memory
+        usage is not limited.
+        """
+        if self.__maxMemory is not None: return self.__maxMemory
+        else:                            return MAX_MEMORY
+
+
+    @property
+    def memoryUsage(self):
+        """Returns the amount of memory, in bytes, currently used by the
+        textures in this ``RenderTextureStack``.
+        """
+        return sum(self.__allocated.values())
+
+
     def getGLObject(self):
         """Returns the :class:`.GLObject` associated with this
         ``RenderTextureStack``.
@@ -109,30 +184,64 @@ class RenderTextureStack(object):
 
         :arg xform: Transformation matrix to apply to rendered slice vertices.
         """
+        self.drawAll([zpos], [xform])
+
+
+    def drawAll(self, zposes, xforms=None):
+        """Draws the pre-generated :class:`.RenderTexture` instances which
+        correspond to all of the specified Z positions. None of the drawn
+        textures will be evicted until this method (or :meth:`draw`) is next
+        called.
 
-        xax = self.__xax
-        yax = self.__yax
+        :arg zposes: Positions of slices to render.
+
+        :arg xforms: Transformation matrices to apply to the vertices of each
+                     rendered slice.
+        """
 
-        texIdx                  = self.__zposToIndex(zpos)
-        self.__lastDrawnTexture = texIdx
+        if xforms is None:
+            xforms = [None] * len(zposes)
 
-        if texIdx < 0 or texIdx >= len(self.__textures):
+        xax    = self.__xax
+        yax    = self.__yax
+        ntexs  = len(self.__textures)
+        idxs   = [self.__zposToIndex(zpos) for zpos in zposes]
+        lo, hi = self.__globj.getDisplayBounds()
+
+        if len(idxs) == 0:
             return
 
-        lo, hi  = self.__globj.getDisplayBounds()
-        texture = self.__textures[texIdx]
+        lastIdx                 = self.__lastDrawnTexture
+        self.__lastDrawnTexture = idxs[len(idxs) // 2]
+        self.__visible          = [i for i in idxs if 0 <= i < ntexs]
+
+        for zpos, xform, texIdx in zip(zposes, xforms, idxs):
+
+            if texIdx < 0 or texIdx >= ntexs:
+                continue
+
+            if self.__textureDirty[texIdx]:
+                self.__allocateTexture(texIdx, force=True)
+                self.__refreshTexture(self.__textures[texIdx], texIdx)
+
+            texture = self.__textures[texIdx]
 
-        if self.__textureDirty[texIdx]:
-            self.__refreshTexture(texture, texIdx)
+            log.debug('Drawing pre-rendered texture '
+                      '[zax {}]: (zpos {}, slice {})'.format(
+                          self.__zax,
+                          zpos,
+                          texIdx))
 
-        log.debug('Drawing pre-rendered texture '
-                  '[zax {}]: (zpos {}, slice {})'.format(
-                      self.__zax,
-                      zpos,
-                      texIdx))
+            texture.drawOnBounds(
+                zpos, lo[xax], hi[xax], lo[yax], hi[yax], xax, yax, xform)
 
-        texture.drawOnBounds(
-            zpos, lo[xax], hi[xax], lo[yax], hi[yax], xax, yax, xform)
+        # If a different slice is being drawn,
+        # pre-rendering of the remaining dirty
+        # textures is re-started around it (it
+        # may have stopped because the memory
+        # limit was reached).
+        if self.__lastDrawnTexture != lastIdx and any(self.__textureDirty):
+            self.__queueTextureUpdates()
 
 
     def setAxes(self, xax, yax):
@@ -156,10 +265,10 @@ class RenderTextureStack(object):
 
         self.__destroyTextures()
 
-        for i in range(numTextures):
-            rt = rendertexture.RenderTexture(
-                '{}_{}'.format(self.name, i), rttype='c')
-            self.__textures.append(rt)
+        # Textures are created on
+        # demand - see __allocateTexture
+        self.__textures         = [None] * numTextures
+        self.__lastDrawnTexture = None
 
         self.onGLObjectUpdate()
 
@@ -170,10 +279,125 @@ class RenderTextureStack(object):
         """
 
         texes = self.__textures
-        self.__textures = []
+        self.__textures  = []
+        self.__allocated = {}
+        self.__visible   = []
 
         for tex in texes:
-            idle.idle(tex.destroy)
+            if tex is not None:
+                idle.idle(tex.destroy)
+
+
+    def __textureSize(self):
+        """Returns the ``(width, height)`` of the textures in this
+        ``RenderTextureStack``.
+        """
+
+        res = self.__globj.getDataResolution(self.__xax, self.__yax)
+
+        if res is not None:
+            width  = res[self.__xax]
+            height = res[self.__yax]
+        else:
+            width  = self.__defaultWidth
+            height = self.__defaultHeight
+
+        width  = min(width,  self.__maxWidth)
+        height = min(height, self.__maxHeight)
+
+        return width, height
+
+
+    def __centreIndex(self):
+        """Returns the index of the most recently drawn texture, or of the
+        middle texture if no textures have been drawn. Textures are
+        prioritised according to their distance from this index.
+        """
+        if self.__lastDrawnTexture is not None:
+            return self.__lastDrawnTexture
+        return len(self.__textures) // 2
+
+
+    def __allocateTexture(self, idx, force=False):
+        """Makes sure that a :class:`.RenderTexture` exists for the slice at
+        the given index. If creating it would take memory usage over the
+        limit, the textures which are furthest from the most recently drawn
+        slice are destroyed to make room for it. Visible textures (those
+        drawn by the most recent call to :meth:`drawAll`) are never
+        destroyed.
+
+        :arg idx:   Texture index
+        :arg force: If ``True``, the texture is created, even if all of the
+                    other textures are closer to the most recently drawn
+                    slice, or are visible, in which case the memory limit
+                    is exceeded.
+
+        :returns:   ``True`` if the texture exists, ``False`` if it could
+                    not be created within the memory limit.
+        """
+
+        if self.__textures[idx] is not None:
+            return True
+
+        width, height = self.__textureSize()
+        nbytes        = width * height * 4
+        maxMemory     = self.maxMemory
+
+        if maxMemory is not None:
+
+            centre = self.__centreIndex()
+            dist   = abs(idx - centre)
+            used   = self.memoryUsage
+
+            # Furthest textures first
+            evictable = [i for i in self.__allocated.keys()
+                         if i not in self.__visible]
+            evictable = sorted(evictable,
+                               key=lambda i: abs(i - centre),
+                               reverse=True)
+
+            while used + nbytes > maxMemory:
+
+                if len(evictable) == 0:
+                    if force: break
+                    else:     return False
+
+                evict = evictable.pop(0)
+
+                if not force and abs(evict - centre) <= dist:
+                    return False
+
+                used -= self.__evictTexture(evict)
+
+        rt = rendertexture.RenderTexture(
+            '{}_{}'.format(self.name, idx), rttype='c')
+
+        self.__textures[    idx] = rt
+        self.__textureDirty[idx] = True
+        self.__allocated[   idx] = nbytes
+
+        return True
+
+
+    def __evictTexture(self, idx):
+        """Destroys the texture at the given index, to free up memory. The
+        texture will be re-created if the slice is drawn again.
+
+        :returns: The amount of memory, in bytes, that was freed.
+        """
+
+        log.debug('Evicting texture slice {} (zax {})'.format(
+            idx, self.__zax))
+
+        tex    = self.__textures[idx]
+        nbytes = self.__allocated.pop(idx)
+
+        self.__textures[    idx] = None
+        self.__textureDirty[idx] = True
+
+        idle.idle(tex.destroy)
+
+        return nbytes
 
 
     def onGLObjectUpdate(self):
@@ -198,11 +422,18 @@ class RenderTextureStack(object):
         """Marks all :class:`.RenderTexture`  instances as *dirty*, so that
         they will be refreshed by the :meth:`.__textureUpdateLoop`.
         """
+        self.__textureDirty = [True] * len(self.__textures)
+        self.__queueTextureUpdates()
 
-        if self.__lastDrawnTexture is not None:
-            lastIdx = self.__lastDrawnTexture
-        else:
-            lastIdx = len(self.__textures) // 2
+
+    def __queueTextureUpdates(self):
+        """Queues all :class:`.RenderTexture` instances to be refreshed by
+        the :meth:`__textureUpdateLoop`, in order of their distance from the
+        most recently drawn slice. Only textures which are *dirty* are
+        actually refreshed.
+        """
+
+        lastIdx = self.__centreIndex()
 
         aboveIdxs = list(range(lastIdx, len(self.__textures)))
         belowIdxs = list(range(lastIdx - 1, -1, -1))
@@ -218,8 +449,7 @@ class RenderTextureStack(object):
             elif len(aboveIdxs) > 0: idxs[i] = aboveIdxs.pop(0)
             else:                    idxs[i] = belowIdxs.pop(0)
 
-        self.__textureDirty = [True] * len(self.__textures)
-        self.__updateQueue  = idxs
+        self.__updateQueue = idxs
 
         idle.idle(self.__textureUpdateLoop)
 
@@ -229,25 +459,39 @@ class RenderTextureStack(object):
         It loops through all :class:`.RenderTexture` instances, and
         refreshes any that have been marked as *dirty*.
 
-        Each call to this method causes one ``RenderTexture`` to be
-        refreshed. After a ``RenderTexture`` has been refreshed, if there
-        are dirty more ``RenderTexture`` instances, this method re-schedules
-        itself to be called again via :func:`.idle.idle`.
+        Each call to this method refreshes as many ``RenderTexture``
+        instances as possible within the update time budget (but at least
+        one). If there are more dirty ``RenderTexture`` instances, this
+        method re-schedules itself to be called again via :func:`.idle.idle`.
+
+        Refreshing stops when the memory limit has been reached, and all of
+        the existing textures are closer to the most recently drawn slice
+        than the remaining dirty textures.
         """
 
-        if len(self.__updateQueue) == 0 or len(self.__textures) == 0:
-            return
+        start = time.time()
+
+        while len(self.__updateQueue) > 0 and len(self.__textures) > 0:
 
-        idx = self.__updateQueue.pop(0)
+            idx = self.__updateQueue.pop(0)
 
-        if self.__textureDirty[idx]:
+            if not self.__textureDirty[idx]:
+                continue
 
-            tex = self.__textures[idx]
+            if not self.__allocateTexture(idx):
+                log.debug('Texture memory limit reached - not pre-rendering '
+                          '{} remaining slices (zax {})'.format(
+                              len(self.__updateQueue) + 1, self.__zax))
+                self.__updateQueue = []
+                break
 
             log.debug('Refreshing texture slice {} (zax {})'.format(
                 idx, self.__zax))
 
-            self.__refreshTexture(tex, idx)
+            self.__refreshTexture(self.__textures[idx], idx)
+
+            if time.time() - start >= self.__updateBudget:
+                break
 
         if len(self.__updateQueue) > 0:
             idle.idle(self.__textureUpdateLoop)
@@ -269,24 +513,15 @@ class RenderTextureStack(object):
         if not globj.ready():
             return
 
-        lo, hi = globj.getDisplayBounds()
-        res    = globj.getDataResolution(xax, yax)
-
-        if res is not None:
-            width  = res[xax]
-            height = res[yax]
-        else:
-            width  = self.__defaultWidth
-            height = self.__defaultHeight
-
-        if width  > self.__maxWidth:  width  = self.__maxWidth
-        if height > self.__maxHeight: height = self.__maxHeight
+        lo, hi        = globj.getDisplayBounds()
+        width, height = self.__textureSize()
 
         log.debug('Refreshing render texture for slice {} (zpos {}, '
                   'zax {}): {} x {}'.format(idx, zpos, self.__zax,
                                             width, height))
 
         tex.setSize(width, height)
+        self.__allocated[idx] = width * height * 4
 
         oldSize       = gl.glGetIntegerv(gl.GL_VIEWPORT)
         oldProjMat    = gl.glGetFloatv(  gl.GL_PROJECTION_MATRIX)
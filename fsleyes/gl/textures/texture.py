@@ -33,6 +33,7 @@ class Texture(object):
 
        getTextureName
        getTextureHandle
+       swapTextureHandle
 
 
     The :meth:`bindTexture` and :meth:`unbindTexture` methods allow you to
@@ -145,6 +146,19 @@ class Texture(object):
         return self.__texture
 
 
+    def swapTextureHandle(self, other):
+        """Swaps the GL texture handle of this texture with that of
+        ``other``, which must be a ``Texture`` with the same number of
+        dimensions. This can be used to fill a texture in the background,
+        and then make it visible in a single step.
+        """
+
+        if self.__ttype != other.__ttype:
+            raise ValueError('Texture dimensions do not match')
+
+        self.__texture, other.__texture = other.__texture, self.__texture
+
+
     def isBound(self):
         """Returns ``True`` if this texture is currently bound, ``False``
         otherwise.
@@ -9,12 +9,19 @@
 """
 
 
+import ctypes
 import logging
+import functools
+import itertools
+import threading
+import multiprocessing
+import multiprocessing.pool as mppool
 
 import numpy                              as np
 import OpenGL.GL                          as gl
 import OpenGL.extensions                  as glexts
 import OpenGL.GL.ARB.texture_float        as arbtf
+import OpenGL.raw.GL._types               as gltypes
 
 import fsl.utils.notifier                 as notifier
 import fsl.utils.memoize                  as memoize
@@ -24,8 +31,11 @@ from   fsl.utils.platform import platform as fslplatform
 import fsleyes_widgets.utils.status       as status
 
 from . import                                texture
+from . import                                datacache
+from . import                                workerpool
 import fsleyes.strings                    as strings
 import fsleyes.gl.routines                as glroutines
+import fsleyes.gl.resources               as glresources
 
 
 log = logging.getLogger(__name__)
@@ -45,6 +55,7 @@ GL_TYPE_NAMES = {
     gl.GL_LUMINANCE16         : 'GL_LUMINANCE16',
     arbtf.GL_LUMINANCE16F_ARB : 'GL_LUMINANCE16F',
     arbtf.GL_LUMINANCE32F_ARB : 'GL_LUMINANCE32F',
+    gl.GL_R16F                : 'GL_R16F',
     gl.GL_R32F                : 'GL_R32F',
 
     gl.GL_R8                  : 'GL_R8',
@@ -52,10 +63,334 @@ GL_TYPE_NAMES = {
 
     gl.GL_RGB8                : 'GL_RGB8',
     gl.GL_RGB16               : 'GL_RGB16',
+    gl.GL_RGB16F              : 'GL_RGB16F',
     gl.GL_RGB32F              : 'GL_RGB32F' ,
 }
 
 
+MAX_TEXTURE_SIZE = None
+"""If not ``None``, this value is used in place of ``GL_MAX_3D_TEXTURE_SIZE``
+as the maximum size of a single 3D texture along any dimension. It is
+intended for testing the :class:`TextureBrick` logic on platforms with
+a large texture size limit. See :meth:`Texture3D.maxTextureSize`.
+"""
+
+
+BRICK_OVERLAP = 2
+"""Number of voxels by which adjacent :class:`TextureBrick` instances
+overlap - see :func:`calculateBricks`. Linear interpolation requires a one
+voxel overlap, but cubic spline interpolation (which samples the two voxels
+on either side of each fragment) requires two.
+"""
+
+
+SLAB_SIZE = 16 * 1024 ** 2
+"""Approximate amount of memory, in bytes, to be used by each worker thread
+when preparing texture data. See :func:`processSlabs`.
+"""
+
+
+NUM_THREADS = None
+"""Number of threads to use when preparing texture data. If ``None``, the
+number of available CPU cores is used. See :func:`processSlabs`.
+"""
+
+
+_slabPools    = {}
+_slabPoolLock = threading.Lock()
+"""Thread pools used by :func:`processSlabs`, stored as
+``{nthreads : ThreadPool}`` mappings, and created on demand by
+:func:`_getSlabPool`.
+"""
+
+
+PYRAMID_SIZE = 8 * 1024 ** 2
+"""Approximate size, in bytes, of the coarsest level of the multi-resolution
+pyramid which is used when the ``pyramid`` option to :class:`Texture3D` is
+enabled. Data smaller than this is never displayed progressively.
+"""
+
+
+STORAGE_MODES = ('default', 'half', 'byte')
+"""Texture storage modes supported by the :class:`Texture3D` class - see
+:meth:`Texture3D.setStorage`.
+"""
+
+
+UPLOAD_SIZE = 32 * 1024 ** 2
+"""Approximate amount of data, in bytes, which is copied to the GPU at a
+time. When a :class:`Texture3D` is used in an interactive environment, the
+texture data is copied in slabs of this size, one slab on each
+:func:`.idle.idle` loop iteration, so the GUI remains responsive while
+large textures are uploaded.
+"""
+
+
+def slabOrder(data):
+    """Returns the memory layout (``'C'`` or ``'F'``) which should be used
+    for an output array that is to be passed, along with ``data``, to
+    :func:`processSlabs`. Fortran order is used unless ``data`` is stored
+    in C order.
+    """
+    if data.flags.c_contiguous and not data.flags.f_contiguous: return 'C'
+    else:                                                       return 'F'
+
+
+def _getSlabPool(nthreads):
+    """Returns a ``multiprocessing.pool.ThreadPool`` with ``nthreads``
+    threads, for use by :func:`processSlabs`, creating it if necessary.
+
+    ``processSlabs`` is typically called from the threads of the shared
+    :class:`.WorkerPool`, so the pool is shared across all calls, rather
+    than being created on every call. This means that the total number of
+    threads which are used to prepare texture data is limited to
+    ``nthreads``, regardless of how many textures are being prepared
+    concurrently.
+    """
+
+    with _slabPoolLock:
+        pool = _slabPools.get(nthreads)
+        if pool is None:
+            pool = mppool.ThreadPool(nthreads)
+            _slabPools[nthreads] = pool
+        return pool
+
+
+def processSlabs(func, data, out, slabSize=None, nthreads=None):
+    """Splits ``data`` and ``out`` into slabs, and calls
+    ``func(dataSlab, outSlab)`` on each pair of slabs. The slabs are
+    processed concurrently on a shared pool of threads (see
+    :func:`_getSlabPool`) - as ``numpy`` releases the GIL for most
+    operations, this results in a speed-up which scales with the number of
+    CPU cores.
+
+    Slabs are taken along the slowest-changing axis of ``data`` (see
+    :func:`slabOrder`) - this is the last (*z*) axis for Fortran-ordered
+    data (e.g. data loaded from a NIFTI image), or the first axis for
+    C-ordered data.
+
+    This function is used by :class:`Texture3D` to normalise and cast image
+    data, so that memory required for temporary copies of the data is
+    limited to the slab size (per thread), rather than being proportional to
+    the size of the full data.
+
+    :arg func:     Function which accepts a slab of ``data``, and writes
+                   the result into the corresponding slab of ``out``.
+    :arg data:     Input data
+    :arg out:      Output array, with the same shape as ``data``.
+    :arg slabSize: Approximate slab size in bytes, assuming 8 bytes per
+                   value (i.e. the size of a ``float64`` copy of a slab).
+                   Defaults to :data:`SLAB_SIZE`.
+    :arg nthreads: Number of threads. Defaults to :data:`NUM_THREADS`.
+    """
+
+    if slabSize is None: slabSize = SLAB_SIZE
+    if nthreads is None: nthreads = NUM_THREADS
+    if nthreads is None: nthreads = multiprocessing.cpu_count()
+
+    if slabOrder(data) == 'C': axis = 0
+    else:                      axis = data.ndim - 1
+
+    nslices    = data.shape[axis]
+    sliceBytes = 8 * int(np.prod(data.shape)) // max(1, nslices)
+    slabLen    = max(1, slabSize // max(1, sliceBytes))
+    slabs      = [(z, min(z + slabLen, nslices))
+                  for z in range(0, nslices, slabLen)]
+
+    def process(slab):
+        slc       = [slice(None)] * data.ndim
+        slc[axis] = slice(*slab)
+        slc       = tuple(slc)
+        func(data[slc], out[slc])
+
+    if min(nthreads, len(slabs)) <= 1:
+        for slab in slabs:
+            process(slab)
+        return
+
+    _getSlabPool(nthreads).map(process, slabs)
+
+
+def pyramidLevels(shape, nbytes, maxSize=None):
+    """Calculates the levels of a multi-resolution pyramid for data of the
+    given ``shape`` and size, such that the coarsest level is no larger
+    than approximately ``maxSize`` bytes.
+
+    :arg shape:   Data shape ``(x, y, z)``.
+    :arg nbytes:  Data size in bytes.
+    :arg maxSize: Maximum size of the coarsest level, in bytes. Defaults to
+                  :data:`PYRAMID_SIZE`.
+
+    :returns:     A list of sub-sampling factors, from coarsest to finest,
+                  not including the full data (a factor of ``1``). Each
+                  level is half the resolution of the next finer level. An
+                  empty list is returned if the data is smaller than
+                  ``maxSize``.
+    """
+
+    if maxSize is None:
+        maxSize = PYRAMID_SIZE
+
+    levels = []
+    factor = 2
+
+    while nbytes > maxSize and factor <= max(shape[:3]):
+        levels.insert(0, factor)
+        nbytes /= 8.0
+        factor *= 2
+
+    return levels
+
+
+def buildPyramid(data, levels):
+    """Calculates the levels of a multi-resolution pyramid for the given 3D
+    ``data``. Each level is calculated from the next finer level, with
+    :func:`.routines.subsample`, so that every level is smoothed over the
+    entire region which each of its voxels covers.
+
+    :arg data:   3D ``numpy`` array.
+    :arg levels: Sub-sampling factors, from coarsest to finest, as returned
+                 by :func:`pyramidLevels`.
+
+    :returns:    A dictionary of ``{factor : data}`` mappings, one for each
+                 level.
+    """
+
+    pyramid = {}
+    prev    = 1
+
+    for factor in reversed(levels):
+        data            = glroutines.subsample(data, factor // prev,
+                                               smooth=True)[0]
+        pyramid[factor] = data
+        prev            = factor
+
+    return pyramid
+
+
+def calculateBricks(shape, maxSize, overlap=1):
+    """Calculates a layout for splitting a 3D texture of the given ``shape``
+    into bricks, each of which has a size no larger than ``maxSize`` along
+    any dimension.
+
+    Adjacent bricks overlap by ``overlap`` voxels on each side, so that
+    interpolation is continuous across brick boundaries - a one voxel
+    overlap is sufficient for linear interpolation, but cubic spline
+    interpolation requires two (see :data:`BRICK_OVERLAP`). The voxels
+    which a brick is responsible for drawing (its *core*) do not overlap.
+
+    :arg shape:   Texture shape ``(x, y, z)``.
+    :arg maxSize: Maximum brick size along any dimension.
+    :arg overlap: Number of voxels by which adjacent bricks overlap.
+
+    :returns:     A list of ``(offset, shape, coreOffset, coreShape)`` tuples,
+                  one for each brick, where each value is a tuple of three
+                  integers.
+    """
+
+    if maxSize <= 2 * overlap:
+        raise ValueError('Brick size ({}) is too small for an overlap '
+                         'of {} voxels'.format(maxSize, overlap))
+
+    axes = []
+
+    for size in shape:
+
+        # Don't split this axis
+        if size <= maxSize:
+            axes.append([(0, size, 0, size)])
+            continue
+
+        step   = maxSize - 2 * overlap
+        ranges = []
+
+        for start in range(0, size, step):
+            end = min(start + step, size)
+            lo  = max(0,    start - overlap)
+            hi  = min(size, end   + overlap)
+            ranges.append((lo, hi - lo, start, end - start))
+
+        axes.append(ranges)
+
+    bricks = []
+
+    for xr, yr, zr in itertools.product(*axes):
+        bricks.append(tuple(zip(xr, yr, zr)))
+
+    return bricks
+
+
+class TextureBrick(texture.Texture):
+    """A ``TextureBrick`` is a 3D texture which stores one part of the data
+    managed by a bricked :class:`Texture3D`. ``TextureBrick`` instances are
+    created and managed by the ``Texture3D``, and are accessible through the
+    :meth:`Texture3D.bricks` property.
+
+    The following attributes are available on a ``TextureBrick``, all
+    of which are in terms of the full texture data (i.e. the data managed by
+    the ``Texture3D``):
+
+    ============== ==========================================================
+    ``offset``     Offset of the brick data.
+    ``shape``      Shape of the brick data.
+    ``coreOffset`` Offset of the voxels that this brick is responsible for
+                   drawing, i.e. excluding any overlap with adjacent bricks.
+    ``coreShape``  Shape of the voxels that this brick is responsible for
+                   drawing.
+    ============== ==========================================================
+    """
+
+
+    def __init__(self, name, offset, shape, coreOffset, coreShape, texShape):
+        """Create a ``TextureBrick``.
+
+        :arg name:       Unique name for this ``TextureBrick``
+        :arg offset:     Brick offset
+        :arg shape:      Brick shape
+        :arg coreOffset: Core offset
+        :arg coreShape:  Core shape
+        :arg texShape:   Shape of the full texture data
+        """
+
+        texture.Texture.__init__(self, name, 3)
+
+        self.offset     = tuple(offset)
+        self.shape      = tuple(shape)
+        self.coreOffset = tuple(coreOffset)
+        self.coreShape  = tuple(coreShape)
+        self.__texShape = np.array(texShape, dtype=np.float64)
+
+
+    @property
+    def slices(self):
+        """Returns a tuple of ``slice`` objects which may be used to extract
+        the data for this brick from the full texture data.
+        """
+        return tuple(slice(o, o + s) for o, s in zip(self.offset, self.shape))
+
+
+    @property
+    def texCoordBounds(self):
+        """Returns a tuple containing the ``(low, high)`` bounds of the core
+        of this brick, in terms of the full texture coordinate system.
+        """
+        lo = np.array(self.coreOffset)
+        hi = lo + self.coreShape
+        return lo / self.__texShape, hi / self.__texShape
+
+
+    @property
+    def texCoordScaleOffset(self):
+        """Returns a tuple containing scales and offsets which may be used to
+        transform coordinates in the full texture coordinate system into
+        this brick's texture coordinate system.
+        """
+        shape  = np.array(self.shape)
+        scale  = self.__texShape / shape
+        offset = -np.array(self.offset) / shape
+        return scale, offset
+
+
 class Texture3D(texture.Texture, notifier.Notifier):
     """The ``Texture3D`` class contains the logic required to create and
     manage a 3D texture.
@@ -75,15 +410,33 @@ class Texture3D(texture.Texture, notifier.Notifier):
        setPrefilter
        setPrefilterRange
        setNormalise
+       setStorage
 
 
     .. autosummary::
        :nosignatures:
 
        ready
+       progress
+       interp
+       normaliseRange
+       storage
        textureShape
        voxValXform
        invVoxValXform
+       bricked
+       bricks
+
+
+    The following methods may be used or overridden by sub-classes:
+
+    .. autosummary::
+       :nosignatures:
+
+       dataCacheKey
+       preparationSettings
+       prepareData
+       getPreparedData
 
 
     When a ``Texture3D`` is created, and when its settings are changed, it may
@@ -96,6 +449,70 @@ class Texture3D(texture.Texture, notifier.Notifier):
     Furthermore, the ``Texture3D`` class derives from :class:`.Notifier`, so
     listeners can register to be notified when an ``Texture3D`` is ready to
     be used.
+
+
+    **Bricking**
+
+
+    OpenGL imposes a limit on the size of a 3D texture (see
+    :meth:`maxTextureSize`). By default, data which is larger than this
+    limit is sub-sampled so that it will fit into a single texture. But if
+    the ``bricked`` parameter to :meth:`__init__` is ``True``, such data is
+    instead split into a collection of :class:`TextureBrick` instances,
+    each of which is stored in its own GL texture, and which are
+    accessible through the :meth:`bricks` property. In this case it is the
+    responsibility of the rendering logic to bind and draw each brick - the
+    ``Texture3D`` handle itself will not contain any data.
+
+    Data which fits into a single texture is never bricked, so the
+    :meth:`bricks` property will return an empty list in this case.
+
+
+    **Storage**
+
+
+    By default, data is stored on the GPU in its native format if possible,
+    or otherwise normalised and stored as 16 bit integers. The ``storage``
+    setting (see :meth:`setStorage`) can be used to store the data at a
+    reduced precision, in order to reduce GPU memory usage. In either case,
+    the :meth:`voxValXform` may be used to transform texture values back to
+    the original data range.
+
+
+    **Progressive refinement**
+
+
+    If the ``pyramid`` parameter to :meth:`__init__` is ``True``, and the
+    texture data is prepared on a separate thread, large data is displayed
+    progressively. The levels of a multi-resolution pyramid are calculated
+    (see :func:`buildPyramid`), and the coarsest level, of approximately
+    :data:`PYRAMID_SIZE` bytes, is prepared and copied to the GPU first, and
+    the ``Texture3D`` becomes ready as soon as this has been done.
+    Successively finer levels, each twice the resolution of the previous
+    level, are then prepared in the background. Each level replaces the
+    previous one when it has been copied to the GPU, and a notification is
+    triggered, so that the texture always contains the finest level which
+    is available.
+
+
+    **Threading**
+
+
+    When threading is enabled, texture data is prepared on the shared
+    :class:`.WorkerPool` (see the :mod:`.workerpool` module), rather than on
+    a dedicated thread. The :meth:`priority` property controls the order in
+    which queued tasks from different ``Texture3D`` instances are run, and
+    at most one task for each ``Texture3D`` is run at any one time.
+
+
+    **Caching**
+
+
+    If a :class:`.DataCache` has been enabled (see the :mod:`.datacache`
+    module), and the :meth:`dataCacheKey` method returns a value which
+    identifies the texture data, prepared data is stored in the cache, and
+    is loaded from the cache (as a memory-mapped array) instead of being
+    re-prepared the next time that the same data is needed.
     """
 
 
@@ -104,6 +521,8 @@ class Texture3D(texture.Texture, notifier.Notifier):
                  nvals=1,
                  notify=True,
                  threaded=None,
+                 bricked=False,
+                 pyramid=False,
                  **kwargs):
         """Create a ``Texture3D``.
 
@@ -121,6 +540,15 @@ class Texture3D(texture.Texture, notifier.Notifier):
                         :meth:`refresh` call will block until it has been
                         prepared.
 
+        :arg bricked:   If ``True``, and the texture data is larger than
+                        :meth:`maxTextureSize`, the data is split into
+                        :class:`TextureBrick` instances. Otherwise (the
+                        default), data which is too large is sub-sampled.
+
+        :arg pyramid:   If ``True``, and ``threaded`` is ``True``, large data
+                        is displayed progressively, starting with a coarse
+                        version of the data.
+
 
         All other keyword arguments are passed through to the :meth:`set`
         method, and thus used as initial texture settings.
@@ -141,6 +569,9 @@ class Texture3D(texture.Texture, notifier.Notifier):
         self.__name       = '{}_{}'.format(type(self).__name__, id(self))
         self.__nvals      = nvals
         self.__threaded   = threaded
+        self.__bricked    = bricked
+        self.__pyramid    = pyramid
+        self.__bricks     = []
 
         # All of these texture settings
         # are updated in the set method,
@@ -154,12 +585,37 @@ class Texture3D(texture.Texture, notifier.Notifier):
         self.__interp         = None
         self.__normalise      = None
         self.__normaliseRange = None
+        self.__storage        = 'default'
 
         # These attributes are modified
         # in the refresh method (which is
         # called via the set method below).
         self.__ready          = True
 
+        # Used to keep track of asynchronous
+        # texture data uploads, and of whether
+        # the texture contains a complete copy
+        # of some data (which may be displayed)
+        # - see the __uploadTextureDataAsync
+        # method.
+        self.__uploadId       = 0
+        self.__progress       = 1.0
+        self.__pbo            = None
+        self.__populated      = False
+
+        # True while coarse pyramid levels
+        # are being refined, and the sub-sampled
+        # data for the levels which have not yet
+        # been prepared - see __refresh
+        self.__refining       = False
+        self.__pyramidData    = {}
+
+        # Estimated GPU memory usage, and
+        # whether the texture data has been
+        # evicted - see the evict method.
+        self.__memorySize     = 0
+        self.__evicted        = False
+
         # These attributes are set by the
         # __refresh, __determineTextureType,
         # and __prepareTextureData methods.
@@ -171,18 +627,21 @@ class Texture3D(texture.Texture, notifier.Notifier):
         self.__texDtype       = None
 
         # If threading is enabled, texture
-        # refreshes are performed with an
-        # idle.TaskThread.
-        if threaded:
-            self.__taskThread = idle.TaskThread()
-            self.__taskName   = '{}_{}_refresh'.format(type(self).__name__,
-                                                       id(self))
+        # refreshes are performed on the
+        # shared workerpool.WorkerPool.
+        self.__priority = 1
 
-            self.__taskThread.daemon = True
-            self.__taskThread.start()
+        if threaded:
+            self.__pool     = workerpool.getPool()
+            self.__taskName = '{}_refresh'.format(self.__name)
         else:
-            self.__taskThread = None
-            self.__taskName   = None
+            self.__pool     = None
+            self.__taskName = None
+
+        # Query the texture size limit now, as
+        # it is used by __realPrepareTextureData,
+        # which may be called on another thread.
+        self.maxTextureSize()
 
         self.set(refresh=False, **kwargs)
 
@@ -197,11 +656,52 @@ class Texture3D(texture.Texture, notifier.Notifier):
         """
 
         texture.Texture.destroy(self)
+        self.__destroyBricks()
+        self.__destroyPixelBuffer()
         self.__data         = None
         self.__preparedData = None
+        self.__pyramidData  = {}
+        self.__memorySize   = 0
+
+        if self.__pool is not None:
+            self.__pool.dequeueGroup(self.taskGroup)
 
-        if self.__taskThread is not None:
-            self.__taskThread.stop()
+
+    @classmethod
+    def maxTextureSize(cls):
+        """Returns the maximum size of a 3D texture along any dimension. This
+        is equal to ``GL_MAX_3D_TEXTURE_SIZE``, unless the
+        :data:`MAX_TEXTURE_SIZE` module attribute has been set.
+        """
+        if MAX_TEXTURE_SIZE is not None:
+            return MAX_TEXTURE_SIZE
+        return cls.__glMaxTextureSize()
+
+
+    @classmethod
+    @memoize.memoize
+    def __glMaxTextureSize(cls):
+        """Queries and returns ``GL_MAX_3D_TEXTURE_SIZE``. """
+        return int(gl.glGetIntegerv(gl.GL_MAX_3D_TEXTURE_SIZE))
+
+
+    @classmethod
+    def exceedsMaxSize(cls, shape):
+        """Returns ``True`` if a texture of the given ``shape`` is too large
+        to be stored in a single GL texture, ``False`` otherwise.
+        """
+        return any(s > cls.maxTextureSize() for s in shape[:3])
+
+
+    @classmethod
+    @memoize.memoize
+    def canUsePixelBuffers(cls):
+        """Returns ``True`` if this GL environment supports pixel buffer
+        objects (core in OpenGL 2.1, otherwise via the
+        ``ARB_pixel_buffer_object`` extension), ``False`` otherwise.
+        """
+        return float(fslplatform.glVersion) >= 2.1 or \
+            glexts.hasExtension('GL_ARB_pixel_buffer_object')
 
 
     @classmethod
@@ -305,7 +805,7 @@ class Texture3D(texture.Texture, notifier.Notifier):
 
     @classmethod
     @memoize.memoize
-    def getTextureType(cls, normalise, dtype, nvals):
+    def getTextureType(cls, normalise, dtype, nvals, storage='default'):
         """Figures out the GL data type, and the base/internal texture
         formats in whihc the specified data should be stored.
 
@@ -313,6 +813,9 @@ class Texture3D(texture.Texture, notifier.Notifier):
         :arg dtype:     The original data type (e.g. ``np.uint8``)
         :arg nvals:     Number of values per voxel. Must be either ``1`` or
                         ``3``.
+        :arg storage:   Storage mode - one of :data:`STORAGE_MODES`. If not
+                        ``'default'``, ``normalise`` is assumed to be
+                        ``True``.
 
         :returns: A tuple containing:
 
@@ -325,6 +828,25 @@ class Texture3D(texture.Texture, notifier.Notifier):
         ocBaseFmt, ocIntFmt              = cls.oneChannelFormat(dtype)
         isFloat                          = issubclass(dtype.type, np.floating)
 
+        # Reduced precision storage - normalised
+        # data is stored as 8 bit integers, or as
+        # half precision floats. The latter is
+        # only possible if float textures are
+        # available - otherwise we fall back to
+        # 16 bit integers.
+        if storage == 'byte':
+            if nvals == 1:
+                baseFmt, intFmt = cls.oneChannelFormat(np.dtype(np.uint8))
+            else:
+                baseFmt, intFmt = gl.GL_RGB, gl.GL_RGB8
+            return gl.GL_UNSIGNED_BYTE, baseFmt, intFmt
+
+        if storage == 'half' and floatTextures:
+            if   nvals == 3:            intFmt = gl.GL_RGB16F
+            elif fIntFmt == gl.GL_R32F: intFmt = gl.GL_R16F
+            else:                       intFmt = arbtf.GL_LUMINANCE16F_ARB
+            return gl.GL_FLOAT, fBaseFmt, intFmt
+
         # Signed data types are a pain in the arse.
         # We have to store them as unsigned, and
         # apply an offset. There is some associated
@@ -373,11 +895,153 @@ class Texture3D(texture.Texture, notifier.Notifier):
 
     def ready(self):
         """Returns ``True`` if this ``Texture3D`` is ready to be used,
-        ``False`` otherwise.
+        ``False`` otherwise. While the texture data is being copied to the
+        GPU, the :meth:`progress` property may be used to determine how
+        much of the data has been copied.
+
+        If the texture data has been evicted from the GPU (see
+        :meth:`evict`), this method will return ``False`` until the texture
+        has been restored (see :meth:`restore`).
         """
         return self.__ready
 
 
+    def evicted(self):
+        """Returns ``True`` if the texture data has been evicted from the GPU
+        (see :meth:`evict`), ``False`` otherwise.
+        """
+        return self.__evicted
+
+
+    def restore(self):
+        """If the texture data has been evicted from the GPU (see
+        :meth:`evict`), it is copied back to the GPU. Listeners are notified
+        when the texture is ready to be used. Has no effect if the texture
+        has not been evicted.
+        """
+
+        if not self.__evicted:
+            return
+
+        log.debug('Restoring evicted texture {}'.format(self.getTextureName()))
+        self.__refresh(refreshData=False)
+
+
+    def bindTexture(self, *args, **kwargs):
+        """Overrides :meth:`.Texture.bindTexture`. Notifies the
+        :mod:`.resources` module that this texture has been used.
+        """
+        texture.Texture.bindTexture(self, *args, **kwargs)
+        glresources.used(self)
+
+
+    def memorySize(self):
+        """Returns the estimated amount of GPU memory, in bytes, used by this
+        ``Texture3D``. Used by the :mod:`.resources` module to enforce its
+        memory budget.
+        """
+        return self.__memorySize
+
+
+    def evict(self):
+        """Releases the GPU memory used by this ``Texture3D``. The prepared
+        texture data is retained, and is copied back to the GPU when
+        :meth:`restore` is called. Called by the :mod:`.resources` module
+        when its memory budget has been exceeded. Has no effect if the
+        texture is not ready.
+        """
+
+        if not self.__ready or self.__refining:
+            return
+
+        log.debug('Evicting texture {} ({} bytes)'.format(
+            self.getTextureName(), self.__memorySize))
+
+        self.__destroyBricks()
+
+        # Replace the texture storage
+        # with a single voxel
+        bound = self.isBound()
+        if not bound:
+            texture.Texture.bindTexture(self)
+
+        gl.glTexImage3D(gl.GL_TEXTURE_3D,
+                        0,
+                        self.__texIntFmt,
+                        1, 1, 1,
+                        0,
+                        self.__texFmt,
+                        self.__texDtype,
+                        None)
+
+        if not bound:
+            self.unbindTexture()
+
+        self.__ready      = False
+        self.__evicted    = True
+        self.__populated  = False
+        self.__memorySize = 0
+
+
+    @property
+    def progress(self):
+        """Returns a value between ``0`` and ``1`` indicating how much of the
+        texture data has been copied to the GPU. Once the data has been
+        fully copied (and :meth:`ready` returns ``True``), this will be
+        ``1``.
+        """
+        if self.__ready: return 1.0
+        else:            return self.__progress
+
+
+    @property
+    def priority(self):
+        """Returns the priority of this ``Texture3D``. When threading is
+        enabled, queued tasks for textures with a higher priority are run
+        before those for textures with a lower priority (see the
+        :class:`.WorkerPool`). Defaults to ``1``.
+        """
+        return self.__priority
+
+
+    @priority.setter
+    def priority(self, priority):
+        """Sets the priority of this ``Texture3D``. Takes effect
+        immediately, including for tasks which have already been queued.
+        """
+        self.__priority = priority
+
+
+    @property
+    def taskGroup(self):
+        """Returns the :class:`.WorkerPool` task group used for all tasks
+        related to this ``Texture3D``. Sub-classes may use this to run their
+        own tasks on the pool, so that they will not be run concurrently with
+        the refresh tasks.
+        """
+        return self.__name
+
+
+    @property
+    def bricked(self):
+        """Returns ``True`` if this ``Texture3D`` was created with
+        ``bricked=True``, ``False`` otherwise. Note that the data for a
+        bricked ``Texture3D`` is only split into bricks if it is too large
+        to be stored in a single texture - see :meth:`bricks`.
+        """
+        return self.__bricked
+
+
+    @property
+    def bricks(self):
+        """Returns a list of :class:`TextureBrick` instances which contain
+        the texture data, if it has been split into bricks. Otherwise
+        returns an empty list, in which case the texture data is stored in
+        this ``Texture3D``.
+        """
+        return list(self.__bricks)
+
+
     def setInterp(self, interp):
         """Sets the texture interpolation - either ``GL_NEAREST`` or
         ``GL_LINEAR``.
@@ -462,6 +1126,47 @@ class Texture3D(texture.Texture, notifier.Notifier):
         self.set(normaliseRange=normaliseRange)
 
 
+    def setStorage(self, storage):
+        """Sets the storage mode, which must be one of:
+
+        ============= ======================================================
+        ``'default'`` Data is stored in its native format if possible, or
+                      is otherwise normalised and stored as 16 bit integers.
+        ``'half'``    Data is normalised, and stored as 16 bit (half
+                      precision) floating point. If floating point textures
+                      are not available, this is equivalent to
+                      ``'default'``.
+        ``'byte'``    Data is normalised, and stored as 8 bit integers.
+        ============= ======================================================
+
+        The reduced precision modes can be used to reduce GPU memory usage.
+        The data is normalised according to the normalisation range (see
+        :meth:`setNormaliseRange`).
+        """
+        self.set(storage=storage)
+
+
+    @property
+    def interp(self):
+        """Returns the current interpolation setting (see :meth:`setInterp`).
+        """
+        return self.__interp
+
+
+    @property
+    def normaliseRange(self):
+        """Returns the current normalisation range (see
+        :meth:`setNormaliseRange`).
+        """
+        return self.__normaliseRange
+
+
+    @property
+    def storage(self):
+        """Returns the current storage mode (see :meth:`setStorage`). """
+        return self.__storage
+
+
     @property
     def voxValXform(self):
         """Return a transformation matrix that can be used to transform
@@ -501,13 +1206,56 @@ class Texture3D(texture.Texture, notifier.Notifier):
         """
 
         data  = self.__realPrepareTextureData(data)[0]
-        shape = data.shape
-        data  = data.flatten(order='F')
 
         bound = self.isBound()
         if not bound:
             self.bindTexture()
 
+        if len(self.__bricks) == 0:
+            self.__patchTextureData(data, offset)
+
+        # If the texture data has been split
+        # into bricks, we need to patch each
+        # brick which overlaps with the data.
+        else:
+            for brick in self.__bricks:
+
+                lo = [max(o, bo)
+                      for o, bo in zip(offset, brick.offset)]
+                hi = [min(o + s, bo + bs)
+                      for o, s, bo, bs in zip(offset,
+                                              data.shape,
+                                              brick.offset,
+                                              brick.shape)]
+
+                if any(blo >= bhi for blo, bhi in zip(lo, hi)):
+                    continue
+
+                slc  = tuple(slice(blo - o, bhi - o)
+                             for blo, bhi, o in zip(lo, hi, offset))
+                boff = [blo - bo for blo, bo in zip(lo, brick.offset)]
+
+                brick.bindTexture()
+                self.__patchTextureData(data[slc], boff)
+                brick.unbindTexture()
+
+            if self.isBound():
+                self.bindTexture()
+
+        if not bound:
+            self.unbindTexture()
+
+        self.notify()
+
+
+    def __patchTextureData(self, data, offset):
+        """Called by :meth:`patchData`. Copies the given ``data`` into the
+        currently bound texture, at the given ``offset``.
+        """
+
+        shape = data.shape
+        data  = data.flatten(order='F')
+
         gl.glTexSubImage3D(gl.GL_TEXTURE_3D,
                            0,
                            offset[0],
@@ -520,11 +1268,6 @@ class Texture3D(texture.Texture, notifier.Notifier):
                            self.__texDtype,
                            data)
 
-        if not bound:
-            self.unbindTexture()
-
-        self.notify()
-
 
     def set(self, **kwargs):
         """Set any parameters on this ``Texture3D``. Valid keyword
@@ -539,6 +1282,7 @@ class Texture3D(texture.Texture, notifier.Notifier):
         ``scales``         See :meth:`setScales`.
         ``normalise``      See :meth:`setNormalise.`
         ``normaliseRange`` See :meth:`setNormaliseRange`.
+        ``storage``        See :meth:`setStorage`.
         ``refresh``        If ``True`` (the default), the :meth:`refresh`
                            function is called (but only if a setting has
                            changed).
@@ -560,6 +1304,7 @@ class Texture3D(texture.Texture, notifier.Notifier):
         scales         = kwargs.get('scales',         self.__scales)
         normalise      = kwargs.get('normalise',      None)
         normaliseRange = kwargs.get('normaliseRange', None)
+        storage        = kwargs.get('storage',        self.__storage)
         data           = kwargs.get('data',           None)
         refresh        = kwargs.get('refresh',        True)
         notify         = kwargs.get('notify',         True)
@@ -572,23 +1317,32 @@ class Texture3D(texture.Texture, notifier.Notifier):
                    'prefilter'      : prefilter      != self.__prefilter,
                    'prefilterRange' : prefilterRange != self.__prefilterRange,
                    'resolution'     : resolution     != self.__resolution,
-                   'scales'         : scales         != self.__scales}
+                   'scales'         : scales         != self.__scales,
+                   'storage'        : storage        != self.__storage}
 
         if not any(changed.values()):
             return False
 
+        if storage not in STORAGE_MODES:
+            raise ValueError('Invalid storage mode: {}'.format(storage))
+
         self.__interp         = interp
         self.__prefilter      = prefilter
         self.__prefilterRange = prefilterRange
         self.__resolution     = resolution
         self.__scales         = scales
-        self.__normalise      = bool(normalise)
+        self.__storage        = storage
+        self.__normalise      = bool(normalise) or storage != 'default'
         self.__normaliseRange = normaliseRange
 
         if data is not None:
-
             self.__data = data
 
+        if self.__data is not None and (changed['data'] or
+                                        changed['storage']):
+
+            data = self.__data
+
             # If the data is of a type which cannot
             # be stored natively as an OpenGL texture,
             # and we don't have support for floating
@@ -618,7 +1372,8 @@ class Texture3D(texture.Texture, notifier.Notifier):
                            changed['normaliseRange'] and self.__normalise,
                            changed['resolution'],
                            changed['scales'],
-                           changed['normalise']))
+                           changed['normalise'],
+                           changed['storage']))
 
         if refresh:
             self.refresh(refreshData=refreshData,
@@ -671,72 +1426,114 @@ class Texture3D(texture.Texture, notifier.Notifier):
         notify      = kwargs.get('notify',      True)
         callback    = kwargs.get('callback',    None)
 
-        self.__ready = False
+        # If we are part way through refining
+        # a coarse pyramid level, the prepared
+        # data is not the full data, so we
+        # have to start again.
+        refreshData = refreshData or self.__refining
 
-        bound = self.isBound()
+        # Any refresh re-creates the
+        # texture, so it is no longer
+        # evicted
+        self.__evicted  = False
+        self.__ready    = False
+        self.__progress = 0.0
+
+        # Cancel any in-progress
+        # asynchronous upload
+        self.__uploadId += 1
+
+        # The upload ID is stored in a list so that
+        # genData can update it (see below).
+        uploadId = [self.__uploadId]
+        bound    = self.isBound()
+
+        # The data may be displayed progressively,
+        # from a coarse level to the full data
+        # (level 1) - see __pyramidLevels.
+        if refreshData: levels = self.__pyramidLevels() + [1]
+        else:           levels = [1]
+
+        self.__refining = len(levels) > 1
 
         # This can take a long time for big
         # data, so we do it in a separate
         # thread using the idle module.
-        def genData():
+        def genData(i=0):
 
             # Another genData function is
             # already queued - don't run.
             # The TaskThreadVeto error
-            # will stop the TaskThread from
+            # will stop the WorkerPool from
             # calling configTexture as well.
-            if self.__taskThread is not None and \
-               self.__taskThread.isQueued(self.__taskName):
+            if i == 0                         and \
+               self.__pool is not None and \
+               self.__pool.isQueued(self.__taskName):
                 raise idle.TaskThreadVeto()
 
-            if refreshData:
+            # If the texture was refreshed while
+            # this task was queued, the refresh
+            # will not have queued its own task,
+            # so this task takes its place. But
+            # if it was refreshed while a finer
+            # level was queued, we just skip it
+            # (configTexture will do nothing).
+            if i == 0:
+                uploadId[0] = self.__uploadId
+            elif uploadId[0] != self.__uploadId:
+                return
+
+            if not refreshData:
+                return
+
+            if i == 0:
                 self.__determineTextureType()
-                self.__prepareTextureData()
+
+                # There's no point in displaying
+                # a coarse level if the full data
+                # has already been prepared
+                if len(levels) > 1 and self.__havePreparedData():
+                    del levels[:-1]
+
+                # The pyramid levels are calculated
+                # from finest to coarsest, but are
+                # displayed from coarsest to finest
+                if len(levels) > 1:
+                    self.__pyramidData = buildPyramid(self.__data,
+                                                      levels[:-1])
+
+            if levels[i] == 1: self.__prepareTextureData()
+            else:              self.__preparePyramidLevel(levels[i])
 
         # Once the genData function has finished,
         # we'll configure the texture back on the
         # main thread - OpenGL doesn't play nicely
         # with multi-threading.
-        def configTexture():
+        def configTexture(i=0):
             data = self.__preparedData
 
             # If destroy() is called, the
             # preparedData will be blanked
             # out.
-            if data is None:
+            if data is None or uploadId[0] != self.__uploadId:
                 return
 
             # It is assumed that, for textures with more than one
             # value per voxel (e.g. RGB textures), the data is
             # arranged accordingly, i.e. with the voxel value
             # dimension the fastest changing
-            if len(data.shape) == 4: self.__textureShape = data.shape[1:]
-            else:                    self.__textureShape = data.shape
+            if len(data.shape) == 4: shape = data.shape[1:]
+            else:                    shape = data.shape
 
             log.debug('Configuring 3D texture (id {}) for '
-                      '{} (data shape: {})'.format(
+                      '{} (data shape: {}, level: {})'.format(
                           self.getTextureHandle(),
                           self.getTextureName(),
-                          self.__textureShape))
-
-            # The image data is flattened, with fortran dimension
-            # ordering, so the data, as stored on the GPU, has its
-            # first dimension as the fastest changing.
-            data = np.ascontiguousarray(data.reshape(-1, order='F'))
-
-            # PyOpenGL needs the data array
-            # to be writeable, as it uses
-            # PyArray_ISCARRAY to check
-            # for contiguousness. but if the
-            # data has come from a nibabel
-            # ArrayProxy, the writeable flag
-            # will be set to False for some
-            # reason.
-            #
-            # TODO: If this turns out to be a problem
-            #       then you will have to bite the
-            #       bullet and copy the data.
-            data.flags.writeable = True
+                          shape,
+                          levels[i]))
+
+            onDone  = functools.partial(finish, i, shape)
+            upAsync = False
 
             if not bound:
                 self.bindTexture()
@@ -746,77 +1543,62 @@ class Texture3D(texture.Texture, notifier.Notifier):
             gl.glPixelStorei(gl.GL_PACK_ALIGNMENT,   1)
             gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
 
-            # set interpolation routine
-            interp = self.__interp
-            if interp is None:
-                interp = gl.GL_NEAREST
-
-            gl.glTexParameteri(gl.GL_TEXTURE_3D,
-                               gl.GL_TEXTURE_MAG_FILTER,
-                               interp)
-            gl.glTexParameteri(gl.GL_TEXTURE_3D,
-                               gl.GL_TEXTURE_MIN_FILTER,
-                               interp)
-
-            # Clamp texture borders to the edge
-            # values - it is the responsibility
-            # of the rendering logic to not draw
-            # anything outside of the image space
-            gl.glTexParameteri(gl.GL_TEXTURE_3D,
-                               gl.GL_TEXTURE_WRAP_S,
-                               gl.GL_CLAMP_TO_EDGE)
-            gl.glTexParameteri(gl.GL_TEXTURE_3D,
-                               gl.GL_TEXTURE_WRAP_T,
-                               gl.GL_CLAMP_TO_EDGE)
-            gl.glTexParameteri(gl.GL_TEXTURE_3D,
-                               gl.GL_TEXTURE_WRAP_R,
-                               gl.GL_CLAMP_TO_EDGE)
-
-            # create the texture according to
-            # the format determined by the
-            # _determineTextureType method.
-            #
-            # note: The ancient Chromium driver (still
-            #       in use by VirtualBox) will improperly
-            #       create 3D textures without two calls
-            #       (to glTexImage3D and glTexSubImage3D).
-            #       If I specify the texture size and set
-            #       the data in a single call, it seems to
-            #       expect that the data or texture
-            #       dimensions always have even size - odd
-            #       sized images will be displayed
-            #       incorrectly.
-            gl.glTexImage3D(gl.GL_TEXTURE_3D,
-                            0,
-                            self.__texIntFmt,
-                            self.__textureShape[0],
-                            self.__textureShape[1],
-                            self.__textureShape[2],
-                            0,
-                            self.__texFmt,
-                            self.__texDtype,
-                            None)
-            gl.glTexSubImage3D(gl.GL_TEXTURE_3D,
-                               0, 0, 0, 0,
-                               self.__textureShape[0],
-                               self.__textureShape[1],
-                               self.__textureShape[2],
-                               self.__texFmt,
-                               self.__texDtype,
-                               data)
+            if self.__bricked and self.exceedsMaxSize(shape):
+                self.__textureShape = shape
+                self.__configBricks(data)
+            else:
+                self.__destroyBricks()
+                self.__configTextureParameters()
+
+                # Large textures are uploaded
+                # asynchronously when running
+                # in an interactive environment
+                upAsync = self.__threaded and data.nbytes > UPLOAD_SIZE
+
+                if upAsync: self.__uploadTextureDataAsync(data, onDone)
+                else:       self.__uploadTextureData(data)
 
             if not bound:
                 self.unbindTexture()
 
-            log.debug('{}({}) is ready to use'.format(
-                type(self).__name__, self.getTextureName()))
-
-            self.__ready = True
+            if not upAsync:
+                onDone()
+
+        # Called by configTexture when
+        # the texture data has been
+        # copied to the GPU
+        def finish(i, shape):
+
+            last = i == len(levels) - 1
+
+            log.debug('{}({}) is ready to use (level {})'.format(
+                type(self).__name__, self.getTextureName(), levels[i]))
+
+            self.__textureShape = shape
+            self.__ready        = True
+            self.__populated    = True
+            self.__progress     = 1.0
+            self.__memorySize   = self.__calculateMemorySize()
+
+            glresources.enforceBudget()
+
+            # Queue the next level. Listeners
+            # are always notified about refined
+            # levels, as they will need to redraw.
+            if not last:
+                self.__pool.enqueue(
+                    genData, i + 1,
+                    taskName='{}_refine'.format(self.__taskName),
+                    group=self.taskGroup,
+                    priority=lambda: self.priority - 1,
+                    onFinish=functools.partial(configTexture, i + 1))
+            else:
+                self.__refining = False
 
-            if notify:
+            if notify or i > 0:
                 self.notify()
 
-            if callback is not None:
+            if last and callback is not None:
                 callback()
 
 
@@ -826,15 +1608,22 @@ class Texture3D(texture.Texture, notifier.Notifier):
         msg   = strings.messages[self, 'dataError']
         genData       = status.reportErrorDecorator(title, msg)(genData)
         configTexture = status.reportErrorDecorator(title, msg)(configTexture)
+        finish        = status.reportErrorDecorator(title, msg)(finish)
 
         if self.__threaded:
 
+            # Any queued refinement of the
+            # previous data is now stale
+            self.__pool.dequeue('{}_refine'.format(self.__taskName))
+
             # Don't queue the texture
             # refresh task twice
-            if not self.__taskThread.isQueued(self.__taskName):
-                self.__taskThread.enqueue(genData,
-                                          taskName=self.__taskName,
-                                          onFinish=configTexture)
+            if not self.__pool.isQueued(self.__taskName):
+                self.__pool.enqueue(genData,
+                                    taskName=self.__taskName,
+                                    group=self.taskGroup,
+                                    priority=lambda: self.priority,
+                                    onFinish=configTexture)
 
             # TODO the task is already queued,
             #      but a callback function has been
@@ -846,6 +1635,393 @@ class Texture3D(texture.Texture, notifier.Notifier):
             configTexture()
 
 
+    def __pyramidLevels(self):
+        """Called by :meth:`__refresh`. Returns a list of sub-sampling
+        factors, from coarsest to finest, for the levels of a
+        multi-resolution pyramid which are to be displayed before the full
+        data, or an empty list if the data is not to be displayed
+        progressively.
+        """
+
+        data = self.__data
+
+        if not (self.__pyramid and self.__threaded) or \
+           self.__nvals      >  1                  or \
+           self.__resolution is not None:
+            return []
+
+        return pyramidLevels(data.shape, data.nbytes)
+
+
+    def __havePreparedData(self):
+        """Called by :meth:`__refresh`. Returns ``True`` if the prepared
+        data for the current settings can be retrieved without being
+        re-calculated (see :meth:`getPreparedData` and :mod:`.datacache`),
+        ``False`` otherwise.
+        """
+
+        if self.getPreparedData() is not None:
+            return True
+
+        cache = datacache.getCache()
+        key   = self.__dataCacheKey(cache)
+
+        return key is not None and key in cache
+
+
+    def __preparePyramidLevel(self, factor):
+        """Called by :meth:`__refresh`. Prepares a smoothed and sub-sampled
+        copy of the texture data (calculated by :func:`buildPyramid`), to be
+        displayed while the full data is being prepared.
+
+        :arg factor: Sub-sampling factor
+        """
+
+        data = self.__pyramidData.pop(factor)
+
+        log.debug('Preparing pyramid level for {} (factor {}, shape '
+                  '{})'.format(self.getTextureName(), factor, data.shape))
+
+        data, voxValXform, invVoxValXform = \
+            self.__realPrepareTextureData(data)
+
+        self.__preparedData   = data
+        self.__voxValXform    = voxValXform
+        self.__invVoxValXform = invVoxValXform
+
+
+    def __calculateMemorySize(self):
+        """Called by :meth:`__refresh`. Returns the estimated number of
+        bytes of GPU memory used to store the texture data.
+        """
+
+        halfFmts = (gl.GL_R16F, gl.GL_RGB16F, arbtf.GL_LUMINANCE16F_ARB)
+
+        if   self.__texDtype == gl.GL_UNSIGNED_BYTE:  nbytes = 1
+        elif self.__texDtype == gl.GL_UNSIGNED_SHORT: nbytes = 2
+        elif self.__texIntFmt in halfFmts:            nbytes = 2
+        else:                                         nbytes = 4
+
+        nbytes *= self.__nvals
+
+        if len(self.__bricks) > 0:
+            return sum(nbytes * int(np.prod(b.shape)) for b in self.__bricks)
+        else:
+            return nbytes * int(np.prod(self.__textureShape))
+
+
+    def __configTextureParameters(self):
+        """Called by :meth:`__refresh`. Sets the interpolation and wrapping
+        parameters on the currently bound 3D texture.
+        """
+
+        # set interpolation routine
+        interp = self.__interp
+        if interp is None:
+            interp = gl.GL_NEAREST
+
+        gl.glTexParameteri(gl.GL_TEXTURE_3D,
+                           gl.GL_TEXTURE_MAG_FILTER,
+                           interp)
+        gl.glTexParameteri(gl.GL_TEXTURE_3D,
+                           gl.GL_TEXTURE_MIN_FILTER,
+                           interp)
+
+        # Clamp texture borders to the edge
+        # values - it is the responsibility
+        # of the rendering logic to not draw
+        # anything outside of the image space
+        gl.glTexParameteri(gl.GL_TEXTURE_3D,
+                           gl.GL_TEXTURE_WRAP_S,
+                           gl.GL_CLAMP_TO_EDGE)
+        gl.glTexParameteri(gl.GL_TEXTURE_3D,
+                           gl.GL_TEXTURE_WRAP_T,
+                           gl.GL_CLAMP_TO_EDGE)
+        gl.glTexParameteri(gl.GL_TEXTURE_3D,
+                           gl.GL_TEXTURE_WRAP_R,
+                           gl.GL_CLAMP_TO_EDGE)
+
+
+    def __uploadTextureData(self, data):
+        """Called by :meth:`__refresh`. Copies the given prepared ``data``
+        to the currently bound 3D texture.
+        """
+        self.__allocateTexture(data)
+        for zoff, slab in self.__uploadSlabs(data):
+            self.__uploadSlab(slab, zoff)
+
+
+    def __uploadTextureDataAsync(self, data, onFinish):
+        """Called by :meth:`__refresh`. Allocates storage for the given
+        prepared ``data``, and then copies the data one slab at a time, on
+        successive :func:`.idle.idle` loop iterations. If pixel buffer
+        objects are available, each slab is copied via a PBO.
+
+        If this texture already contains data (which may be being displayed,
+        e.g. a coarse pyramid level, or the previous volume of an image),
+        the new data is copied to a separate staging texture, which replaces
+        this texture (via :meth:`.Texture.swapTextureHandle`) when all of
+        the data has been copied. Until then, this texture keeps its
+        existing storage and contents, so it never contains partially
+        uploaded data. Otherwise (e.g. on the first upload), the data is
+        copied straight into this texture, so that GPU memory is only
+        allocated once.
+
+        The upload is cancelled if :meth:`refresh` or :meth:`destroy` is
+        called before it has completed.
+
+        :arg data:     Prepared texture data
+        :arg onFinish: Function to call when all of the data has been copied.
+        """
+
+        uploadId = self.__uploadId
+        slabs    = self.__uploadSlabs(data)
+        usePbo   = self.canUsePixelBuffers()
+        staged   = self.__populated
+
+        # This texture is bound
+        # by the __refresh method
+        if not staged:
+            target = self
+            self.__allocateTexture(data)
+
+        else:
+            target = texture.Texture(
+                '{}_staging'.format(self.getTextureName()), 3)
+
+            target.bindTexture()
+            self.__configTextureParameters()
+            self.__allocateTexture(data)
+            target.unbindTexture()
+
+            # Unbinding the staging texture
+            # will have clobbered our binding
+            if self.isBound():
+                self.bindTexture()
+
+        if usePbo and self.__pbo is None:
+            self.__pbo = gl.glGenBuffers(1)
+
+        log.debug('Uploading data for {} in {} slabs (PBO: {}, '
+                  'staged: {})'.format(self.getTextureName(),
+                                       len(slabs),
+                                       usePbo,
+                                       staged))
+
+        def upload(i):
+
+            # refresh/destroy has been called
+            if uploadId != self.__uploadId or self.__preparedData is None:
+                if staged:
+                    target.destroy()
+                return
+
+            zoff, slab = slabs[i]
+            bound      = target.isBound()
+
+            if not bound:
+                target.bindTexture()
+
+            if usePbo: pbo = self.__pbo
+            else:      pbo = None
+
+            gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
+            self.__uploadSlab(slab, zoff, pbo)
+
+            if not bound:
+                target.unbindTexture()
+
+            self.__progress = (i + 1) / float(len(slabs))
+
+            if i < len(slabs) - 1:
+                idle.idle(upload, i + 1)
+            else:
+                self.__destroyPixelBuffer()
+                if staged:
+                    self.swapTextureHandle(target)
+                    target.destroy()
+                onFinish()
+
+        idle.idle(upload, 0)
+
+
+    def __allocateTexture(self, data):
+        """Called by :meth:`__uploadTextureData` and
+        :meth:`__uploadTextureDataAsync`. Allocates storage for the given
+        ``data`` on the currently bound 3D texture, without copying any data.
+        """
+
+        # It is assumed that, for textures with more than one
+        # value per voxel (e.g. RGB textures), the data is
+        # arranged accordingly, i.e. with the voxel value
+        # dimension the fastest changing
+        if len(data.shape) == 4: shape = data.shape[1:]
+        else:                    shape = data.shape
+
+        # create the texture according to
+        # the format determined by the
+        # _determineTextureType method.
+        #
+        # note: The ancient Chromium driver (still
+        #       in use by VirtualBox) will improperly
+        #       create 3D textures without two calls
+        #       (to glTexImage3D and glTexSubImage3D).
+        #       If I specify the texture size and set
+        #       the data in a single call, it seems to
+        #       expect that the data or texture
+        #       dimensions always have even size - odd
+        #       sized images will be displayed
+        #       incorrectly.
+        gl.glTexImage3D(gl.GL_TEXTURE_3D,
+                        0,
+                        self.__texIntFmt,
+                        shape[0],
+                        shape[1],
+                        shape[2],
+                        0,
+                        self.__texFmt,
+                        self.__texDtype,
+                        None)
+
+
+    def __uploadSlabs(self, data):
+        """Splits the given prepared ``data`` into slabs along the *z* axis,
+        each of which is approximately :data:`UPLOAD_SIZE` bytes in size.
+        Returns a list of ``(zoffset, slab)`` tuples.
+        """
+
+        nslices    = data.shape[-1]
+        sliceBytes = max(1, data.nbytes // max(1, nslices))
+        slabLen    = max(1, UPLOAD_SIZE // sliceBytes)
+
+        return [(z, data[..., z:z + slabLen])
+                for z in range(0, nslices, slabLen)]
+
+
+    def __uploadSlab(self, slab, zoff, pbo=None):
+        """Copies a slab of prepared data into the currently bound 3D texture,
+        at the given *z* offset.
+
+        :arg slab: Prepared data
+        :arg zoff: Offset along the *z* axis
+        :arg pbo:  Handle to a pixel buffer object to copy the data through.
+                   If not provided, the data is copied directly.
+        """
+
+        if len(slab.shape) == 4: shape = slab.shape[1:]
+        else:                    shape = slab.shape
+
+        # The image data is flattened, with fortran dimension
+        # ordering, so the data, as stored on the GPU, has its
+        # first dimension as the fastest changing. For
+        # fortran-ordered data (e.g. data from a NIFTI image),
+        # a z slab is already contiguous, so this will not
+        # result in a copy.
+        slab = np.ascontiguousarray(slab.reshape(-1, order='F'))
+
+        # PyOpenGL needs the data array
+        # to be writeable, as it uses
+        # PyArray_ISCARRAY to check
+        # for contiguousness. but if the
+        # data has come from a nibabel
+        # ArrayProxy, the writeable flag
+        # will be set to False for some
+        # reason.
+        #
+        # If the data is a view into a read-only
+        # array (e.g. a memory-mapped array from
+        # the DataCache), the flag cannot be
+        # changed, so we have no choice but to
+        # copy it.
+        if not slab.flags.writeable:
+            try:
+                slab.flags.writeable = True
+            except ValueError:
+                slab = np.array(slab)
+
+        if pbo is not None:
+            gl.glBindBuffer(gl.GL_PIXEL_UNPACK_BUFFER, pbo)
+            gl.glBufferData(gl.GL_PIXEL_UNPACK_BUFFER,
+                            slab.nbytes,
+                            slab,
+                            gl.GL_STREAM_DRAW)
+            pixels = ctypes.c_void_p(0)
+        else:
+            pixels = slab
+
+        gl.glTexSubImage3D(gl.GL_TEXTURE_3D,
+                           0, 0, 0, zoff,
+                           shape[0],
+                           shape[1],
+                           shape[2],
+                           self.__texFmt,
+                           self.__texDtype,
+                           pixels)
+
+        if pbo is not None:
+            gl.glBindBuffer(gl.GL_PIXEL_UNPACK_BUFFER, 0)
+
+
+    def __destroyPixelBuffer(self):
+        """Deletes the pixel buffer object used for asynchronous uploads,
+        if one has been created.
+        """
+        if self.__pbo is not None:
+            gl.glDeleteBuffers(1, gltypes.GLuint(self.__pbo))
+            self.__pbo = None
+
+
+    def __configBricks(self, data):
+        """Called by :meth:`__refresh` when the texture data is too large to
+        be stored in a single texture. Splits the data into a set of
+        :class:`TextureBrick` instances (re-using the existing bricks if the
+        brick layout has not changed), and copies the data to each of them.
+        """
+
+        shape  = self.__textureShape
+        layout = calculateBricks(shape,
+                                 self.maxTextureSize(),
+                                 overlap=BRICK_OVERLAP)
+        old    = [(b.offset, b.shape, b.coreOffset, b.coreShape)
+                  for b in self.__bricks]
+
+        if layout != old:
+
+            self.__destroyBricks()
+
+            for i, (offset, bshape, coff, cshape) in enumerate(layout):
+                name  = '{}_brick{}'.format(self.getTextureName(), i)
+                brick = TextureBrick(name, offset, bshape, coff, cshape, shape)
+                self.__bricks.append(brick)
+
+            log.debug('Split {} (shape {}) into {} bricks'.format(
+                self.getTextureName(), shape, len(self.__bricks)))
+
+        for brick in self.__bricks:
+
+            slc = brick.slices
+            if len(data.shape) == 4:
+                slc = (slice(None),) + slc
+
+            brick.bindTexture()
+            self.__configTextureParameters()
+            self.__uploadTextureData(data[slc])
+            brick.unbindTexture()
+
+        # Brick unbinding will have
+        # clobbered our own binding
+        if self.isBound():
+            self.bindTexture()
+
+
+    def __destroyBricks(self):
+        """Destroys all :class:`TextureBrick` instances, if there are any.
+        """
+        for brick in self.__bricks:
+            brick.destroy()
+        self.__bricks = []
+
+
     def __determineTextureType(self):
         """Figures out how the texture data should be stored as an OpenGL 3D
         texture. This method just figures out the data types which should be
@@ -909,15 +2085,18 @@ class Texture3D(texture.Texture, notifier.Notifier):
         dtype                    = self.__data.dtype
         normalise                = self.__normalise
         nvals                    = self.__nvals
-        texDtype, texFmt, intFmt = self.getTextureType(normalise, dtype, nvals)
+        storage                  = self.__storage
+        texDtype, texFmt, intFmt = self.getTextureType(
+            normalise, dtype, nvals, storage)
 
         log.debug('Texture ({}) is to be stored as {}/{}/{} '
-                  '(normalised: {})'.format(
+                  '(normalised: {}, storage: {})'.format(
                       self.getTextureName(),
                       GL_TYPE_NAMES[texDtype],
                       GL_TYPE_NAMES[texFmt],
                       GL_TYPE_NAMES[intFmt],
-                      normalise))
+                      normalise,
+                      storage))
 
         self.__texFmt    = texFmt
         self.__texIntFmt = intFmt
@@ -946,14 +2125,129 @@ class Texture3D(texture.Texture, notifier.Notifier):
         ==================== =============================================
         """
 
-        data, voxValXform, invVoxValXform = self.__realPrepareTextureData(
-            self.__data)
+        cache  = datacache.getCache()
+        cached = self.getPreparedData()
+        key    = None
+
+        if cached is None:
+            key = self.__dataCacheKey(cache)
+
+        if key is not None:
+            cached = cache.get(key)
+
+        if cached is not None:
+            data, voxValXform, invVoxValXform = cached
+
+        else:
+            data, voxValXform, invVoxValXform = \
+                self.__realPrepareTextureData(self.__data)
+
+            # Replace the prepared data with a
+            # memory-mapped copy from the cache,
+            # so it is not kept in memory twice.
+            # There is no point in caching data
+            # which did not need to be prepared.
+            if key is not None and data is not self.__data:
+                data = cache.put(key, data, voxValXform, invVoxValXform)
 
         self.__preparedData   = data
         self.__voxValXform    = voxValXform
         self.__invVoxValXform = invVoxValXform
 
 
+    def __dataCacheKey(self, cache):
+        """Called by :meth:`__prepareTextureData`. Generates a key which
+        identifies the prepared texture data in the given
+        :class:`.DataCache`. Returns ``None`` if the cache is disabled, or if
+        the data cannot be cached.
+
+        The key is derived from the value returned by :meth:`dataCacheKey`,
+        and from all of the settings which affect the prepared data. Data
+        which is passed through a ``prefilter`` function is never cached, as
+        there is no way to identify the function.
+        """
+
+        if cache is None or self.__prefilter is not None:
+            return None
+
+        sourceKey = self.dataCacheKey()
+
+        if sourceKey is None:
+            return None
+
+        return cache.key(tuple(sourceKey),
+                         str(self.__data.dtype),
+                         tuple(self.__data.shape),
+                         *self.preparationSettings())
+
+
+    def preparationSettings(self):
+        """Returns a tuple containing all of the current settings which
+        affect the prepared texture data (see :meth:`prepareData`). This
+        may be used by sub-classes to determine whether previously prepared
+        data is still valid.
+        """
+
+        def floats(vals):
+            if vals is None: return None
+            return tuple(None if v is None else float(v) for v in vals)
+
+        resolution = self.__resolution
+        if resolution is not None:
+            resolution = float(resolution)
+
+        if self.__prefilter is None: prefilter = None
+        else:                        prefilter = (self.__prefilter,
+                                                  self.__prefilterRange)
+
+        return (self.__nvals,
+                bool(self.__normalise),
+                floats(self.__normaliseRange),
+                self.__storage,
+                resolution,
+                floats(self.__scales),
+                prefilter,
+                self.__bricked,
+                self.maxTextureSize(),
+                self.canUseFloatTextures(self.__nvals)[0])
+
+
+    def prepareData(self, data):
+        """Prepares the given ``data`` for use as texture data, according to
+        the current texture settings, without modifying this ``Texture3D``.
+        This may be called from any thread, and may be used by sub-classes
+        to prepare data ahead of time. See :meth:`getPreparedData`.
+
+        :returns: A tuple containing the prepared data, the ``voxValXform``,
+                  and the ``invVoxValXform``.
+        """
+        return self.__realPrepareTextureData(data)
+
+
+    def getPreparedData(self):
+        """Returns previously prepared data for the current texture data and
+        settings, as a tuple of the form returned by :meth:`prepareData`,
+        or ``None`` (the default) if there is no such data. This method is
+        called on the data preparation thread, and may be overridden by
+        sub-classes which prepare data ahead of time (e.g.
+        :class:`.ImageTexture`).
+        """
+        return None
+
+
+    def dataCacheKey(self):
+        """Returns a tuple of values which uniquely identify the source of
+        the current texture data, or ``None`` if the data cannot be
+        identified (the default). If a :class:`.DataCache` has been enabled,
+        and this method returns a value, the prepared texture data will be
+        stored in, and retrieved from, the cache.
+
+        Sub-classes which manage data that is loaded from a file (e.g. the
+        :class:`.ImageTexture`) may override this method.
+        """
+        return None
+
+
     def __realPrepareTextureData(self, data):
         """This method prepares and returns the given ``data``, ready to be
         used as GL texture data.
@@ -997,6 +2291,12 @@ class Texture3D(texture.Texture, notifier.Notifier):
         scales         = self.__scales
         normalise      = self.__normalise
         normaliseRange = self.__normaliseRange
+        storage        = self.__storage
+
+        # Half precision storage is not
+        # possible without float textures
+        if storage == 'half' and not self.canUseFloatTextures()[0]:
+            storage = 'default'
 
         if normalise: dmin, dmax = normaliseRange
         else:         dmin, dmax = 0, 0
@@ -1047,24 +2347,70 @@ class Texture3D(texture.Texture, notifier.Notifier):
         if prefilter is not None:
             data = prefilter(data)
 
+        # If the data is too big to fit into a
+        # single texture, and we are not allowed
+        # to split it into bricks, we have to
+        # sub-sample it.
+        if not self.__bricked and self.exceedsMaxSize(data.shape[-3:]):
+            data = self.__subsampleToFit(data)
+
+        # The data is normalised/cast slab-by-slab
+        # (see the processSlabs function), into
+        # a pre-allocated output array.
+        #
         # TODO if FLOAT_TEXTURES, you should
         #      save normalised values as float32
         if normalise:
 
-            log.debug('Normalising to range {} - {}'.format(dmin, dmax))
-
-            if dmax != dmin:
-                data = np.clip((data - dmin) / float(dmax - dmin), 0, 1)
-
-            data = np.round(data * 65535)
-            data = np.array(data, dtype=np.uint16)
-
-        elif dtype == np.uint8:  pass
-        elif dtype == np.int8:   data = np.array(data + 128,   dtype=np.uint8)
-        elif dtype == np.uint16: pass
-        elif dtype == np.int16:  data = np.array(data + 32768, dtype=np.uint16)
+            log.debug('Normalising to range {} - {} (storage: {})'.format(
+                dmin, dmax, storage))
+
+            # Normalised data is scaled to the full
+            # range of the output integer type, or
+            # left in the range [0, 1] for half
+            # precision float storage (the data is
+            # converted to half precision by GL).
+            if   storage == 'byte': outDtype, outMax = np.uint8,   255
+            elif storage == 'half': outDtype, outMax = np.float32, None
+            else:                   outDtype, outMax = np.uint16,  65535
+
+            def prepare(src, dst):
+                src = np.array(src, dtype=np.float64)
+                if dmax != dmin:
+                    src -= dmin
+                    src /= float(dmax - dmin)
+                    np.clip(src, 0, 1, out=src)
+                if outMax is not None:
+                    src *= outMax
+                    np.round(src, out=src)
+                dst[:] = src
+
+        elif dtype == np.uint8:
+            prepare = None
+        elif dtype == np.int8:
+            prepare  = self.__offset(128)
+            outDtype = np.uint8
+        elif dtype == np.uint16:
+            prepare = None
+        elif dtype == np.int16:
+            prepare  = self.__offset(32768)
+            outDtype = np.uint16
         elif floatTextures and data.dtype != np.float32:
-            data = np.array(data, dtype=np.float32)
+            prepare  = self.__offset(0)
+            outDtype = np.float32
+        else:
+            prepare = None
+
+        # The output is stored in the same order
+        # as the input, so that each slab is
+        # contiguous in both. For NIFTI images
+        # this will be fortran order, which is
+        # the order in which it is copied to
+        # the GPU.
+        if prepare is not None:
+            out = np.empty(data.shape, dtype=outDtype, order=slabOrder(data))
+            processSlabs(prepare, data, out)
+            data = out
 
         log.debug('Data preparation for {} complete [dtype={}, '
                   'scale={}, offset={}, dmin={}, dmax={}].'.format(
@@ -1076,3 +2422,38 @@ class Texture3D(texture.Texture, notifier.Notifier):
                       dmax))
 
         return data, voxValXform, invVoxValXform
+
+
+    @staticmethod
+    def __offset(offset):
+        """Called by :meth:`__realPrepareTextureData`. Returns a function
+        which may be passed to :func:`processSlabs`, to add the given
+        ``offset`` to the data, and cast it to the output data type.
+        """
+        offset = np.int32(offset)
+
+        def prepare(src, dst):
+            np.add(src, offset, out=dst, casting='unsafe')
+        return prepare
+
+
+    def __subsampleToFit(self, data):
+        """Called by :meth:`__realPrepareTextureData`. Sub-samples the given
+        data so that it fits within the limit given by
+        :meth:`maxTextureSize`. The last three dimensions of ``data`` are
+        assumed to be the spatial dimensions.
+        """
+
+        maxSize = self.maxTextureSize()
+        shape   = data.shape[-3:]
+        steps   = [int(np.ceil(s / float(maxSize))) for s in shape]
+        slc     = [slice(None)] * (data.ndim - 3)
+        slc    += [slice(None, None, st) for st in steps]
+        data    = data[tuple(slc)]
+
+        log.warning('Data for {} (shape {}) is larger than the maximum '
+                    'texture size ({}) - sub-sampling to {}'.format(
+                        self.getTextureName(), shape, maxSize,
+                        data.shape[-3:]))
+
+        return data
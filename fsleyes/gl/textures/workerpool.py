@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+#
+# workerpool.py - Shared pool of threads for preparing texture data.
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+"""This module provides the :class:`WorkerPool` class, a pool of threads
+which is shared by all :class:`.Texture3D` instances, and used to prepare
+texture data in the background.
+
+Rather than every ``Texture3D`` creating its own :class:`.idle.TaskThread`
+(so that a session with many overlays would have many threads all competing
+with each other), the ``WorkerPool`` uses a small, fixed number of threads,
+and has the following features:
+
+  - Tasks are given a *priority* - when a thread becomes free, the queued
+    task with the highest priority is run next. Priorities may be specified
+    as functions, which are evaluated when the next task is chosen, so
+    that a task's priority can change after it has been queued (e.g. when
+    the user selects a different overlay).
+
+  - Tasks are identified by name - a task which is enqueued with the same
+    name as an already queued task replaces that task, and queued tasks
+    can be cancelled via :meth:`WorkerPool.dequeue` and
+    :meth:`WorkerPool.dequeueGroup`.
+
+  - Tasks belong to a *group* (e.g. all of the tasks for one texture), and
+    at most one task from each group is run at a time.
+
+The ``WorkerPool`` has the same interface as the :class:`.idle.TaskThread`
+(plus the ``priority`` and ``group`` options), and honours the
+:class:`.idle.TaskThreadVeto` exception. The shared ``WorkerPool`` is
+accessed via the :func:`getPool` function::
+
+    import fsleyes.gl.textures.workerpool as workerpool
+
+    pool = workerpool.getPool()
+    pool.enqueue(prepareData,
+                 taskName='texture1_refresh',
+                 group='texture1',
+                 priority=1,
+                 onFinish=uploadData)
+"""
+
+
+import itertools
+import threading
+import logging
+import multiprocessing
+
+import fsl.utils.idle as idle
+
+
+log = logging.getLogger(__name__)
+
+
+NUM_WORKERS = None
+"""Number of threads in the shared :class:`WorkerPool`. If ``None``, the
+number of available CPU cores is used, up to a maximum of ``4``. Must be
+set before the pool is first used (see :func:`getPool`).
+"""
+
+
+def getPool():
+    """Returns the shared :class:`WorkerPool`, creating it if necessary. """
+
+    global _pool
+
+    if _pool is None:
+        nworkers = NUM_WORKERS
+        if nworkers is None:
+            nworkers = min(4, multiprocessing.cpu_count())
+        _pool = WorkerPool(nworkers)
+
+    return _pool
+
+
+class Task(object):
+    """Container object used by the :class:`WorkerPool` to store information
+    about a queued task.
+    """
+
+    def __init__(self, name, group, priority, seq, func, onFinish, args,
+                 kwargs):
+        self.name     = name
+        self.group    = group
+        self.priority = priority
+        self.seq      = seq
+        self.func     = func
+        self.onFinish = onFinish
+        self.args     = args
+        self.kwargs   = kwargs
+
+
+    def currentPriority(self):
+        """Returns the current priority of this task. """
+        if callable(self.priority): return self.priority()
+        else:                       return self.priority
+
+
+class WorkerPool(object):
+    """A pool of threads which run queued tasks according to their priority.
+    See the module documentation for details. Worker threads are started
+    when the first task is enqueued.
+    """
+
+
+    def __init__(self, nworkers):
+        """Create a ``WorkerPool``.
+
+        :arg nworkers: Number of worker threads.
+        """
+
+        self.__nworkers = max(1, nworkers)
+        self.__cond     = threading.Condition()
+        self.__queued   = {}
+        self.__running  = set()
+        self.__threads  = []
+        self.__seq      = itertools.count()
+        self.__stop     = False
+
+        log.debug('Texture worker pool: {} threads'.format(self.__nworkers))
+
+
+    @property
+    def nworkers(self):
+        """Returns the number of worker threads. """
+        return self.__nworkers
+
+
+    def enqueue(self, func, *args, **kwargs):
+        """Enqueue a task to be executed.
+
+        :arg func:     The task function.
+
+        :arg taskName: Task name. Must be specified as a keyword argument.
+                       If a task with the same name is already queued (but
+                       not running), it is replaced.
+
+        :arg group:    Task group. Must be specified as a keyword argument.
+                       At most one task from each group is run at any one
+                       time. Defaults to ``taskName``.
+
+        :arg priority: Task priority - a number, or a function which returns
+                       a number. Tasks with a higher priority are run first,
+                       and tasks with equal priority are run in the order
+                       that they were enqueued. Must be specified as a
+                       keyword argument. Defaults to ``0``.
+
+        :arg onFinish: An optional function to be called (via
+                       :func:`.idle.idle`) when the task function has
+                       finished. Must be provided as a keyword argument. If
+                       the ``func`` raises a :class:`.idle.TaskThreadVeto`
+                       error, this function will not be called.
+
+        All other arguments are passed through to the task function when it is
+        executed.
+        """
+
+        name     = kwargs.pop('taskName')
+        group    = kwargs.pop('group',    name)
+        priority = kwargs.pop('priority', 0)
+        onFinish = kwargs.pop('onFinish', None)
+
+        log.debug('Enqueueing task: {} (group: {})'.format(name, group))
+
+        with self.__cond:
+            task = Task(name, group, priority, next(self.__seq),
+                        func, onFinish, args, kwargs)
+            self.__queued[name] = task
+            self.__startWorkers()
+            self.__cond.notify_all()
+
+
+    def isQueued(self, name):
+        """Returns ``True`` if a task with the given name is queued (and
+        not running), ``False`` otherwise.
+        """
+        with self.__cond:
+            return name in self.__queued
+
+
+    def dequeue(self, name):
+        """Cancels the queued task with the given name, if there is one.
+        Tasks which are already running are not affected.
+        """
+        with self.__cond:
+            if self.__queued.pop(name, None) is not None:
+                log.debug('Dequeued task: {}'.format(name))
+
+
+    def dequeueGroup(self, group):
+        """Cancels all queued tasks in the given group. """
+        with self.__cond:
+            for name, task in list(self.__queued.items()):
+                if task.group == group:
+                    self.__queued.pop(name)
+
+
+    def stop(self):
+        """Stops all worker threads after any currently running tasks have
+        completed. Any queued tasks are discarded.
+        """
+        with self.__cond:
+            self.__stop   = True
+            self.__queued = {}
+            self.__cond.notify_all()
+
+
+    def waitUntilIdle(self):
+        """Causes the calling thread to block until there are no queued or
+        running tasks.
+        """
+        with self.__cond:
+            while len(self.__queued) > 0 or len(self.__running) > 0:
+                self.__cond.wait()
+
+
+    def __startWorkers(self):
+        """Starts the worker threads, if they have not already been started.
+        Must be called with the lock held.
+        """
+        while len(self.__threads) < self.__nworkers:
+            thread = threading.Thread(
+                target=self.__run,
+                name='TextureWorker{}'.format(len(self.__threads)))
+            thread.daemon = True
+            thread.start()
+            self.__threads.append(thread)
+
+
+    def __nextTask(self):
+        """Returns the queued task which should be run next, or ``None`` if
+        there are no tasks which can be run. Must be called with the lock
+        held.
+        """
+
+        best    = None
+        bestKey = None
+
+        for task in self.__queued.values():
+
+            if task.group in self.__running:
+                continue
+
+            key = (task.currentPriority(), -task.seq)
+
+            if best is None or key > bestKey:
+                best    = task
+                bestKey = key
+
+        return best
+
+
+    def __run(self):
+        """Run by each worker thread. Repeatedly waits for a task to be
+        available, and runs it.
+        """
+
+        while True:
+
+            with self.__cond:
+
+                task = None
+
+                while not self.__stop:
+                    task = self.__nextTask()
+                    if task is not None:
+                        break
+                    self.__cond.wait()
+
+                if self.__stop:
+                    break
+
+                self.__queued.pop(task.name)
+                self.__running.add(task.group)
+
+            log.debug('Running task: {}'.format(task.name))
+
+            try:
+                task.func(*task.args, **task.kwargs)
+
+                if task.onFinish is not None:
+                    idle.idle(task.onFinish)
+
+            # If the task raises a TaskThreadVeto error,
+            # we just have to skip the onFinish handler
+            except idle.TaskThreadVeto:
+                log.debug('Task completed (vetoed onFinish): '
+                          '{}'.format(task.name))
+
+            except Exception as e:
+                log.warning('Task crashed: {}: {}: {}'.format(
+                    task.name, type(e).__name__, str(e)), exc_info=True)
+
+            finally:
+                with self.__cond:
+                    self.__running.discard(task.group)
+                    self.__cond.notify_all()
+
+                # Clear the reference to the task,
+                # so that objects referred to by the
+                # task function can be GC'd.
+                task = None
+
+
+_pool = None
+"""The shared :class:`WorkerPool`. Use the :func:`getPool` function instead
+of accessing this directly.
+"""
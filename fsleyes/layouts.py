@@ -475,6 +475,8 @@ def deserialiseLayout(layout):
         PowerSpectrumControlPanel
     from fsleyes.controls.powerspectrumtoolbar       import \
         PowerSpectrumToolBar
+    from fsleyes.controls.renderprofilepanel         import \
+        RenderProfilePanel
     from fsleyes.controls.scene3dtoolbar             import Scene3DToolBar
     from fsleyes.controls.timeseriescontrolpanel     import \
         TimeSeriesControlPanel
@@ -511,6 +513,7 @@ def deserialiseLayout(layout):
         'PlotToolBar'                : PlotToolBar,
         'PowerSpectrumControlPanel'  : PowerSpectrumControlPanel,
         'PowerSpectrumToolBar'       : PowerSpectrumToolBar,
+        'RenderProfilePanel'         : RenderProfilePanel,
         'Scene3DToolBar'             : Scene3DToolBar,
         'TimeSeriesControlPanel'     : TimeSeriesControlPanel,
         'TimeSeriesToolBar'          : TimeSeriesToolBar,
@@ -416,6 +416,11 @@ OPTIONS = td.TypeDict({
                        'standard1mm',
                        'initialDisplayRange',
                        'bigmem',
+                       'textureCache',
+                       'textureCacheSize',
+                       'prefetchVolumes',
+                       'gpuMemory',
+                       'prerenderMemory',
                        'bumMode',
                        'fontSize',
                        'notebook',
@@ -504,7 +509,8 @@ OPTIONS = td.TypeDict({
                         'cmapResolution',
                         'interpolation',
                         'interpolateCmaps',
-                        'invert'],
+                        'invert',
+                        'textureStorage'],
     'Volume3DOpts'   : ['numSteps',
                         'blendFactor',
                         'smoothing',
@@ -728,6 +734,11 @@ ARGUMENTS = td.TypeDict({
     'Main.standard1mm'         : ('std1mm', 'standard1mm',         False),
     'Main.initialDisplayRange' : ('idr',    'initialDisplayRange', True),
     'Main.bigmem'              : ('b',      'bigmem',              False),
+    'Main.textureCache'        : ('tc',     'textureCache',        True),
+    'Main.textureCacheSize'    : ('tcs',    'textureCacheSize',    True),
+    'Main.prefetchVolumes'     : ('pv',     'prefetchVolumes',     True),
+    'Main.gpuMemory'           : ('gm',     'gpuMemory',           True),
+    'Main.prerenderMemory'     : ('prm',    'prerenderMemory',     True),
     'Main.bumMode'             : ('bums',   'bumMode',             False),
     'Main.fontSize'            : ('fs',     'fontSize',            True),
     'Main.notebook'            : ('nb',     'notebook',            False),
@@ -802,6 +813,7 @@ ARGUMENTS = td.TypeDict({
     'VolumeOpts.overrideDataRange' : ('or',  'overrideDataRange', True),
     'VolumeOpts.clipImage'         : ('cl',  'clipImage',         True),
     'VolumeOpts.interpolation'     : ('in',  'interpolation',     True),
+    'VolumeOpts.textureStorage'    : ('ts',  'textureStorage',    True),
 
     'Volume3DOpts.numSteps'      : ('ns',  'numSteps',      True),
     'Volume3DOpts.blendFactor'   : ('bf',  'blendFactor',   True),
@@ -939,6 +951,25 @@ HELP = td.TypeDict({
 
     'Main.bigmem'           : 'Load all images into memory, '
                               'regardless of size.',
+    'Main.textureCache'     : 'Cache prepared image texture data in the '
+                              'given directory, so that large images can be '
+                              're-displayed more quickly (default '
+                              'directory: FSLeyes settings directory).',
+    'Main.textureCacheSize' : 'Maximum size of the texture data cache, '
+                              'in megabytes (default: 4096). Implies '
+                              '--textureCache.',
+    'Main.prefetchVolumes'  : 'Number of volumes adjacent to the current '
+                              'volume of 4D images to prepare in advance, '
+                              'for smoother movie playback (default: 0).',
+    'Main.gpuMemory'        : 'Limit the amount of GPU memory, in megabytes, '
+                              'used by image textures - textures for '
+                              'overlays which are not visible are released '
+                              'when this limit is exceeded (default: no '
+                              'limit).',
+    'Main.prerenderMemory'  : 'Limit the amount of GPU memory, in megabytes, '
+                              'used by the pre-rendered slices of each '
+                              'overlay, when the "prerender" performance '
+                              'setting is used (default: 256).',
     'Main.bumMode'          : 'Make the coronal icon look like a bum',
     'Main.fontSize'         : 'Application font size',
     'Main.notebook'         : 'Start the Jupyter notebook server',
@@ -1040,6 +1071,9 @@ HELP = td.TypeDict({
     'VolumeOpts.clipImage'         : 'Image containing clipping values '
                                      '(defaults to the image itself)' ,
     'VolumeOpts.interpolation'     : 'Interpolation',
+    'VolumeOpts.textureStorage'    : 'Texture storage precision - '
+                                     'reduced precision storage uses less '
+                                     'GPU memory',
 
     'Volume3DOpts.numSteps' :
     '3D only. Maximum number of samples per pixel',
@@ -1625,6 +1659,27 @@ def _configMainParser(mainParser):
     mainParser.add_argument(*mainArgs['bigmem'],
                             action='store_true',
                             help=mainHelp['bigmem'])
+    mainParser.add_argument(*mainArgs['textureCache'],
+                            metavar='DIR',
+                            nargs='?',
+                            const='',
+                            help=mainHelp['textureCache'])
+    mainParser.add_argument(*mainArgs['textureCacheSize'],
+                            metavar='MB',
+                            type=int,
+                            help=mainHelp['textureCacheSize'])
+    mainParser.add_argument(*mainArgs['prefetchVolumes'],
+                            metavar='N',
+                            type=int,
+                            help=mainHelp['prefetchVolumes'])
+    mainParser.add_argument(*mainArgs['gpuMemory'],
+                            metavar='MB',
+                            type=int,
+                            help=mainHelp['gpuMemory'])
+    mainParser.add_argument(*mainArgs['prerenderMemory'],
+                            metavar='MB',
+                            type=int,
+                            help=mainHelp['prerenderMemory'])
     mainParser.add_argument(*mainArgs['bumMode'],
                             action='store_true',
                             help=mainHelp['bumMode'])
@@ -2386,6 +2441,30 @@ def applyMainArgs(args, overlayList, displayCtx):
     if args.bigmem is not None:
         displayCtx.loadInMemory = args.bigmem
 
+    # --textureCacheSize implies --textureCache
+    if args.textureCache is not None or args.textureCacheSize is not None:
+        import fsleyes.gl.textures.datacache as datacache
+
+        cachedir = args.textureCache or None
+        maxSize  = args.textureCacheSize
+
+        if maxSize is not None:
+            maxSize = maxSize * 1024 * 1024
+
+        datacache.enable(cachedir, maxSize)
+
+    if args.prefetchVolumes is not None:
+        import fsleyes.gl.textures.imagetexture as imagetexture
+        imagetexture.PREFETCH_VOLUMES = max(0, args.prefetchVolumes)
+
+    if args.gpuMemory is not None:
+        import fsleyes.gl.resources as glresources
+        glresources.setBudget(args.gpuMemory * 1024 * 1024)
+
+    if args.prerenderMemory is not None:
+        import fsleyes.gl.textures.rendertexturestack as rts
+        rts.MAX_MEMORY = args.prerenderMemory * 1024 * 1024
+
     if args.neuroOrientation is not None:
         displayCtx.radioOrientation = not args.neuroOrientation
 
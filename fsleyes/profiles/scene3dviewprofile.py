@@ -38,8 +38,22 @@ class Scene3DViewProfile(profiles.Profile):
     ``pick``   Clicking changes the :attr:`.DisplayContext.vertexIndex`
                or :attr:`.DisplayContext.location`
     ========== ========================================================
+
+
+    While the user is rotating, panning, or zooming, the scene is drawn at a
+    reduced level of detail, so that the canvas remains responsive (see
+    :meth:`.Scene3DCanvas.beginInteraction`). The scene is re-drawn at full
+    quality when the mouse is released, or :attr:`ZOOM_SETTLE_TIME` seconds
+    after the last mouse wheel event.
+    """
+
+
+    ZOOM_SETTLE_TIME = 0.25
+    """Time, in seconds, after the most recent mouse wheel event, at which the
+    scene is re-drawn at full quality.
     """
 
+
     def __init__(self,
                  viewPanel,
                  overlayList,
@@ -57,6 +71,7 @@ class Scene3DViewProfile(profiles.Profile):
         self.__rotateMousePos = None
         self.__panMousePos    = None
         self.__panCanvasPos   = None
+        self.__zoomCount      = 0
 
 
     def getEventTargets(self):
@@ -88,6 +103,7 @@ class Scene3DViewProfile(profiles.Profile):
         self.__rotateMousePos = mousePos
         self.__baseXform      = canvas.opts.rotation
         self.__lastRot        = np.eye(3)
+        canvas.beginInteraction()
 
 
     def _rotateModeLeftMouseDrag(self, ev, canvas, mousePos, canvasPos):
@@ -130,6 +146,7 @@ class Scene3DViewProfile(profiles.Profile):
         handlers.
         """
         self.__rotateMousePos = None
+        canvas.endInteraction()
 
 
     def _zoomModeMouseWheel(self, ev, canvas, wheel, mousePos, canvasPos):
@@ -146,9 +163,23 @@ class Scene3DViewProfile(profiles.Profile):
             if   wheel > 0: opts.zoom += 0.1 * opts.zoom
             elif wheel < 0: opts.zoom -= 0.1 * opts.zoom
 
+        # Draw at full quality once the
+        # user has stopped zooming - only
+        # the most recent wheel event
+        # ends the interaction.
+        self.__zoomCount += 1
+        zoomCount         = self.__zoomCount
+
+        def settle():
+            if zoomCount == self.__zoomCount:
+                canvas.endInteraction()
+
+        canvas.beginInteraction()
+
         # See comment in OrthoViewProfile._zoomModeMouseWheel
         # for the reason why we do this asynchronously.
         idle.idle(update, timeout=0.1)
+        idle.idle(settle, after=self.ZOOM_SETTLE_TIME)
 
 
     def _panModeLeftMouseDown(self, ev, canvas, mousePos, canvasPos):
@@ -163,6 +194,7 @@ class Scene3DViewProfile(profiles.Profile):
 
         self.__panMousePos    = (x, y)
         self.__panStartOffset = canvas.opts.offset[:]
+        canvas.beginInteraction()
 
 
     def _panModeLeftMouseDrag(self, ev, canvas, mousePos, canvasPos):
@@ -187,6 +219,7 @@ class Scene3DViewProfile(profiles.Profile):
         internal state used by the down and drag handlers.
         """
         self.__panMousePos  = None
+        canvas.endInteraction()
 
 
     def _pickModeLeftMouseDown(self, ev, canvas, mousePos, canvasPos):
@@ -6,14 +6,31 @@
 #
 """The ``render`` module is a program which provides off-screen rendering
 capability for scenes which can otherwise be displayed via *FSLeyes*.
+
+As well as rendering a single scene, ``render`` can be used to render a
+large number of scenes in one invocation, via the ``--batch`` option - see
+the :func:`batch` function.
+
+Scenes can also be rendered from Python code, straight into a ``numpy``
+array, via the :class:`Renderer` class.
+
+If the ``--profile-render`` option is specified, the time taken by each
+overlay to draw itself is recorded (see the :mod:`.gl.profiler` module),
+and printed once rendering is complete. In ``--batch`` mode, only jobs
+which are rendered in the main process (i.e. ``--jobs 1``) are profiled.
 """
 
 
 import os.path as op
 import            sys
+import            json
+import            time
+import            shlex
 import            logging
 import            textwrap
+import            multiprocessing
 
+import six
 import numpy as np
 
 import fsleyes_widgets.utils.layout          as fsllayout
@@ -30,7 +47,10 @@ import fsleyes.displaycontext.lightboxopts   as lightboxopts
 import fsleyes.displaycontext.scene3dopts    as scene3dopts
 import fsleyes.controls.colourbar            as cbar
 import fsleyes.gl                            as fslgl
+import fsleyes.gl.resources                  as glresources
+import fsleyes.gl.profiler                   as glprofiler
 import fsleyes.gl.ortholabels                as ortholabels
+import fsleyes.gl.shaders.glsl.program       as glslprogram
 import fsleyes.gl.offscreenslicecanvas       as slicecanvas
 import fsleyes.gl.offscreenlightboxcanvas    as lightboxcanvas
 import fsleyes.gl.offscreenscene3dcanvas     as scene3dcanvas
@@ -44,20 +64,35 @@ def main(args=None):
 
     Creates and renders an OpenGL scene, and saves it to a file, according
     to the specified command line arguments (which default to
-    ``sys.argv[1:]``).
+    ``sys.argv[1:]``). If the ``--batch`` option is specified, all of the
+    scenes in the specified manifest file are rendered - see :func:`batch`.
     """
 
     if args is None:
         args = sys.argv[1:]
 
-    # Create a GL context
-    fslgl.getGLContext(offscreen=True, createApp=True)
+    if '--profile-render' in args:
+        glprofiler.enable()
 
-    # Initialise FSLeyes and implement hacks
-    fsleyes.initialise()
+    # Batch mode - all other arguments
+    # are applied to every job in the
+    # manifest file. The batch function
+    # takes care of GL initialisation,
+    # as it may need to create worker
+    # processes first.
+    if '--batch' in args:
 
-    # Initialise colour maps module
-    fslcm.init()
+        manifest, njobs, args = parseBatchArgs(args)
+        failed                = batch(manifest, args, njobs)
+
+        if glprofiler.enabled():
+            print(glprofiler.report())
+
+        if len(failed) > 0:
+            sys.exit(1)
+        return
+
+    _initialise()
 
     # Parse arguments, and
     # configure logging/debugging
@@ -70,9 +105,20 @@ def main(args=None):
     # Create a description of the scene
     overlayList, displayCtx, sceneOpts = makeDisplayContext(namespace)
 
+    # Render that scene, and save it to file
+    renderToFile(namespace, overlayList, displayCtx, sceneOpts)
+
+    if glprofiler.enabled():
+        print(glprofiler.report())
+
+
+def renderToFile(namespace, overlayList, displayCtx, sceneOpts):
+    """Renders the scene (see :func:`render`), crops it if requested, and
+    saves it to the output file specified in the ``namespace``.
+    """
+
     import matplotlib.image as mplimg
 
-    # Render that scene, and save it to file
     bitmap, bg = render(namespace, overlayList, displayCtx, sceneOpts)
 
     if namespace.crop is not None:
@@ -80,6 +126,587 @@ def main(args=None):
     mplimg.imsave(namespace.outfile, bitmap)
 
 
+def batch(manifest, args=None, njobs=1):
+    """Renders every job in the given manifest file.
+
+    The manifest is a JSON file containing a list of jobs. Each job is either
+    a list of ``render`` command line arguments, or a string containing
+    those arguments, e.g.::
+
+        [
+          ["-of", "sub01.png", "sub01/T1.nii.gz", "sub01/seg.nii.gz"],
+          "-of sub02.png sub02/T1.nii.gz sub02/seg.nii.gz"
+        ]
+
+    The jobs are rendered by a :class:`BatchRenderer`, which re-uses a single
+    GL context, and as much other GL state as possible, between jobs. If
+    ``njobs`` is greater than ``1``, the jobs are shared between ``njobs``
+    worker processes, each of which has its own GL context (with OSMesa, if
+    no display is available) and ``BatchRenderer``. Jobs are handed out one
+    at a time, to whichever worker is free, so the load is balanced even if
+    some jobs take longer than others.
+
+    A failed job does not stop the remaining jobs from being rendered. If a
+    worker process dies, however, all jobs which have not yet been rendered
+    are marked as failed. Once all jobs have been rendered, the number of
+    rendered images per second, and a list of failed jobs, are printed.
+
+    :arg manifest: Path to the manifest file.
+
+    :arg args:     Command line arguments which are applied to every job.
+                   These are inserted before the arguments for each job,
+                   so may only contain scene options, not overlays. The
+                   ``--glversion`` of the first job is used for all jobs.
+
+    :arg njobs:    Number of worker processes. If ``1`` (the default),
+                   all jobs are rendered in this process. If ``0``, one
+                   worker process is created for each CPU core.
+
+    :returns:      A list containing the indices of all failed jobs.
+    """
+
+    with open(manifest, 'rt') as f:
+        jobs = json.load(f)
+
+    for i, job in enumerate(jobs):
+        if isinstance(job, six.string_types): jobs[i] = shlex.split(job)
+        else:                                 jobs[i] = [str(a) for a in job]
+
+    if njobs == 0:
+        njobs = multiprocessing.cpu_count()
+
+    # Worker processes are managed with
+    # concurrent.futures, which is not
+    # available in python 2
+    if njobs > 1 and six.PY2:
+        log.warning('Multiple processes are not supported '
+                    'under Python 2 - using one process')
+        njobs = 1
+
+    njobs  = max(1, min(njobs, len(jobs)))
+    jobs   = list(enumerate(jobs))
+    errors = {}
+    start  = time.time()
+
+    # Render everything in this process
+    if njobs == 1:
+        _initialise()
+        renderer = BatchRenderer(args)
+        try:
+            for i, job in jobs:
+                errors[i] = _renderBatchJob(renderer, i, job)
+        finally:
+            renderer.destroy()
+
+    # Create a pool of worker processes.
+    # GL state cannot be shared with, or
+    # copied into, child processes, so we
+    # start fresh processes where possible,
+    # in case a GL context has already been
+    # created in this process. A
+    # ProcessPoolExecutor is used, rather
+    # than a multiprocessing.Pool, because
+    # if a worker process dies (e.g. the GL
+    # driver segfaults), the executor fails
+    # all outstanding jobs, whereas a Pool
+    # would wait forever for the lost job.
+    else:
+        import concurrent.futures         as futures
+        import concurrent.futures.process as fprocess
+
+        kwargs = {}
+        if sys.version_info >= (3, 7):
+            kwargs['mp_context'] = multiprocessing.get_context('spawn')
+
+        pool = futures.ProcessPoolExecutor(njobs, **kwargs)
+        try:
+            submitted = {pool.submit(_runBatchWorker, args, job) : job[0]
+                         for job in jobs}
+
+            for future in futures.as_completed(submitted):
+                i = submitted[future]
+                try:
+                    errors[i] = future.result()[1]
+                except fprocess.BrokenProcessPool as e:
+                    errors[i] = 'A worker process died: {}'.format(e)
+                except Exception as e:
+                    errors[i] = '{}: {}'.format(type(e).__name__, str(e))
+        finally:
+            pool.shutdown()
+
+    elapsed = time.time() - start
+    failed  = sorted([i for i, e in errors.items() if e is not None])
+    nimgs   = len(jobs) - len(failed)
+
+    print('Rendered {} images in {:0.2f} seconds ({:0.2f} images/second, '
+          '{} processes, {} failed)'.format(
+              nimgs, elapsed, nimgs / max(elapsed, 1e-6), njobs,
+              len(failed)))
+
+    for i in failed:
+        print('Job {} failed ({}): {}'.format(
+            i, ' '.join(jobs[i][1]), errors[i]))
+
+    return failed
+
+
+def _initialise():
+    """Used by :func:`main`, :func:`batch`, and the :class:`Renderer`.
+    Creates a GL context, and initialises FSLeyes. Does nothing if this
+    has already been done.
+    """
+
+    global _initialised
+
+    if _initialised:
+        return
+
+    _initialised = True
+
+    # Create a GL context
+    fslgl.getGLContext(offscreen=True, createApp=True)
+
+    # Initialise FSLeyes and implement hacks
+    fsleyes.initialise()
+
+    # Initialise colour maps module
+    fslcm.init()
+
+
+_initialised = False
+"""Set to ``True`` by :func:`_initialise`. """
+
+
+def _renderBatchJob(renderer, i, job):
+    """Used by :func:`batch`. Renders the given job with the given
+    :class:`BatchRenderer`. Returns ``None`` if the job was successfully
+    rendered, or an error message if it failed.
+    """
+    try:
+        renderer.render(job)
+        log.info('Rendered job {}'.format(i))
+        return None
+
+    except Exception as e:
+        log.error('Job {} ({}) failed: {}'.format(
+            i, ' '.join(job), e), exc_info=True)
+        return '{}: {}'.format(type(e).__name__, str(e))
+
+
+_batchRenderer = None
+"""The :class:`BatchRenderer` used by a worker process created by the
+:func:`batch` function.
+"""
+
+
+def _runBatchWorker(args, job):
+    """Called in a worker process created by :func:`batch`, to render one
+    job. The ``job`` is a tuple containing the job index and arguments.
+    Returns a tuple containing the job index, and the result of
+    :func:`_renderBatchJob`.
+
+    The first time that this function is called in a worker process, a GL
+    context and a :class:`BatchRenderer` are created.
+
+    :arg args: Command line arguments which are applied to every job.
+    :arg job:  Tuple containing the job index and arguments.
+    """
+    global _batchRenderer
+
+    if _batchRenderer is None:
+        _initialise()
+        _batchRenderer = BatchRenderer(args)
+
+    i, job = job
+    return i, _renderBatchJob(_batchRenderer, i, job)
+
+
+class Renderer(object):
+    """The ``Renderer`` is the library interface to off-screen rendering. It
+    renders a scene, described by an :class:`.OverlayList`,
+    :class:`.DisplayContext` and :class:`.SceneOpts`, and returns it as a
+    ``numpy`` RGBA bitmap, without touching the file system. For example::
+
+        import fsleyes.render as fslrender
+        from fsl.data.image import Image
+
+        renderer = fslrender.Renderer()
+        overlayList, displayCtx, sceneOpts = renderer.createScene('ortho')
+
+        for fname in ['sub01.nii.gz', 'sub02.nii.gz']:
+            overlayList[:] = [Image(fname)]
+            bitmap = renderer.render(overlayList,
+                                     displayCtx,
+                                     sceneOpts,
+                                     size=(800, 600))
+            # ... do something with the bitmap
+
+        displayCtx.destroy()
+        displayCtx.masterDisplayCtx.destroy()
+        renderer.destroy()
+
+    A ``Renderer`` keeps its GL context and GL state between calls to
+    :meth:`render`, so repeated calls avoid most of the set-up cost of
+    rendering a scene:
+
+      - Compiled shader programs are re-used (see
+        :data:`.glsl.program.RECYCLE_PROGRAMS`).
+
+      - The GL textures for an overlay are re-used (see
+        :func:`.resources.setRetain`), as long as the overlay's
+        :class:`.Display` and :class:`.DisplayOpts` settings have not
+        changed since the previous call. The textures for other overlays
+        are destroyed.
+
+    The :meth:`destroy` method must be called when the ``Renderer`` is no
+    longer needed. Only one ``Renderer`` may exist at any one time.
+    """
+
+
+    def __init__(self, glversion=None):
+        """Create a ``Renderer``. A GL context is created if necessary.
+
+        :arg glversion: A tuple containing the desired (major, minor) OpenGL
+                        version. If ``None``, the best available version is
+                        used. Ignored if FSLeyes has already been
+                        bootstrapped (see :func:`.gl.bootstrap`).
+        """
+
+        _initialise()
+        fslgl.bootstrap(glversion)
+
+        self.__prevSigs = {}
+
+        glresources.setRetain(True)
+        glslprogram.RECYCLE_PROGRAMS = True
+
+
+    def destroy(self):
+        """Must be called when this ``Renderer`` is no longer needed.
+        Destroys all retained GL resources.
+        """
+        glslprogram.RECYCLE_PROGRAMS = False
+        glslprogram.clearRecycledPrograms()
+        glresources.setRetain(False)
+        glresources.purge()
+        self.__prevSigs = None
+
+
+    def createScene(self, scene='ortho'):
+        """Creates an :class:`.OverlayList`, :class:`.DisplayContext` and
+        :class:`.SceneOpts` which may be passed to :meth:`render`. The
+        caller is responsible for destroying the display context and its
+        parent (``displayCtx.masterDisplayCtx``).
+
+        :arg scene: Scene type - one of ``'ortho'``, ``'lightbox'`` or
+                    ``'3d'``.
+
+        :returns:   A tuple containing the ``OverlayList``,
+                    ``DisplayContext`` and ``SceneOpts``.
+        """
+        overlayList, displayCtx = createDisplayContext()
+        sceneOpts               = createSceneOpts(scene)
+
+        if scene == '3d':
+            displayCtx.displaySpace = 'world'
+
+        return overlayList, displayCtx, sceneOpts
+
+
+    def render(self,
+               overlayList,
+               displayCtx,
+               sceneOpts,
+               size=(800, 600),
+               crop=None,
+               namespace=None):
+        """Renders the given scene.
+
+        :arg overlayList: The :class:`.OverlayList`.
+
+        :arg displayCtx:  The :class:`.DisplayContext`. This must be a child
+                          of another ``DisplayContext``, e.g. as created by
+                          :meth:`createScene`.
+
+        :arg sceneOpts:   The :class:`.SceneOpts`, which must have been
+                          created by :meth:`createScene` or
+                          :func:`createSceneOpts`.
+
+        :arg size:        Size of the rendered scene, as a ``(width,
+                          height)`` tuple.
+
+        :arg crop:        If not ``None``, the scene is cropped to its
+                          contents, leaving a border of this many pixels
+                          (see :func:`autocrop`).
+
+        :arg namespace:   ``argparse.Namespace`` containing command line
+                          arguments, if the scene was described on the
+                          command line.
+
+        :returns:         A ``uint8`` ``numpy`` array of shape ``(height,
+                          width, 4)``, containing the scene as an RGBA bitmap.
+        """
+
+        # Discard retained textures for
+        # overlays which are no longer
+        # in the list, or which have
+        # different display settings
+        sigs = {}
+        keep = []
+
+        for ovl in overlayList:
+            sig            = displaySignature(displayCtx, ovl)
+            sigs[id(ovl)]  = (ovl, sig)
+            prevOvl, prevSig = self.__prevSigs.get(id(ovl), (None, None))
+            if prevOvl is ovl and prevSig == sig:
+                keep.append(ovl)
+
+        purgeResources(keep)
+
+        # The previous overlays are
+        # referenced (until the next
+        # call), so their IDs can't be
+        # re-used by new overlays.
+        self.__prevSigs = sigs
+
+        try:
+            bitmap, bg = renderScene(overlayList,
+                                     displayCtx,
+                                     sceneOpts,
+                                     size,
+                                     namespace)
+
+        # Don't re-use anything if
+        # something has gone wrong
+        except Exception:
+            self.__prevSigs = {}
+            raise
+
+        if crop is not None:
+            bitmap = autocrop(bitmap, bg, crop)
+
+        return np.asarray(bitmap, dtype=np.uint8)
+
+
+class BatchRenderer(object):
+    """The ``BatchRenderer`` renders a sequence of scenes, each described by
+    a list of ``render`` command line arguments, and saves each of them to
+    the output file specified in its arguments. It is used by the
+    :func:`batch` function.
+
+    All scenes are rendered with the same :class:`Renderer`, and the
+    following state is shared between scenes:
+
+      - Compiled shader programs (see
+        :data:`.glsl.program.RECYCLE_PROGRAMS`).
+
+      - Overlay files which are used by consecutive scenes (e.g. a template
+        image which is displayed underneath each subject's data) are only
+        loaded once.
+
+      - The GL textures for such overlays are re-used as well (see
+        :func:`.resources.setRetain`), as long as the scene settings (apart
+        from the overlay files and output file) have not changed.
+
+    The :meth:`destroy` method must be called when the ``BatchRenderer`` is
+    no longer needed. Only one ``BatchRenderer`` may exist at any one time.
+    """
+
+
+    def __init__(self, args=None):
+        """Create a ``BatchRenderer``. The :class:`Renderer` is created when
+        the first scene is rendered, as the GL version is specified on the
+        command line.
+
+        :arg args: Command line arguments which are applied to every scene
+                   (see :func:`batch`).
+        """
+
+        if args is None:
+            args = []
+
+        self.__args         = list(args)
+        self.__overlayCache = {}
+        self.__prevSigs     = {}
+        self.__renderer     = None
+
+
+    def destroy(self):
+        """Must be called when this ``BatchRenderer`` is no longer needed.
+        Destroys all retained GL resources.
+        """
+        if self.__renderer is not None:
+            self.__renderer.destroy()
+        self.__renderer     = None
+        self.__overlayCache = None
+        self.__prevSigs     = None
+
+
+    def render(self, job):
+        """Renders the scene described by the given list of command line
+        arguments, and saves it to file. Raises an error if the scene could
+        not be rendered.
+        """
+
+        # parseArgs calls sys.exit on bad
+        # arguments - we don't want that
+        try:
+            namespace = parseArgs(self.__args + list(job))
+        except SystemExit:
+            raise ValueError('Invalid arguments')
+
+        fsleyes.configLogging(namespace.verbose, namespace.noisy)
+
+        if self.__renderer is None:
+            self.__renderer = Renderer(namespace.glversion)
+
+        try:
+            self.__render(namespace)
+
+        # Don't re-use anything
+        # that a failed job touched
+        except Exception:
+            self.__prevSigs = {}
+            self.__overlayCache.clear()
+            raise
+
+
+    def __render(self, namespace):
+        """Called by :meth:`render`. Renders the scene described by the
+        given ``argparse.Namespace``.
+        """
+
+        import matplotlib.image as mplimg
+
+        cache = self.__overlayCache
+
+        # Discard textures and overlays
+        # which are not needed by this job
+        sigs = batchSignatures(namespace)
+        same = [p for p in sigs if self.__prevSigs.get(p) == sigs[p]]
+
+        purgeResources([o for key, ovls in cache.items()
+                        for o in ovls if key[0] in same])
+
+        for key in list(cache.keys()):
+            if key[0] not in sigs:
+                cache.pop(key)
+
+        self.__prevSigs = sigs
+
+        overlayList, displayCtx, sceneOpts = makeDisplayContext(namespace,
+                                                                cache)
+
+        try:
+            bitmap = self.__renderer.render(overlayList,
+                                            displayCtx,
+                                            sceneOpts,
+                                            namespace.size,
+                                            namespace.crop,
+                                            namespace)
+            mplimg.imsave(namespace.outfile, bitmap)
+        finally:
+            displayCtx.destroy()
+            displayCtx.masterDisplayCtx.destroy()
+            overlayList.clear()
+
+
+def purgeResources(keep):
+    """Used by :class:`Renderer` and :class:`BatchRenderer`. Destroys all
+    retained GL resources (see :func:`.resources.purge`), apart from those
+    belonging to the overlays in ``keep``.
+    """
+
+    # Resource keys contain the ID
+    # of the overlay they relate to
+    keep = set([str(id(o)) for o in keep])
+    glresources.purge(lambda k: any(t in keep for t in str(k).split('_')))
+
+
+def displaySignature(displayCtx, overlay):
+    """Used by :class:`Renderer`. Returns a string which describes all of
+    the :class:`.Display` and :class:`.DisplayOpts` settings for the given
+    overlay. The GL textures for an overlay may be re-used as long as its
+    signature is unchanged.
+    """
+
+    sig = []
+
+    for obj in (displayCtx.getDisplay(overlay), displayCtx.getOpts(overlay)):
+        props = obj.getAllProperties()[0]
+        sig.append(type(obj).__name__)
+        sig.extend([(p, repr(getattr(obj, p))) for p in sorted(props)])
+
+    return repr(sig)
+
+
+def batchSignatures(namespace):
+    """Used by :class:`BatchRenderer`. Returns a dictionary of
+    ``{path : signature}`` mappings, containing the absolute path to each
+    overlay file specified in the given ``namespace``, and a string which
+    describes all of the job settings (apart from the output file and the
+    other overlay files) that are applied to that overlay. A GL texture for
+    an overlay can be re-used by the next job if the signature for its file
+    is unchanged.
+
+    This function must be called before the arguments in the ``namespace``
+    are applied, as :func:`.parseargs.applyOverlayArgs` modifies them.
+    """
+
+    exclude = ('outfile', 'overlays')
+    common  = [(k, v) for k, v in sorted(vars(namespace).items())
+               if k not in exclude]
+    sigs    = {}
+
+    for ovlArgs in namespace.overlays:
+        path = fsloverlay.guessDataSourceType(ovlArgs.overlay)[1]
+        path = op.abspath(path)
+        sig  = [(k, v) for k, v in sorted(vars(ovlArgs).items())
+                if k != 'overlay']
+
+        sigs[path] = repr((common, sig))
+
+    return sigs
+
+
+def parseBatchArgs(argv):
+    """Used by :func:`main`. Extracts the ``--batch`` and ``--jobs``
+    options from the given command line arguments.
+
+    :returns: A tuple containing:
+
+               - The manifest file path
+               - The number of worker processes
+               - The remaining arguments
+    """
+
+    argv  = list(argv)
+    njobs = 1
+
+    def extract(opt):
+        idx = argv.index(opt)
+        if idx == len(argv) - 1:
+            log.error('{} requires an argument'.format(opt))
+            sys.exit(1)
+        val = argv[idx + 1]
+        argv[idx:idx + 2] = []
+        return val
+
+    manifest = extract('--batch')
+
+    if '--jobs' in argv:
+        try:
+            njobs = int(extract('--jobs'))
+        except ValueError:
+            njobs = -1
+
+        if njobs < 0:
+            log.error('--jobs must be a non-negative integer')
+            sys.exit(1)
+
+    return manifest, njobs, argv
+
+
 def parseArgs(argv):
     """Creates an argument parser which accepts options for off-screen
     rendering. Uses the :mod:`fsleyes.parseargs` module to peform the
@@ -108,6 +735,22 @@ def parseArgs(argv):
                             metavar=('W', 'H'),
                             help='Size in pixels (width, height)',
                             default=(800, 600))
+    mainParser.add_argument('--batch',
+                            metavar='MANIFEST',
+                            help='Render all of the jobs in a JSON manifest '
+                                 'file. Other options are applied to every '
+                                 'job')
+    mainParser.add_argument('--jobs',
+                            type=int,
+                            metavar='N',
+                            help='Number of processes to use with --batch '
+                                 '(0 = one per CPU core)',
+                            default=1)
+    mainParser.add_argument('--profile-render',
+                            dest='profileRender',
+                            action='store_true',
+                            help='Print the time taken by each overlay '
+                                 'to draw itself')
 
     name        = 'render'
     prolog      = 'FSLeyes render version {}\n'.format(version.__version__)
@@ -128,8 +771,11 @@ def parseArgs(argv):
         usageProlog=optStr,
         argOpts=['-of', '--outfile',
                  '-sz', '--size',
-                 '-c',  '--crop'],
-        shortHelpExtra=['--outfile', '--size', '--crop'])
+                 '-c',  '--crop',
+                 '--batch',
+                 '--jobs'],
+        shortHelpExtra=['--outfile', '--size', '--crop', '--batch',
+                        '--jobs', '--profile-render'])
 
     if namespace.outfile is None:
         log.error('outfile is required')
@@ -146,29 +792,21 @@ def parseArgs(argv):
     return namespace
 
 
-def makeDisplayContext(namespace):
+def makeDisplayContext(namespace, overlayCache=None):
     """Creates :class:`.OverlayList`, :class:`.DisplayContext``, and
     :class:`.SceneOpts` instances which represent the scene to be rendered,
     as described by the arguments in the given ``namespace`` object.
-    """
 
-    # Create an overlay list and display context.
-    # The DisplayContext, Display and DisplayOpts
-    # classes are designed to be created in a
-    # parent-child hierarchy. So we need to create
-    # a 'dummy' master display context to make
-    # things work properly.
-    overlayList      = fsloverlay.OverlayList()
-    masterDisplayCtx = displaycontext.DisplayContext(overlayList)
-    childDisplayCtx  = displaycontext.DisplayContext(overlayList,
-                                                     parent=masterDisplayCtx)
+    :arg namespace:    ``argparse.Namespace`` object containing command line
+                       arguments.
 
-    # We have to artificially create a ref to the
-    # master display context, otherwise it may get
-    # gc'd arbitrarily. The parent reference in the
-    # child creation above is ultimately stored as
-    # a weakref, so we need to create a real one.
-    childDisplayCtx.masterDisplayCtx = masterDisplayCtx
+    :arg overlayCache: Optional ``dict`` used to cache loaded overlays (see
+                       the ``cache`` argument to
+                       :func:`.loadoverlay.loadOverlays`).
+    """
+
+    overlayList, childDisplayCtx = createDisplayContext()
+    masterDisplayCtx             = childDisplayCtx.masterDisplayCtx
 
     # The handleOverlayArgs function uses the
     # fsleyes.overlay.loadOverlays function,
@@ -190,22 +828,12 @@ def makeDisplayContext(namespace):
                                overlayList,
                                masterDisplayCtx,
                                loadFunc=load,
-                               errorFunc=error)
+                               errorFunc=error,
+                               cache=overlayCache)
 
     # Create a SceneOpts instance describing
-    # the scene to be rendered. The parseargs
-    # module assumes that GL canvases have
-    # already been created, so we use mock
-    # objects to trick it. The options applied
-    # to these mock objects are applied to the
-    # real canvases later on, in the render
-    # function below.
-    if namespace.scene == 'ortho':
-        sceneOpts = orthoopts.OrthoOpts(MockCanvasPanel(3))
-    elif namespace.scene == 'lightbox':
-        sceneOpts = lightboxopts.LightBoxOpts(MockCanvasPanel(1))
-    elif namespace.scene == '3d':
-        sceneOpts = scene3dopts. Scene3DOpts(MockCanvasPanel(1))
+    # the scene to be rendered.
+    sceneOpts = createSceneOpts(namespace.scene)
 
     # 3D views default to
     # world display space
@@ -241,6 +869,57 @@ def makeDisplayContext(namespace):
     return overlayList, childDisplayCtx, sceneOpts
 
 
+def createDisplayContext():
+    """Creates an :class:`.OverlayList` and :class:`.DisplayContext` for
+    rendering a scene. The ``DisplayContext`` is a child of another
+    ``DisplayContext``, which is available as its ``masterDisplayCtx``
+    attribute.
+
+    :returns: A tuple containing the ``OverlayList`` and ``DisplayContext``.
+    """
+
+    # Create an overlay list and display context.
+    # The DisplayContext, Display and DisplayOpts
+    # classes are designed to be created in a
+    # parent-child hierarchy. So we need to create
+    # a 'dummy' master display context to make
+    # things work properly.
+    overlayList      = fsloverlay.OverlayList()
+    masterDisplayCtx = displaycontext.DisplayContext(overlayList)
+    childDisplayCtx  = displaycontext.DisplayContext(overlayList,
+                                                     parent=masterDisplayCtx)
+
+    # We have to artificially create a ref to the
+    # master display context, otherwise it may get
+    # gc'd arbitrarily. The parent reference in the
+    # child creation above is ultimately stored as
+    # a weakref, so we need to create a real one.
+    childDisplayCtx.masterDisplayCtx = masterDisplayCtx
+
+    return overlayList, childDisplayCtx
+
+
+def createSceneOpts(scene):
+    """Creates a :class:`.SceneOpts` instance describing a scene of the given
+    type (one of ``'ortho'``, ``'lightbox'`` or ``'3d'``).
+    """
+
+    # The parseargs module assumes that GL
+    # canvases have already been created, so
+    # we use mock objects to trick it. The
+    # options applied to these mock objects
+    # are applied to the real canvases later
+    # on, in the renderScene function below.
+    if scene == 'ortho':
+        return orthoopts.OrthoOpts(MockCanvasPanel(3))
+    elif scene == 'lightbox':
+        return lightboxopts.LightBoxOpts(MockCanvasPanel(1))
+    elif scene == '3d':
+        return scene3dopts.Scene3DOpts(MockCanvasPanel(1))
+
+    raise ValueError('Unknown scene type: {}'.format(scene))
+
+
 def render(namespace, overlayList, displayCtx, sceneOpts):
     """Renders the scene, and returns a tuple containing the bitmap and the
     background colour.
@@ -252,11 +931,35 @@ def render(namespace, overlayList, displayCtx, sceneOpts):
     :arg displayCtx:  The :class:`.DisplayContext` instance.
     :arg sceneOpts:   The :class:`.SceneOpts` instance.
     """
+    return renderScene(overlayList,
+                       displayCtx,
+                       sceneOpts,
+                       namespace.size,
+                       namespace)
+
+
+def renderScene(overlayList, displayCtx, sceneOpts, size, namespace=None):
+    """Renders the scene, and returns a tuple containing the bitmap and the
+    background colour.
+
+    :arg overlayList: The :class:`.OverlayList` instance.
+    :arg displayCtx:  The :class:`.DisplayContext` instance.
+    :arg sceneOpts:   The :class:`.SceneOpts` instance (see
+                      :func:`createSceneOpts`).
+    :arg size:        Scene ``(width, height)`` in pixels.
+    :arg namespace:   ``argparse.Namespace`` object containing command line
+                      arguments, if the scene was described on the command
+                      line.
+    """
+
+    if   isinstance(sceneOpts, orthoopts   .OrthoOpts):    scene = 'ortho'
+    elif isinstance(sceneOpts, lightboxopts.LightBoxOpts): scene = 'lightbox'
+    elif isinstance(sceneOpts, scene3dopts .Scene3DOpts):  scene = '3d'
 
     # Calculate canvas and colour bar sizes
     # so that the entire scene will fit in
     # the width/height specified by the user
-    width, height = namespace.size
+    width, height = size
     (width, height), (cbarWidth, cbarHeight) = \
         adjustSizeForColourBar(width,
                                height,
@@ -264,8 +967,10 @@ def render(namespace, overlayList, displayCtx, sceneOpts):
                                sceneOpts.colourBarLocation,
                                sceneOpts.labelSize)
 
+    labelMgr = None
+
     # Lightbox view -> only one canvas
-    if namespace.scene == 'lightbox':
+    if scene == 'lightbox':
         c = createLightBoxCanvas(namespace,
                                  width,
                                  height,
@@ -275,7 +980,7 @@ def render(namespace, overlayList, displayCtx, sceneOpts):
         canvases = [c]
 
     # Ortho view -> up to three canvases
-    elif namespace.scene == 'ortho':
+    elif scene == 'ortho':
         canvases = createOrthoCanvases(namespace,
                                        width,
                                        height,
@@ -289,7 +994,7 @@ def render(namespace, overlayList, displayCtx, sceneOpts):
         labelMgr.refreshLabels()
 
     # 3D -> one 3D canvas
-    elif namespace.scene == '3d':
+    elif scene == '3d':
         c = create3DCanvas(namespace,
                            width,
                            height,
@@ -300,7 +1005,7 @@ def render(namespace, overlayList, displayCtx, sceneOpts):
         canvases = [c]
 
     # Do we need to do a neuro/radio l/r flip?
-    if namespace.scene in ('ortho', 'lightbox'):
+    if scene in ('ortho', 'lightbox'):
         inRadio = displayCtx.displaySpaceIsRadiological()
         lrFlip  = displayCtx.radioOrientation != inRadio
 
@@ -323,7 +1028,7 @@ def render(namespace, overlayList, displayCtx, sceneOpts):
     # re-orders the canvases, which
     # we're assuming knowledge of,
     # by indexing canvases[1].
-    if namespace.scene == 'ortho' and sceneOpts.layout == 'grid':
+    if scene == 'ortho' and sceneOpts.layout == 'grid':
         canvases[1].opts.invertX = True
 
     # Configure each of the canvases (with those
@@ -340,12 +1045,14 @@ def render(namespace, overlayList, displayCtx, sceneOpts):
         canvasBmps.append(c.getBitmap())
 
     # destroy the canvases
+    if labelMgr is not None:
+        labelMgr.destroy()
     for c in canvases:
         c.destroy()
     canvases = None
 
     # layout the bitmaps
-    if namespace.scene in ('lightbox', '3d'):
+    if scene in ('lightbox', '3d'):
         layout = fsllayout.Bitmap(canvasBmps[0])
     elif len(canvasBmps) > 0:
         layout = fsllayout.buildOrthoLayout(canvasBmps,
@@ -382,7 +1089,7 @@ def createLightBoxCanvas(namespace,
                          sceneOpts):
     """Creates, configures, and returns an :class:`.OffScreenLightBoxCanvas`.
 
-    :arg namespace:   ``argparse.Namespace`` object.
+    :arg namespace:   ``argparse.Namespace`` object, or ``None``.
     :arg width:       Available width in pixels.
     :arg height:      Available height in pixels.
     :arg overlayList: The :class:`.OverlayList` instance.
@@ -425,7 +1132,7 @@ def createOrthoCanvases(namespace,
     """Creates, configures, and returns up to three
     :class:`.OffScreenSliceCanvas` instances, for rendering the scene.
 
-    :arg namespace:   ``argparse.Namespace`` object.
+    :arg namespace:   ``argparse.Namespace`` object, or ``None``.
     :arg width:       Available width in pixels.
     :arg height:      Available height in pixels.
     :arg overlayList: The :class:`.OverlayList` instance.
@@ -517,7 +1224,7 @@ def create3DCanvas(namespace,
                    sceneOpts):
     """Creates, configures, and returns an :class:`.OffScreenScene3DCanvas`.
 
-    :arg namespace:   ``argparse.Namespace`` object.
+    :arg namespace:   ``argparse.Namespace`` object, or ``None``.
     :arg width:       Available width in pixels.
     :arg height:      Available height in pixels.
     :arg overlayList: The :class:`.OverlayList` instance.
@@ -543,7 +1250,8 @@ def create3DCanvas(namespace,
     opts.offset          = sceneOpts.offset
     opts.rotation        = sceneOpts.rotation
 
-    if parseargs.wasSpecified(namespace, sceneOpts, 'lightPos'):
+    if namespace is not None and \
+       parseargs.wasSpecified(namespace, sceneOpts, 'lightPos'):
         opts.lightPos        = sceneOpts.lightPos
         canvas.resetLightPos = False
     else:
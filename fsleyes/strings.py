@@ -368,6 +368,7 @@ titles = TypeDict({
 
     'CropImagePanel'             : 'Crop',
     'EditTransformPanel'         : 'Nudge',
+    'RenderProfilePanel'         : 'Render profiler',
 
     'LocationHistoryPanel.loadError' : 'Error loading location file',
     'LocationHistoryPanel.saveError' : 'Error saving location file',
@@ -517,6 +518,7 @@ actions = TypeDict({
     'CanvasPanel.toggleClusterPanel'        : 'Cluster browser',
     'CanvasPanel.toggleOverlayInfo'         : 'Overlay information',
     'CanvasPanel.toggleClassificationPanel' : 'Melodic IC classification',
+    'CanvasPanel.toggleRenderProfilePanel'  : 'Render profiler',
 
     'OrthoPanel.toggleOrthoToolBar'       : 'Ortho toolbar',
     'OrthoPanel.toggleEditMode'           : 'Edit mode',
@@ -595,6 +597,15 @@ labels = TypeDict({
 
     'OverlayListPanel.noDataSource'       : '[in memory]',
 
+    'RenderProfilePanel.reset'   : 'Reset',
+    'RenderProfilePanel.overlay' : 'Overlay',
+    'RenderProfilePanel.phase'   : 'Phase',
+    'RenderProfilePanel.calls'   : 'Calls',
+    'RenderProfilePanel.cpuMean' : 'CPU mean (ms)',
+    'RenderProfilePanel.cpuMax'  : 'CPU max (ms)',
+    'RenderProfilePanel.gpuMean' : 'GPU mean (ms)',
+    'RenderProfilePanel.gpuMax'  : 'GPU max (ms)',
+
     'LookupTablePanel.selectAll'   : 'Select all',
     'LookupTablePanel.selectNone'  : 'Deselect all',
     'LookupTablePanel.addLabel'    : 'Add label',
@@ -888,6 +899,8 @@ properties = TypeDict({
     'CanvasPanel.movieRate'          : 'Movie update rate',
     'CanvasPanel.movieAxis'          : 'Movie axis',
     'CanvasPanel.movieSyncRefresh'   : 'Synchronise movie updates',
+    'CanvasPanel.movieCache'         : 'Cache movie frames',
+    'CanvasPanel.movieCacheSize'     : 'Movie frame cache size (MB)',
     'CanvasPanel.profile'            : 'Mode',
 
     'SceneOpts.showCursor'         : 'Show location cursor',
@@ -1017,6 +1030,7 @@ properties = TypeDict({
 
     'VolumeOpts.clipImage'                : 'Clip by',
     'VolumeOpts.interpolation'            : 'Interpolation',
+    'VolumeOpts.textureStorage'           : 'Texture storage',
     'VolumeOpts.enableOverrideDataRange'  : 'Override image data range',
     'VolumeOpts.overrideDataRange'        : 'Override image data range',
     'VolumeOpts.custom_overrideDataRange' : 'Override image data range',
@@ -1190,6 +1204,10 @@ choices = TypeDict({
                                   'linear' : 'Linear interpolation',
                                   'spline' : 'Spline interpolation'},
 
+    'VolumeOpts.textureStorage' : {'default' : 'Full precision',
+                                   'half'    : 'Half precision (16 bit)',
+                                   'byte'    : 'Low precision (8 bit)'},
+
     'Volume3DOpts.clipMode' : {'intersection' : 'Intersection',
                                'union'        : 'Union',
                                'complement'   : 'Complement'},
@@ -115,6 +115,11 @@ properties = TypeDict({
     'interpolation (equivalent to nearest neighbour interpolation), linear '
     'interpolation, or third-order spline (cubic) interpolation.',
 
+    'VolumeOpts.textureStorage' :
+    'How the image data is stored on the GPU. Half (16 bit) and low (8 bit) '
+    'precision storage use less GPU memory, which may be useful for very '
+    'large images, at the cost of some loss of precision.',
+
     'VolumeOpts.enableOverrideDataRange' :
     'Override the actual data range of an image with a user-specified '
     'one. This is useful for images which have a very large data '
@@ -525,6 +530,16 @@ properties = TypeDict({
     'manner. This is not possible under certain platforms/environments, '
     'where the canvas updates cannot be synchronised.',
 
+    'CanvasPanel.movieCache' :
+    'If checked, the frames drawn during the first loop of a movie through '
+    'time are stored in memory, and re-displayed on subsequent loops, '
+    'instead of being drawn again. The stored frames are discarded whenever '
+    'the scene changes.',
+
+    'CanvasPanel.movieCacheSize' :
+    'The maximum amount of memory, in megabytes, to use for storing movie '
+    'frames.',
+
     'PlotPanel.legend'     : 'Show / hide a legend for series which have '
                              'been added to the plot.',
     'PlotPanel.xAutoScale' : 'If checked, the plot X axis limits are '
@@ -19,6 +19,7 @@ import fsleyes_props                               as props
 
 import fsleyes.actions                             as actions
 import fsleyes.displaycontext                      as displayctx
+import fsleyes.gl.framecache                       as framecache
 import fsleyes.controls.overlaylistpanel           as overlaylistpanel
 import fsleyes.controls.overlayinfopanel           as overlayinfopanel
 import fsleyes.controls.atlaspanel                 as atlaspanel
@@ -29,6 +30,7 @@ import fsleyes.controls.locationpanel              as locationpanel
 import fsleyes.controls.clusterpanel               as clusterpanel
 import fsleyes.controls.lookuptablepanel           as lookuptablepanel
 import fsleyes.controls.melodicclassificationpanel as melclasspanel
+import fsleyes.controls.renderprofilepanel         as renderprofilepanel
 from . import                                         colourbarpanel
 from . import                                         viewpanel
 
@@ -94,6 +96,7 @@ class CanvasPanel(viewpanel.ViewPanel):
        toggleClusterPanel
        toggleLookupTablePanel
        toggleClassificationPanel
+       toggleRenderProfilePanel
 
 
     .. _canvaspanel-adding-content:
@@ -226,6 +229,26 @@ class CanvasPanel(viewpanel.ViewPanel):
     """
 
 
+    movieCache = props.Boolean(default=False)
+    """If ``True``, and the :attr:`movieAxis` is ``3`` (time), the frames
+    rendered during the first loop of a movie are stored in a
+    :class:`.FrameCache`. On subsequent loops, cached frames are copied
+    straight to the canvases, instead of each volume having to be drawn
+    again (the :attr:`.NiftiOpts.volume` is still updated, so that other
+    views and panels follow the movie). Any change to the scene causes the
+    cache to be discarded. The total size of the cache is limited by the
+    :attr:`movieCacheSize`.
+    """
+
+
+    movieCacheSize = props.Int(minval=16, maxval=8192, default=512,
+                               clamped=True)
+    """Maximum amount of memory, in megabytes, to use for the movie frame
+    cache (see :attr:`movieCache`). If the frames for a full movie loop do
+    not fit within this limit, only the earlier frames are cached.
+    """
+
+
     def __init__(self, parent, overlayList, displayCtx, frame, sceneOpts):
         """Create a ``CanvasPanel``.
 
@@ -299,7 +322,28 @@ class CanvasPanel(viewpanel.ViewPanel):
         # movie loop stops. So it needs to be
         # re-started if/when a compatible overlay is
         # selected.
-        self.__movieRunning = False
+        #
+        # Frames drawn in movie mode may be stored
+        # in a FrameCache (see the movieCache
+        # property). While frames are being drawn
+        # from the cache, the overlay and opts
+        # being animated are stored in
+        # __movieCacheTarget, and the GLObject
+        # listeners on the movie property, which
+        # are disabled so that the GL textures
+        # are not needlessly refreshed, are
+        # stored in __movieCacheSuspended.
+        self.__movieRunning        = False
+        self.__movieCacheTarget    = None
+        self.__movieCacheSuspended = []
+        self.__movieCache          = framecache.FrameCache(
+            self.movieCacheSize * 1048576)
+        self            .addListener('movieCache',
+                                     self.__name,
+                                     self.__movieCacheChanged)
+        self            .addListener('movieCacheSize',
+                                     self.__name,
+                                     self.__movieCacheChanged)
         self            .addListener('movieMode',
                                      self.__name,
                                      self.__movieModeChanged)
@@ -345,6 +389,8 @@ class CanvasPanel(viewpanel.ViewPanel):
         if self.__colourBar is not None:
             self.__colourBar.destroy()
 
+        self            .removeListener('movieCache',        self.__name)
+        self            .removeListener('movieCacheSize',    self.__name)
         self            .removeListener('movieMode',         self.__name)
         self            .removeListener('movieAxis',         self.__name)
         self.overlayList.removeListener('overlays',          self.__name)
@@ -356,6 +402,9 @@ class CanvasPanel(viewpanel.ViewPanel):
         self.sceneOpts  .removeListener('labelSize',         self.__name)
         self.__movieGifAction.destroy()
 
+        self.__resumeMovieListeners()
+        self.__movieCache.clear()
+
         self.__opts           = None
         self.__movieGifAction = None
 
@@ -522,6 +571,15 @@ class CanvasPanel(viewpanel.ViewPanel):
                          canvasPanel=self)
 
 
+    @actions.toggleControlAction(renderprofilepanel.RenderProfilePanel)
+    def toggleRenderProfilePanel(self):
+        """Toggles a :class:`.RenderProfilePanel`. See
+        :meth:`.ViewPanel.togglePanel`.
+        """
+        self.togglePanel(renderprofilepanel.RenderProfilePanel,
+                         location=wx.BOTTOM)
+
+
     @property
     def sceneOpts(self):
         """Returns the :class:`.SceneOpts` instance used by this
@@ -963,25 +1021,52 @@ class CanvasPanel(viewpanel.ViewPanel):
         :attr:`.NiftiOpts.volume` property is incremented and all
         GL canvases in this ``CanvasPanel`` are refreshed.
 
+        If the :attr:`movieCache` is enabled, and the next frame has been
+        cached, it is drawn from the cache instead - see
+        :meth:`__cachedMovieFrame`.
+
         :returns: ``True`` if the movie loop was started, ``False`` otherwise.
         """
 
         from . import scene3dpanel
 
-        if self.destroyed():   return False
-        if not self.movieMode: return False
+        if self.destroyed():
+            return False
+
+        if not self.movieMode:
+            self.__syncCachedMovie()
+            return False
 
         overlay  = self.displayCtx.getSelectedOverlay()
         canvases = self.getGLCanvases()
 
         if overlay is None:
+            self.__syncCachedMovie()
             return False
 
         opts = self.displayCtx.getOpts(overlay)
 
         if not self.canRunMovie(overlay, opts):
+            self.__syncCachedMovie()
             return False
 
+        # Figure out the movie rate - the
+        # number of seconds to wait until
+        # triggering the next frame.
+        rate    = self.movieRate
+        rateMin = self.getAttribute('movieRate', 'minval')
+        rateMax = self.getAttribute('movieRate', 'maxval')
+
+        # Special case/hack - if this is a Scene3DPanel,
+        # and the movie axis is X/Y/Z, we always
+        # use a fast rate. Instead, the Scene3dPanel
+        # will increase/decrease the rotation angle
+        # to speed up/slow down the movie instead.
+        if isinstance(self, scene3dpanel.Scene3DPanel) and self.movieAxis < 3:
+            rate = rateMax
+
+        rate = (rateMin + (rateMax - rate)) / 1000.0
+
         # We want the canvas refreshes to be
         # synchronised. So we 'freeze' them
         # while changing the image volume, and
@@ -990,7 +1075,30 @@ class CanvasPanel(viewpanel.ViewPanel):
             c.FreezeDraw()
             c.FreezeSwapBuffers()
 
-        self.doMovieUpdate(overlay, opts)
+        # Draw the next frame from the
+        # cache if we can, otherwise
+        # update the scene as normal.
+        onDrawn = None
+
+        if self.__useMovieCache(overlay, opts):
+            frame = self.__cachedMovieFrame(overlay, opts, canvases)
+
+            if frame is None:
+                idle.idle(self.__movieLoop, after=rate)
+                return True
+
+            # Store the frame in the
+            # cache after it is drawn
+            def cacheFrame(bitmaps):
+                key = self.__movieCacheKey(overlay, opts, canvases)
+                self.__movieCache.validate(key)
+                self.__movieCache.put(frame, bitmaps)
+
+            onDrawn = cacheFrame
+
+        else:
+            self.__syncCachedMovie()
+            self.doMovieUpdate(overlay, opts)
 
         # Now we get refs to *all* GLObjects managed
         # by every canvas - we have to wait until
@@ -1005,35 +1113,284 @@ class CanvasPanel(viewpanel.ViewPanel):
         def allReady():
             return all([g.ready() for g in globjs])
 
-        # Figure out the movie rate - the
-        # number of seconds to wait until
-        # triggering the next frame.
-        rate    = self.movieRate
-        rateMin = self.getAttribute('movieRate', 'minval')
-        rateMax = self.getAttribute('movieRate', 'maxval')
-
-        # Special case/hack - if this is a Scene3DPanel,
-        # and the movie axis is X/Y/Z, we always
-        # use a fast rate. Instead, the Scene3dPanel
-        # will increase/decrease the rotation angle
-        # to speed up/slow down the movie instead.
-        if isinstance(self, scene3dpanel.Scene3DPanel) and self.movieAxis < 3:
-            rate = rateMax
-
-        rate = (rateMin + (rateMax - rate)) / 1000.0
-
         # Use sync or unsync refresh regime
         if self.movieSyncRefresh: update = self.__syncMovieRefresh
         else:                     update = self.__unsyncMovieRefresh
 
         # Refresh the canvases when all
         # GLObjects are ready to be drawn.
-        idle.idleWhen(update, allReady, canvases, rate, pollTime=rate / 10)
+        idle.idleWhen(update,
+                      allReady,
+                      canvases,
+                      rate,
+                      onDrawn,
+                      pollTime=rate / 10)
 
         return True
 
 
-    def __unsyncMovieRefresh(self, canvases, rate):
+    def __useMovieCache(self, overlay, opts):
+        """Called by :meth:`__movieFrame`. Returns ``True`` if the movie
+        frame cache can be used for the current movie, ``False`` otherwise.
+        The cache is only used for movies through time (i.e. when the
+        :attr:`movieAxis` is ``3``).
+        """
+        return (self.movieCache      and
+                self.movieAxis == 3  and
+                self.__numMovieFrames(overlay, opts) is not None)
+
+
+    def __numMovieFrames(self, overlay, opts):
+        """Returns the number of frames in a movie through time for the given
+        overlay, or ``None`` if the overlay is not supported.
+        """
+
+        import fsl.data.image as fslimage
+        import fsl.data.mesh  as fslmesh
+
+        if isinstance(overlay, fslimage.Nifti):
+            return overlay.shape[3]
+        elif isinstance(overlay, fslmesh.Mesh):
+            return opts.vertexDataLen()
+        return None
+
+
+    def __movieProp(self, overlay):
+        """Returns the name of the :class:`.DisplayOpts` property which is
+        changed by a movie through time for the given overlay.
+        """
+
+        import fsl.data.image as fslimage
+
+        if isinstance(overlay, fslimage.Nifti): return 'volume'
+        else:                                   return 'vertexDataIndex'
+
+
+    def __setMovieFrame(self, overlay, opts, frame):
+        """Sets the volume (or vertex data index) of the given overlay to the
+        given frame of a movie through time.
+        """
+        setattr(opts, self.__movieProp(overlay), frame)
+
+
+    def __movieCacheKey(self, overlay, opts, canvases):
+        """Returns a value which describes the current scene. Cached movie
+        frames are discarded whenever this value changes - see
+        :meth:`.FrameCache.validate`. The value is made up of the properties
+        of the :class:`.SceneOpts`, the :class:`.DisplayContext`, every
+        canvas, and every :class:`.Display` and :class:`.DisplayOpts`,
+        excluding the property which is changed by the movie.
+
+        .. note:: The movie property (e.g. :attr:`.NiftiOpts.volume`) is
+                  excluded for all overlays, as overlays which are grouped
+                  with the selected overlay are animated along with it.
+        """
+
+        movieProp = self.__movieProp(overlay)
+
+        def propState(obj, exclude=None):
+            names = obj.getAllProperties()[0]
+            return tuple([str(getattr(obj, n))
+                          for n in names if n != exclude])
+
+        state = [id(overlay),
+                 propState(self.sceneOpts),
+                 propState(self.displayCtx)]
+
+        for c in canvases:
+            state.append((id(c),
+                          c.IsShownOnScreen(),
+                          c.GetScaledSize(),
+                          propState(c.opts)))
+
+        for ovl in self.overlayList:
+            display = self.displayCtx.getDisplay(ovl)
+            state.append((id(ovl),
+                          propState(display),
+                          propState(display.opts, movieProp)))
+
+        return tuple(state)
+
+
+    def __cachedMovieFrame(self, overlay, opts, canvases):
+        """Called by :meth:`__movieFrame` when the :attr:`movieCache` is
+        enabled. If the next movie frame is in the cache, it is drawn on
+        all canvases straight from the cache. Otherwise, the overlay is
+        updated to show the next frame, so that it can be drawn normally.
+
+        While frames are being drawn from the cache, the canvases remain
+        frozen, so they are not re-drawn. The movie property (e.g.
+        :attr:`.NiftiOpts.volume`) is still updated, so that linked views,
+        and other panels (e.g. plots), follow the movie, but the listeners
+        registered on it by the ``GLObject`` instances of this panel are
+        disabled, so that their textures are not refreshed (see
+        :meth:`__suspendMovieListeners`). The :meth:`__syncCachedMovie`
+        method thaws the canvases and re-enables the listeners when the movie
+        stops.
+
+        :returns: ``None`` if the next frame was drawn from the cache,
+                  otherwise the index of the next frame.
+        """
+
+        cache  = self.__movieCache
+        target = self.__movieCacheTarget
+
+        # The selected overlay has changed
+        if target is not None and target[0] is not overlay:
+            self.__syncCachedMovie()
+
+        cache.validate(self.__movieCacheKey(overlay, opts, canvases))
+
+        current = cache.current
+        if current is None:
+            current = self.getMovieFrame(overlay, opts)
+
+        frame   = (current + 1) % self.__numMovieFrames(overlay, opts)
+        bitmaps = cache.get(frame)
+
+        if bitmaps is not None and len(bitmaps) == len(canvases):
+
+            drawn = True
+            for c, bmp in zip(canvases, bitmaps):
+                if bmp is not None:
+                    drawn = drawn and c.drawFrame(bmp)
+
+            if drawn:
+                cache.current           = frame
+                self.__movieCacheTarget = (overlay, opts)
+                self.__suspendMovieListeners(overlay, canvases)
+                self.__setMovieFrame(overlay, opts, frame)
+                return None
+
+        # Cache miss - draw the frame in the
+        # normal way. The GLObjects are
+        # notified of the new frame, so they
+        # will catch up on any frames that
+        # were skipped while they were
+        # suspended.
+        cache.current           = None
+        self.__movieCacheTarget = None
+        self.__resumeMovieListeners()
+        self.__setMovieFrame(overlay, opts, frame)
+
+        return frame
+
+
+    def __syncCachedMovie(self):
+        """If frames are being drawn from the movie frame cache, the canvases
+        are frozen (see :meth:`__cachedMovieFrame`). This method makes sure
+        that the movie property (e.g. :attr:`.NiftiOpts.volume`) of the
+        selected overlay is set to the frame that is currently displayed,
+        and re-enables normal drawing on all canvases.
+        """
+
+        cache  = self.__movieCache
+        target = self.__movieCacheTarget
+        frame  = cache.current
+
+        if frame is None:
+            return
+
+        cache.current           = None
+        self.__movieCacheTarget = None
+        overlay, opts           = target
+        canvases                = self.getGLCanvases()
+
+        for c in canvases:
+            c.ThawDraw()
+            c.ThawSwapBuffers()
+
+        if overlay in self.overlayList and \
+           opts is self.displayCtx.getOpts(overlay):
+            self.__setMovieFrame(overlay, opts, frame)
+
+        # The movie property already has the
+        # current frame, so we force a
+        # notification, in order for the
+        # GLObjects to refresh their textures.
+        for opts, prop in self.__resumeMovieListeners():
+            opts.propNotify(prop)
+
+        for c in canvases:
+            c.Refresh()
+
+
+    def __suspendMovieListeners(self, overlay, canvases):
+        """Called by :meth:`__cachedMovieFrame` when a frame is drawn from
+        the movie frame cache. Disables the listeners which have been
+        registered on the movie property (e.g. :attr:`.NiftiOpts.volume`) of
+        every overlay by the ``GLObject`` instances on the given canvases, so
+        that they do not refresh their textures while the movie is being
+        played from the cache. See :meth:`__resumeMovieListeners`.
+        """
+
+        if len(self.__movieCacheSuspended) > 0:
+            return
+
+        prop      = self.__movieProp(overlay)
+        suspended = []
+
+        for ovl in self.overlayList:
+
+            opts = self.displayCtx.getOpts(ovl)
+
+            if prop not in opts.getAllProperties()[0]:
+                continue
+
+            for c in canvases:
+                globj = c.getGLObject(ovl)
+
+                if globj is None or not opts.hasListener(prop, globj.name):
+                    continue
+
+                opts.disableListener(prop, globj.name)
+                suspended.append((ovl, opts, prop, globj.name))
+
+        self.__movieCacheSuspended = suspended
+
+
+    def __resumeMovieListeners(self):
+        """Re-enables any listeners which were disabled by
+        :meth:`__suspendMovieListeners`.
+
+        :returns: A list of ``(opts, propName)`` tuples, one for each
+                  :class:`.DisplayOpts` instance which had its listeners
+                  re-enabled.
+        """
+
+        suspended                  = self.__movieCacheSuspended
+        self.__movieCacheSuspended = []
+        resumed                    = []
+
+        for ovl, opts, prop, name in suspended:
+
+            if ovl not in self.overlayList or \
+               opts is not self.displayCtx.getOpts(ovl):
+                continue
+
+            if opts.hasListener(prop, name):
+                opts.enableListener(prop, name)
+
+            if (opts, prop) not in resumed:
+                resumed.append((opts, prop))
+
+        return resumed
+
+
+    def __movieCacheChanged(self, *a):
+        """Called when the :attr:`movieCache` or :attr:`movieCacheSize`
+        properties change. Updates the movie frame cache.
+        """
+
+        cache = self.__movieCache
+
+        self.__syncCachedMovie()
+
+        if self.movieCache: cache.budget = self.movieCacheSize * 1048576
+        else:               cache.clear()
+
+
+    def __unsyncMovieRefresh(self, canvases, rate, cacheFrame=None):
         """Called by :meth:`__movieUpdate`. Updates all canvases in an
         unsynchronised manner.
 
@@ -1043,10 +1400,13 @@ class CanvasPanel(viewpanel.ViewPanel):
         this approach, and require drawing and front/back buffer swaps to be
         done at the same time. This method is used for those drivers.
 
-        :arg canvases: List of canvases to update. It is assumed that
-                       ``FreezeDraw`` and ``FreezeSwapBuffers`` has been
-                       called on every canvas.
-        :arg rate:     Delay to trigger the next movie update.
+        :arg canvases:   List of canvases to update. It is assumed that
+                         ``FreezeDraw`` and ``FreezeSwapBuffers`` has been
+                         called on every canvas.
+        :arg rate:       Delay to trigger the next movie update.
+        :arg cacheFrame: If provided, a function which is passed the
+                         drawn frame of every canvas, to be stored in the
+                         movie frame cache.
         """
 
         for c in canvases:
@@ -1054,24 +1414,33 @@ class CanvasPanel(viewpanel.ViewPanel):
             c.ThawSwapBuffers()
             c.Refresh()
 
+        if cacheFrame is not None:
+            cacheFrame([c.captureFrame(front=True) for c in canvases])
+
         idle.idle(self.__movieLoop, after=rate)
 
 
-    def __syncMovieRefresh(self, canvases, rate):
+    def __syncMovieRefresh(self, canvases, rate, cacheFrame=None):
         """Updates all canvases in a synchronised manner. All canvases are
         refreshed, and then the front/back buffers are swapped on each of
         them.
 
-        :arg canvases: List of canvases to update. It is assumed that
-                       ``FreezeDraw`` and ``FreezeSwapBuffers`` has been
-                       called on every canvas.
-        :arg rate:     Delay to trigger the next movie update.
+        :arg canvases:   List of canvases to update. It is assumed that
+                         ``FreezeDraw`` and ``FreezeSwapBuffers`` has been
+                         called on every canvas.
+        :arg rate:       Delay to trigger the next movie update.
+        :arg cacheFrame: If provided, a function which is passed the
+                         drawn frame of every canvas, to be stored in the
+                         movie frame cache.
         """
 
         for c in canvases:
             c.ThawDraw()
             c.Refresh()
 
+        if cacheFrame is not None:
+            cacheFrame([c.captureFrame() for c in canvases])
+
         for c in canvases:
             c.ThawSwapBuffers()
             c.SwapBuffers()
@@ -202,6 +202,7 @@ class LightBoxPanel(canvaspanel.CanvasPanel):
                    self.toggleLookupTablePanel,
                    self.toggleClusterPanel,
                    self.toggleClassificationPanel,
+                   self.toggleRenderProfilePanel,
                    self.removeAllPanels]
 
         names = [a.__name__ if a is not None else None for a in actions]
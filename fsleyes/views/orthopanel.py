@@ -465,6 +465,7 @@ class OrthoPanel(canvaspanel.CanvasPanel):
                    self.toggleLookupTablePanel,
                    self.toggleClusterPanel,
                    self.toggleClassificationPanel,
+                   self.toggleRenderProfilePanel,
                    self.removeAllPanels]
 
         def makeTuples(actionz):
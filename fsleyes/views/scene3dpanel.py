@@ -140,6 +140,7 @@ class Scene3DPanel(canvaspanel.CanvasPanel):
                    self.toggleLookupTablePanel,
                    self.toggleClusterPanel,
                    self.toggleClassificationPanel,
+                   self.toggleRenderProfilePanel,
                    self.removeAllPanels]
 
         def makeTuples(actionz):
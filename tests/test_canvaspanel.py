@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+#
+# test_canvaspanel.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import numpy as np
+
+import fsl.data.image as fslimage
+
+from . import run_with_orthopanel, realYield
+
+
+def test_movieCache_noTextureRefresh():
+    run_with_orthopanel(_test_movieCache_noTextureRefresh)
+def _test_movieCache_noTextureRefresh(panel, overlayList, displayCtx):
+
+    data = np.random.randint(0, 100, (10, 10, 10, 5)).astype(np.float32)
+    img  = fslimage.Image(data, name='image')
+
+    overlayList.append(img)
+    realYield(50)
+
+    panel.movieCache = True
+    realYield(20)
+
+    opts     = displayCtx.getOpts(img)
+    canvases = panel.getGLCanvases()
+    glvol    = canvases[0].getGLObject(img)
+    cache    = panel._CanvasPanel__movieCache
+    key      = panel._CanvasPanel__movieCacheKey(img, opts, canvases)
+    bitmaps  = [c.captureFrame() for c in canvases]
+
+    cache.validate(key)
+    cache.put(1, bitmaps)
+
+    with mock.patch.object(glvol.imageTexture, 'set') as texset:
+
+        # Frame 1 is drawn from the cache - the
+        # volume is updated, but the image
+        # texture is not refreshed
+        frame = panel._CanvasPanel__cachedMovieFrame(img, opts, canvases)
+        realYield(20)
+
+        assert frame             is None
+        assert opts.volume       == 1
+        assert texset.call_count == 0
+
+        # When the movie stops, the
+        # texture catches up
+        panel._CanvasPanel__syncCachedMovie()
+        realYield(20)
+
+        assert opts.volume       == 1
+        assert texset.call_count >  0
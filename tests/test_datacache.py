@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+#
+# test_datacache.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import argparse
+import time
+
+import numpy as np
+
+import fsl.utils.tempdir as tempdir
+
+import fsleyes.gl.textures.datacache as datacache
+import fsleyes.parseargs              as parseargs
+
+
+def test_datacache():
+
+    with tempdir.tempdir():
+
+        cache = datacache.DataCache('cache', maxSize=5000)
+        data  = np.random.randint(0, 65535, (10, 10, 10)).astype(np.uint16)
+        xform = np.diag([2, 2, 2, 1])
+        key   = cache.key('image.nii.gz', 12345, 0)
+
+        assert cache.get(key) is None
+        assert key not in cache
+
+        mmapped = cache.put(key, data, xform, np.linalg.inv(xform))
+
+        assert key in cache
+        assert isinstance(mmapped, np.memmap)
+        assert np.all(mmapped == data)
+
+        got, vvx, ivvx = cache.get(key)
+        assert np.all(got  == data)
+        assert np.all(vvx  == xform)
+        assert np.all(ivvx == np.linalg.inv(xform))
+
+        # Different parameters -> different key
+        assert cache.key('image.nii.gz', 12345, 1) != key
+
+        # The cache is big enough for two
+        # entries - adding a third should
+        # cause the least recently used
+        # entry to be evicted
+        key2 = cache.key('image.nii.gz', 12345, 1)
+        key3 = cache.key('image.nii.gz', 12345, 2)
+        cache.put(key2, data, xform, xform)
+
+        # access the first entry, so
+        # the second becomes the LRU
+        time.sleep(0.05)
+        cache.get(key)
+        cache.put(key3, data, xform, xform)
+
+        assert key  in     cache
+        assert key2 not in cache
+        assert key3 in     cache
+        assert cache.size() <= cache.maxSize
+
+        # data which is bigger than the
+        # cache is never stored
+        big  = np.zeros((20, 20, 20), dtype=np.uint16)
+        key4 = cache.key('big.nii.gz', 1, 0)
+        assert cache.put(key4, big, xform, xform) is big
+        assert key4 not in cache
+
+        cache.clear()
+        assert cache.size() == 0
+
+
+def test_textureCacheSize_implies_textureCache():
+
+    class DisplayContext(object):
+        pass
+
+    def apply(argv):
+        parser = argparse.ArgumentParser(add_help=False)
+        args   = parseargs.parseArgs(parser, argv, 'fsleyes')
+        with mock.patch('fsleyes.gl.textures.datacache.enable') as enable:
+            parseargs.applyMainArgs(args, [], DisplayContext())
+            return enable.call_args_list
+
+    assert apply([]) == []
+    assert apply(['--textureCache', 'cachedir']) == \
+        [mock.call('cachedir', None)]
+    assert apply(['--textureCacheSize', '10']) == \
+        [mock.call(None, 10 * 1024 * 1024)]
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+#
+# test_framecache.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+import numpy as np
+
+import fsleyes.gl.framecache as framecache
+
+
+def test_FrameCache():
+
+    bmp   = np.zeros((10, 10, 4), dtype=np.uint8)
+    cache = framecache.FrameCache(bmp.nbytes * 9)
+
+    cache.validate('key')
+
+    for i in range(4):
+        assert cache.put(i, [bmp, bmp])
+
+    # over budget
+    assert not cache.put(4, [bmp, bmp])
+    assert     cache.put(4, [bmp, None])
+
+    assert len(cache)  == 5
+    assert cache.size  == bmp.nbytes * 9
+    assert 3           in cache
+    assert 5       not in cache
+    assert cache.get(5) is None
+    assert cache.get(4)[1] is None
+
+    # same key - frames retained
+    cache.current = 2
+    assert cache.validate('key')
+    assert len(cache) == 5
+
+    # new key - frames discarded,
+    # current frame retained
+    assert not cache.validate('newkey')
+    assert len(cache)     == 0
+    assert cache.size     == 0
+    assert cache.current  == 2
+
+    cache.put(0, [bmp])
+    cache.budget = 0
+    assert len(cache) == 0
+
+    cache.clear()
+    assert cache.current is None
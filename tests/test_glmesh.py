@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+#
+# test_glmesh.py - Test GLMesh rendering from vertex buffers.
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+import os.path as op
+
+import numpy     as np
+import OpenGL.GL as gl
+
+import fsl.utils.transform as transform
+from   fsl.utils.platform import platform as fslplatform
+import fsl.data.image      as fslimage
+import fsl.data.mesh       as fslmesh
+import fsl.data.vtk        as fslvtk
+
+from . import run_with_orthopanel, run_with_scene3dpanel, realYield
+
+
+datadir = op.join(op.dirname(__file__), 'testdata')
+
+
+def _bufferData(canvas, glmesh):
+    """Reads back the contents of the vertex and index buffers of the given
+    ``GLMesh``.
+    """
+
+    canvas._setGLContext()
+
+    verts = np.zeros(glmesh.vertices.size, dtype=np.float32)
+    idxs  = np.zeros(glmesh.indices .size, dtype=np.uint32)
+
+    gl.glBindBuffer(gl.GL_ARRAY_BUFFER, glmesh.vertexBuffer)
+    gl.glGetBufferSubData(gl.GL_ARRAY_BUFFER, 0, verts.nbytes, verts)
+    gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+
+    gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, glmesh.indexBuffer)
+    gl.glGetBufferSubData(gl.GL_ELEMENT_ARRAY_BUFFER, 0, idxs.nbytes, idxs)
+    gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    return verts.reshape(-1, 3), idxs
+
+
+def _drawn(canvas):
+    """Returns the number of non-background pixels on the given canvas. """
+    realYield(20)
+    bmp = canvas.getBitmap()
+    return np.sum(np.any(bmp[..., :3] > 0, axis=-1))
+
+
+def _shrink(vertices):
+    """Returns a copy of ``vertices``, scaled by half about their centre. """
+    centre = vertices.mean(axis=0)
+    return centre + 0.5 * (vertices - centre)
+
+
+def _test_vertexSet(canvas, mesh, display, opts):
+    """Checks that the mesh is drawn on the given canvas, and that the
+    vertex buffers (if used), and the render, are updated when the vertex
+    set changes.
+    """
+
+    glmesh  = canvas.getGLObject(mesh)
+    verts   = mesh.vertices
+    xform   = opts.getTransform('mesh', 'display')
+    buffers = glmesh.vertexBuffer is not None
+
+    if buffers:
+        bverts, bidxs = _bufferData(canvas, glmesh)
+        assert np.all(np.isclose(bverts, transform.transform(verts, xform),
+                                 atol=1e-4))
+        assert np.all(bidxs == mesh.indices.flatten())
+
+    display.enabled = False
+    base            = _drawn(canvas)
+    display.enabled = True
+    full            = _drawn(canvas)
+
+    assert full > base
+
+    # Vertex buffers must be
+    # updated with the new set
+    mesh.addVertices(_shrink(verts), 'shrunk', select=False)
+    opts.addVertexSetOptions(['shrunk'])
+    opts.vertexSet = 'shrunk'
+    realYield(20)
+
+    if buffers:
+        bverts, bidxs = _bufferData(canvas, glmesh)
+        expverts      = transform.transform(_shrink(verts), xform)
+        assert np.all(np.isclose(bverts, expverts, atol=1e-4))
+        assert np.all(bidxs == mesh.indices.flatten())
+
+    shrunk = _drawn(canvas)
+    assert base < shrunk < full
+
+
+def _refImage(overlayList, displayCtx, img=None):
+    """Adds a hidden image to the overlay list, so that the display bounds
+    do not change when the mesh vertex set changes.
+    """
+    if img is None:
+        img = fslimage.Image(op.join(datadir, 'mesh_ref'))
+    overlayList.append(img)
+    displayCtx.getDisplay(img).enabled = False
+    return img
+
+
+def test_GLMesh_2D_crossSection():
+    run_with_orthopanel(_test_GLMesh_2D_crossSection)
+def _test_GLMesh_2D_crossSection(panel, overlayList, displayCtx):
+
+    panel.sceneOpts.showCursor = False
+    panel.sceneOpts.showLabels = False
+
+    img  = _refImage(overlayList, displayCtx)
+    mesh = fslvtk.VTKMesh(op.join(datadir, 'mesh_l_thal.vtk'))
+    overlayList.append(mesh)
+    realYield(50)
+
+    display       = displayCtx.getDisplay(mesh)
+    opts          = displayCtx.getOpts(mesh)
+    opts.refImage = img
+    opts.outline  = False
+    opts.colour   = (1, 0, 0)
+
+    # Make sure that the slice
+    # passes through the mesh
+    xform               = opts.getTransform('mesh', 'display')
+    displayCtx.location = transform.transform(
+        mesh.vertices.mean(axis=0), xform)
+    realYield(50)
+
+    # The mesh is drawn as a filled
+    # cross-section (drawCrossSection)
+    _test_vertexSet(panel.getGLCanvases()[2], mesh, display, opts)
+
+
+def test_GLMesh_2D_flat():
+    run_with_orthopanel(_test_GLMesh_2D_flat)
+def _test_GLMesh_2D_flat(panel, overlayList, displayCtx):
+
+    panel.sceneOpts.showCursor = False
+    panel.sceneOpts.showLabels = False
+
+    # A flat mesh, in the z plane
+    verts = np.array([[20, 20, 40],
+                      [70, 20, 40],
+                      [70, 70, 40],
+                      [20, 70, 40]], dtype=np.float64)
+    idxs  = np.array([[0, 1, 2], [0, 2, 3]])
+
+    # The mesh has no reference image, and the
+    # image has an identity affine, so the mesh
+    # vertices are in the display coordinate
+    # system
+    img  = fslimage.Image(np.zeros((100, 100, 80)), xform=np.eye(4))
+    mesh = fslmesh.Mesh(idxs, name='flat', vertices=verts)
+
+    displayCtx.displaySpace = 'world'
+    _refImage(overlayList, displayCtx, img)
+    overlayList.append(mesh)
+    realYield(50)
+
+    display       = displayCtx.getDisplay(mesh)
+    opts          = displayCtx.getOpts(mesh)
+    opts.refImage = None
+    opts.outline  = False
+    opts.colour   = (1, 0, 0)
+    realYield(50)
+
+    # The mesh is drawn in its entirety
+    # on the z canvas (draw2DMesh)
+    _test_vertexSet(panel.getGLCanvases()[2], mesh, display, opts)
+
+
+def test_GLMesh_3D():
+    run_with_scene3dpanel(_test_GLMesh_3D)
+def _test_GLMesh_3D(panel, overlayList, displayCtx):
+
+    panel.sceneOpts.showCursor = False
+    panel.sceneOpts.showLegend = False
+
+    img  = _refImage(overlayList, displayCtx)
+    mesh = fslvtk.VTKMesh(op.join(datadir, 'mesh_l_thal.vtk'))
+    overlayList.append(mesh)
+    realYield(50)
+
+    display       = displayCtx.getDisplay(mesh)
+    opts          = displayCtx.getOpts(mesh)
+    opts.refImage = img
+    opts.colour   = (1, 0, 0)
+    realYield(50)
+
+    canvas = panel.getGLCanvases()[0]
+    glmesh = canvas.getGLObject(mesh)
+
+    # Drawn with glDrawElements from
+    # the index buffer under GL14, and
+    # via shader attributes under GL21,
+    # in which case the GLMesh vertex
+    # buffers are not needed
+    if float(fslplatform.glVersion) >= 2.1:
+        assert glmesh.vertexBuffer is None
+        assert glmesh.indexBuffer  is None
+    else:
+        assert glmesh.vertexBuffer is not None
+
+    _test_vertexSet(canvas, mesh, display, opts)
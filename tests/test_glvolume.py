@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#
+# test_glvolume.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import numpy as np
+
+import fsl.data.image as fslimage
+
+from fsleyes.views.orthopanel import OrthoPanel
+
+from . import run_with_fsleyes, realYield
+
+
+def _image(name, shape):
+    data = np.random.randint(0, 100, shape).astype(np.float32)
+    return fslimage.Image(data, name=name)
+
+
+def test_GLVolume_clipTextureChanged():
+    run_with_fsleyes(_test_GLVolume_clipTextureChanged)
+def _test_GLVolume_clipTextureChanged(frame, overlayList, displayCtx):
+
+    img  = _image('image', (10, 10, 10, 5))
+    clip = _image('clip',  (10, 10, 10))
+
+    panel = frame.addViewPanel(OrthoPanel)
+    overlayList.extend((img, clip))
+    realYield(50)
+
+    opts = panel.displayCtx.getOpts(img)
+    opts.unsyncFromParent('volume')
+    opts.clipImage = clip
+    realYield(50)
+
+    glvol = panel.getGLCanvases()[0].getGLObject(img)
+
+    with mock.patch.object(glvol, 'refreshImageTexture') as refresh:
+
+        # Changes to the clip texture do
+        # not cause the image texture to
+        # be refreshed
+        glvol.clipTexture.notify()
+        realYield(20)
+        assert refresh.call_count == 0
+
+        # But changes to the image texture do
+        glvol.imageTexture.notify()
+        realYield(20)
+        assert refresh.call_count == 1
+
+
+def test_GLVolume_borrowedTexture():
+    run_with_fsleyes(_test_GLVolume_borrowedTexture)
+def _test_GLVolume_borrowedTexture(frame, overlayList, displayCtx):
+
+    img = _image('image', (10, 10, 10, 5))
+
+    synced   = frame.addViewPanel(OrthoPanel)
+    unsynced = frame.addViewPanel(OrthoPanel)
+    overlayList.append(img)
+    realYield(50)
+
+    sopts = synced  .displayCtx.getOpts(img)
+    uopts = unsynced.displayCtx.getOpts(img)
+
+    uopts.unsyncFromParent('volume')
+    realYield(50)
+
+    sglvol = synced  .getGLCanvases()[0].getGLObject(img)
+    uglvol = unsynced.getGLCanvases()[0].getGLObject(img)
+    stex   = sglvol.imageTexture
+
+    # Both display the same volume, so the
+    # unsynced GLVolume borrows the synced
+    # texture
+    assert uglvol.imageTexture is stex
+
+    # Selecting a different volume in the
+    # unsynced view does not modify the
+    # borrowed texture
+    sprio        = stex.priority
+    uopts.volume = 3
+    realYield(50)
+
+    utex = uglvol.imageTexture
+
+    assert sopts.volume      == 0
+    assert list(stex.volume) == [0]
+    assert stex.priority     == sprio
+    assert utex              is not stex
+    assert list(utex.volume) == [3]
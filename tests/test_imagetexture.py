@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+#
+# test_imagetexture.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+import numpy     as np
+import OpenGL.GL as gl
+import nibabel   as nib
+
+import fsl.data.image                   as fslimage
+import fsleyes.gl.textures.texture3d    as texture3d
+import fsleyes.gl.textures.imagetexture as imagetexture
+
+from . import run_with_orthopanel, realYield, tempdir
+
+
+def _textureData(canvas, tex, shape):
+    """Reads the data back from the given ``ImageTexture``, and transforms
+    it into the original image data range.
+    """
+
+    canvas._setGLContext()
+
+    texDtype, baseFmt, _ = texture3d.Texture3D.getTextureType(
+        False, np.dtype(np.int16), 1)
+
+    tex.bindTexture()
+    data = gl.glGetTexImage(gl.GL_TEXTURE_3D, 0, baseFmt, gl.GL_FLOAT)
+    tex.unbindTexture()
+
+    data  = np.asarray(data, dtype=np.float64).reshape(shape, order='F')
+    xform = tex.voxValXform
+
+    return np.round(data * xform[0, 0] + xform[0, 3])
+
+
+def test_ImageTexture_memoryMapped_dataRange():
+    run_with_orthopanel(_test_ImageTexture_memoryMapped_dataRange)
+def _test_ImageTexture_memoryMapped_dataRange(panel, overlayList, displayCtx):
+
+    data         = np.zeros((20, 20, 20, 3), dtype=np.int16)
+    data[..., 0] = np.random.randint(0,    100,  (20, 20, 20))
+    data[..., 1] = np.random.randint(200,  300,  (20, 20, 20))
+    data[..., 2] = np.random.randint(-300, -200, (20, 20, 20))
+
+    with tempdir():
+
+        # Uncompressed, so the texture data
+        # can be read through a memory-map
+        nib.save(nib.Nifti1Image(data, np.eye(4)), 'image.nii')
+
+        img = fslimage.Image('image.nii', loadData=False, calcRange=False)
+        overlayList.append(img)
+        realYield(50)
+
+        opts   = displayCtx.getOpts(img)
+        canvas = panel.getGLCanvases()[0]
+
+        shown = []
+
+        for vol in (1, 2, 0):
+
+            opts.volume = vol
+            tex         = canvas.getGLObject(img).imageTexture
+
+            for i in range(50):
+                realYield()
+                if tex.ready():
+                    break
+
+            # The data range must include
+            # every volume that has been
+            # displayed
+            shown.append(vol)
+            dmin   = data[..., shown].min()
+            dmax   = data[..., shown].max()
+            drange = img.dataRange
+
+            assert tex.ready()
+            assert drange[0] <= dmin and drange[1] >= dmax
+            assert np.all(_textureData(canvas, tex, data.shape[:3]) ==
+                          data[..., vol])
+
+
+def test_ImageTexture_memoryMapped():
+    run_with_orthopanel(_test_ImageTexture_memoryMapped)
+def _test_ImageTexture_memoryMapped(panel, overlayList, displayCtx):
+
+    data = np.random.randint(10, 200, (20, 20, 20)).astype(np.uint8)
+
+    with tempdir():
+
+        nib.save(nib.Nifti1Image(data, np.eye(4)), 'image.nii')
+
+        # The data range is not known when the
+        # image is first displayed, so it is
+        # calculated from the memory-map
+        img = fslimage.Image('image.nii', loadData=False, calcRange=False)
+        overlayList.append(img)
+        realYield(50)
+
+        canvas = panel.getGLCanvases()[0]
+        tex    = canvas.getGLObject(img).imageTexture
+
+        for i in range(50):
+            realYield()
+            if tex.ready():
+                break
+
+        # The texture data is taken straight
+        # from the memory-map, without being
+        # read through the Image
+        assert tex.ready()
+        assert isinstance(tex._Texture3D__preparedData, np.memmap)
+        assert not img.nibImage.in_memory
+        assert img.getImageWrapper().covered
+        assert np.all(np.isclose(img.dataRange, (data.min(), data.max())))
+        assert np.all(_textureData(canvas, tex, data.shape) == data)
+
+
+def test_slabRange():
+
+    data = np.random.random((10, 10, 10))
+    data[2, 3, 4] = np.nan
+    data[5, 6, 7] = np.inf
+    data[1, 1, 9] = -5
+    data[8, 8, 0] = 5
+
+    # one slice per slab
+    assert np.all(imagetexture.slabRange(data, 800) == (-5, 5))
+    assert np.all(imagetexture.slabRange(data)      == (-5, 5))
+    assert np.all(np.isnan(imagetexture.slabRange(np.full((2, 2), np.nan))))
+
+
+def test_stepDirection():
+
+    stepDirection = imagetexture.stepDirection
+
+    assert stepDirection(3, 3, 10) ==  0
+    assert stepDirection(3, 4, 10) ==  1
+    assert stepDirection(3, 6, 10) ==  1
+    assert stepDirection(4, 3, 10) == -1
+    assert stepDirection(6, 3, 10) == -1
+
+    # Looping from the end back to
+    # the start is a forward step,
+    # and vice versa
+    assert stepDirection(9, 0, 10) ==  1
+    assert stepDirection(8, 1, 10) ==  1
+    assert stepDirection(0, 9, 10) == -1
+    assert stepDirection(1, 8, 10) == -1
+
+    # ties are forward
+    assert stepDirection(0, 5, 10) ==  1
+    assert stepDirection(5, 0, 10) ==  1
+    assert stepDirection(0, 1, 2)  ==  1
+    assert stepDirection(1, 0, 2)  ==  1
+
+
+def test_ringVolumes():
+
+    ringVolumes = imagetexture.ringVolumes
+
+    assert ringVolumes(5, 1,  4, 10) == [6, 7, 8, 4]
+    assert ringVolumes(5, -1, 4, 10) == [4, 3, 2, 6]
+
+    # wrap around
+    assert ringVolumes(9, 1,  4, 10) == [0, 1, 2, 8]
+    assert ringVolumes(0, -1, 4, 10) == [9, 8, 7, 1]
+
+    # ring cannot contain more
+    # than the other volumes
+    assert sorted(ringVolumes(1, 1, 8, 4)) == [0, 2, 3]
+    assert ringVolumes(0, 1, 4, 1) == []
+
+    # Playback which loops from the last
+    # volume to the first keeps the ring
+    # ahead of the current volume
+    direction = imagetexture.stepDirection(9, 0, 10)
+    assert ringVolumes(0, direction, 4, 10) == [1, 2, 3, 9]
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+#
+# test_meshopts.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+import os.path as op
+
+import numpy as np
+
+import fsl.data.vtk as fslvtk
+
+from . import run_with_orthopanel, realYield
+
+
+datadir = op.join(op.dirname(__file__), 'testdata')
+
+
+def test_MeshOpts_getVertex():
+    run_with_orthopanel(_test_MeshOpts_getVertex)
+def _test_MeshOpts_getVertex(panel, overlayList, displayCtx):
+
+    mesh = fslvtk.VTKMesh(op.join(datadir, 'mesh_l_thal.vtk'))
+    overlayList.append(mesh)
+    realYield()
+
+    opts  = displayCtx.getOpts(mesh)
+    verts = mesh.vertices
+
+    for vidx in np.random.randint(0, mesh.nvertices, 10):
+
+        assert opts.getVertex(verts[vidx]) == vidx
+
+        # offset from the vertex
+        # by less than the distance
+        # to its nearest neighbour
+        dists   = np.sqrt(np.sum((verts - verts[vidx]) ** 2, axis=1))
+        nndist  = np.min(dists[dists > 0])
+        xyz     = verts[vidx] + [0.25 * nndist, 0, 0]
+
+        assert opts.getVertex(xyz)                    is None
+        assert opts.getVertex(xyz, tolerance=nndist) == vidx
+        assert opts.getNearestVertex(xyz)[0]         == vidx
+
+        # radius query
+        xyz      = verts[vidx]
+        radius   = 2 * nndist
+        expected = np.where(dists <= radius)[0]
+        assert np.all(opts.getVerticesWithin(radius, xyz) == expected)
+
+    # The current location is used
+    # if an xyz is not provided
+    displayCtx.vertexIndex = 5
+    realYield()
+    assert opts.getVertex() == 5
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+#
+# test_moviegif.py - Test the GifWriter and ApngWriter classes
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+import numpy     as np
+import PIL.Image as Image
+
+import fsleyes.actions.moviegif as moviegif
+
+from . import tempdir
+
+
+def _frames(nframes=5, shape=(40, 60)):
+    frames = []
+    for i in range(nframes):
+        xlo, xhi                = i * 10, (i + 1) * 10
+        frame                   = np.zeros(shape + (4, ), dtype=np.uint8)
+        frame[:,    :,       3] = 255
+        frame[:,    xlo:xhi, 0] = 255
+        frame[5:10, :,       2] = 100 + i
+        frames.append(frame)
+    return frames
+
+
+def _test_writer(suffix, wtype):
+
+    frames = _frames()
+
+    with tempdir():
+
+        fname = 'movie.{}'.format(suffix)
+
+        with moviegif.movieWriter(fname, delay=70) as w:
+            assert isinstance(w, wtype)
+            for f in frames:
+                w.write(f)
+
+            # frames of a different size
+            # should be cropped/padded
+            w.write(np.zeros((30, 70, 3), dtype=np.uint8))
+
+            assert w.nframes == len(frames) + 1
+
+        img = Image.open(fname)
+
+        assert img.n_frames         == len(frames) + 1
+        assert img.size             == (60, 40)
+        assert img.info['duration'] == 70
+        assert img.info['loop']     == 0
+
+        for i, f in enumerate(frames):
+            img.seek(i)
+            assert np.all(np.asarray(img.convert('RGBA')) == f)
+
+
+def test_GifWriter():
+    _test_writer('gif', moviegif.GifWriter)
+
+
+def test_ApngWriter():
+    _test_writer('png', moviegif.ApngWriter)
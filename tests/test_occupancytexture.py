@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+#
+# test_occupancytexture.py - Test the minMaxGrid and occupancy functions.
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+import numpy as np
+
+import fsleyes.gl.textures.occupancytexture as occtex
+
+
+def test_minMaxGrid():
+
+    data             = np.zeros((30, 20, 17), dtype=np.int16)
+    data[3,  4,  16] = 10
+    data[29, 19, 0]  = -5
+
+    mins, maxs = occtex.minMaxGrid(data, 8)
+
+    assert mins.shape == (4, 3, 3)
+    assert maxs.shape == (4, 3, 3)
+
+    # Each cell includes its neighbours
+    expmaxs                = np.zeros((4, 3, 3))
+    expmaxs[0:2, 0:2, 1:3] = 10
+    expmins                = np.zeros((4, 3, 3))
+    expmins[2:4, 1:3, 0:2] = -5
+
+    assert np.all(maxs == expmaxs)
+    assert np.all(mins == expmins)
+
+
+def test_minMaxGrid_nan():
+
+    data          = np.full((16, 16, 16), np.nan, dtype=np.float32)
+    data[0, 0, 0] = 1
+
+    mins, maxs = occtex.minMaxGrid(data, 4)
+
+    assert mins.shape == (4, 4, 4)
+    assert np.all(mins[:2, :2, :2] == 1)
+    assert np.all(maxs[:2, :2, :2] == 1)
+    assert np.isnan(mins).sum() == 64 - 8
+
+
+def test_occupancy():
+
+    mins = np.array([0, 0, 5, -10, np.nan])
+    maxs = np.array([0, 5, 5,  -5, np.nan])
+
+    occ = occtex.occupancy(mins, maxs, 0, 10)
+    assert list(occ) == [False, True, True, False, False]
+
+    occ = occtex.occupancy(mins, maxs, 0, 10, mirror=True)
+    assert list(occ) == [False, True, True, True, False]
+
+    occ = occtex.occupancy(mins, maxs, 4, 6, invert=True)
+    assert list(occ) == [True, True, False, True, False]
+
+    occ = occtex.occupancy(mins, maxs, 0, 10, margin=0.5)
+    assert list(occ) == [True, True, True, False, False]
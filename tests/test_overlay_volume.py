@@ -159,3 +159,43 @@ def silly_range():
 
     fslimage.Image(data).save('silly_range.nii.gz')
     return 'silly_range.nii.gz'
+
+
+bricked_cli_tests = """
+3d.nii.gz -dr 2000 7500
+3d.nii.gz -dr 2000 7500 -cr 4000 8000
+-xz 750 -yz 750 -zz 750 3d.nii.gz -in none
+-xz 750 -yz 750 -zz 750 3d.nii.gz -in linear
+4d.nii.gz -v 2 -b 40 -c 90
+"""
+
+
+def test_overlay_volume_bricked():
+    # Images which are split into bricks
+    # should look the same as images which
+    # are stored in a single texture, so
+    # we compare against the same benchmarks
+    with mock.patch('fsleyes.gl.textures.texture3d.MAX_TEXTURE_SIZE', 8):
+        run_cli_tests('test_overlay_volume', bricked_cli_tests)
+
+
+storage_cli_tests = """
+3d.nii.gz -dr 2000 7500                      -ts half
+3d.nii.gz -dr 2000 7500                      -ts byte
+3d.nii.gz -dr 2000 7500 -cr 4000 8000        -ts half
+3d.nii.gz -dr 2000 7500 -cr 4000 8000        -ts byte
+-xz 750 -yz 750 -zz 750 3d.nii.gz -in linear -ts half
+-xz 750 -yz 750 -zz 750 3d.nii.gz -in linear -ts byte
+4d.nii.gz -v 2 -b 40 -c 90                   -ts half
+4d.nii.gz -v 2 -b 40 -c 90                   -ts byte
+"""
+
+
+def test_overlay_volume_textureStorage():
+    # Images stored at a reduced precision
+    # should look (almost) the same as
+    # images stored at full precision, so
+    # the benchmarks for these tests are
+    # copies of the benchmarks for the
+    # default storage.
+    run_cli_tests('test_overlay_volume', storage_cli_tests)
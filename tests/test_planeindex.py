@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+#
+# test_planeindex.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+import numpy as np
+
+import fsleyes.gl.planeindex as planeindex
+
+
+def _bruteForce(vertices, indices, normal, origin):
+    normal = np.array(normal, dtype=np.float64)
+    normal = normal / np.sqrt(np.sum(normal ** 2))
+    dists  = np.dot(vertices, normal) - np.dot(origin, normal)
+    above  = (dists[indices] > 0).sum(axis=1)
+    return np.where((above == 1) | (above == 2))[0]
+
+
+def _randomMesh(nverts=500, ntris=2000):
+    vertices = np.random.random((nverts, 3)) * 100
+    indices  = np.random.randint(0, nverts, (ntris, 3))
+    return vertices, indices
+
+
+def test_PlaneIndex():
+
+    vertices, indices = _randomMesh()
+
+    for normal in [(1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 2, -0.5)]:
+
+        index = planeindex.PlaneIndex(vertices, indices, normal)
+        unorm = index.normal
+
+        assert np.isclose(np.sqrt(np.sum(unorm ** 2)), 1)
+
+        for off in np.linspace(-10, 110, 25):
+
+            origin             = unorm * off
+            lines, faces, bary = index.intersect(origin)
+            expfaces           = _bruteForce(vertices, indices,
+                                             normal,   origin)
+
+            assert np.all(faces == expfaces)
+            assert lines.shape == (len(faces), 2, 3)
+            assert bary .shape == (len(faces), 2, 3)
+
+            if len(faces) == 0:
+                continue
+
+            # line vertices are on the plane
+            assert np.all(np.isclose(np.dot(lines, unorm), off))
+
+            # barycentric coordinates sum to
+            # one, and map to the line vertices
+            tverts = vertices[indices[faces]]
+            recon  = (bary[:, :, :, None] * tverts[:, None, :, :]).sum(axis=2)
+
+            assert np.all(np.isclose(bary.sum(axis=2), 1))
+            assert np.all(np.isclose(recon, lines))
+
+
+def test_PlaneIndex_onPlane():
+
+    # Two triangles sharing an edge, one of
+    # which lies in the plane z == 0
+    vertices = np.array([[0, 0, 0],
+                         [1, 0, 0],
+                         [0, 1, 0],
+                         [0, 0, 1]], dtype=np.float64)
+    indices  = np.array([[0, 1, 2],
+                         [0, 1, 3]])
+
+    index = planeindex.PlaneIndex(vertices, indices, (0, 0, 1))
+
+    # The in-plane triangle is ignored, but
+    # the edge that it shares with the other
+    # triangle is returned
+    lines, faces, bary = index.intersect((0, 0, 0))
+    assert list(faces) == [1]
+    assert np.all(np.isclose(lines[0, :, 2], 0))
+
+    lines, faces, bary = index.intersect((0, 0, 0.5))
+    assert list(faces) == [1]
+    assert np.all(np.isclose(lines[0, :, 2], 0.5))
+
+
+def test_PlaneIndex_empty():
+    vertices = np.zeros((0, 3))
+    indices  = np.zeros((0, 3), dtype=np.uint32)
+    index    = planeindex.PlaneIndex(vertices, indices, (0, 0, 1))
+
+    lines, faces, bary = index.intersect((0, 0, 0))
+
+    assert len(faces) == 0
+    assert lines.shape == (0, 2, 3)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#
+# test_profiler.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+import time
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import fsleyes.gl.profiler as glprofiler
+
+
+class GLObject(object):
+    def __init__(self, name):
+        self.name    = name
+        self.overlay = None
+
+
+def test_profiler():
+
+    gpu    = glprofiler._gpuTiming
+    globj1 = GLObject('globj1')
+    globj2 = GLObject('globj2')
+
+    try:
+        glprofiler._gpuTiming = False
+        glprofiler.reset()
+
+        # disabled by default
+        with glprofiler.phase(globj1, 'draw2D'):
+            pass
+        assert len(glprofiler.stats()) == 0
+
+        glprofiler.enable()
+        assert glprofiler.enabled()
+
+        for i in range(5):
+            with glprofiler.phase(globj1, 'draw2D'):
+                time.sleep(0.01)
+            with glprofiler.phase(globj2, 'draw2D'):
+                pass
+
+        stats = glprofiler.stats()
+        assert len(stats) == 2
+        assert stats[0].count == 5
+        assert stats[1].count == 5
+        assert stats[0].cpuMean >= 0.01
+        assert stats[0].cpuMax  >= stats[0].cpuMean
+        assert stats[1].cpuMean <  stats[0].cpuMean
+        assert stats[0].gpuMean is None
+
+        report = glprofiler.report().split('\n')
+        assert len(report) == 3
+        assert 'draw2D' in report[1]
+
+        glprofiler.reset()
+        assert len(glprofiler.stats()) == 0
+
+    finally:
+        glprofiler.disable()
+        glprofiler.reset()
+        glprofiler._gpuTiming = gpu
+
+
+def test_enable_refcount():
+
+    glprofiler.reset()
+
+    try:
+        assert not glprofiler.enabled()
+
+        glprofiler.enable()
+        glprofiler.enable()
+        assert glprofiler.enabled()
+
+        # Profiling stays enabled until
+        # every enable has been released
+        glprofiler.disable()
+        assert glprofiler.enabled()
+        glprofiler.disable()
+        assert not glprofiler.enabled()
+
+        # Extra calls to disable are ignored
+        glprofiler.disable()
+        glprofiler.enable()
+        assert glprofiler.enabled()
+
+    finally:
+        glprofiler._enabled = 0
+        glprofiler.reset()
+
+
+def test_reset_deletes_pending():
+
+    st = glprofiler.PhaseStats('globj', 'draw2D')
+
+    glprofiler._pending.append((1, st))
+    glprofiler._pending.append((2, st))
+
+    with mock.patch('OpenGL.GL.glDeleteQueries') as delete:
+        glprofiler.reset()
+
+        assert len(glprofiler._pending) == 0
+        delete.assert_called_once_with(2, [1, 2])
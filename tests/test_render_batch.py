@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+#
+# test_render_batch.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+import os.path as op
+import            os
+import            json
+import            shutil
+
+import pytest
+
+import matplotlib.image as mplimg
+
+from fsl.utils.tempdir import tempdir
+
+import fsleyes.render as fslrender
+
+from . import compare_images
+
+
+pytestmark = pytest.mark.clitest
+
+
+# The same file is used by every job, so
+# its texture is re-used by the second and
+# fourth jobs. The third job has different
+# settings, so cannot re-use the texture.
+batch_tests = [
+    '3d.nii.gz',
+    '-hl 3d.nii.gz',
+    '-lo horizontal 3d.nii.gz',
+    '3d.nii.gz',
+]
+
+
+@pytest.mark.parametrize('njobs', [1, 2])
+def test_render_batch(njobs):
+
+    glver    = os.environ.get('FSLEYES_TEST_GL', '2.1')
+    glver    = [int(v) for v in glver.split('.')]
+    datadir  = op.join(op.dirname(__file__), 'testdata')
+    benchdir = op.join(datadir, 'cli_tests')
+
+    with tempdir() as td:
+
+        shutil.copytree(datadir, op.join(td, 'testdata'))
+        os.chdir('testdata')
+
+        jobs = []
+        for i, test in enumerate(batch_tests):
+            jobs.append('-of {}.png {}'.format(i, test))
+
+        # one job which will fail
+        jobs.insert(2, '-of bad.png nonexistent.nii.gz')
+
+        with open('manifest.json', 'wt') as f:
+            json.dump(jobs, f)
+
+        common = '-gl {} {} -sz 640 480 -s ortho'.format(*glver).split()
+
+        with pytest.raises(SystemExit):
+            fslrender.main(['--batch', 'manifest.json',
+                            '--jobs', str(njobs)] + common)
+
+        assert not op.exists('bad.png')
+
+        for i, test in enumerate(batch_tests):
+            fname     = 'test_render_ortho_{}.png'.format(
+                test.replace(' ', '_'))
+            benchmark = op.join(benchdir, fname)
+            testimg   = mplimg.imread('{}.png'.format(i))
+            benchimg  = mplimg.imread(benchmark)
+
+            assert compare_images(testimg, benchimg, 50)[0]
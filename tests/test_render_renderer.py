@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#
+# test_render_renderer.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+import os.path as op
+import            os
+
+import numpy as np
+import pytest
+
+import matplotlib.image as mplimg
+
+from fsl.data.image    import Image
+from fsl.utils.tempdir import tempdir
+
+import fsleyes.render as fslrender
+
+from . import compare_images
+
+
+pytestmark = pytest.mark.clitest
+
+
+def test_Renderer():
+
+    glver    = os.environ.get('FSLEYES_TEST_GL', '2.1')
+    glver    = [int(v) for v in glver.split('.')]
+    datadir  = op.join(op.dirname(__file__), 'testdata')
+    benchdir = op.join(datadir, 'cli_tests')
+
+    renderer = fslrender.Renderer(glver)
+    overlayList, displayCtx, sceneOpts = renderer.createScene('ortho')
+
+    def check(bitmap, bench):
+        assert bitmap.dtype == np.uint8
+        assert bitmap.shape == (480, 640, 4)
+        bench = op.join(benchdir, 'test_render_ortho_{}.png'.format(bench))
+        with tempdir():
+            mplimg.imsave('test.png', bitmap)
+            assert compare_images(mplimg.imread('test.png'),
+                                  mplimg.imread(bench), 50)[0]
+
+    try:
+        overlayList.append(Image(op.join(datadir, '3d')))
+
+        # The second call re-uses the GL
+        # state from the first call. The
+        # third call has a different scene
+        # setting, and the fourth has a
+        # different display setting.
+        first = renderer.render(overlayList, displayCtx, sceneOpts,
+                                size=(640, 480))
+        check(first, '3d.nii.gz')
+        check(renderer.render(overlayList, displayCtx, sceneOpts,
+                              size=(640, 480)), '3d.nii.gz')
+
+        sceneOpts.layout = 'horizontal'
+        check(renderer.render(overlayList, displayCtx, sceneOpts,
+                              size=(640, 480)), '-lo_horizontal_3d.nii.gz')
+
+        sceneOpts.layout = 'grid'
+        displayCtx.getOpts(overlayList[0]).cmap = 'red-yellow'
+        bitmap = renderer.render(overlayList, displayCtx, sceneOpts,
+                                 size=(640, 480))
+        assert not np.all(bitmap == first)
+
+        # Cropping
+        cropped = renderer.render(overlayList, displayCtx, sceneOpts,
+                                  size=(640, 480), crop=0)
+        assert cropped.shape[0] <= 480 and cropped.shape[1] <= 640
+
+    finally:
+        overlayList.clear()
+        displayCtx.destroy()
+        displayCtx.masterDisplayCtx.destroy()
+        renderer.destroy()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+#
+# test_rendertexturestack.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import contextlib
+
+import fsleyes.gl.textures.rendertexturestack as rts
+
+
+class RenderTexture(object):
+    def __init__(self, name, rttype):
+        self.name      = name
+        self.destroyed = False
+        self.drawn     = 0
+    def setSize(self, w, h):
+        pass
+    def bindAsRenderTarget(self):
+        pass
+    def unbindAsRenderTarget(self):
+        pass
+    def drawOnBounds(self, *args):
+        self.drawn += 1
+    def destroy(self):
+        self.destroyed = True
+
+
+class GLObject(object):
+    def ready(self):
+        return True
+    def getDisplayBounds(self):
+        return (0, 0, 0), (10, 10, 10)
+    def getDataResolution(self, xax, yax):
+        return (10, 10, 10)
+    def preDraw(self):
+        pass
+    def draw2D(self, *args):
+        pass
+    def postDraw(self):
+        pass
+
+
+@contextlib.contextmanager
+def mockStack(maxMemory):
+    """Creates a ``RenderTextureStack`` with 10 slices, with all of its GL
+    calls mocked out. Idle tasks are queued, and run by the ``runIdle``
+    function which is yielded along with the stack.
+    """
+
+    queue = []
+
+    def idle(task, *args, **kwargs):
+        queue.append((task, args))
+
+    def runIdle():
+        while len(queue) > 0:
+            task, args = queue.pop(0)
+            task(*args)
+
+    rtmod = rts.rendertexture
+
+    with mock.patch.object(rtmod,    'RenderTexture', RenderTexture), \
+         mock.patch.object(rts.idle, 'idle',          idle), \
+         mock.patch.object(rts,      'gl'), \
+         mock.patch.object(rts,      'glroutines'):
+
+        stack = rts.RenderTextureStack(GLObject(), maxMemory=maxMemory)
+        stack.setAxes(0, 1)
+        yield stack, runIdle
+        stack.destroy()
+        runIdle()
+
+
+def zpos(idx):
+    """Returns the Z position of slice ``idx``. """
+    return idx + 0.5
+
+
+def slices(stack):
+    """Returns the indices of all slices which have a texture. """
+    return [i for i in range(10)
+            if stack._RenderTextureStack__textures[i] is not None]
+
+
+def test_prerender_limit():
+
+    # room for four slices of 10 * 10 RGBA pixels
+    tsize = 10 * 10 * 4
+
+    with mockStack(4 * tsize) as (stack, runIdle):
+
+        stack.draw(zpos(5))
+        runIdle()
+
+        # Background pre-rendering stops when the
+        # limit is reached, keeping the slices
+        # closest to the most recently drawn one
+        assert stack.memoryUsage == 4 * tsize
+        assert slices(stack)     == [3, 4, 5, 6]
+
+
+def test_evict_furthest():
+
+    tsize = 10 * 10 * 4
+
+    with mockStack(4 * tsize) as (stack, runIdle):
+
+        stack.draw(zpos(5))
+        runIdle()
+        old = stack._RenderTextureStack__textures[6]
+
+        # Drawing a slice which has not been pre-
+        # rendered evicts the slice which is
+        # furthest from it, and pre-rendering
+        # then proceeds from that slice
+        stack.draw(zpos(1))
+        runIdle()
+
+        assert stack.memoryUsage == 4 * tsize
+        assert old.destroyed
+        assert slices(stack) == [0, 1, 2, 3]
+
+
+def test_scroll_requeue():
+
+    tsize = 10 * 10 * 4
+
+    with mockStack(4 * tsize) as (stack, runIdle):
+
+        stack.draw(zpos(5))
+        runIdle()
+        assert slices(stack) == [3, 4, 5, 6]
+
+        # Pre-rendering stopped at the memory
+        # limit, but is re-started around the
+        # new slice when the user scrolls
+        stack.draw(zpos(8))
+        runIdle()
+        assert stack.memoryUsage == 4 * tsize
+        assert slices(stack)     == [6, 7, 8, 9]
+
+        # Existing textures are kept when
+        # scrolling within the pre-rendered
+        # slices
+        texes = [stack._RenderTextureStack__textures[i] for i in range(6, 10)]
+        stack.draw(zpos(7))
+        runIdle()
+        assert slices(stack) == [6, 7, 8, 9]
+        assert [stack._RenderTextureStack__textures[i]
+                for i in range(6, 10)] == texes
+
+
+def test_visible_never_evicted():
+
+    tsize = 10 * 10 * 4
+
+    with mockStack(2 * tsize) as (stack, runIdle):
+
+        # Four slices are visible at once (e.g.
+        # in a lightbox view) - they are all
+        # drawn, and kept, even though they do
+        # not fit within the memory limit
+        visible = [1, 3, 6, 8]
+        stack.drawAll([zpos(i) for i in visible])
+        runIdle()
+
+        texes = [stack._RenderTextureStack__textures[i] for i in visible]
+
+        assert slices(stack)     == visible
+        assert stack.memoryUsage == 4 * tsize
+        assert all(t.drawn == 1 for t in texes)
+
+        # Re-drawing does not re-create
+        # or destroy any textures
+        stack.drawAll([zpos(i) for i in visible])
+        runIdle()
+
+        assert slices(stack) == visible
+        assert [stack._RenderTextureStack__textures[i] for i in visible] == \
+            texes
+        assert not any(t.destroyed for t in texes)
+        assert all(t.drawn == 2 for t in texes)
+
+        # When a different set of slices is
+        # drawn, the old slices may be evicted
+        stack.drawAll([zpos(0), zpos(9)])
+        runIdle()
+        assert slices(stack) == [0, 9]
+        assert all(t.destroyed for t in texes)
+
+
+def test_max_memory():
+
+    tsize = 10 * 10 * 4
+
+    with mock.patch.object(rts, 'MAX_MEMORY', 3 * tsize), \
+         mockStack(None) as (stack, runIdle):
+
+        assert stack.maxMemory == 3 * tsize
+
+        stack.draw(zpos(5))
+        runIdle()
+        assert slices(stack) == [4, 5, 6]
+
+        # Changes to MAX_MEMORY affect
+        # existing stacks
+        rts.MAX_MEMORY = 5 * tsize
+        stack.draw(zpos(5))
+        runIdle()
+        stack.onGLObjectUpdate()
+        runIdle()
+        assert slices(stack) == [3, 4, 5, 6, 7]
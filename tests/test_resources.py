@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+#
+# test_resources.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+import time
+
+import fsleyes.gl.resources as glresources
+
+
+class Resource(object):
+    def __init__(self, size):
+        self.size      = size
+        self.destroyed = False
+        self.evicted   = False
+    def memorySize(self):
+        if self.evicted: return 0
+        else:            return self.size
+    def evict(self):
+        self.evicted = True
+    def destroy(self):
+        self.destroyed = True
+
+
+def test_budget():
+
+    glresources.setBudget(None)
+
+    try:
+        r1 = glresources.get('r1', Resource, 100)
+        r2 = glresources.get('r2', Resource, 100)
+        r3 = glresources.get('r3', Resource, 100)
+        r4 = glresources.get('r4', Resource, 100)
+
+        usage = glresources.usage()
+        assert usage['total']    == 400
+        assert usage['count']    == 4
+        assert usage['resident'] == 4
+
+        # r1 is used by a visible user, r2 and r3
+        # by a hidden user, and r4 by nobody
+        glresources.registerVisibility('shown',  lambda: ([r1],     True))
+        glresources.registerVisibility('hidden', lambda: ([r2, r3], False))
+
+        assert     glresources.visible(r1)
+        assert not glresources.visible(r2)
+        assert not glresources.visible(r4)
+
+        # hidden resources are evicted,
+        # least recently used first
+        glresources.used(r2)
+        time.sleep(0.01)
+        glresources.used(r3)
+        glresources.setBudget(350)
+        assert     r2.evicted
+        assert not r1.evicted
+        assert not r3.evicted
+        assert not r4.evicted
+        assert glresources.usage()['total'] == 300
+
+        # visible and unclaimed resources are
+        # never evicted, even if the budget is
+        # exceeded
+        glresources.setBudget(50)
+        assert     r3.evicted
+        assert not r1.evicted
+        assert not r4.evicted
+        assert glresources.enforceBudget() == 0
+
+        # resources which are not referenced
+        # are evicted, even if they are visible
+        glresources.deregisterVisibility('hidden')
+        glresources.setRetain(True)
+        glresources.delete('r1')
+        assert not r1.destroyed
+        assert glresources.enforceBudget() == 1
+        assert     r1.evicted
+        assert not r4.evicted
+
+        glresources.setRetain(False)
+        glresources.purge()
+        glresources.delete('r2')
+        glresources.delete('r3')
+        glresources.delete('r4')
+        assert all(r.destroyed for r in (r1, r2, r3, r4))
+        assert glresources.usage()['count'] == 0
+
+    finally:
+        glresources.setBudget(None)
+        glresources.setRetain(False)
+        glresources.deregisterVisibility('shown')
+        glresources.deregisterVisibility('hidden')
+
+
+def test_restore():
+
+    class RestorableResource(Resource):
+        def restore(self):
+            self.evicted = False
+
+    try:
+        r1 = glresources.get('r1', RestorableResource, 100)
+        glresources.registerVisibility('hidden', lambda: ([r1], False))
+        glresources.setBudget(50)
+        assert r1.evicted
+
+        # get restores evicted resources
+        assert glresources.get('r1') is r1
+        assert not r1.evicted
+        assert glresources.refcount('r1') == 2
+
+    finally:
+        glresources.setBudget(None)
+        glresources.deregisterVisibility('hidden')
+
+    glresources.delete('r1')
+    glresources.delete('r1')
+    assert r1.destroyed
+
+
+def test_retain():
+
+    glresources.setRetain(True)
+
+    try:
+        r1 = glresources.get('r1', Resource, 100)
+        r2 = glresources.get('r2', Resource, 100)
+
+        glresources.delete('r1')
+        glresources.delete('r2')
+
+        # retained, and re-used by get
+        assert not r1.destroyed
+        assert not r2.destroyed
+        assert glresources.refcount('r1') == 0
+        assert glresources.get('r1') is r1
+        assert glresources.refcount('r1') == 1
+
+        glresources.delete('r1')
+
+        # only unreferenced resources are purged
+        r3 = glresources.get('r3', Resource, 100)
+        glresources.purge(keep=lambda key: key == 'r1')
+        assert not r1.destroyed
+        assert     r2.destroyed
+        assert not r3.destroyed
+        assert not glresources.exists('r2')
+
+        glresources.purge()
+        assert r1.destroyed
+        assert not r3.destroyed
+
+    finally:
+        glresources.setRetain(False)
+
+    glresources.delete('r3')
+    assert r3.destroyed
+    assert glresources.usage()['count'] == 0
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+#
+# test_routines.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+import numpy as np
+
+import fsl.utils.transform as transform
+import fsleyes.gl.routines as glroutines
+
+
+def test_transformAll():
+
+    verts  = np.random.random((5, 6, 3)).astype(np.float32)
+    xforms = [transform.compose(np.random.random(3) + 0.5,
+                                np.random.random(3),
+                                np.random.random(3))
+              for i in range(5)]
+
+    result = glroutines.transformAll(verts, xforms)
+
+    assert result.shape == (5, 6, 3)
+    assert result.dtype == np.float32
+
+    for v, x, r in zip(verts, xforms, result):
+        assert np.all(np.isclose(transform.transform(v, x), r, atol=1e-5))
+
+
+def test_broadcast():
+
+    verts   = np.random.random((4, 3))
+    indices = [0, 1, 2, 0, 2, 3]
+    zposes  = np.linspace(0, 1, 7)
+    xforms  = [transform.scaleOffsetXform(1, [i, 2 * i, 0])
+               for i in range(7)]
+
+    allVerts, allTexCoords, allIndices = glroutines.broadcast(
+        verts, indices, zposes, xforms, 2)
+
+    assert allVerts    .shape == (28, 3)
+    assert allTexCoords.shape == (28, 3)
+    assert allIndices  .shape == (42,)
+
+    for i, (zpos, xform) in enumerate(zip(zposes, xforms)):
+
+        expTexCoords       = np.array(verts)
+        expTexCoords[:, 2] = zpos
+        expVerts           = transform.transform(expTexCoords, xform)
+
+        vslc = slice(i * 4, i * 4 + 4)
+        islc = slice(i * 6, i * 6 + 6)
+
+        assert np.all(np.isclose(allTexCoords[vslc], expTexCoords))
+        assert np.all(np.isclose(allVerts[    vslc], expVerts))
+        assert np.all(allIndices[islc] == np.array(indices) + i * 4)
+
+
+def test_subsample_smooth():
+
+    data = np.random.randint(0, 1000, (20, 17, 9)).astype(np.int16)
+
+    sample, starts, steps = glroutines.subsample(data, 2, smooth=True)
+
+    assert sample.dtype == np.int16
+    assert sample.shape == (10, 9, 5)
+    assert starts       == (0, 0, 0)
+    assert steps        == (2, 2, 2)
+
+    # Each sample is the mean of the 2*2*2
+    # block starting at the sample location,
+    # clamped at the data boundaries
+    padded = np.pad(data.astype(np.float64), [(0, 0), (0, 1), (0, 1)],
+                    mode='edge')
+    exp    = np.zeros((10, 9, 5))
+    for i, j, k in np.ndindex(*exp.shape):
+        exp[i, j, k] = padded[i * 2:i * 2 + 2,
+                              j * 2:j * 2 + 2,
+                              k * 2:k * 2 + 2].mean()
+
+    assert np.all(sample == np.round(exp))
+
+    # Single/double precision data is
+    # accumulated at its own precision
+    for dtype in (np.float32, np.float64):
+        fdata  = np.random.random((8, 8, 8)).astype(dtype)
+        sample = glroutines.subsample(fdata, 2, smooth=True)[0]
+        exp    = fdata.reshape(4, 2, 4, 2, 4, 2).mean(axis=(1, 3, 5))
+
+        assert sample.dtype == dtype
+        assert np.all(np.isclose(sample, exp, atol=1e-6))
+
+    # Not smoothed - every second voxel
+    sample = glroutines.subsample(data, 2)[0]
+    assert np.all(sample == data[::2, ::2, ::2])
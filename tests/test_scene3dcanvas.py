@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+#
+# test_scene3dcanvas.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+import numpy as np
+
+import fsleyes.gl.scene3dcanvas as scene3dcanvas
+
+
+class Scene3DCanvas(scene3dcanvas.Scene3DCanvas):
+    """Scene3DCanvas which can be created without an overlay list,
+    display context, or GL context, for testing level of detail
+    calculations.
+    """
+    def __init__(self):
+        self._Scene3DCanvas__interacting = False
+        self._Scene3DCanvas__lodLevel    = 1.0
+        self.refreshed                   = 0
+    def Refresh(self):
+        self.refreshed += 1
+    def adjustLod(self, elapsed):
+        self._Scene3DCanvas__adjustLod(elapsed)
+
+
+def test_lod_stepdown():
+
+    canvas = Scene3DCanvas()
+    target = canvas.TARGET_FRAME_TIME
+
+    canvas.beginInteraction()
+    assert canvas.lod == 1
+
+    # Frames which take as long as the
+    # target leave the lod unchanged
+    canvas.adjustLod(target)
+    assert np.isclose(canvas.lod, 1)
+
+    # draw time is proportional to the
+    # cube of the lod, so a frame which
+    # takes eight times too long halves it
+    canvas.adjustLod(target * 8)
+    assert np.isclose(canvas.lod, 0.5)
+
+    canvas.adjustLod(target * 8)
+    assert np.isclose(canvas.lod, 0.25)
+
+    # Never drops below MIN_LOD
+    canvas.adjustLod(target * 1000)
+    assert np.isclose(canvas.lod, canvas.MIN_LOD)
+
+
+def test_lod_recovery():
+
+    canvas = Scene3DCanvas()
+    target = canvas.TARGET_FRAME_TIME
+
+    canvas.beginInteraction()
+    canvas.adjustLod(target * 1000)
+    assert np.isclose(canvas.lod, canvas.MIN_LOD)
+
+    # Fast frames raise the lod
+    canvas.adjustLod(target / 8)
+    assert np.isclose(canvas.lod, canvas.MIN_LOD * 2)
+
+    # but never above 1
+    canvas.adjustLod(target / 1000)
+    assert np.isclose(canvas.lod, 1)
+
+    # A zero draw time is handled
+    canvas.adjustLod(0)
+    assert np.isclose(canvas.lod, 1)
+
+
+def test_lod_interaction():
+
+    canvas = Scene3DCanvas()
+    target = canvas.TARGET_FRAME_TIME
+
+    canvas.beginInteraction()
+    canvas.adjustLod(target * 8)
+    assert np.isclose(canvas.lod, 0.5)
+
+    # Full quality when not interacting
+    canvas.endInteraction()
+    assert canvas.lod       == 1
+    assert canvas.refreshed == 1
+
+    # Redundant calls are ignored
+    canvas.endInteraction()
+    assert canvas.refreshed == 1
+
+    # The previous level is used as the
+    # starting point for the next interaction
+    canvas.beginInteraction()
+    assert np.isclose(canvas.lod, 0.5)
+
+
+def test_lod_steps():
+
+    canvas = Scene3DCanvas()
+    target = canvas.TARGET_FRAME_TIME
+    step   = canvas.LOD_STEP
+
+    canvas.beginInteraction()
+
+    # Small changes in the draw time do
+    # not change the level of detail
+    canvas.adjustLod(target * 1.2)
+    assert canvas.lod == 1
+    canvas.adjustLod(target * 1.2)
+    assert canvas.lod == 1 - step
+
+    # lod is always a multiple of the step
+    for elapsed in np.linspace(0.2, 3, 20) * target:
+        canvas.adjustLod(elapsed)
+        assert np.isclose(canvas.lod / step, np.round(canvas.lod / step))
+        assert canvas.MIN_LOD <= canvas.lod <= 1
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+#
+# test_scenehash.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+import numpy as np
+
+import fsl.data.image as fslimage
+import fsleyes.gl     as fslgl
+
+from . import run_with_orthopanel, run_with_scene3dpanel, realYield
+
+
+class Target(fslgl.SceneHashTarget):
+    def __init__(self):
+        fslgl.SceneHashTarget.__init__(self)
+        self.state = 0
+    def _sceneHash(self):
+        return self.state
+
+
+def test_SceneHashTarget():
+
+    target = Target()
+
+    assert not target._sceneUnchanged()
+    assert     target._sceneUnchanged()
+    assert     target._sceneUnchanged()
+    assert target.drawCount        == 1
+    assert target.skippedDrawCount == 2
+
+    target.state = 1
+    assert not target._sceneUnchanged()
+    assert     target._sceneUnchanged()
+
+    target._invalidateSceneHash()
+    assert not target._sceneUnchanged()
+    assert target.drawCount        == 3
+    assert target.skippedDrawCount == 3
+
+    # None -> always draw
+    target.state = None
+    assert not target._sceneUnchanged()
+    assert not target._sceneUnchanged()
+    assert target.drawCount == 5
+
+
+def test_SceneHashTarget_disabled():
+
+    target = Target()
+    skip   = fslgl.SKIP_UNCHANGED_DRAWS
+    try:
+        fslgl.SKIP_UNCHANGED_DRAWS = False
+        assert not target._sceneUnchanged()
+        assert not target._sceneUnchanged()
+        assert target.skippedDrawCount == 0
+    finally:
+        fslgl.SKIP_UNCHANGED_DRAWS = skip
+
+
+def _test_canvas_sceneHash(panel, overlayList, displayCtx):
+    """Checks that the scene hash of every canvas in the given panel
+    changes when the canvas, display, opts, or GLObject state changes.
+    """
+
+    img = fslimage.Image(np.random.random((10, 10, 10)), name='image')
+    overlayList.append(img)
+    realYield(50)
+
+    display  = displayCtx.getDisplay(img)
+    opts     = displayCtx.getOpts(img)
+    canvases = panel.getGLCanvases()
+
+    def hashes():
+        return [c._sceneHash() for c in canvases]
+
+    def changed(before):
+        after = hashes()
+        return all(b != a for b, a in zip(before, after))
+
+    before = hashes()
+    assert all(h is not None for h in before)
+    assert hashes() == before
+
+    # canvas properties
+    for c in canvases:
+        c.opts.bgColour = (0.5, 0.5, 0.5, 1)
+    assert changed(before)
+
+    # display properties
+    before        = hashes()
+    display.alpha = 50
+    assert changed(before)
+
+    # opts properties
+    before    = hashes()
+    opts.cmap = 'hot'
+    assert changed(before)
+
+    # GLObject state
+    before = hashes()
+    for c in canvases:
+        c.getGLObject(img).notify()
+    assert changed(before)
+
+    # new overlay
+    before = hashes()
+    img2   = fslimage.Image(np.random.random((10, 10, 10)), name='image2')
+    overlayList.append(img2)
+    realYield(50)
+    assert changed(before)
+
+
+def test_SliceCanvas_sceneHash():
+    run_with_orthopanel(_test_canvas_sceneHash)
+
+
+def test_Scene3DCanvas_sceneHash():
+    run_with_scene3dpanel(_test_canvas_sceneHash)
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+#
+# test_texture3d.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import numpy     as np
+import OpenGL.GL as gl
+
+import fsleyes.gl.textures.texture3d as texture3d
+
+from . import run_with_orthopanel, realYield
+
+
+def test_processSlabs():
+
+    def normalise(src, dst):
+        dst[:] = np.round(np.clip(src / 1000.0, 0, 1) * 65535)
+
+    for order in ('C', 'F'):
+        for shape in [(20, 30, 40), (3, 20, 30, 40), (10, 10, 1)]:
+
+            data = np.asarray(np.random.random(shape) * 1200,
+                              dtype=np.float32,
+                              order=order)
+            exp  = np.array(np.round(np.clip(data / 1000.0, 0, 1) * 65535),
+                            dtype=np.uint16)
+
+            for nthreads in (1, 4):
+                out = np.empty(shape, dtype=np.uint16,
+                               order=texture3d.slabOrder(data))
+
+                # small slab size, so the
+                # data is split into many slabs
+                texture3d.processSlabs(normalise,
+                                       data,
+                                       out,
+                                       slabSize=1000,
+                                       nthreads=nthreads)
+
+                assert out.flags['{}_CONTIGUOUS'.format(order)]
+                assert np.all(out == exp)
+
+
+def _oldPrepareData(data, normalise, dmin, dmax, floatTextures):
+    """Reference implementation of texture data preparation, as it was
+    performed on the full data, before slab-wise preparation was
+    introduced. Used by ``test_Texture3D_prepareData``.
+    """
+
+    dtype = data.dtype
+
+    if normalise:
+        data = np.asarray(data, dtype=np.float64)
+        if dmax != dmin:
+            data = np.clip((data - dmin) / float(dmax - dmin), 0, 1)
+        data = np.round(data * 65535)
+        data = np.array(data, dtype=np.uint16)
+
+    elif dtype == np.uint8:  pass
+    elif dtype == np.int8:   data = np.array(data.astype(np.int32) + 128,
+                                             dtype=np.uint8)
+    elif dtype == np.uint16: pass
+    elif dtype == np.int16:  data = np.array(data.astype(np.int32) + 32768,
+                                             dtype=np.uint16)
+    elif floatTextures:      data = np.array(data, dtype=np.float32)
+
+    return data
+
+
+def test_Texture3D_prepareData():
+    run_with_orthopanel(_test_Texture3D_prepareData)
+def _test_Texture3D_prepareData(panel, overlayList, displayCtx):
+
+    canvas = panel.getGLCanvases()[0]
+    shape  = (23, 17, 31)
+    floatt = texture3d.Texture3D.canUseFloatTextures()[0]
+
+    def rand(dtype):
+        if np.issubdtype(dtype, np.integer):
+            info = np.iinfo(dtype)
+            return np.random.randint(info.min, int(info.max) + 1, shape)
+        return np.random.random(shape) * 1000 - 500
+
+    # (dtype, normalise)
+    tests = [(np.uint8,   False),
+             (np.int8,    False),
+             (np.uint16,  False),
+             (np.int16,   False),
+             (np.int16,   True),
+             (np.float32, True),
+             (np.float64, True)]
+
+    # Non-normalised floating point data
+    # requires floating point textures
+    if floatt:
+        tests.append((np.float64, False))
+
+    # Small slab size, so the data is
+    # split into many slabs, which are
+    # processed on multiple threads
+    with mock.patch.object(texture3d, 'SLAB_SIZE',   1000), \
+         mock.patch.object(texture3d, 'NUM_THREADS', 4):
+
+        for order in ('C', 'F'):
+            for dtype, normalise in tests:
+
+                data = np.asarray(rand(dtype), dtype=dtype, order=order)
+
+                if normalise:
+                    dmin, dmax = np.percentile(data, [10, 90])
+                    kwargs     = {'normalise'      : True,
+                                  'normaliseRange' : (dmin, dmax)}
+                else:
+                    dmin, dmax = 0, 0
+                    kwargs     = {}
+
+                canvas._setGLContext()
+                tex = texture3d.Texture3D('test',
+                                          threaded=False,
+                                          data=data,
+                                          **kwargs)
+
+                try:
+                    got = tex.prepareData(data)[0]
+                    exp = _oldPrepareData(data, normalise, dmin, dmax,
+                                          floatt)
+
+                    assert got.dtype == exp.dtype
+                    assert got.shape == exp.shape
+                    assert np.all(got == exp)
+
+                    if got is not data:
+                        assert got.flags['{}_CONTIGUOUS'.format(order)]
+
+                finally:
+                    tex.destroy()
+
+
+def test_pyramidLevels():
+
+    # Each level is 1/8 the size of the next
+    # finer level - levels are added until
+    # the coarsest is no bigger than maxSize
+    assert texture3d.pyramidLevels((64, 64, 64), 64 ** 3, 64 ** 3)     == []
+    assert texture3d.pyramidLevels((64, 64, 64), 64 ** 3, 32 ** 3)     == [2]
+    assert texture3d.pyramidLevels((64, 64, 64), 64 ** 3, 32 ** 3 - 1) == \
+        [4, 2]
+    assert texture3d.pyramidLevels((64, 64, 64), 64 ** 3, 1000)        == \
+        [8, 4, 2]
+
+    # Levels never go beyond the data shape
+    assert texture3d.pyramidLevels((4, 4, 4), 64, 1) == [4, 2]
+
+
+def test_buildPyramid():
+
+    data    = np.random.random((32, 32, 32)).astype(np.float32)
+    levels  = texture3d.pyramidLevels(data.shape, data.nbytes, 100)
+    pyramid = texture3d.buildPyramid(data, levels)
+
+    assert levels == [16, 8, 4, 2]
+    assert sorted(pyramid.keys()) == [2, 4, 8, 16]
+
+    # Each level is the mean of the full
+    # resolution data within each voxel
+    for factor in levels:
+        n     = 32 // factor
+        exp   = data.reshape(n, factor, n, factor, n, factor)
+        exp   = exp.mean(axis=(1, 3, 5))
+        level = pyramid[factor]
+
+        assert level.shape == (n, n, n)
+        assert level.dtype == np.float32
+        assert np.all(np.isclose(level, exp, atol=1e-5))
+
+
+def test_calculateBricks():
+
+    shape   = (20, 9, 30)
+    overlap = texture3d.BRICK_OVERLAP
+
+    for maxSize in (8, 10, 16):
+
+        bricks = texture3d.calculateBricks(shape, maxSize, overlap)
+        cores  = np.zeros(shape, dtype=np.int32)
+
+        for offset, bshape, coff, cshape in bricks:
+
+            assert all(s <= maxSize for s in bshape)
+
+            cores[tuple(slice(o, o + s) for o, s in zip(coff, cshape))] += 1
+
+            # Every core voxel must have enough
+            # neighbours in the brick for spline
+            # interpolation, unless it is at the
+            # edge of the texture
+            for o, s, co, cs, size in zip(offset, bshape, coff, cshape, shape):
+                assert co - o              >= min(2, co)
+                assert (o + s) - (co + cs) >= min(2, size - (co + cs))
+
+        # Cores do not overlap,
+        # and cover the texture
+        assert np.all(cores == 1)
+
+
+def _textureData(tex, shape):
+    """Reads back the data from the given uint16 ``Texture3D``. """
+    baseFmt = texture3d.Texture3D.getTextureType(
+        False, np.dtype(np.uint16), 1)[1]
+    tex.bindTexture()
+    data = gl.glGetTexImage(
+        gl.GL_TEXTURE_3D, 0, baseFmt, gl.GL_UNSIGNED_SHORT)
+    tex.unbindTexture()
+    return np.asarray(data, dtype=np.uint16).reshape(shape, order='F')
+
+
+def test_Texture3D_asyncUpload():
+    run_with_orthopanel(_test_Texture3D_asyncUpload)
+def _test_Texture3D_asyncUpload(panel, overlayList, displayCtx):
+
+    canvas = panel.getGLCanvases()[0]
+    shape  = (40, 40, 40)
+    old    = np.random.randint(0, 65535, shape).astype(np.uint16)
+    new    = np.random.randint(0, 65535, shape).astype(np.uint16)
+
+    def wait(tex):
+        for i in range(100):
+            if tex.ready():
+                break
+            realYield()
+
+    # Keep track of the staging
+    # textures which are created
+    staging  = []
+    realInit = texture3d.texture.Texture.__init__
+    def init(self, name, *args, **kwargs):
+        if name.endswith('_staging'):
+            staging.append(name)
+        realInit(self, name, *args, **kwargs)
+
+    # Small upload size, so the data is
+    # uploaded in slabs, over several
+    # idle loop iterations
+    with mock.patch.object(texture3d, 'UPLOAD_SIZE', 40 * 40 * 2 * 4), \
+         mock.patch.object(texture3d.texture.Texture, '__init__', init):
+
+        canvas._setGLContext()
+        tex = texture3d.Texture3D('test', threaded=True, data=old)
+
+        try:
+            # The first upload is copied
+            # straight into the texture
+            wait(tex)
+            canvas._setGLContext()
+            assert tex.ready()
+            assert len(staging) == 0
+            assert np.all(_textureData(tex, shape) == old)
+
+            # While the new data is being uploaded,
+            # the texture must contain the old data,
+            # rather than partially uploaded data
+            tex.set(data=new)
+
+            seen = 0
+            for i in range(500):
+                if tex.ready():
+                    break
+                canvas._setGLContext()
+                assert np.all(_textureData(tex, shape) == old)
+                seen += 1
+                realYield(1)
+
+            canvas._setGLContext()
+            assert seen > 0
+            assert len(staging) == 1
+            assert np.all(_textureData(tex, shape) == new)
+
+        finally:
+            tex.destroy()
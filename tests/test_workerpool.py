@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+#
+# test_workerpool.py -
+#
+# Author: Paul McCarthy <pauldmccarthy@gmail.com>
+#
+
+import time
+import threading
+
+import fsl.utils.idle as idle
+
+import fsleyes.gl.textures.workerpool as workerpool
+
+
+def test_workerpool_priority():
+
+    pool    = workerpool.WorkerPool(1)
+    order   = []
+    blocker = threading.Event()
+
+    # Occupy the worker, so that the
+    # other tasks are queued together
+    pool.enqueue(blocker.wait, taskName='block')
+    time.sleep(0.1)
+
+    pool.enqueue(order.append, 'low',  taskName='low',  priority=0)
+    pool.enqueue(order.append, 'high', taskName='high', priority=2)
+    pool.enqueue(order.append, 'mid',  taskName='mid',  priority=1)
+    pool.enqueue(order.append, 'mid2', taskName='mid2', priority=1)
+
+    blocker.set()
+    pool.waitUntilIdle()
+    pool.stop()
+
+    assert order == ['high', 'mid', 'mid2', 'low']
+
+
+def test_workerpool_dynamic_priority():
+
+    pool     = workerpool.WorkerPool(1)
+    order    = []
+    blocker  = threading.Event()
+    priority = {'a' : 1, 'b' : 0}
+
+    pool.enqueue(blocker.wait, taskName='block')
+    time.sleep(0.1)
+
+    pool.enqueue(order.append, 'a', taskName='a',
+                 priority=lambda: priority['a'])
+    pool.enqueue(order.append, 'b', taskName='b',
+                 priority=lambda: priority['b'])
+
+    # Priorities are evaluated
+    # when the next task is chosen
+    priority['b'] = 2
+
+    blocker.set()
+    pool.waitUntilIdle()
+    pool.stop()
+
+    assert order == ['b', 'a']
+
+
+def test_workerpool_dequeue():
+
+    pool    = workerpool.WorkerPool(1)
+    done    = []
+    blocker = threading.Event()
+
+    pool.enqueue(blocker.wait, taskName='block')
+    time.sleep(0.1)
+
+    pool.enqueue(done.append, 1, taskName='task1', group='g1')
+    pool.enqueue(done.append, 2, taskName='task2', group='g1')
+    pool.enqueue(done.append, 3, taskName='task3', group='g2')
+    pool.enqueue(done.append, 4, taskName='task4', group='g2')
+
+    assert pool.isQueued('task1')
+
+    pool.dequeue('task1')
+    pool.dequeueGroup('g2')
+
+    assert not pool.isQueued('task1')
+    assert not pool.isQueued('task3')
+    assert not pool.isQueued('task4')
+
+    blocker.set()
+    pool.waitUntilIdle()
+    pool.stop()
+
+    assert done == [2]
+
+
+def test_workerpool_group():
+
+    pool    = workerpool.WorkerPool(4)
+    running = []
+    maxrun  = [0]
+    lock    = threading.Lock()
+
+    def task():
+        with lock:
+            running.append(1)
+            maxrun[0] = max(maxrun[0], len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+
+    # At most one task from
+    # a group is run at a time
+    for i in range(8):
+        pool.enqueue(task, taskName='task{}'.format(i), group='group')
+
+    pool.waitUntilIdle()
+    pool.stop()
+
+    assert maxrun[0] == 1
+
+
+def test_workerpool_onFinish():
+
+    pool     = workerpool.WorkerPool(2)
+    finished = []
+
+    def veto():
+        raise idle.TaskThreadVeto()
+
+    def crash():
+        raise RuntimeError()
+
+    pool.enqueue(lambda : None, taskName='ok',
+                 onFinish=lambda : finished.append('ok'))
+    pool.enqueue(veto,          taskName='veto',
+                 onFinish=lambda : finished.append('veto'))
+    pool.enqueue(crash,         taskName='crash',
+                 onFinish=lambda : finished.append('crash'))
+
+    pool.waitUntilIdle()
+    pool.stop()
+
+    # With no GUI, idle.idle calls
+    # onFinish functions immediately.
+    # onFinish is not called for
+    # vetoed or crashed tasks.
+    assert finished == ['ok']